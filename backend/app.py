@@ -4,20 +4,23 @@ ClaunNetworking Backend API
 Sistema completo de backend para a plataforma ClaunNetworking
 """
 
-from flask import Flask, request, jsonify, session, send_from_directory
+from flask import Flask, request, jsonify, session
 import logging
 import sentry_sdk
 from sentry_sdk.integrations.flask import FlaskIntegration
 from flask_talisman import Talisman
 from flask_cors import CORS
-from werkzeug.security import generate_password_hash, check_password_hash
 import os
 import json
+from concurrent.futures import TimeoutError as HashTimeout
 from datetime import datetime, timedelta
 import uuid
 
 # Importa as funções de banco de dados do novo módulo
-from app.services.database import execute_sql
+from app.services.database import execute_sql, release_request_connection, transaction
+from app.services import metrics, query_log, replicas, statements
+from app.services.passwords import HashingBusy, hasher, needs_rehash
+from app.services.static_assets import static_assets
 
 # ----------------------------------------------------------------
 # Configuração do Aplicativo
@@ -57,6 +60,18 @@ app.config.update(
 # O Talisman é configurado para funcionar com CORS e Flask-Session.
 Talisman(app, content_security_policy=None) # CSP é desabilitado para evitar quebras no frontend, mas HSTS e outros headers são aplicados.
 
+# Cada requisição usa uma única conexão do pool, devolvida no teardown (inclusive em erros)
+app.teardown_appcontext(release_request_connection)
+
+# Histogramas de latência por rota e por query, gauges do pool e GET /metrics (Prometheus);
+# com PROMETHEUS_MULTIPROC_DIR os valores de todos os workers do gunicorn são somados
+metrics.init_app(app)
+# Server-Timing (queries e tempo de banco por requisição), log de queries lentas e @query_budget
+query_log.init_app(app)
+# Leituras nas réplicas (DATABASE_REPLICA_URLS); após escrever, o cliente lê do primário por
+# READ_YOUR_WRITES_SECONDS (cookie de watermark)
+replicas.init_app(app)
+
 
 # ----------------------------------------------------------------
 # Rotas de Autenticação
@@ -73,7 +88,11 @@ def register():
     if not all([email, password, user_type, name]):
         return jsonify({"error": "Dados incompletos"}), 400
 
-    password_hash = generate_password_hash(password)
+    # O hash roda no pool de processos dedicado; com a fila cheia, recusa com 503
+    try:
+        password_hash = hasher.hash(password)
+    except HashingBusy:
+        return jsonify({"error": "Servidor ocupado. Tente novamente em instantes."}), 503, {"Retry-After": "1"}
     
     # 1. Inserir na tabela 'users'
     sql_insert = """
@@ -85,22 +104,24 @@ def register():
     params = (email, password_hash, user_type, name, data.get('phone', ''))
     
     try:
-        # Usa a função centralizada para executar o SQL
-        result = execute_sql(sql_insert, params, fetch=True, commit=True)
-        user_id = result[0][0]
-        
-        # 2. Inserir na tabela de perfil específica
-        if user_type == 'candidate':
-            sql_profile = "INSERT INTO candidate_profiles (user_id) VALUES (%s);"
-        elif user_type == 'company':
-            sql_profile = "INSERT INTO company_profiles (user_id) VALUES (%s);"
-        elif user_type == 'institution':
-            sql_profile = "INSERT INTO institution_profiles (user_id) VALUES (%s);"
-        else:
-            # Se o tipo de usuário for inválido, apenas retorna o sucesso do registro
-            return jsonify({"message": "Registro de usuário bem-sucedido, mas tipo de perfil desconhecido."}), 201
-
-        execute_sql(sql_profile, (user_id,), commit=True)
+        # Usuário e perfil são gravados na mesma transação, com um único commit:
+        # uma falha no segundo INSERT desfaz também o primeiro.
+        with transaction():
+            result = execute_sql(sql_insert, params, fetch=True, commit=True)
+            user_id = result[0]['id']
+            
+            # 2. Inserir na tabela de perfil específica
+            if user_type == 'candidate':
+                sql_profile = "INSERT INTO candidate_profiles (user_id) VALUES (%s);"
+            elif user_type == 'company':
+                sql_profile = "INSERT INTO company_profiles (user_id) VALUES (%s);"
+            elif user_type == 'institution':
+                sql_profile = "INSERT INTO institution_profiles (user_id) VALUES (%s);"
+            else:
+                # Se o tipo de usuário for inválido, apenas retorna o sucesso do registro
+                return jsonify({"message": "Registro de usuário bem-sucedido, mas tipo de perfil desconhecido."}), 201
+
+            execute_sql(sql_profile, (user_id,), commit=True)
         
         return jsonify({"message": "Registro bem-sucedido", "user_id": user_id}), 201
         
@@ -112,6 +133,13 @@ def register():
         app.logger.error(f"Falha no registro do usuário {email}: {e}", extra={"user_email": email, "error_type": "registration_failure"})
         return jsonify({"error": "Erro interno do servidor durante o registro."}), 500
 
+# Consulta mais frequente do login: preparada uma vez por conexão no PostgreSQL
+LOGIN_LOOKUP = statements.register('users_login_lookup',
+    "SELECT id, password_hash, user_type, name FROM users WHERE email = %s;", prepare=True)
+
+UPDATE_PASSWORD_HASH = statements.register('users_update_password_hash',
+    "UPDATE users SET password_hash = %s WHERE id = %s;")
+
 @app.route('/api/login', methods=['POST'])
 def login():
     data = request.get_json()
@@ -121,10 +149,8 @@ def login():
     if not all([email, password]):
         return jsonify({"error": "E-mail e senha são obrigatórios"}), 400
 
-    sql = "SELECT id, password_hash, user_type, name FROM users WHERE email = %s;"
-    
     try:
-        user_data = execute_sql(sql, (email,), fetch=True)
+        user_data = execute_sql(LOGIN_LOOKUP, (email,), fetch=True)
         if not user_data:
             app.logger.warning(f"Tentativa de login falha (e-mail não encontrado): {email}", extra={"user_email": email, "error_type": "user_not_found"})
             return jsonify({"error": "E-mail ou senha inválidos"}), 401
@@ -136,7 +162,15 @@ def login():
         user_type = user_dict['user_type']
         name = user_dict['name']
 
-        if check_password_hash(password_hash, password):
+        if hasher.verify(password_hash, password):
+            if needs_rehash(password_hash):
+                # Atualiza hashes antigos para os parâmetros atuais (custo extra apenas neste login).
+                # A senha já foi verificada: com a fila cheia ou lenta, o rehash fica para o próximo login
+                try:
+                    execute_sql(UPDATE_PASSWORD_HASH, (hasher.hash(password), user_id), commit=True)
+                except (HashingBusy, HashTimeout):
+                    app.logger.warning(f"Rehash de senha adiado (hashing ocupado) para o usuário: {email}", extra={"user_id": user_id, "error_type": "rehash_skipped"})
+
             session.permanent = True
             session['user_id'] = user_id
             session['user_type'] = user_type
@@ -148,6 +182,9 @@ def login():
             app.logger.warning(f"Tentativa de login falha (senha incorreta) para o e-mail: {email}", extra={"user_email": email, "error_type": "invalid_password"})
             return jsonify({"error": "E-mail ou senha inválidos"}), 401
 
+    except HashingBusy:
+        app.logger.warning("Login recusado: fila de hashing de senhas cheia", extra={"error_type": "hashing_busy"})
+        return jsonify({"error": "Servidor ocupado. Tente novamente em instantes."}), 503, {"Retry-After": "1"}
     except Exception as e:
         app.logger.error(f"Erro interno no login para o e-mail: {email}: {e}", extra={"user_email": email, "error_type": "internal_login_error"})
         return jsonify({"error": "Erro interno do servidor durante o login."}), 500
@@ -229,25 +266,25 @@ def get_profile():
 # Serve o index.html do frontend principal
 @app.route('/')
 def serve_index():
-    return send_from_directory('../frontend', 'index.html')
+    return static_assets.response('index.html')
 
-# Serve arquivos estáticos do frontend principal e admin
+# Serve arquivos estáticos do frontend principal e admin: variantes gzip/brotli
+# pré-geradas, URLs com hash (cache imutável) e 304 para If-None-Match
 @app.route('/<path:path>')
 def serve_static(path):
     # Garante que o usuário não acesse arquivos sensíveis
     if '..' in path:
         return "Acesso negado", 403
     
-    # 1. Tenta servir o arquivo diretamente do diretório 'frontend'
-    try:
-        return send_from_directory('../frontend', path)
-    except Exception:
-        pass # Continua para a próxima verificação
+    # 1. Arquivo do manifest do frontend (caminho original ou com fingerprint)
+    response = static_assets.response(path)
+    if response is not None:
+        return response
 
     # 2. Se a rota for para o admin, tenta servir o index do admin
     if path.startswith('admin/'):
         # Serve o index do admin para rotas como /admin/dashboard
-        return send_from_directory('../frontend', 'admin.html')
+        return static_assets.response('admin.html')
 
     # 3. Se não encontrar, retorna 404
     return "Não encontrado", 404
@@ -255,7 +292,7 @@ def serve_static(path):
 # Rota específica para o index do admin
 @app.route('/admin')
 def serve_admin_index():
-    return send_from_directory('../frontend', 'admin.html')
+    return static_assets.response('admin.html')
 # Execução
 # ----------------------------------------------------------------
 
@@ -2,38 +2,64 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-from flask import Flask
+from flask import Flask, jsonify
 from flask_cors import CORS
 import os
 
-from .routes import auth, jobs, courses
+from .routes import auth, jobs, courses, candidates, admin, messages
 from .models import database
+from .services import database as database_service
+from .services import metrics, query_log, replicas
+from .services.static_assets import static_assets
 
 def create_app():
-    app = Flask(__name__, static_folder='../../frontend', static_url_path='/')
+    # O frontend é servido por static_assets (gzip/brotli, fingerprint e ETag), não pelo static do Flask
+    app = Flask(__name__, static_folder=None)
     app.secret_key = 'claunnetworking_secret_key_2024'
     CORS(app, supports_credentials=True)
 
     # Configurar o caminho do banco de dados
-    app.config['DATABASE_PATH'] = os.path.join(app.instance_path, 'database', 'claunnetworking.db')
+    # (o mesmo arquivo SQLite usado por execute_sql(), para que as rotas compartilhem os dados)
+    app.config['DATABASE_PATH'] = database_service.DATABASE_PATH
     app.config['UPLOAD_FOLDER'] = os.path.join(app.instance_path, 'uploads')
 
     # Criar diretórios necessários
-    os.makedirs(os.path.join(app.instance_path, 'database'), exist_ok=True)
+    os.makedirs(os.path.dirname(app.config['DATABASE_PATH']), exist_ok=True)
     os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
+    # Conexões vinculadas à requisição são devolvidas no teardown, mesmo em caso de erro
+    app.teardown_appcontext(database.close_db)
+    app.teardown_appcontext(database_service.release_request_connection)
+
+    # Latência por rota/status e GET /metrics (formato Prometheus)
+    metrics.init_app(app)
+    # Server-Timing com queries/tempo de banco e orçamentos de @query_budget
+    query_log.init_app(app)
+    # Cookie de read-your-writes: após uma escrita, o cliente lê do primário por alguns segundos
+    replicas.init_app(app)
+
     # Inicializar o banco de dados
     with app.app_context():
-        database.init_database()
+        database_service.init_database()
 
     # Registrar blueprints
     app.register_blueprint(auth.bp)
     app.register_blueprint(jobs.bp)
     app.register_blueprint(courses.bp)
+    app.register_blueprint(candidates.bp)
+    app.register_blueprint(admin.bp)
+    app.register_blueprint(messages.bp)
 
     @app.route('/')
     def serve_index():
-        return app.send_static_file('index.html')
+        return static_assets.response('index.html')
+
+    @app.route('/<path:path>')
+    def serve_static(path):
+        response = static_assets.response(path)
+        if response is None:
+            return jsonify({'error': 'Não encontrado'}), 404
+        return response
 
     return app
 
@@ -2,13 +2,28 @@
 # -*- coding: utf-8 -*-
 
 import sqlite3
-from flask import current_app
+from flask import current_app, g
+
+from app.services.sqlite_engine import SQLITE_ENGINE, sqlite_engine
 
 def get_db():
-    db_path = current_app.config["DATABASE_PATH"]
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    return conn
+    """Retorna a conexão SQLite da requisição atual (a persistente da thread, ver sqlite_engine)."""
+    if 'sqlite_db' not in g:
+        db_path = current_app.config["DATABASE_PATH"]
+        g.sqlite_db = sqlite_engine.connection(db_path) if SQLITE_ENGINE else sqlite3.connect(db_path)
+        g.sqlite_db.row_factory = sqlite3.Row
+    return g.sqlite_db
+
+def close_db(exception=None):
+    """Handler de teardown: libera a conexão da requisição, inclusive após erros e retornos antecipados."""
+    conn = g.pop('sqlite_db', None)
+    if conn is None:
+        return
+    if SQLITE_ENGINE:
+        # Desfaz o que não foi comitado; a conexão continua aberta para a thread
+        sqlite_engine.release(conn)
+    else:
+        conn.close()
 
 def init_database():
     """Inicializa o banco de dados com todas as tabelas necessárias"""
@@ -215,5 +230,4 @@ def init_database():
     """)
     
     conn.commit()
-    conn.close()
 
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from datetime import date, datetime, timedelta, timezone
+
+from flask import Blueprint, request, jsonify, session
+from app.services.database import execute_sql
+from app.services.metric_rollups import DAILY_SQL, TOTALS_SQL
+from app.services.migrations import METRIC_ROLLUPS
+from app.services.query_log import query_budget
+
+bp = Blueprint('admin', __name__, url_prefix='/api/admin')
+
+# Períodos do seletor do painel (metrics-period): de 1 dia a 1 ano
+DEFAULT_METRICS_DAYS = 30
+MAX_METRICS_DAYS = 366
+
+def _admin_required():
+    if 'user_id' not in session:
+        return jsonify({'error': 'Não autorizado'}), 401
+    if session.get('user_type') != 'admin':
+        return jsonify({'error': 'Acesso restrito a administradores'}), 403
+    return None
+
+def _parse_days(raw):
+    if raw is None or raw == '':
+        return DEFAULT_METRICS_DAYS
+    days = int(raw)
+    if not 1 <= days <= MAX_METRICS_DAYS:
+        raise ValueError
+    return days
+
+@bp.route('/metrics', methods=['GET'])
+@query_budget(3)
+def get_metrics():
+    """
+    Totais da plataforma e séries diárias do período (days=7, 30, 90, 365...).
+
+    Lê apenas as tabelas de rollup e os deltas ainda não consolidados (migração 0012,
+    app.services.metric_rollups): o custo depende do número de dias, não de usuários ou candidaturas.
+    """
+    denied = _admin_required()
+    if denied:
+        return denied
+
+    try:
+        days = _parse_days(request.args.get('days'))
+    except ValueError:
+        return jsonify({'error': f'Parâmetro days deve estar entre 1 e {MAX_METRICS_DAYS}'}), 400
+
+    try:
+        # Mesma data dos buckets gravados pelos triggers (CURRENT_DATE do banco, em UTC),
+        # calculada aqui para não gastar uma query
+        today = datetime.now(timezone.utc).date()
+        start = today - timedelta(days=days - 1)
+
+        totals = {metric: {} for metric in METRIC_ROLLUPS}
+        for row in execute_sql(TOTALS_SQL, fetch=True):
+            totals[row['metric']][row['dimension']] = int(row['total'])
+
+        daily = {start + timedelta(days=offset): dict.fromkeys(METRIC_ROLLUPS, 0) for offset in range(days)}
+        rows = execute_sql(DAILY_SQL, (start.isoformat(), today.isoformat()) * 2, fetch=True)
+        for row in rows:
+            day = date.fromisoformat(str(row['day'])[:10])
+            if day in daily and row['metric'] in daily[day]:
+                daily[day][row['metric']] = int(row['total'])
+
+        plans = {str(plan['id']): plan['name'] for plan in execute_sql('SELECT id, name FROM plans', fetch=True)}
+
+        return jsonify({
+            'period': {'days': days, 'start': start.isoformat(), 'end': today.isoformat()},
+            'totals': {
+                'users': {'total': sum(totals['users'].values()), 'by_type': totals['users']},
+                'jobs': {'active': sum(totals['jobs'].values())},
+                'courses': {'active': sum(totals['courses'].values())},
+                'applications': {'total': sum(totals['applications'].values())},
+                'subscriptions': {
+                    'active': sum(totals['subscriptions'].values()),
+                    'by_plan': [
+                        {'plan_id': int(plan_id), 'name': plans.get(plan_id), 'count': count}
+                        for plan_id, count in sorted(totals['subscriptions'].items(), key=lambda item: -item[1])
+                    ],
+                },
+            },
+            'period_totals': {metric: sum(counts[metric] for counts in daily.values()) for metric in METRIC_ROLLUPS},
+            'daily': [dict(counts, date=day.isoformat()) for day, counts in daily.items()],
+        }), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -1,9 +1,12 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-from flask import Blueprint, request, jsonify, session
-from werkzeug.security import generate_password_hash, check_password_hash
+from concurrent.futures import TimeoutError as HashTimeout
+
+from flask import Blueprint, current_app, request, jsonify, session
 from app.models.database import get_db
+from app.services.passwords import HashingBusy, hasher, needs_rehash
+from app.services.sqlite_engine import begin_write
 
 bp = Blueprint('auth', __name__, url_prefix='/api/auth')
 
@@ -19,7 +22,8 @@ def register():
         if cursor.fetchone():
             return jsonify({'error': 'Email já cadastrado'}), 400
         
-        password_hash = generate_password_hash(data['password'])
+        password_hash = hasher.hash(data['password'])
+        begin_write(conn)
         cursor.execute('''
             INSERT INTO users (email, password_hash, user_type, name, phone)
             VALUES (?, ?, ?, ?, ?)
@@ -27,10 +31,11 @@ def register():
         
         user_id = cursor.lastrowid
         conn.commit()
-        conn.close()
         
         return jsonify({'message': 'Usuário cadastrado com sucesso', 'user_id': user_id}), 201
         
+    except HashingBusy:
+        return jsonify({'error': 'Servidor ocupado. Tente novamente em instantes.'}), 503, {'Retry-After': '1'}
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -45,7 +50,20 @@ def login():
         cursor.execute('SELECT id, password_hash, user_type, name FROM users WHERE email = ?', (data['email'],))
         user = cursor.fetchone()
         
-        if user and check_password_hash(user['password_hash'], data['password']):
+        if user and hasher.verify(user['password_hash'], data['password']):
+            if needs_rehash(user['password_hash']):
+                # Atualiza hashes antigos para os parâmetros atuais. A senha já foi verificada:
+                # com a fila cheia ou lenta, o login segue e o rehash fica para o próximo
+                try:
+                    new_hash = hasher.hash(data['password'])
+                except (HashingBusy, HashTimeout):
+                    current_app.logger.warning('Rehash de senha adiado no login: hashing ocupado',
+                                               extra={'user_id': user['id'], 'error_type': 'rehash_skipped'})
+                else:
+                    begin_write(conn)
+                    cursor.execute('UPDATE users SET password_hash = ? WHERE id = ?', (new_hash, user['id']))
+                    conn.commit()
+            
             session['user_id'] = user['id']
             session['user_type'] = user['user_type']
             
@@ -60,6 +78,8 @@ def login():
         else:
             return jsonify({'error': 'Credenciais inválidas'}), 401
             
+    except HashingBusy:
+        return jsonify({'error': 'Servidor ocupado. Tente novamente em instantes.'}), 503, {'Retry-After': '1'}
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from flask import Blueprint, request, jsonify, session
+from app.services.database import execute_sql
+from app.services.pagination import PaginationError, keyset_condition, keyset_order_by, paginate, parse_limit
+from app.services.query_log import query_budget
+from app.services.recommendations import CANDIDATE_FEATURES_SQL, RECOMMENDATION_TOP_K, recommendations_for_candidate
+from app.services.search import SearchError
+
+bp = Blueprint('candidates', __name__, url_prefix='/api/candidates')
+
+# Filtros de igualdade sobre o perfil (parâmetro -> condição)
+CANDIDATE_FILTERS = {
+    'sector': 'p.sector = %s',
+    'level': 'p.level = %s',
+    'work_modality': 'p.work_modality = %s',
+    'state': 'p.address_state = %s',
+    'city': 'p.address_city = %s',
+}
+
+# Faixa de pretensão salarial aceita pela empresa
+SALARY_FILTERS = {
+    'salary_min': 'p.salary_expectation >= %s',
+    'salary_max': 'p.salary_expectation <= %s',
+}
+
+# Parâmetro -> tipo de tag em candidate_tags (ver migração 0005)
+TAG_FILTERS = {'skills': 'skill', 'languages': 'language'}
+MAX_TAGS_PER_FILTER = 10
+
+# Facetas calculadas sobre o conjunto filtrado (faceta -> coluna do perfil)
+CANDIDATE_FACETS = {
+    'sector': 'sector',
+    'level': 'level',
+    'work_modality': 'work_modality',
+    'state': 'address_state',
+}
+TOP_SKILLS_FACET = 20
+
+CANDIDATE_COLUMNS = '''
+    p.user_id AS user_id, u.name AS name, p.professional_title, p.sector, p.level,
+    p.work_modality, p.address_city, p.address_state, p.experience_years,
+    p.salary_expectation, p.skills, p.languages, p.education_level, p.availability_status
+'''
+
+# Nomes das colunas de CANDIDATE_COLUMNS (linhas da página na primeira página com facetas)
+CANDIDATE_COLUMN_NAMES = [column.split()[-1].split('.')[-1] for column in CANDIDATE_COLUMNS.split(',')]
+
+def _split_tags(raw):
+    tags = list(dict.fromkeys(tag.strip() for tag in raw.split(',') if tag.strip()))
+    if len(tags) > MAX_TAGS_PER_FILTER:
+        raise SearchError(f'Máximo de {MAX_TAGS_PER_FILTER} termos por filtro')
+    return tags
+
+def _candidate_source(args):
+    """
+    Monta o FROM/WHERE da busca a partir dos parâmetros da requisição.
+
+    Com competências ou idiomas, a consulta parte da lista de candidatos do
+    primeiro termo no índice invertido, já ordenada por user_id, e confere os
+    demais termos com EXISTS pela chave (kind, tag, user_id). Assim uma página
+    lê apenas as entradas do índice até completar o LIMIT.
+
+    :return: (from_sql, condições, parâmetros, chave de ordenação).
+    """
+    tags = [(kind, tag) for name, kind in TAG_FILTERS.items() for tag in _split_tags(args.get(name, ''))]
+    conditions = []
+    params = []
+    if tags:
+        from_sql = '''candidate_tags t0
+            JOIN candidate_profiles p ON p.user_id = t0.user_id
+            JOIN users u ON u.id = p.user_id'''
+        sort_key = ('t0.user_id',)
+        (kind, tag), others = tags[0], tags[1:]
+        conditions.append(f"t0.kind = '{kind}' AND t0.tag = lower(trim(%s))")
+        params.append(tag)
+        for index, (kind, tag) in enumerate(others, start=1):
+            conditions.append(
+                f"EXISTS (SELECT 1 FROM candidate_tags t{index} WHERE t{index}.kind = '{kind}' "
+                f"AND t{index}.tag = lower(trim(%s)) AND t{index}.user_id = t0.user_id)"
+            )
+            params.append(tag)
+    else:
+        from_sql = 'candidate_profiles p JOIN users u ON u.id = p.user_id'
+        sort_key = ('p.user_id',)
+
+    conditions += [
+        "u.user_type = 'candidate'",
+        'u.is_active = TRUE',
+        'u.profile_public = TRUE',
+    ]
+    for name, condition in CANDIDATE_FILTERS.items():
+        value = args.get(name, '').strip()
+        if value:
+            conditions.append(condition)
+            params.append(value)
+    for name, condition in SALARY_FILTERS.items():
+        value = args.get(name, '').strip()
+        if value:
+            try:
+                params.append(float(value))
+            except ValueError:
+                raise SearchError(f'Valor inválido para {name}')
+            conditions.append(condition)
+    return from_sql, conditions, params, sort_key
+
+def _first_page_sql(from_sql, conditions):
+    """
+    Primeira página e facetas em um único comando: o conjunto filtrado inteiro é
+    calculado uma vez (CTE) e agrupado por cada coluna, então as contagens e o
+    total são exatos. As linhas da página vêm com facet = NULL; as das facetas,
+    com as colunas da página em NULL. O último parâmetro é o LIMIT da página.
+    """
+    matched = f'''
+        SELECT {CANDIDATE_COLUMNS}
+        FROM {from_sql}
+        WHERE {' AND '.join(conditions)}
+    '''
+    no_columns = ', '.join(f'NULL AS {column}' for column in CANDIDATE_COLUMN_NAMES)
+    branches = [f'''
+        SELECT {', '.join(CANDIDATE_COLUMN_NAMES)}, NULL AS facet, NULL AS value, NULL AS total
+        FROM (SELECT * FROM matched {keyset_order_by(('user_id',))} LIMIT %s) page
+    ''']
+    branches += [
+        f"SELECT {no_columns}, '{facet}' AS facet, {column} AS value, COUNT(*) AS total "
+        f"FROM matched WHERE {column} IS NOT NULL GROUP BY {column}"
+        for facet, column in CANDIDATE_FACETS.items()
+    ]
+    # CROSS JOIN fixa a ordem no SQLite: parte das linhas filtradas, e não de
+    # todas as competências cadastradas (o PostgreSQL reordena livremente)
+    branches.append(f'''
+        SELECT {no_columns}, 'skills' AS facet, tag AS value, total FROM (
+            SELECT s.tag, COUNT(*) AS total
+            FROM matched m CROSS JOIN candidate_tags s
+            WHERE s.user_id = m.user_id AND s.kind = 'skill'
+            GROUP BY s.tag ORDER BY total DESC, s.tag LIMIT {TOP_SKILLS_FACET}
+        ) top_skills
+    ''')
+    branches.append(f"SELECT {no_columns}, 'total' AS facet, NULL AS value, COUNT(*) AS total FROM matched")
+    return f'WITH matched AS ({matched}) ' + ' UNION ALL '.join(branches)
+
+def _group_facets(rows):
+    """
+    Separa as linhas de _first_page_sql() em página, facetas e total.
+
+    :return: (linhas da página, facetas, total).
+    """
+    facets = {facet: [] for facet in list(CANDIDATE_FACETS) + ['skills']}
+    page = []
+    total = 0
+    for row in rows:
+        if row['facet'] is None:
+            page.append({column: row[column] for column in CANDIDATE_COLUMN_NAMES})
+        elif row['facet'] == 'total':
+            total = row['total']
+        else:
+            facets[row['facet']].append({'value': row['value'], 'count': row['total']})
+    for facet, values in facets.items():
+        if facet != 'skills':
+            values.sort(key=lambda item: (-item['count'], str(item['value'])))
+    return page, facets, total
+
+@bp.route('/search', methods=['GET'])
+@query_budget(1)
+def search_candidates():
+    """
+    Busca de candidatos com perfil público por competências, idiomas, setor, nível,
+    modalidade, localização e pretensão salarial. A primeira página traz as facetas.
+    """
+    if 'user_id' not in session:
+        return jsonify({'error': 'Não autorizado'}), 401
+
+    try:
+        limit = parse_limit(request.args.get('limit'))
+        cursor_token = request.args.get('cursor')
+        from_sql, conditions, params, sort_key = _candidate_source(request.args)
+
+        # Facetas só na primeira página (as seguintes reutilizam as da primeira), no mesmo comando da página
+        if not cursor_token and request.args.get('facets', '1') != '0':
+            rows = execute_sql(_first_page_sql(from_sql, conditions), params + [limit + 1], fetch=True, cache=True)
+            page, facets, total = _group_facets(rows)
+            candidates, next_cursor = paginate(page, sort_key, limit)
+            body = {'candidates': candidates, 'next_cursor': next_cursor, 'facets': facets, 'total': total}
+            return jsonify(body), 200
+
+        query_conditions = list(conditions)
+        query_params = list(params)
+        if cursor_token:
+            condition, cursor_params = keyset_condition(sort_key, cursor_token)
+            query_conditions.append(condition)
+            query_params += cursor_params
+        query = f'''
+            SELECT {CANDIDATE_COLUMNS}
+            FROM {from_sql}
+            WHERE {' AND '.join(query_conditions)}
+            {keyset_order_by(sort_key)} LIMIT %s
+        '''
+        query_params.append(limit + 1)
+
+        candidates, next_cursor = paginate(execute_sql(query, query_params, fetch=True, cache=True),
+                                           sort_key, limit)
+        body = {'candidates': candidates, 'next_cursor': next_cursor}
+        return jsonify(body), 200
+
+    except (PaginationError, SearchError) as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/me/recommendations', methods=['GET'])
+@query_budget(3)
+def get_my_recommendations():
+    """
+    Vagas ativas mais compatíveis com o perfil do candidato logado.
+    """
+    if 'user_id' not in session:
+        return jsonify({'error': 'Não autorizado'}), 401
+
+    try:
+        limit = parse_limit(request.args.get('limit'), maximum=RECOMMENDATION_TOP_K)
+
+        profiles = execute_sql(f'{CANDIDATE_FEATURES_SQL} AND p.user_id = %s', (session['user_id'],), fetch=True)
+        if not profiles:
+            return jsonify({'error': 'Perfil de candidato não encontrado'}), 404
+
+        recommendations = recommendations_for_candidate(profiles[0], limit)
+        jobs = {}
+        if recommendations:
+            placeholders = ', '.join(['%s'] * len(recommendations))
+            rows = execute_sql(f'''
+                SELECT j.id, j.title, u.name AS company_name, j.location, j.work_modality,
+                       j.job_type, j.area, j.level, j.salary_range
+                FROM jobs j JOIN users u ON u.id = j.company_id
+                WHERE j.id IN ({placeholders}) AND j.is_active = TRUE
+            ''', [item['item_id'] for item in recommendations], fetch=True)
+            jobs = {row['id']: row for row in rows}
+
+        return jsonify({'jobs': [
+            dict(jobs[item['item_id']], score=item['score'])
+            for item in recommendations if item['item_id'] in jobs
+        ]}), 200
+
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -2,69 +2,162 @@
 # -*- coding: utf-8 -*-
 
 from flask import Blueprint, request, jsonify
-from app.models.database import get_db
+from app.services.database import execute_sql
+from app.services.facets import FacetCatalog
+from app.services.pagination import (
+    PaginationError, decode_cursor, keyset_condition, keyset_order_by, keyset_sql, paginate, parse_limit
+)
+from app.services.projection import Projection, ProjectionError, parse_format, serialize
+from app.services.query_log import query_budget
+from app.services.search import SearchError, search_source
+from app.services.statements import register_lazy, register_variants
 
 bp = Blueprint('courses', __name__, url_prefix='/api/courses')
 
+# Filtros opcionais da listagem, na ordem em que os parâmetros são passados
+COURSE_FILTERS = {
+    'category': 'c.category = %s',
+    'level': 'c.level = %s',
+    'modality': 'c.modality = %s',
+    'is_free': 'c.is_free = %s',
+}
+COURSE_SORT_KEY = ('c.is_featured', 'c.created_at', 'c.id')
+SEARCH_SORT_KEY = ('relevance', 'id')
+
+# Campos que a listagem pode devolver (fields=); a chave de ordenação é sempre lida
+COURSE_PROJECTION = Projection({
+    'id': 'c.id',
+    'institution_id': 'c.institution_id',
+    'title': 'c.title',
+    'description': 'c.description',
+    'category': 'c.category',
+    'level': 'c.level',
+    'modality': 'c.modality',
+    'duration': 'c.duration',
+    'price': 'c.price',
+    'is_free': 'c.is_free',
+    'is_featured': 'c.is_featured',
+    'created_at': 'c.created_at',
+    'institution_name': 'u.name',
+}, always=('id', 'is_featured', 'created_at'))
+
+# Cursos visíveis na listagem, na busca e nas facetas
+COURSE_VISIBLE = ['c.is_active = TRUE']
+
+# Filtro -> coluna contada em GET /api/courses/facets
+COURSE_FACETS = FacetCatalog('courses', 'c', {
+    'category': 'category',
+    'level': 'level',
+    'modality': 'modality',
+    'is_free': 'is_free',
+}, COURSE_FILTERS, COURSE_VISIBLE)
+
+def _course_filter_conditions(active):
+    return COURSE_VISIBLE + [condition for name, condition in COURSE_FILTERS.items() if name in active]
+
+def _course_filter_params(args):
+    """
+    :return: (filtros informados, valores na ordem de COURSE_FILTERS).
+    """
+    is_free = args.get('is_free')
+    values = {
+        'category': args.get('category'),
+        'level': args.get('level'),
+        'modality': args.get('modality'),
+        'is_free': is_free.lower() == 'true' if is_free else None,
+    }
+    active = frozenset(name for name in COURSE_FILTERS if args.get(name))
+    return active, [values[name] for name in COURSE_FILTERS if name in active]
+
+def _course_listing_sql(active, fields=COURSE_PROJECTION.names):
+    conditions = _course_filter_conditions(active)
+    if 'cursor' in active:
+        # Keyset: continua a partir da última linha da página anterior, sem OFFSET
+        conditions.append(keyset_sql(COURSE_SORT_KEY))
+    return f'''
+        SELECT {COURSE_PROJECTION.select_sql(fields)}
+        FROM courses c 
+        JOIN users u ON c.institution_id = u.id 
+        WHERE {' AND '.join(conditions)}
+        {keyset_order_by(COURSE_SORT_KEY)} LIMIT %s
+    '''
+
+# Uma variante preparada por combinação de filtros
+LIST_COURSES = register_variants('courses_list', tuple(COURSE_FILTERS) + ('cursor',), _course_listing_sql, prepare=True)
+
+def _listing_statement(active, fields):
+    if fields == COURSE_PROJECTION.names:
+        return LIST_COURSES[active]
+    # Projeções são preparadas sob demanda, só para as combinações realmente usadas
+    name = f'{LIST_COURSES[active].name}_{COURSE_PROJECTION.mask(fields)}'
+    return register_lazy(name, lambda: _course_listing_sql(active, fields), prepare=True)
+
+@bp.route('/facets', methods=['GET'])
+@query_budget(1)
+def get_course_facets():
+    """
+    Quantidade de cursos por categoria, nível, modalidade e gratuidade para os filtros (e busca) informados.
+    """
+    try:
+        active, filter_params = _course_filter_params(request.args)
+        q = request.args.get('q', '').strip()
+        search = search_source('courses', 'c', q) if q else None
+        
+        sql, params = COURSE_FACETS.sql(active, filter_params, search)
+        return jsonify(COURSE_FACETS.group(execute_sql(sql, params, fetch=True, cache=True))), 200
+        
+    except SearchError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @bp.route('/', methods=['GET'])
+@query_budget(1)
 def get_courses():
     try:
-        conn = get_db()
-        cursor = conn.cursor()
-        
-        category = request.args.get('category')
-        level = request.args.get('level')
-        modality = request.args.get('modality')
-        is_free = request.args.get('is_free')
+        q = request.args.get('q', '').strip()
+        limit = parse_limit(request.args.get('limit'))
+        cursor_token = request.args.get('cursor')
+        fields = COURSE_PROJECTION.parse(request.args.get('fields'))
+        output_format = parse_format(request.args.get('format'))
         
-        query = '''
-            SELECT c.*, u.name as institution_name 
-            FROM courses c 
-            JOIN users u ON c.institution_id = u.id 
-            WHERE c.is_active = 1
-        '''
-        params = []
+        active, filter_params = _course_filter_params(request.args)
         
-        if category:
-            query += ' AND c.category = ?'
-            params.append(category)
-        if level:
-            query += ' AND c.level = ?'
-            params.append(level)
-        if modality:
-            query += ' AND c.modality = ?'
-            params.append(modality)
-        if is_free:
-            query += ' AND c.is_free = ?'
-            params.append(1 if is_free.lower() == 'true' else 0)
+        if q:
+            # Busca textual: usa o índice FTS5/tsvector e ordena por relevância
+            from_sql, relevance_sql, where_sql, params = search_source('courses', 'c', q)
+            query = f'''
+                SELECT * FROM (
+                    SELECT {COURSE_PROJECTION.select_sql(fields)}, {relevance_sql} AS relevance
+                    FROM {from_sql}
+                    JOIN users u ON c.institution_id = u.id
+                    WHERE {' AND '.join([where_sql] + _course_filter_conditions(active))}
+                ) ranked
+            '''
+            params += filter_params
+            sort_key = SEARCH_SORT_KEY
+            if cursor_token:
+                condition, cursor_params = keyset_condition(sort_key, cursor_token)
+                query += f' WHERE {condition}'
+                params += cursor_params
+            query += f' {keyset_order_by(sort_key)} LIMIT %s'
+        else:
+            # Listagem: statement pré-compilado para a combinação de filtros recebida
+            params = filter_params
+            sort_key = COURSE_SORT_KEY
+            if cursor_token:
+                active |= {'cursor'}
+                params += decode_cursor(cursor_token, len(sort_key))
+            query = _listing_statement(active, fields)
             
-        query += ' ORDER BY c.is_featured DESC, c.created_at DESC'
+        params.append(limit + 1)
         
-        cursor.execute(query, params)
-        courses = cursor.fetchall()
+        courses, next_cursor = paginate(execute_sql(query, params, fetch=True, cache=True), sort_key, limit)
         
-        course_list = []
-        for course in courses:
-            course_dict = {
-                'id': course['id'],
-                'institution_id': course['institution_id'],
-                'title': course['title'],
-                'description': course['description'],
-                'category': course['category'],
-                'level': course['level'],
-                'modality': course['modality'],
-                'duration': course['duration'],
-                'price': course['price'],
-                'is_free': course['is_free'],
-                'is_featured': course['is_featured'],
-                'created_at': course['created_at'],
-                'institution_name': course['institution_name']
-            }
-            course_list.append(course_dict)
-        
-        conn.close()
-        return jsonify(course_list), 200
+        body = serialize('courses', courses, fields, output_format, next_cursor=next_cursor)
+        return jsonify(body), 200
         
+    except (PaginationError, ProjectionError, SearchError) as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-
@@ -1,72 +1,230 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-from flask import Blueprint, request, jsonify, session
-from app.models.database import get_db
+from flask import Blueprint, Response, request, jsonify, session
+from app.services import outbox
+from app.services.database import execute_sql, transaction
+from app.services.facets import FacetCatalog
+from app.services.job_import import JobImportError, import_jobs, read_records
+from app.services.job_stream import StreamFull, job_stream
+from app.services.pagination import (
+    PaginationError, decode_cursor, keyset_condition, keyset_order_by, keyset_sql, paginate, parse_limit
+)
+from app.services.projection import Projection, ProjectionError, parse_format, serialize
+from app.services.query_log import query_budget
+from app.services.recommendations import JOB_FEATURES_SQL, RECOMMENDATION_TOP_K, matches_for_job
+from app.services.search import SearchError, search_source
+from app.services.statements import register, register_lazy, register_variants
 
 bp = Blueprint('jobs', __name__, url_prefix='/api/jobs')
 
+# Filtros opcionais da listagem, na ordem em que os parâmetros são passados
+JOB_FILTERS = {
+    'area': 'j.area = %s',
+    'location': 'j.location LIKE %s',
+    'modality': 'j.work_modality = %s',
+}
+JOB_SORT_KEY = ('j.is_featured', 'j.created_at', 'j.id')
+SEARCH_SORT_KEY = ('relevance', 'id')
+
+# Campos que a listagem pode devolver (fields=); a chave de ordenação é sempre lida
+JOB_PROJECTION = Projection({
+    'id': 'j.id',
+    'company_id': 'j.company_id',
+    'title': 'j.title',
+    'description': 'j.description',
+    'requirements': 'j.requirements',
+    'benefits': 'j.benefits',
+    'salary_range': 'j.salary_range',
+    'location': 'j.location',
+    'work_modality': 'j.work_modality',
+    'job_type': 'j.job_type',
+    'area': 'j.area',
+    'level': 'j.level',
+    'is_featured': 'j.is_featured',
+    'created_at': 'j.created_at',
+    'company_name': 'u.name',
+}, always=('id', 'is_featured', 'created_at'))
+
+# Vagas visíveis: ativas e não expiradas (listagem, busca e facetas)
+JOB_VISIBLE = ['j.is_active = TRUE', '(j.expires_at IS NULL OR j.expires_at >= CURRENT_DATE)']
+
+# Filtro -> coluna contada em GET /api/jobs/facets
+JOB_FACETS = FacetCatalog('jobs', 'j', {
+    'area': 'area',
+    'location': 'location',
+    'modality': 'work_modality',
+}, JOB_FILTERS, JOB_VISIBLE)
+
+def _job_filter_conditions(active):
+    return JOB_VISIBLE + [condition for name, condition in JOB_FILTERS.items() if name in active]
+
+def _job_filter_params(args):
+    """
+    :return: (filtros informados, valores na ordem de JOB_FILTERS).
+    """
+    location = args.get('location')
+    values = {'area': args.get('area'), 'location': f'%{location}%' if location else None,
+              'modality': args.get('modality')}
+    active = frozenset(name for name in JOB_FILTERS if values[name])
+    return active, [values[name] for name in JOB_FILTERS if name in active]
+
+def _job_listing_sql(active, fields=JOB_PROJECTION.names):
+    conditions = _job_filter_conditions(active)
+    if 'cursor' in active:
+        # Keyset: continua a partir da última linha da página anterior, sem OFFSET
+        conditions.append(keyset_sql(JOB_SORT_KEY))
+    return f'''
+        SELECT {JOB_PROJECTION.select_sql(fields)}
+        FROM jobs j 
+        JOIN users u ON j.company_id = u.id 
+        WHERE {' AND '.join(conditions)}
+        {keyset_order_by(JOB_SORT_KEY)} LIMIT %s
+    '''
+
+# Uma variante preparada por combinação de filtros: é a consulta mais frequente da API
+LIST_JOBS = register_variants('jobs_list', tuple(JOB_FILTERS) + ('cursor',), _job_listing_sql, prepare=True)
+
+def _listing_statement(active, fields):
+    if fields == JOB_PROJECTION.names:
+        return LIST_JOBS[active]
+    # Projeções são preparadas sob demanda, só para as combinações realmente usadas
+    name = f'{LIST_JOBS[active].name}_{JOB_PROJECTION.mask(fields)}'
+    return register_lazy(name, lambda: _job_listing_sql(active, fields), prepare=True)
+
+INSERT_JOB = register('jobs_insert', '''
+    INSERT INTO jobs (company_id, title, description, requirements, benefits, 
+                    salary_range, location, work_modality, job_type, area, level)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    RETURNING id
+''')
+
+# Candidatura em um único comando: o índice único (job_id, candidate_id) resolve
+# cliques simultâneos no banco, e a vaga precisa existir e estar ativa
+APPLY_TO_JOB = register('applications_apply', '''
+    INSERT INTO applications (job_id, candidate_id, message, idempotency_key)
+    SELECT j.id, CAST(%s AS INTEGER), CAST(%s AS TEXT), CAST(%s AS VARCHAR(255))
+    FROM jobs j WHERE j.id = %s AND j.is_active = TRUE
+    ON CONFLICT DO NOTHING
+    RETURNING id
+''', prepare=True)
+
+# Só consultado quando o INSERT não gravou nada (duplicata, retry ou vaga inexistente)
+FIND_APPLICATION_CONFLICT = register('applications_find_conflict', '''
+    SELECT id, job_id, idempotency_key FROM applications
+    WHERE candidate_id = %s AND (job_id = %s OR idempotency_key = %s)
+''', prepare=True)
+
+# Máximo de vagas por candidatura em lote
+MAX_BATCH_APPLICATIONS = 50
+
+def _apply_batch_statement(count):
+    placeholders = ', '.join(['%s'] * count)
+    return register_lazy(f'applications_apply_batch_{count}', lambda: f'''
+        INSERT INTO applications (job_id, candidate_id, message)
+        SELECT j.id, CAST(%s AS INTEGER), CAST(%s AS TEXT)
+        FROM jobs j WHERE j.id IN ({placeholders}) AND j.is_active = TRUE
+        ON CONFLICT DO NOTHING
+        RETURNING id, job_id
+    ''', prepare=True)
+
+def _existing_applications_statement(count):
+    placeholders = ', '.join(['%s'] * count)
+    return register_lazy(f'applications_existing_{count}', lambda: f'''
+        SELECT job_id FROM applications WHERE candidate_id = %s AND job_id IN ({placeholders})
+    ''', prepare=True)
+
 @bp.route('/', methods=['GET'])
+@query_budget(1)
 def get_jobs():
     try:
-        conn = get_db()
-        cursor = conn.cursor()
-        
-        area = request.args.get('area')
-        location = request.args.get('location')
-        modality = request.args.get('modality')
-        
-        query = '''
-            SELECT j.*, u.name as company_name 
-            FROM jobs j 
-            JOIN users u ON j.company_id = u.id 
-            WHERE j.is_active = 1
-        '''
-        params = []
-        
-        if area:
-            query += ' AND j.area = ?'
-            params.append(area)
-        if location:
-            query += ' AND j.location LIKE ?'
-            params.append(f'%{location}%')
-        if modality:
-            query += ' AND j.work_modality = ?'
-            params.append(modality)
+        q = request.args.get('q', '').strip()
+        limit = parse_limit(request.args.get('limit'))
+        cursor_token = request.args.get('cursor')
+        fields = JOB_PROJECTION.parse(request.args.get('fields'))
+        output_format = parse_format(request.args.get('format'))
+        
+        active, filter_params = _job_filter_params(request.args)
+        
+        if q:
+            # Busca textual: usa o índice FTS5/tsvector e ordena por relevância
+            from_sql, relevance_sql, where_sql, params = search_source('jobs', 'j', q)
+            query = f'''
+                SELECT * FROM (
+                    SELECT {JOB_PROJECTION.select_sql(fields)}, {relevance_sql} AS relevance
+                    FROM {from_sql}
+                    JOIN users u ON j.company_id = u.id
+                    WHERE {' AND '.join([where_sql] + _job_filter_conditions(active))}
+                ) ranked
+            '''
+            params += filter_params
+            sort_key = SEARCH_SORT_KEY
+            if cursor_token:
+                condition, cursor_params = keyset_condition(sort_key, cursor_token)
+                query += f' WHERE {condition}'
+                params += cursor_params
+            query += f' {keyset_order_by(sort_key)} LIMIT %s'
+        else:
+            # Listagem: statement pré-compilado para a combinação de filtros recebida
+            params = filter_params
+            sort_key = JOB_SORT_KEY
+            if cursor_token:
+                active |= {'cursor'}
+                params += decode_cursor(cursor_token, len(sort_key))
+            query = _listing_statement(active, fields)
             
-        query += ' ORDER BY j.is_featured DESC, j.created_at DESC'
-        
-        cursor.execute(query, params)
-        jobs = cursor.fetchall()
-        
-        job_list = []
-        for job in jobs:
-            job_dict = {
-                'id': job['id'],
-                'company_id': job['company_id'],
-                'title': job['title'],
-                'description': job['description'],
-                'requirements': job['requirements'],
-                'benefits': job['benefits'],
-                'salary_range': job['salary_range'],
-                'location': job['location'],
-                'work_modality': job['work_modality'],
-                'job_type': job['job_type'],
-                'area': job['area'],
-                'level': job['level'],
-                'is_featured': job['is_featured'],
-                'created_at': job['created_at'],
-                'company_name': job['company_name']
-            }
-            job_list.append(job_dict)
-        
-        conn.close()
-        return jsonify(job_list), 200
+        params.append(limit + 1)
+        
+        jobs, next_cursor = paginate(execute_sql(query, params, fetch=True, cache=True), sort_key, limit)
+        
+        body = serialize('jobs', jobs, fields, output_format, next_cursor=next_cursor)
+        return jsonify(body), 200
         
+    except (PaginationError, ProjectionError, SearchError) as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@bp.route('/facets', methods=['GET'])
+@query_budget(1)
+def get_job_facets():
+    """
+    Quantidade de vagas por área, localização e modalidade para os filtros (e busca) informados.
+    """
+    try:
+        active, filter_params = _job_filter_params(request.args)
+        q = request.args.get('q', '').strip()
+        search = search_source('jobs', 'j', q) if q else None
+        
+        sql, params = JOB_FACETS.sql(active, filter_params, search)
+        return jsonify(JOB_FACETS.group(execute_sql(sql, params, fetch=True, cache=True))), 200
+        
+    except SearchError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/stream', methods=['GET'])
+@query_budget(0)
+def stream_jobs():
+    """
+    Server-Sent Events com as vagas criadas ou destacadas a partir de agora que
+    atendem aos filtros (area, modality, location), sem reconsultar a listagem.
+    A conexão não usa o banco: os eventos chegam pelo broker do processo.
+    """
+    try:
+        subscriber = job_stream.subscribe(request.args)
+    except StreamFull as e:
+        return jsonify({'error': str(e)}), 503, {'Retry-After': '30'}
+    
+    return Response(job_stream.stream(subscriber), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        # Nginx/proxies: repassa cada evento sem bufferizar a resposta
+        'X-Accel-Buffering': 'no',
+    })
+
 @bp.route('/', methods=['POST'])
+@query_budget(2)
 def create_job():
     if 'user_id' not in session:
         return jsonify({'error': 'Não autorizado'}), 401
@@ -74,53 +232,173 @@ def create_job():
     data = request.get_json()
     
     try:
-        conn = get_db()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO jobs (company_id, title, description, requirements, benefits, 
-                            salary_range, location, work_modality, job_type, area, level)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (session['user_id'], data['title'], data['description'], 
-              data['requirements'], data['benefits'], data['salary_range'],
-              data['location'], data['work_modality'], data['job_type'],
-              data['area'], data['level']))
-        
-        job_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+        # Os índices de busca (FTS5/tsvector) são atualizados pelo próprio banco neste INSERT;
+        # as notificações saem pela outbox, gravada na mesma transação
+        with transaction():
+            result = execute_sql(INSERT_JOB, (session['user_id'], data['title'], data['description'], 
+                                              data['requirements'], data['benefits'], data['salary_range'],
+                                              data['location'], data['work_modality'], data['job_type'],
+                                              data['area'], data['level']), fetch=True, commit=True)
+            job_id = result[0]['id']
+            outbox.enqueue('job.created', {'job_id': job_id, 'company_id': session['user_id']})
         
         return jsonify({'message': 'Vaga criada com sucesso', 'job_id': job_id}), 201
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@bp.route('/import', methods=['POST'])
+def import_jobs_bulk():
+    """
+    Importa vagas em lote a partir de um CSV (text/csv) ou NDJSON (application/x-ndjson).
+    O corpo é lido e validado em streaming; as linhas válidas são gravadas em uma única transação.
+    """
+    if 'user_id' not in session:
+        return jsonify({'error': 'Não autorizado'}), 401
+    if session.get('user_type') != 'company':
+        return jsonify({'error': 'Apenas empresas podem importar vagas'}), 403
+    
+    try:
+        records = read_records(request.stream, request.content_type)
+        result = import_jobs(session['user_id'], records)
+        
+        status = 201 if result['imported'] else 400
+        return jsonify(result), status
+        
+    except (JobImportError, UnicodeDecodeError) as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @bp.route('/apply', methods=['POST'])
+@query_budget(2)
 def apply_to_job():
     if 'user_id' not in session:
         return jsonify({'error': 'Não autorizado'}), 401
     
-    data = request.get_json()
+    data = request.get_json(silent=True)
+    try:
+        job_id = int(data['job_id'])
+    except (KeyError, TypeError, ValueError):
+        return jsonify({'error': 'job_id deve ser o id de uma vaga'}), 400
+    
+    # Retries com a mesma Idempotency-Key devolvem a resposta original sem gravar de novo
+    idempotency_key = request.headers.get('Idempotency-Key') or None
+    if idempotency_key and len(idempotency_key) > 255:
+        return jsonify({'error': 'Idempotency-Key deve ter no máximo 255 caracteres'}), 400
     
     try:
-        conn = get_db()
-        cursor = conn.cursor()
+        with transaction():
+            result = execute_sql(APPLY_TO_JOB, (session['user_id'], data.get('message', ''), idempotency_key,
+                                                job_id), fetch=True, commit=True)
+            if result:
+                # Notificações da empresa e do candidato, entregues pelo worker da outbox
+                outbox.enqueue('application.created', {
+                    'candidate_id': session['user_id'],
+                    'applications': [{'id': result[0]['id'], 'job_id': job_id}],
+                })
+        if result:
+            return jsonify({'message': 'Candidatura enviada com sucesso', 'application_id': result[0]['id']}), 201
         
-        cursor.execute('SELECT id FROM applications WHERE job_id = ? AND candidate_id = ?',
-                      (data['job_id'], session['user_id']))
-        if cursor.fetchone():
+        conflicts = execute_sql(FIND_APPLICATION_CONFLICT, (session['user_id'], job_id, idempotency_key), fetch=True)
+        for application in conflicts:
+            if idempotency_key and application['idempotency_key'] == idempotency_key:
+                if application['job_id'] != job_id:
+                    return jsonify({'error': 'Idempotency-Key já utilizada em outra candidatura'}), 422
+                response = jsonify({'message': 'Candidatura enviada com sucesso', 'application_id': application['id']})
+                response.headers['Idempotent-Replayed'] = 'true'
+                return response, 201
+        if conflicts:
             return jsonify({'error': 'Você já se candidatou a esta vaga'}), 400
+        return jsonify({'error': 'Vaga não encontrada'}), 404
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/apply/batch', methods=['POST'])
+@query_budget(3)
+def apply_to_jobs_batch():
+    """
+    Candidatura a várias vagas em uma requisição: {"job_ids": [...], "message": "..."}.
+    Reenviar o mesmo lote é seguro: vagas já candidatadas voltam em already_applied.
+    """
+    if 'user_id' not in session:
+        return jsonify({'error': 'Não autorizado'}), 401
+    
+    data = request.get_json()
+    
+    try:
+        job_ids = list(dict.fromkeys(int(job_id) for job_id in data['job_ids']))
+        if not job_ids:
+            return jsonify({'error': 'Informe ao menos uma vaga'}), 400
+        if len(job_ids) > MAX_BATCH_APPLICATIONS:
+            return jsonify({'error': f'Máximo de {MAX_BATCH_APPLICATIONS} vagas por lote'}), 400
         
-        cursor.execute('''
-            INSERT INTO applications (job_id, candidate_id, message)
-            VALUES (?, ?, ?)
-        ''', (data['job_id'], session['user_id'], data.get('message', '')))
+        with transaction():
+            result = execute_sql(_apply_batch_statement(len(job_ids)),
+                                 [session['user_id'], data.get('message', '')] + job_ids, fetch=True, commit=True)
+            if result:
+                # Um único evento (e um único INSERT na outbox) para o lote
+                outbox.enqueue('application.created', {
+                    'candidate_id': session['user_id'],
+                    'applications': [{'id': row['id'], 'job_id': row['job_id']} for row in result],
+                })
+        applied = {row['job_id'] for row in result}
         
-        conn.commit()
-        conn.close()
+        remaining = [job_id for job_id in job_ids if job_id not in applied]
+        existing = set()
+        if remaining:
+            rows = execute_sql(_existing_applications_statement(len(remaining)),
+                               [session['user_id']] + remaining, fetch=True)
+            existing = {row['job_id'] for row in rows}
         
-        return jsonify({'message': 'Candidatura enviada com sucesso'}), 201
+        status = 201 if applied else 200 if existing else 404
+        return jsonify({
+            'applied': [job_id for job_id in job_ids if job_id in applied],
+            'already_applied': [job_id for job_id in remaining if job_id in existing],
+            'not_found': [job_id for job_id in remaining if job_id not in existing],
+        }), status
         
+    except (KeyError, TypeError, ValueError):
+        return jsonify({'error': 'job_ids deve ser uma lista de ids de vagas'}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@bp.route('/<int:job_id>/matches', methods=['GET'])
+@query_budget(3)
+def get_job_matches(job_id):
+    """
+    Candidatos mais compatíveis com a vaga (apenas para a empresa dona da vaga).
+    """
+    if 'user_id' not in session:
+        return jsonify({'error': 'Não autorizado'}), 401
+    
+    try:
+        limit = parse_limit(request.args.get('limit'), maximum=RECOMMENDATION_TOP_K)
+        
+        jobs = execute_sql(f'{JOB_FEATURES_SQL} AND id = %s AND company_id = %s',
+                           (job_id, session['user_id']), fetch=True)
+        if not jobs:
+            return jsonify({'error': 'Vaga não encontrada'}), 404
+        
+        matches = matches_for_job(jobs[0], limit)
+        candidates = {}
+        if matches:
+            placeholders = ', '.join(['%s'] * len(matches))
+            rows = execute_sql(f'''
+                SELECT p.user_id, u.name, p.professional_title, p.sector, p.level,
+                       p.address_city, p.address_state
+                FROM candidate_profiles p JOIN users u ON u.id = p.user_id
+                WHERE p.user_id IN ({placeholders}) AND u.is_active = TRUE AND u.profile_public = TRUE
+            ''', [match['item_id'] for match in matches], fetch=True)
+            candidates = {row['user_id']: row for row in rows}
+        
+        return jsonify({'matches': [
+            dict(candidates[match['item_id']], score=match['score'])
+            for match in matches if match['item_id'] in candidates
+        ]}), 200
+        
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
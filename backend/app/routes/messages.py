@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import math
+
+from flask import Blueprint, request, jsonify, session
+from app.services import messaging
+from app.services.messaging import HISTORY_SORT_KEY, INBOX_SORT_KEY, MessagingError, TooManyWaiters
+from app.services.pagination import PaginationError, decode_cursor, paginate, parse_limit
+from app.services.query_log import query_budget
+
+bp = Blueprint('messages', __name__, url_prefix='/api/messages')
+
+@bp.route('/conversations', methods=['GET'])
+@query_budget(2)
+def list_conversations():
+    """
+    Caixa de entrada: conversas do usuário por atividade recente, com as não lidas de cada uma.
+    """
+    if 'user_id' not in session:
+        return jsonify({'error': 'Não autorizado'}), 401
+
+    try:
+        limit = parse_limit(request.args.get('limit'))
+        cursor_token = request.args.get('cursor')
+        cursor = decode_cursor(cursor_token, len(INBOX_SORT_KEY)) if cursor_token else None
+
+        rows = messaging.inbox(session['user_id'], limit, cursor)
+        conversations, next_cursor = paginate(rows, INBOX_SORT_KEY, limit)
+        return jsonify({'conversations': conversations, 'next_cursor': next_cursor}), 200
+
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/conversations', methods=['POST'])
+@query_budget(5)
+def create_conversation():
+    """
+    Nova conversa: {"participant_ids": [...], "subject": "...", "message": "..."} (assunto e mensagem opcionais).
+    """
+    if 'user_id' not in session:
+        return jsonify({'error': 'Não autorizado'}), 401
+
+    data = request.get_json() or {}
+
+    try:
+        result = messaging.create_conversation(session['user_id'], data.get('participant_ids') or [],
+                                               data.get('subject'), data.get('message'))
+        return jsonify(result), 201
+
+    except MessagingError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/conversations/<int:conversation_id>/messages', methods=['GET'])
+@query_budget(2)
+def get_messages(conversation_id):
+    """
+    Histórico da conversa, da mensagem mais nova para a mais antiga; next_cursor busca as anteriores.
+    """
+    if 'user_id' not in session:
+        return jsonify({'error': 'Não autorizado'}), 401
+
+    try:
+        limit = parse_limit(request.args.get('limit'))
+        cursor_token = request.args.get('cursor')
+        cursor = decode_cursor(cursor_token, len(HISTORY_SORT_KEY)) if cursor_token else None
+
+        rows = messaging.history(conversation_id, session['user_id'], limit, cursor)
+        if rows is None:
+            return jsonify({'error': 'Conversa não encontrada'}), 404
+        messages, next_cursor = paginate(rows, HISTORY_SORT_KEY, limit)
+        return jsonify({'messages': messages, 'next_cursor': next_cursor}), 200
+
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/conversations/<int:conversation_id>/messages', methods=['POST'])
+@query_budget(3)
+def send_message(conversation_id):
+    if 'user_id' not in session:
+        return jsonify({'error': 'Não autorizado'}), 401
+
+    data = request.get_json() or {}
+
+    try:
+        message = messaging.send_message(conversation_id, session['user_id'], data.get('body'))
+        if message is None:
+            return jsonify({'error': 'Conversa não encontrada'}), 404
+        return jsonify({'message': message}), 201
+
+    except MessagingError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/conversations/<int:conversation_id>/read', methods=['POST'])
+@query_budget(1)
+def mark_conversation_read(conversation_id):
+    if 'user_id' not in session:
+        return jsonify({'error': 'Não autorizado'}), 401
+
+    try:
+        last_read = messaging.mark_read(conversation_id, session['user_id'])
+        if last_read is None:
+            return jsonify({'error': 'Conversa não encontrada'}), 404
+        return jsonify({'last_read_message_id': last_read}), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/unread', methods=['GET'])
+@query_budget(1)
+def get_unread():
+    """
+    Total de não lidas e não lidas por conversa (contadores mantidos no envio, sem COUNT em messages).
+    """
+    if 'user_id' not in session:
+        return jsonify({'error': 'Não autorizado'}), 401
+
+    try:
+        return jsonify(messaging.unread_counts(session['user_id'])), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/poll', methods=['GET'])
+def poll_messages():
+    """
+    Long-poll de mensagens novas em qualquer conversa do usuário: responde assim que
+    houver mensagens com id maior que `after`, ou com a lista vazia após `timeout` s.
+    Sem `after`, responde na hora com o last_id atual, a partir do qual o cliente passa a esperar.
+    """
+    if 'user_id' not in session:
+        return jsonify({'error': 'Não autorizado'}), 401
+
+    try:
+        user_id = session['user_id']
+        if not request.args.get('after'):
+            return jsonify({'messages': [], 'last_id': messaging.latest_message_id(user_id)}), 200
+
+        after = int(request.args['after'])
+        timeout = float(request.args.get('timeout', messaging.MESSAGES_POLL_TIMEOUT))
+        limit = parse_limit(request.args.get('limit'))
+        # nan/inf passariam pelas comparações e a espera viraria um laço de queries
+        if after < 0 or not math.isfinite(timeout):
+            raise ValueError
+        timeout = min(max(timeout, 0.0), messaging.MESSAGES_POLL_TIMEOUT)
+
+        messages = messaging.wait_for_messages(user_id, after, timeout, limit)
+        return jsonify({'messages': messages, 'last_id': messages[-1]['id'] if messages else after}), 200
+
+    except TooManyWaiters as e:
+        return jsonify({'error': str(e)}), 503, {'Retry-After': '5'}
+    except (PaginationError, ValueError):
+        return jsonify({'error': 'Parâmetros after, timeout ou limit inválidos'}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
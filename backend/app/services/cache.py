@@ -0,0 +1,156 @@
+# backend/app/services/cache.py
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+# ----------------------------------------------------------------
+# Cache de Resultados de Consultas (LRU com TTL e tags por tabela)
+# ----------------------------------------------------------------
+
+# Tabelas lidas (FROM/JOIN) ou escritas (INSERT INTO/UPDATE/DELETE FROM/DDL) por um comando
+_TABLE_RE = re.compile(r'\b(?:FROM|JOIN|INTO|UPDATE|TABLE)\s+([A-Za-z_][A-Za-z0-9_]*)', re.IGNORECASE)
+
+# Apenas as tabelas alteradas (um INSERT ... SELECT FROM jobs não escreve em jobs)
+_WRITTEN_TABLE_RE = re.compile(
+    r'\b(?:INTO|UPDATE|DELETE\s+FROM|TABLE)\s+(?:IF\s+(?:NOT\s+)?EXISTS\s+)?([A-Za-z_][A-Za-z0-9_]*)',
+    re.IGNORECASE
+)
+
+# Tabelas mantidas por triggers: escrever na tabela-base também altera estas
+# (migrações 0005 e 0007), então o cache delas é invalidado junto
+DERIVED_TABLES = {
+    'candidate_profiles': {'candidate_tags'},
+    'jobs': {'job_facet_counts'},
+    'courses': {'course_facet_counts'},
+}
+
+
+def tables_in(sql):
+    """
+    Retorna o conjunto de tabelas citadas no comando SQL (em minúsculas).
+    """
+    return {name.lower() for name in _TABLE_RE.findall(sql)}
+
+
+def written_tables(sql):
+    """
+    Retorna as tabelas escritas pelo comando SQL (e as mantidas por trigger a
+    partir delas), usadas na invalidação do cache.
+    """
+    tables = {name.lower() for name in _WRITTEN_TABLE_RE.findall(sql)}
+    for table in list(tables):
+        tables |= DERIVED_TABLES.get(table, set())
+    return tables
+
+
+def _estimate_size(rows):
+    """
+    Estimativa barata do espaço ocupado pelas linhas de um resultado, em bytes.
+    """
+    size = sys.getsizeof(rows)
+    for row in rows:
+        size += sys.getsizeof(row)
+        values = row.values() if isinstance(row, dict) else row
+        for value in values:
+            size += sys.getsizeof(value)
+    return size
+
+
+class QueryCache:
+    """
+    Cache LRU de resultados de SELECT, limitado por memória e por TTL.
+
+    Cada entrada é marcada com as tabelas que leu; um comando com commit
+    invalida todas as entradas marcadas com as tabelas que escreveu.
+    O cache é local ao processo: entre workers do gunicorn a consistência
+    é garantida apenas pelo TTL.
+    """
+
+    def __init__(self, max_bytes, ttl):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()  # chave -> (expira_em, tamanho, tags, linhas)
+        self._tags = {}                # tabela -> conjunto de chaves
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(sql, params):
+        return (sql, tuple(params or ()))
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[0] < time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[3]
+
+    def set(self, key, rows, tags):
+        size = _estimate_size(rows)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl, size, tags, rows)
+            self._bytes += size
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate(self, tags):
+        """
+        Remove todas as entradas que leram alguma das tabelas informadas.
+        """
+        with self._lock:
+            for tag in tags:
+                for key in self._tags.pop(tag, ()):
+                    if key in self._entries:
+                        self._remove(key)
+                        self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
+
+    def _remove(self, key):
+        # Chamado com o lock adquirido
+        _, size, tags, _ = self._entries.pop(key)
+        self._bytes -= size
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
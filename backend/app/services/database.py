@@ -1,9 +1,26 @@
 # backend/app/services/database.py
+import csv
+import io
 import os
+import json
 import psycopg2
+import select
 import sqlite3
+import threading
+import time
+from contextlib import contextmanager
 from urllib.parse import urlparse
-from psycopg2.pool import SimpleConnectionPool
+from flask import g, has_app_context, has_request_context
+from psycopg2 import extensions
+from psycopg2.extras import RealDictCursor
+
+from app.services import metrics, query_log
+from app.services.replicas import (DATABASE_REPLICA_PATHS, DATABASE_REPLICA_URLS, ReplicaSet, note_write,
+                                   pinned_to_primary)
+from app.services.cache import QueryCache, tables_in, written_tables
+from app.services.pool import ConnectionPool, default_pool_size
+from app.services.sqlite_engine import SQLITE_ENGINE, begin_write, sqlite_engine
+from app.services.statements import Statement
 
 # ----------------------------------------------------------------
 # Configuração do Banco de Dados
@@ -14,6 +31,28 @@ DATABASE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '
 
 # Variável global para o pool de conexões
 connection_pool = None
+_pool_lock = threading.Lock()
+
+# Parâmetros do pool (o tamanho é calculado por default_pool_size())
+DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 5))
+DB_POOL_VALIDATE_AFTER = float(os.environ.get('DB_POOL_VALIDATE_AFTER', 30))
+DB_POOL_MAX_IDLE = float(os.environ.get('DB_POOL_MAX_IDLE', 300))
+DB_POOL_MAX_LIFETIME = float(os.environ.get('DB_POOL_MAX_LIFETIME', 1800))
+
+# Usa PREPARE/EXECUTE para statements registrados com prepare=True.
+# Desative (0) atrás de um PgBouncer em modo transaction, que não preserva a sessão.
+DB_PREPARE_STATEMENTS = os.environ.get('DB_PREPARE_STATEMENTS', '1') != '0'
+
+# Cache opcional de resultados de leitura (ver execute_sql(cache=True))
+QUERY_CACHE_MAX_BYTES = int(os.environ.get('QUERY_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+QUERY_CACHE_TTL = float(os.environ.get('QUERY_CACHE_TTL', 30))
+query_cache = QueryCache(QUERY_CACHE_MAX_BYTES, QUERY_CACHE_TTL)
+
+# Réplicas de leitura (DATABASE_REPLICA_URLS / DATABASE_REPLICA_PATHS), ver get_read_connection()
+replica_set = None
+
+# Transação aberta por transaction() na thread atual (conexão e tabelas escritas)
+_transaction_state = threading.local()
 
 # ----------------------------------------------------------------
 # Funções de Conexão
@@ -25,311 +64,380 @@ def initialize_connection_pool():
     Chamado apenas uma vez na inicialização do aplicativo.
     """
     global connection_pool
-    if DATABASE_URL and connection_pool is None:
-        try:
-            # Configurações básicas do pool: min 1, max 10 conexões
-            connection_pool = SimpleConnectionPool(1, 10, DATABASE_URL)
-            print("Pool de conexões PostgreSQL inicializado com sucesso.")
-        except Exception as e:
-            print(f"Erro ao inicializar o pool de conexões PostgreSQL: {e}")
-            # Em caso de falha, o aplicativo deve falhar ou tentar novamente
-            raise
+    with _pool_lock:
+        if DATABASE_URL and connection_pool is None:
+            try:
+                # Tamanho derivado de workers/threads do gunicorn (ver default_pool_size)
+                minconn, maxconn = default_pool_size()
+                connection_pool = ConnectionPool(
+                    DATABASE_URL, minconn, maxconn,
+                    timeout=DB_POOL_TIMEOUT,
+                    validate_after=DB_POOL_VALIDATE_AFTER,
+                    max_idle=DB_POOL_MAX_IDLE,
+                    max_lifetime=DB_POOL_MAX_LIFETIME,
+                )
+                print(f"Pool de conexões PostgreSQL inicializado com sucesso ({minconn}-{maxconn} conexões).")
+            except Exception as e:
+                print(f"Erro ao inicializar o pool de conexões PostgreSQL: {e}")
+                # Em caso de falha, o aplicativo deve falhar ou tentar novamente
+                raise
+
+def get_pool_stats():
+    """
+    Estatísticas do pool PostgreSQL deste processo (None no SQLite ou antes da inicialização).
+    """
+    return connection_pool.stats() if connection_pool is not None else None
+
+def _replica_pool(url):
+    minconn, maxconn = default_pool_size()
+    return ConnectionPool(
+        url, minconn, maxconn,
+        timeout=DB_POOL_TIMEOUT,
+        validate_after=DB_POOL_VALIDATE_AFTER,
+        max_idle=DB_POOL_MAX_IDLE,
+        max_lifetime=DB_POOL_MAX_LIFETIME,
+    )
+
+def _sqlite_replica(path):
+    # A réplica é preenchida por fora: um arquivo ausente conta como réplica indisponível
+    if not os.path.exists(path):
+        raise FileNotFoundError(f'Réplica SQLite não encontrada: {path}')
+    return os.path.abspath(path)
+
+if DATABASE_URL:
+    # Um pool por réplica, com os mesmos parâmetros do primário (criado no primeiro uso)
+    replica_set = ReplicaSet(DATABASE_REPLICA_URLS, _replica_pool,
+                             lambda pool: pool.getconn(), lambda pool, conn: pool.putconn(conn))
+else:
+    # Arquivos SQLite no papel de réplica, com as conexões por thread do sqlite_engine
+    replica_set = ReplicaSet(DATABASE_REPLICA_PATHS, _sqlite_replica,
+                             sqlite_engine.connection, lambda path, conn: sqlite_engine.release(conn))
 
 def get_db_connection():
     """
     Retorna uma conexão com o banco de dados, usando o pool em produção (PostgreSQL)
-    ou uma nova conexão (SQLite) em desenvolvimento.
+    ou a conexão persistente da thread (SQLite, ver sqlite_engine).
     """
     if DATABASE_URL:
         # PostgreSQL - Obtém uma conexão do pool
         if connection_pool is None:
             initialize_connection_pool()
         return connection_pool.getconn()
+    elif SQLITE_ENGINE:
+        # SQLite - Conexão da thread atual (WAL, PRAGMAs aplicados na abertura)
+        return sqlite_engine.connection(DATABASE_PATH)
     else:
-        # SQLite - Abre uma nova conexão (desenvolvimento)
+        # SQLite - Abre uma nova conexão (SQLITE_ENGINE=0)
         os.makedirs(os.path.dirname(DATABASE_PATH), exist_ok=True)
         return sqlite3.connect(DATABASE_PATH)
 
 def put_db_connection(conn):
     """
-    Retorna a conexão ao pool (PostgreSQL) ou fecha a conexão (SQLite).
+    Retorna a conexão ao pool (PostgreSQL), devolve à thread (SQLite) ou fecha (SQLITE_ENGINE=0).
     """
     if DATABASE_URL and connection_pool is not None:
         # PostgreSQL - Retorna a conexão ao pool
         connection_pool.putconn(conn)
+    elif conn and SQLITE_ENGINE:
+        # SQLite - Mantém aberta para a próxima chamada da thread, sem transação pendente
+        sqlite_engine.release(conn)
     elif conn:
         # SQLite - Fecha a conexão
         conn.close()
 
+def get_request_connection():
+    """
+    Retorna a conexão vinculada à requisição atual (flask.g), obtendo-a na primeira chamada.
+    A conexão é devolvida por release_request_connection() no teardown do app context.
+    """
+    if 'db_conn' not in g:
+        g.db_conn = get_db_connection()
+    return g.db_conn
+
+def get_read_connection():
+    """
+    Conexão para uma leitura da requisição: uma réplica (escolhida uma vez por
+    requisição, em rodízio) ou, sem réplicas disponíveis, a conexão do primário.
+
+    Lê do primário a requisição que já escreveu e o cliente que escreveu há
+    menos de READ_YOUR_WRITES_SECONDS (read-your-writes).
+    """
+    if replica_set and not pinned_to_primary():
+        if 'db_replica' not in g:
+            g.db_replica = replica_set.acquire()
+        conn = g.db_replica[1]
+        if conn is not None:
+            return conn
+    return get_request_connection()
+
+def release_request_connection(exception=None):
+    """
+    Handler de teardown: descarta qualquer transação pendente e devolve a conexão da requisição.
+    """
+    index, replica_conn = g.pop('db_replica', (None, None))
+    if replica_conn is not None:
+        try:
+            replica_set.release(index, replica_conn)
+        except Exception as e:
+            print(f"Erro ao liberar conexão da réplica: {e}")
+    conn = g.pop('db_conn', None)
+    if conn is None:
+        return
+    try:
+        conn.rollback()
+    except Exception as e:
+        print(f"Erro ao liberar conexão da requisição: {e}")
+    finally:
+        put_db_connection(conn)
+
+def listen(channel, handle):
+    """
+    Ouve um canal LISTEN/NOTIFY do PostgreSQL em uma conexão dedicada (fora do
+    pool) e chama handle(payload) com o JSON de cada notificação. Não retorna:
+    deve rodar em uma thread própria, e reconecta com backoff se a conexão cair.
+
+    Notificações emitidas enquanto a conexão estava caída se perdem; quem usa
+    o canal deve tratá-lo apenas como um aviso.
+    """
+    delay = 1
+    while True:
+        conn = None
+        try:
+            conn = psycopg2.connect(DATABASE_URL)
+            conn.set_isolation_level(extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+            conn.cursor().execute(f'LISTEN {channel}')
+            delay = 1
+            while True:
+                # Acorda a cada 30 s mesmo sem notificações, para perceber conexões perdidas
+                if select.select([conn], [], [], 30) == ([], [], []):
+                    conn.cursor().execute('SELECT 1')
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    handle(json.loads(conn.notifies.pop(0).payload))
+        except Exception as e:
+            print(f"Ouvinte do canal {channel} desconectado ({e}); nova tentativa em {delay}s")
+            time.sleep(delay)
+            delay = min(delay * 2, 30)
+        finally:
+            if conn is not None:
+                conn.close()
+
+@contextmanager
+def transaction():
+    """
+    Agrupa vários execute_sql() em uma única transação e um único commit.
+
+    Dentro do bloco, commit=True apenas registra as tabelas escritas; o commit
+    acontece ao sair do bloco sem erros, e qualquer exceção desfaz tudo.
+    Blocos aninhados participam da transação mais externa.
+    """
+    if getattr(_transaction_state, 'conn', None) is not None:
+        yield
+        return
+
+    request_scoped = has_app_context()
+    conn = get_request_connection() if request_scoped else get_db_connection()
+    _transaction_state.conn = conn
+    _transaction_state.written = set()
+    try:
+        yield
+        conn.commit()
+        query_cache.invalidate(_transaction_state.written)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        _transaction_state.conn = None
+        _transaction_state.written = None
+        if not request_scoped:
+            put_db_connection(conn)
+
 # ----------------------------------------------------------------
 # Funções de Execução de SQL
 # ----------------------------------------------------------------
 
-def execute_sql(sql, params=None, fetch=False, commit=False):
+def _record_query(statement, sql, params, seconds, conn, failed=False):
+    # Histograma Prometheus por statement, totais da requisição (Server-Timing) e log de queries lentas
+    label = statement.name if statement else metrics.sql_label(sql)
+    metrics.observe_query(label, seconds, failed)
+    query_log.record(label, statement.sql if statement else sql, params, seconds, conn, bool(DATABASE_URL))
+
+def execute_sql(sql, params=None, fetch=False, commit=False, cache=False):
     """
     Executa comandos SQL no banco de dados.
     
-    :param sql: Comando SQL a ser executado.
+    :param sql: Comando SQL a ser executado (texto com placeholders '%s' ou um
+                Statement registrado em app.services.statements).
     :param params: Parâmetros para o comando SQL.
     :param fetch: Se True, retorna o resultado da consulta.
-    :param commit: Se True, comita a transação.
+    :param commit: Se True, comita a transação e invalida o cache das tabelas escritas.
+                   Dentro de transaction(), o commit fica para o fim do bloco.
+    :param cache: Se True (apenas leituras), usa o cache de resultados. As linhas
+                  retornadas são compartilhadas e não devem ser modificadas.
     :return: Resultado da consulta se fetch=True, senão None.
     """
+    statement = sql if isinstance(sql, Statement) else None
+    params = params or ()
+    written = statement.written if statement else written_tables(sql)
+    tx_conn = getattr(_transaction_state, 'conn', None)
+    cache_key = None
+    if cache and fetch and not commit and tx_conn is None:
+        cache_key = QueryCache.make_key(statement.sql if statement else sql, params)
+        cached = query_cache.get(cache_key)
+        if cached is not None:
+            return list(cached)
+
     conn = None
+    owned = False
+    started = None
     try:
-        conn = get_db_connection()
+        # Prioridade: transação aberta > conexão da requisição (réplica, nas leituras) > conexão avulsa
+        if tx_conn is not None:
+            conn = tx_conn
+        elif has_request_context() and not (commit or written):
+            conn = get_read_connection()
+        elif has_app_context():
+            conn = get_request_connection()
+        else:
+            conn = get_db_connection()
+            owned = True
         
-        # Para PostgreSQL, usamos cursor factory para retornar dicionários (melhor serialização)
+        if written and replica_set:
+            note_write()
+
+        started = time.perf_counter()
         if DATABASE_URL:
-            # Importa o cursor de dicionário para PostgreSQL
-            from psycopg2.extras import RealDictCursor
+            # PostgreSQL: cursor de dicionário (melhor serialização)
             cursor = conn.cursor(cursor_factory=RealDictCursor)
+            prepared = getattr(conn, 'prepared_statements', None)
+            if statement is not None and statement.prepare and DB_PREPARE_STATEMENTS and prepared is not None:
+                # Prepara uma vez por conexão; as execuções seguintes pulam o parse/plan
+                if statement.name not in prepared:
+                    cursor.execute(statement.prepare_sql)
+                    prepared.add(statement.name)
+                cursor.execute(statement.execute_sql, params)
+            else:
+                cursor.execute(statement.sql if statement else sql, params)
         else:
-            # Para SQLite, usamos o row_factory para retornar dicionários
+            # SQLite: row_factory para dicionários e placeholders '?'
+            # (já convertidos na declaração, no caso de um Statement)
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
+            if written:
+                # Fila de escrita do processo (liberada no commit/rollback)
+                begin_write(conn)
+            cursor.execute(statement.sqlite_sql if statement else sql.replace('%s', '?'), params)
         
-        # SQLite usa '?' como placeholder, PostgreSQL usa '%s'.
-        # Se for SQLite, converte '%s' para '?' no SQL antes de executar.
-        if not DATABASE_URL:
-            sql_sqlite = sql.replace('%s', '?')
-            cursor.execute(sql_sqlite, params or ())
-        else:
-            cursor.execute(sql, params or ())
-        
-        if commit:
-            conn.commit()
-        
+        results = None
         if fetch:
-            # Retorna a lista de dicionários (ou tuplas se não for RealDictCursor/sqlite3.Row)
+            # Lê o resultado antes do commit: no SQLite, um INSERT ... RETURNING
+            # ainda em andamento impede o commit da transação.
             results = cursor.fetchall()
             
             # Converte sqlite3.Row para dict para consistência
-            if not DATABASE_URL and results and isinstance(results[0], sqlite3.Row):
-                return [dict(row) for row in results]
-            
-            return results
+            if not DATABASE_URL and results:
+                results = [dict(row) for row in results]
+        _record_query(statement, sql, params, time.perf_counter() - started, conn)
+        
+        if commit and tx_conn is not None:
+            _transaction_state.written |= written
+        elif commit:
+            conn.commit()
+            query_cache.invalidate(written)
+        elif cache_key is not None:
+            query_cache.set(cache_key, results, statement.tables if statement else tables_in(sql))
+            results = list(results)
+        
+        return results
             
     except Exception as e:
         print(f"Erro de Banco de Dados: {e}")
+        if started is not None:
+            _record_query(statement, sql, params, time.perf_counter() - started, conn, failed=True)
         # Reverte a transação em caso de erro
         if conn:
             conn.rollback()
         raise
     finally:
-        # Retorna a conexão ao pool ou fecha (dependendo do tipo de DB)
+        # Retorna a conexão avulsa ao pool ou fecha (dependendo do tipo de DB);
+        # conexões da requisição/transação são liberadas por quem as abriu
+        if conn and owned:
+            put_db_connection(conn)
+
+def insert_many(table, columns, rows):
+    """
+    Insere várias linhas de uma vez: COPY no PostgreSQL e executemany() no SQLite.
+
+    Segue as mesmas regras de execute_sql(commit=True): dentro de transaction()
+    o commit fica para o fim do bloco; fora dele, comita e invalida o cache.
+
+    :param table: Nome da tabela (identificador fixo do código, nunca entrada do usuário).
+    :param columns: Colunas preenchidas, na ordem dos valores de cada linha.
+    :param rows: Lista de tuplas de valores (None vira NULL).
+    :return: Número de linhas inseridas.
+    """
+    if not rows:
+        return 0
+    tx_conn = getattr(_transaction_state, 'conn', None)
+    conn = None
+    owned = False
+    try:
+        if tx_conn is not None:
+            conn = tx_conn
+        elif has_app_context():
+            conn = get_request_connection()
+        else:
+            conn = get_db_connection()
+            owned = True
+        if replica_set:
+            note_write()
+
+        column_list = ', '.join(columns)
+        cursor = conn.cursor()
+        if DATABASE_URL:
+            # COPY em CSV: campo vazio sem aspas é NULL, por isso strings vazias
+            # devem chegar aqui já convertidas para None
+            buffer = io.StringIO()
+            csv.writer(buffer, lineterminator='\n').writerows(rows)
+            buffer.seek(0)
+            cursor.copy_expert(f'COPY {table} ({column_list}) FROM STDIN WITH (FORMAT csv)', buffer)
+        else:
+            placeholders = ', '.join(['?'] * len(columns))
+            begin_write(conn)
+            cursor.executemany(f'INSERT INTO {table} ({column_list}) VALUES ({placeholders})', rows)
+
+        if tx_conn is not None:
+            _transaction_state.written.add(table)
+        else:
+            conn.commit()
+            query_cache.invalidate({table})
+        return len(rows)
+
+    except Exception as e:
+        print(f"Erro de Banco de Dados: {e}")
         if conn:
+            conn.rollback()
+        raise
+    finally:
+        if conn and owned:
             put_db_connection(conn)
 
 # ----------------------------------------------------------------
 # Função de Inicialização do Banco de Dados
 # ----------------------------------------------------------------
 
+# Colunas com busca textual por tabela, em ordem de relevância (peso A, B, C no PostgreSQL)
+SEARCH_COLUMNS = {
+    'jobs': ('title', 'requirements', 'description'),
+    'courses': ('title', 'category', 'description'),
+}
+
 def init_database():
     """
-    Cria as tabelas do banco de dados se elas não existirem.
+    Cria/atualiza o esquema aplicando as migrações pendentes (ver app/services/migrations.py).
+    Quando o esquema já está atualizado, apenas consulta a tabela schema_migrations.
     """
-    print("Iniciando a criação das tabelas...")
-    
-    # ... (Comandos SQL de criação de tabelas)
-    # Nota: Os comandos SQL originais usam SERIAL PRIMARY KEY e TIMESTAMP WITH TIME ZONE,
-    # que são mais adequados para PostgreSQL. O SQLite os aceita, mas os mapeia.
-    # Com a refatoração para RealDictCursor/sqlite3.Row, a serialização está melhor.
-    
-    sql_commands = [
-        # Tabela de usuários
-        '''
-        CREATE TABLE IF NOT EXISTS users (
-            id SERIAL PRIMARY KEY,
-            email VARCHAR(255) UNIQUE NOT NULL,
-            password_hash VARCHAR(255) NOT NULL,
-            user_type VARCHAR(50) NOT NULL,
-            name VARCHAR(255) NOT NULL,
-            phone VARCHAR(50),
-            created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
-            is_active BOOLEAN DEFAULT TRUE,
-            is_verified BOOLEAN DEFAULT FALSE,
-            profile_public BOOLEAN DEFAULT TRUE
-        )
-        ''',
-        
-        # Tabela de perfis de candidatos
-        '''
-        CREATE TABLE IF NOT EXISTS candidate_profiles (
-            id SERIAL PRIMARY KEY,
-            user_id INTEGER NOT NULL REFERENCES users (id),
-            birth_date DATE,
-            marital_status VARCHAR(50),
-            nationality VARCHAR(100),
-            linkedin_url VARCHAR(255),
-            address_cep VARCHAR(20),
-            address_street VARCHAR(255),
-            address_number VARCHAR(10),
-            address_complement VARCHAR(255),
-            address_neighborhood VARCHAR(100),
-            address_city VARCHAR(100),
-            address_state VARCHAR(50),
-            professional_title VARCHAR(255),
-            experience_years INTEGER,
-            sector VARCHAR(100),
-            level VARCHAR(50),
-            work_modality VARCHAR(50),
-            salary_expectation DECIMAL(10,2),
-            summary TEXT,
-            skills TEXT,
-            languages TEXT,
-            education_level VARCHAR(100),
-            course VARCHAR(255),
-            institution VARCHAR(255),
-            graduation_year INTEGER,
-            availability_status VARCHAR(50),
-            start_availability DATE
-        )
-        ''',
-        
-        # Tabela de perfis de empresas
-        '''
-        CREATE TABLE IF NOT EXISTS company_profiles (
-            id SERIAL PRIMARY KEY,
-            user_id INTEGER NOT NULL REFERENCES users (id),
-            cnpj VARCHAR(50),
-            company_type VARCHAR(100),
-            founded_year INTEGER,
-            sector VARCHAR(100),
-            employees_count VARCHAR(50),
-            tagline VARCHAR(255),
-            description TEXT,
-            address_cep VARCHAR(20),
-            address_street VARCHAR(255),
-            address_number VARCHAR(10),
-            address_complement VARCHAR(255),
-            address_neighborhood VARCHAR(100),
-            address_city VARCHAR(100),
-            address_state VARCHAR(50),
-            work_modality VARCHAR(50),
-            company_culture TEXT,
-            benefits TEXT,
-            areas_of_operation TEXT,
-            website VARCHAR(255),
-            linkedin_url VARCHAR(255),
-            responsible_name VARCHAR(255),
-            responsible_email VARCHAR(255),
-            responsible_phone VARCHAR(50)
-        )
-        ''',
-        
-        # Tabela de perfis de instituições
-        '''
-        CREATE TABLE IF NOT EXISTS institution_profiles (
-            id SERIAL PRIMARY KEY,
-            user_id INTEGER NOT NULL REFERENCES users (id),
-            cnpj VARCHAR(50),
-            institution_type VARCHAR(100),
-            founded_year INTEGER,
-            students_count INTEGER,
-            mec_code VARCHAR(50),
-            description TEXT,
-            address_cep VARCHAR(20),
-            address_street VARCHAR(255),
-            address_number VARCHAR(10),
-            address_complement VARCHAR(255),
-            address_neighborhood VARCHAR(100),
-            address_city VARCHAR(100),
-            address_state VARCHAR(50),
-            courses_offered TEXT,
-            education_levels TEXT,
-            modalities TEXT,
-            specialization_areas TEXT,
-            special_programs TEXT,
-            website VARCHAR(255),
-            linkedin_url VARCHAR(255),
-            responsible_name VARCHAR(255),
-            responsible_email VARCHAR(255),
-            responsible_phone VARCHAR(50)
-        )
-        ''',
-        
-        # Tabela de vagas
-        '''
-        CREATE TABLE IF NOT EXISTS jobs (
-            id SERIAL PRIMARY KEY,
-            company_id INTEGER NOT NULL REFERENCES users (id),
-            title VARCHAR(255) NOT NULL,
-            description TEXT,
-            requirements TEXT,
-            benefits TEXT,
-            salary_range VARCHAR(100),
-            location VARCHAR(255),
-            work_modality VARCHAR(50),
-            job_type VARCHAR(50),
-            area VARCHAR(100),
-            level VARCHAR(50),
-            is_active BOOLEAN DEFAULT TRUE,
-            is_featured BOOLEAN DEFAULT FALSE,
-            created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
-            expires_at DATE
-        )
-        ''',
-        
-        # Tabela de candidaturas
-        '''
-        CREATE TABLE IF NOT EXISTS applications (
-            id SERIAL PRIMARY KEY,
-            job_id INTEGER NOT NULL REFERENCES jobs (id),
-            candidate_id INTEGER NOT NULL REFERENCES users (id),
-            status VARCHAR(50) DEFAULT 'pending',
-            applied_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
-            message TEXT
-        )
-        ''',
-        
-        # Tabela de cursos
-        '''
-        CREATE TABLE IF NOT EXISTS courses (
-            id SERIAL PRIMARY KEY,
-            institution_id INTEGER NOT NULL REFERENCES users (id),
-            title VARCHAR(255) NOT NULL,
-            description TEXT,
-            category VARCHAR(100),
-            level VARCHAR(50),
-            modality VARCHAR(50),
-            duration VARCHAR(50),
-            price DECIMAL(10,2) DEFAULT 0,
-            is_free BOOLEAN DEFAULT TRUE,
-            is_featured BOOLEAN DEFAULT FALSE,
-            is_active BOOLEAN DEFAULT TRUE,
-            created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
-        )
-        ''',
-        
-        # Tabela de planos
-        '''
-        CREATE TABLE IF NOT EXISTS plans (
-            id SERIAL PRIMARY KEY,
-            name VARCHAR(255) NOT NULL,
-            description TEXT,
-            price DECIMAL(10,2) NOT NULL,
-            features TEXT,
-            plan_type VARCHAR(50) NOT NULL,
-            is_active BOOLEAN DEFAULT TRUE
-        )
-        ''',
-        
-        # Tabela de assinaturas
-        '''
-        CREATE TABLE IF NOT EXISTS subscriptions (
-            id SERIAL PRIMARY KEY,
-            user_id INTEGER NOT NULL REFERENCES users (id),
-            plan_id INTEGER NOT NULL REFERENCES plans (id),
-            status VARCHAR(50) DEFAULT 'active',
-            started_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
-            expires_at DATE
-        )
-        '''
-    ]
-    
-    # Executa todos os comandos SQL
-    for sql in sql_commands:
-        execute_sql(sql, commit=True)
-        
-    print("Criação das tabelas concluída.")
+    # Importação tardia: o módulo de migrações depende deste módulo
+    from app.services.migrations import run_migrations
+    run_migrations()
@@ -0,0 +1,110 @@
+# backend/app/services/facets.py
+import os
+
+from app.services.migrations import FACET_COUNTER_DEFAULTS, FACET_COUNTER_TYPES, FACET_COUNTERS
+
+# ----------------------------------------------------------------
+# Contagens por Faceta (filtros das listagens de vagas e cursos)
+# ----------------------------------------------------------------
+
+# Máximo de valores devolvidos por faceta (os mais frequentes)
+FACET_VALUE_LIMIT = int(os.environ.get('FACET_VALUE_LIMIT', 50))
+
+
+class FacetCatalog:
+    """
+    Facetas de um catálogo (vagas ou cursos) em um único comando agrupado.
+
+    Sem busca textual, as contagens são somas sobre a tabela de contadores
+    mantida por trigger (migração 0007), que tem uma linha por combinação de
+    valores e não cresce com o catálogo. Com busca textual, os mesmos
+    agrupamentos são feitos sobre as linhas encontradas.
+
+    Cada faceta é contada com todos os filtros ativos exceto o dela mesma,
+    para que a tela mostre quantos itens cada alternativa traria.
+    """
+
+    def __init__(self, table, alias, facets, filters, visible_conditions):
+        """
+        :param table: Tabela do catálogo ('jobs' ou 'courses').
+        :param alias: Alias usado nas condições de `filters` (ex.: 'j').
+        :param facets: Parâmetro do filtro -> coluna da faceta.
+        :param filters: Parâmetro do filtro -> condição SQL (a mesma da listagem).
+        :param visible_conditions: Condições de item ativo/não expirado da listagem.
+        """
+        self.table = table
+        self.alias = alias
+        self.counts_table, _, self.expires = FACET_COUNTERS[table]
+        self.facets = facets
+        self.filters = filters
+        self.visible_conditions = visible_conditions
+
+    def _source(self, search):
+        columns = list(self.facets.values())
+        if search is None:
+            # Expiração por data: os contadores guardam a data, e o corte é feito na leitura
+            where = f'{self.expires} >= CURRENT_DATE' if self.expires else 'total > 0'
+            return f"SELECT {', '.join(columns)}, total FROM {self.counts_table} WHERE {where}", []
+        from_sql, _, where_sql, params = search
+        # Mesmos valores no lugar de NULL que os contadores usam
+        defaults = {column: FACET_COUNTER_DEFAULTS.get(column, "''") for column in columns}
+        selected = ', '.join(f'COALESCE({self.alias}.{column}, {defaults[column]}) AS {column}' for column in columns)
+        conditions = [where_sql] + self.visible_conditions
+        return f"SELECT {selected}, 1 AS total FROM {from_sql} WHERE {' AND '.join(conditions)}", list(params)
+
+    def _value_sql(self, column):
+        if FACET_COUNTER_TYPES.get(column) == 'BOOLEAN':
+            return f"CASE WHEN {self.alias}.{column} THEN 'true' ELSE 'false' END", []
+        return f'{self.alias}.{column}', [f"{self.alias}.{column} <> ''"]
+
+    def sql(self, active, filter_params, search=None):
+        """
+        :param active: Filtros informados (chaves de `filters`).
+        :param filter_params: Valores dos filtros ativos, na ordem de `filters`.
+        :param search: Retorno de search_source() quando há busca textual.
+        :return: (sql, params) com as linhas (facet, value, total).
+        """
+        source_sql, params = self._source(search)
+        values = dict(zip([name for name in self.filters if name in active], filter_params))
+
+        branches = []
+        for facet, column in self.facets.items():
+            value_sql, conditions = self._value_sql(column)
+            others = [name for name in self.filters if name in active and name != facet]
+            conditions = conditions + [self.filters[name] for name in others]
+            params += [values[name] for name in others]
+            branches.append(f'''
+                SELECT '{facet}' AS facet, value, total FROM (
+                    SELECT {value_sql} AS value, SUM(total) AS total
+                    FROM source {self.alias}
+                    {'WHERE ' + ' AND '.join(conditions) if conditions else ''}
+                    GROUP BY {self.alias}.{column} HAVING SUM(total) > 0
+                    ORDER BY 2 DESC, 1 LIMIT {FACET_VALUE_LIMIT}
+                ) facet_{facet}
+            ''')
+        conditions = [self.filters[name] for name in self.filters if name in active]
+        params += filter_params
+        branches.append(f'''
+            SELECT 'total' AS facet, NULL AS value, SUM(total) AS total
+            FROM source {self.alias}
+            {'WHERE ' + ' AND '.join(conditions) if conditions else ''}
+        ''')
+        return f"WITH source AS ({source_sql}) {' UNION ALL '.join(branches)}", params
+
+    def group(self, rows):
+        """
+        Agrupa as linhas de sql() em {'facets': {faceta: [{'value', 'count'}]}, 'total'}.
+        """
+        facets = {facet: [] for facet in self.facets}
+        total = 0
+        for row in rows:
+            if row['facet'] == 'total':
+                total = int(row['total'] or 0)
+                continue
+            value = row['value']
+            if FACET_COUNTER_TYPES.get(self.facets[row['facet']]) == 'BOOLEAN':
+                value = value == 'true'
+            facets[row['facet']].append({'value': value, 'count': int(row['total'])})
+        for values in facets.values():
+            values.sort(key=lambda item: (-item['count'], str(item['value'])))
+        return {'facets': facets, 'total': total}
@@ -0,0 +1,131 @@
+# backend/app/services/images.py
+import io
+import os
+
+from PIL import Image, features
+
+# ----------------------------------------------------------------
+# Variantes Responsivas de Imagens (AVIF/WebP em várias larguras)
+# ----------------------------------------------------------------
+
+# Larguras geradas (limitadas à largura original) e largura servida sem dica do cliente
+IMAGE_WIDTHS = tuple(int(width) for width in os.environ.get('IMAGE_WIDTHS', '160,320,640,1024').split(','))
+IMAGE_DEFAULT_WIDTH = int(os.environ.get('IMAGE_DEFAULT_WIDTH', 1024))
+
+# Maior largura aceita em ?w= / Sec-CH-Width (evita variantes arbitrárias)
+IMAGE_MAX_HINT = 4096
+
+# Formato -> (tipo MIME, opções do Pillow), na ordem de preferência do servidor
+IMAGE_FORMATS = {
+    'avif': ('image/avif', {'quality': 55, 'speed': 6}),
+    'webp': ('image/webp', {'quality': 80, 'method': 6}),
+}
+IMAGE_FORMATS = {name: spec for name, spec in IMAGE_FORMATS.items() if features.check(name)}
+
+# Tipos de origem processados (o original continua disponível como fallback)
+SOURCE_IMAGE_TYPES = ('image/png', 'image/jpeg')
+_FALLBACK_FORMATS = {'image/png': ('PNG', {'optimize': True}), 'image/jpeg': ('JPEG', {'quality': 85, 'optimize': True})}
+
+
+def _encode(image, image_format, options):
+    buffer = io.BytesIO()
+    image.save(buffer, format=image_format, **options)
+    return buffer.getvalue()
+
+
+def build_variants(path, full, content_type, write):
+    """
+    Redimensiona a imagem para cada largura de IMAGE_WIDTHS e a codifica em
+    AVIF/WebP (e no formato original, otimizado). Variantes maiores que o
+    arquivo original são descartadas.
+
+    :param write: Função (caminho relativo, bytes) que grava a variante no build.
+    :return: Lista de {'width', 'type', 'file', 'size'}.
+    """
+    source_size = os.path.getsize(full)
+    with Image.open(full) as source:
+        source.load()
+        width, height = source.size
+        widths = sorted({min(target, width) for target in IMAGE_WIDTHS})
+        fallback_format, fallback_options = _FALLBACK_FORMATS[content_type]
+        variants = []
+        for target in widths:
+            resized = source if target == width else source.resize(
+                (target, max(1, round(height * target / width))), Image.LANCZOS)
+            encodings = [(name, mime, name.upper(), options) for name, (mime, options) in IMAGE_FORMATS.items()]
+            encodings.append((fallback_format.lower(), content_type, fallback_format, fallback_options))
+            for suffix, mime, image_format, options in encodings:
+                image = resized
+                if image_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+                    image = image.convert('RGB')
+                data = _encode(image, image_format, options)
+                if len(data) >= source_size:
+                    continue
+                file = f'{path}.{target}w.{suffix}'
+                write(file, data)
+                variants.append({'width': target, 'type': mime, 'file': file, 'size': len(data)})
+    return variants
+
+
+def parse_width_hint(query_width, headers):
+    """
+    Largura desejada em pixels físicos: ?w= ou as Client Hints Sec-CH-Width/Width,
+    ou Sec-CH-Viewport-Width multiplicado por Sec-CH-DPR. None se não houver dica.
+    """
+    for raw in (query_width, headers.get('Sec-CH-Width'), headers.get('Width')):
+        if raw:
+            try:
+                return max(1, min(IMAGE_MAX_HINT, int(float(raw))))
+            except ValueError:
+                continue
+    viewport = headers.get('Sec-CH-Viewport-Width') or headers.get('Viewport-Width')
+    if viewport:
+        try:
+            dpr = float(headers.get('Sec-CH-DPR') or headers.get('DPR') or 1)
+            return max(1, min(IMAGE_MAX_HINT, int(float(viewport) * dpr)))
+        except ValueError:
+            return None
+    return None
+
+
+def _accepted_types(accept):
+    """
+    Tipos do cabeçalho Accept com q > 0.
+    """
+    accepted = set()
+    for part in (accept or '').split(','):
+        mime, *params = [piece.strip() for piece in part.split(';')]
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if mime and quality > 0:
+            accepted.add(mime.lower())
+    return accepted
+
+
+def choose_variant(variants, accept, width):
+    """
+    Menor variante com largura >= width (ou a maior disponível) no melhor formato aceito.
+
+    :return: Entrada de `variants` ou None (serve o original).
+    """
+    if not variants:
+        return None
+    accepted = _accepted_types(accept)
+    width = width or IMAGE_DEFAULT_WIDTH
+    widths = sorted({variant['width'] for variant in variants})
+    target = next((candidate for candidate in widths if candidate >= width), widths[-1])
+    at_width = [variant for variant in variants if variant['width'] == target]
+    for mime, _ in IMAGE_FORMATS.values():
+        if mime in accepted:
+            for variant in at_width:
+                if variant['type'] == mime:
+                    return variant
+    # Sem AVIF/WebP: o formato original redimensionado
+    return next((variant for variant in at_width if variant['type'] not in
+                 [mime for mime, _ in IMAGE_FORMATS.values()]), None)
@@ -0,0 +1,195 @@
+# backend/app/services/job_import.py
+import csv
+import io
+import json
+import os
+from datetime import date
+
+from app.services import outbox
+from app.services.database import DATABASE_URL, execute_sql, insert_many, transaction
+
+# ----------------------------------------------------------------
+# Importação de Vagas em Lote (CSV / NDJSON)
+# ----------------------------------------------------------------
+
+# Linhas por lote de INSERT/COPY e limite de linhas por importação
+JOB_IMPORT_BATCH_SIZE = int(os.environ.get('JOB_IMPORT_BATCH_SIZE', 1000))
+JOB_IMPORT_MAX_ROWS = int(os.environ.get('JOB_IMPORT_MAX_ROWS', 50000))
+
+# Quantos erros por linha são devolvidos na resposta (o total é sempre informado)
+JOB_IMPORT_MAX_ERRORS = 500
+
+# Campos aceitos -> tamanho máximo (None = TEXT), conforme a tabela jobs
+JOB_IMPORT_FIELDS = {
+    'title': 255,
+    'description': None,
+    'requirements': None,
+    'benefits': None,
+    'salary_range': 100,
+    'location': 255,
+    'work_modality': 50,
+    'job_type': 50,
+    'area': 100,
+    'level': 50,
+    'expires_at': None,
+}
+JOB_IMPORT_REQUIRED = ('title',)
+JOB_IMPORT_COLUMNS = ('company_id',) + tuple(JOB_IMPORT_FIELDS)
+
+CSV_CONTENT_TYPES = ('text/csv', 'application/csv')
+NDJSON_CONTENT_TYPES = ('application/x-ndjson', 'application/ndjson', 'application/jsonl')
+
+
+class JobImportError(ValueError):
+    """Arquivo de importação inválido como um todo (a rota responde 400)."""
+
+
+class RowError(ValueError):
+    """Linha inválida: é reportada e ignorada, sem interromper a importação."""
+
+
+def _csv_records(stream):
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    header = text.readline()
+    if not header.strip():
+        raise JobImportError('Arquivo CSV vazio')
+    # Planilhas em português costumam exportar com ';' como separador
+    delimiter = ';' if header.count(';') > header.count(',') else ','
+    fieldnames = [name.strip() for name in next(csv.reader([header], delimiter=delimiter))]
+    unknown = set(fieldnames) - JOB_IMPORT_FIELDS.keys()
+    if unknown:
+        raise JobImportError(f"Colunas desconhecidas no cabeçalho: {', '.join(sorted(unknown))}")
+    reader = csv.DictReader(text, fieldnames=fieldnames, delimiter=delimiter)
+    for record in reader:
+        # Linha 1 é o cabeçalho
+        yield reader.line_num + 1, record
+
+
+def _ndjson_records(stream):
+    for line_number, line in enumerate(io.TextIOWrapper(stream, encoding='utf-8'), start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_number, RowError(f'JSON inválido: {e.msg}')
+            continue
+        if not isinstance(record, dict):
+            yield line_number, RowError('Cada linha deve ser um objeto JSON')
+            continue
+        yield line_number, record
+
+
+def read_records(stream, content_type):
+    """
+    Lê o corpo da requisição linha a linha, sem carregá-lo inteiro na memória.
+
+    :return: Gerador de (número da linha, dicionário ou RowError).
+    """
+    mimetype = (content_type or '').split(';')[0].strip().lower()
+    if mimetype in CSV_CONTENT_TYPES:
+        return _csv_records(stream)
+    if mimetype in NDJSON_CONTENT_TYPES:
+        return _ndjson_records(stream)
+    raise JobImportError('Content-Type deve ser text/csv ou application/x-ndjson')
+
+
+def validate_job(record):
+    """
+    Normaliza uma linha da importação para a tupla de valores de JOB_IMPORT_FIELDS.
+    Strings vazias viram None (NULL).
+    """
+    if None in record:
+        raise RowError('Linha com mais colunas que o cabeçalho')
+    unknown = set(record) - JOB_IMPORT_FIELDS.keys()
+    if unknown:
+        raise RowError(f"Campos desconhecidos: {', '.join(sorted(unknown))}")
+
+    values = []
+    for name, max_length in JOB_IMPORT_FIELDS.items():
+        value = record.get(name)
+        if value is not None and not isinstance(value, str):
+            if isinstance(value, (dict, list, bool)):
+                raise RowError(f'Campo {name} deve ser texto')
+            value = str(value)
+        value = value.strip() if value else None
+        if not value:
+            if name in JOB_IMPORT_REQUIRED:
+                raise RowError(f'Campo obrigatório ausente: {name}')
+            value = None
+        elif max_length is not None and len(value) > max_length:
+            raise RowError(f'Campo {name} excede {max_length} caracteres')
+        elif name == 'expires_at':
+            try:
+                value = date.fromisoformat(value).isoformat()
+            except ValueError:
+                raise RowError('Campo expires_at deve estar no formato AAAA-MM-DD')
+        values.append(value)
+    return tuple(values)
+
+
+def _insert_batch(company_id, batch):
+    """
+    Grava um lote com insert_many() e enfileira um evento 'jobs.imported' com os ids
+    das vagas criadas (alertas aos candidatos, como no 'job.created' da criação avulsa).
+
+    :return: Número de vagas inseridas.
+    """
+    if not batch:
+        return 0
+    if DATABASE_URL:
+        # COPY não devolve os ids: reserva-os na sequência e grava a coluna id explicitamente
+        job_ids = [row['id'] for row in execute_sql(
+            "SELECT nextval(pg_get_serial_sequence('jobs', 'id')) AS id FROM generate_series(1, %s)",
+            (len(batch),), fetch=True)]
+        insert_many('jobs', ('id',) + JOB_IMPORT_COLUMNS,
+                    [(job_id,) + row for job_id, row in zip(job_ids, batch)])
+    else:
+        # SQLite: a transação segura o lock de escrita, então os ids AUTOINCREMENT do lote
+        # são consecutivos e terminam no valor atual de sqlite_sequence
+        insert_many('jobs', JOB_IMPORT_COLUMNS, batch)
+        last = execute_sql("SELECT seq FROM sqlite_sequence WHERE name = 'jobs'", fetch=True)[0]['seq']
+        job_ids = list(range(last - len(batch) + 1, last + 1))
+    outbox.enqueue('jobs.imported', {'company_id': company_id, 'job_ids': job_ids})
+    return len(batch)
+
+
+def import_jobs(company_id, records, batch_size=None):
+    """
+    Valida e insere as vagas em lotes, todas em uma única transação.
+
+    Linhas inválidas são reportadas em 'errors' e não impedem a gravação das
+    demais; um erro do banco desfaz a importação inteira (inclusive os eventos
+    da outbox de cada lote).
+
+    :param company_id: Empresa dona das vagas (usuário da sessão).
+    :param records: Gerador de read_records().
+    :return: Dicionário com imported, failed e errors [{'line', 'error'}].
+    """
+    batch_size = batch_size or JOB_IMPORT_BATCH_SIZE
+    imported = 0
+    failed = 0
+    errors = []
+    batch = []
+    seen = 0
+
+    with transaction():
+        for line_number, record in records:
+            seen += 1
+            if seen > JOB_IMPORT_MAX_ROWS:
+                raise JobImportError(f'Limite de {JOB_IMPORT_MAX_ROWS} linhas por importação excedido')
+            try:
+                if isinstance(record, RowError):
+                    raise record
+                batch.append((company_id,) + validate_job(record))
+            except RowError as e:
+                failed += 1
+                if len(errors) < JOB_IMPORT_MAX_ERRORS:
+                    errors.append({'line': line_number, 'error': str(e)})
+                continue
+            if len(batch) >= batch_size:
+                imported += _insert_batch(company_id, batch)
+                batch = []
+        imported += _insert_batch(company_id, batch)
+
+    return {'imported': imported, 'failed': failed, 'errors': errors}
@@ -0,0 +1,185 @@
+# backend/app/services/job_stream.py
+import json
+import os
+import threading
+import time
+from collections import deque
+
+from app.services.database import DATABASE_URL, execute_sql, listen
+from app.services.metrics import SSE_SUBSCRIBERS
+
+# ----------------------------------------------------------------
+# Stream SSE de Vagas Novas/Destacadas (broker em processo)
+# ----------------------------------------------------------------
+
+# Canal do LISTEN/NOTIFY (ver migração 0010)
+JOB_EVENTS_CHANNEL = 'job_events'
+
+# Comentário enviado a cada N segundos sem eventos: mantém proxies abertos e detecta clientes desconectados
+SSE_HEARTBEAT_SECONDS = float(os.environ.get('SSE_HEARTBEAT_SECONDS', 15))
+
+# Duração máxima de uma conexão (s); o EventSource reconecta sozinho após SSE_RETRY_MS
+SSE_MAX_SECONDS = float(os.environ.get('SSE_MAX_SECONDS', 600))
+SSE_RETRY_MS = int(os.environ.get('SSE_RETRY_MS', 5000))
+
+# Assinantes por processo e eventos guardados por assinante lento (os mais antigos são descartados)
+SSE_MAX_SUBSCRIBERS = int(os.environ.get('SSE_MAX_SUBSCRIBERS', 5000))
+SSE_QUEUE_SIZE = int(os.environ.get('SSE_QUEUE_SIZE', 100))
+
+# SQLite: intervalo de leitura da tabela job_events e idade (s) a partir da qual ela é podada
+JOB_EVENTS_POLL_INTERVAL = float(os.environ.get('JOB_EVENTS_POLL_INTERVAL', 1))
+JOB_EVENTS_RETENTION = float(os.environ.get('JOB_EVENTS_RETENTION', 300))
+
+# Filtros aceitos pelo stream -> campo do evento (os mesmos da listagem de vagas)
+STREAM_FILTERS = {'area': 'area', 'modality': 'work_modality', 'location': 'location'}
+
+SQLITE_EVENTS_SQL = '''
+    SELECT e.id AS event_id, e.event, j.id, j.title, j.area, j.work_modality, j.location, j.level,
+           j.is_featured, u.name AS company_name
+    FROM job_events e JOIN jobs j ON j.id = e.job_id JOIN users u ON u.id = j.company_id
+    WHERE e.id > %s ORDER BY e.id
+'''
+
+
+class StreamFull(Exception):
+    """O processo já atende SSE_MAX_SUBSCRIBERS conexões."""
+
+
+class Subscriber:
+    """
+    Uma conexão do stream: filtros normalizados, fila de eventos pendentes e o sinal de "há eventos".
+    """
+
+    __slots__ = ('filters', 'queue', 'ready')
+
+    def __init__(self, filters):
+        self.filters = {}
+        for name, field in STREAM_FILTERS.items():
+            value = (filters.get(name) or '').strip()
+            if value:
+                self.filters[field] = value.casefold()
+        self.queue = deque(maxlen=SSE_QUEUE_SIZE)
+        self.ready = threading.Event()
+
+    def matches(self, job):
+        for field, value in self.filters.items():
+            current = (job.get(field) or '').casefold()
+            if field == 'location':
+                # Trecho da localização, como o LIKE da listagem
+                if value not in current:
+                    return False
+            elif current != value:
+                return False
+        return True
+
+
+class JobStreamBroker:
+    """
+    Distribui os eventos de vagas para os assinantes deste processo.
+
+    Há um único ouvinte do banco por processo (uma conexão com LISTEN no
+    PostgreSQL, ou a leitura periódica de job_events no SQLite), iniciado no
+    primeiro assinante; cada evento é copiado apenas para as filas dos
+    assinantes cujos filtros ele satisfaz. As conexões ociosas só esperam o
+    próprio sinal, sem consultar o banco.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._listener = None
+        self._pid = os.getpid()
+        self.published = 0
+
+    def subscribe(self, filters):
+        with self._lock:
+            if self._pid != os.getpid():
+                # Após um fork, o ouvinte (thread) e os assinantes do pai não existem aqui
+                self._subscribers, self._listener, self._pid = set(), None, os.getpid()
+            if len(self._subscribers) >= SSE_MAX_SUBSCRIBERS:
+                raise StreamFull(f'Limite de {SSE_MAX_SUBSCRIBERS} conexões do stream atingido')
+            subscriber = Subscriber(filters)
+            self._subscribers.add(subscriber)
+            if self._listener is None:
+                target = self._listen_postgres if DATABASE_URL else self._poll_sqlite
+                self._listener = threading.Thread(target=target, name='job-stream-listener', daemon=True)
+                self._listener.start()
+        SSE_SUBSCRIBERS.inc()
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            if subscriber not in self._subscribers:
+                return
+            self._subscribers.discard(subscriber)
+        SSE_SUBSCRIBERS.dec()
+
+    def publish(self, job):
+        """
+        Entrega um evento ({'event', 'id', 'title', 'area', ...}) aos assinantes compatíveis.
+        """
+        self.published += 1
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            if subscriber.matches(job):
+                subscriber.queue.append(job)
+                subscriber.ready.set()
+
+    def stream(self, subscriber):
+        """
+        Gerador do corpo text/event-stream de uma conexão; remove o assinante ao terminar
+        (inclusive quando o cliente desconecta e a escrita do heartbeat falha).
+        """
+        try:
+            yield f'retry: {SSE_RETRY_MS}\n\n'
+            deadline = time.monotonic() + SSE_MAX_SECONDS
+            while time.monotonic() < deadline:
+                if not subscriber.queue:
+                    subscriber.ready.wait(min(SSE_HEARTBEAT_SECONDS, max(0.0, deadline - time.monotonic())))
+                subscriber.ready.clear()
+                if not subscriber.queue:
+                    yield ': ping\n\n'
+                    continue
+                while subscriber.queue:
+                    job = subscriber.queue.popleft()
+                    yield f"event: job.{job['event']}\ndata: {json.dumps(job, ensure_ascii=False)}\n\n"
+        finally:
+            self.unsubscribe(subscriber)
+
+    def stats(self):
+        with self._lock:
+            return {'subscribers': len(self._subscribers), 'published': self.published,
+                    'listening': self._listener is not None}
+
+    # ----------------------------------------------------------------
+    # Ouvintes do banco (um por processo)
+    # ----------------------------------------------------------------
+
+    def _listen_postgres(self):
+        # Eventos emitidos enquanto a conexão estava caída se perdem: o stream é só um aviso
+        listen(JOB_EVENTS_CHANNEL, self.publish)
+
+    def _poll_sqlite(self):
+        last_id = None
+        last_prune = 0.0
+        while True:
+            try:
+                if last_id is None:
+                    # Começa no evento mais recente: o stream não reenvia o histórico
+                    last_id = execute_sql('SELECT COALESCE(MAX(id), 0) AS id FROM job_events', fetch=True)[0]['id']
+                for row in execute_sql(SQLITE_EVENTS_SQL, (last_id,), fetch=True):
+                    last_id = row.pop('event_id')
+                    row['is_featured'] = bool(row['is_featured'])
+                    self.publish(row)
+                now = time.time()
+                if now - last_prune > JOB_EVENTS_RETENTION:
+                    execute_sql('DELETE FROM job_events WHERE created_at < %s', (now - JOB_EVENTS_RETENTION,),
+                                commit=True)
+                    last_prune = now
+            except Exception as e:
+                print(f"Erro ao ler job_events: {e}")
+            time.sleep(JOB_EVENTS_POLL_INTERVAL)
+
+
+job_stream = JobStreamBroker()
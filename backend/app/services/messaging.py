@@ -0,0 +1,410 @@
+# backend/app/services/messaging.py
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import has_app_context
+
+from app.services.database import DATABASE_URL, execute_sql, listen, release_request_connection, transaction
+from app.services.metrics import MESSAGE_WAITERS
+from app.services.pagination import keyset_order_by, keyset_sql
+from app.services.statements import register, register_lazy, register_variants
+
+# ----------------------------------------------------------------
+# Mensagens: conversas, contadores de não lidas e entrega por long-poll
+# ----------------------------------------------------------------
+
+# Canal do LISTEN/NOTIFY (ver migração 0011)
+MESSAGES_CHANNEL = 'messages'
+
+# Tamanho máximo do texto de uma mensagem e participantes por conversa (incluindo quem cria).
+# O limite de participantes também mantém o NOTIFY (lista de usuários) abaixo de 8000 bytes.
+MESSAGE_MAX_LENGTH = int(os.environ.get('MESSAGE_MAX_LENGTH', 5000))
+MAX_CONVERSATION_PARTICIPANTS = int(os.environ.get('MAX_CONVERSATION_PARTICIPANTS', 50))
+
+# Espera máxima (s) de um long-poll sem mensagens novas; o cliente refaz a chamada em seguida
+MESSAGES_POLL_TIMEOUT = float(os.environ.get('MESSAGES_POLL_TIMEOUT', 25))
+
+# Long-polls simultâneos por processo (acima disso a rota responde 503)
+MESSAGES_MAX_WAITERS = int(os.environ.get('MESSAGES_MAX_WAITERS', 5000))
+
+# SQLite: intervalo de leitura das mensagens novas pelo ouvinte do processo (s)
+MESSAGES_POLL_INTERVAL = float(os.environ.get('MESSAGES_POLL_INTERVAL', 0.5))
+
+# Tamanho de conversations.last_message_preview
+PREVIEW_LENGTH = 255
+
+INBOX_SORT_KEY = ('p.last_message_id', 'p.conversation_id')
+HISTORY_SORT_KEY = ('m.id',)
+
+
+class MessagingError(ValueError):
+    """Conversa ou mensagem inválida enviada pelo cliente."""
+
+
+class TooManyWaiters(Exception):
+    """O processo já atende MESSAGES_MAX_WAITERS long-polls."""
+
+
+# A mensagem só é gravada se o remetente participar da conversa
+INSERT_MESSAGE = register('messages_insert', '''
+    INSERT INTO messages (conversation_id, sender_id, body)
+    SELECT CAST(%s AS INTEGER), CAST(%s AS INTEGER), CAST(%s AS TEXT)
+    WHERE EXISTS (SELECT 1 FROM conversation_participants WHERE conversation_id = %s AND user_id = %s)
+    RETURNING id, conversation_id, sender_id, body, created_at
+''', prepare=True)
+
+# Maior entre dois valores (GREATEST não existe no SQLite; lá MAX() com dois argumentos é escalar)
+_GREATEST = 'GREATEST' if DATABASE_URL else 'MAX'
+
+# Contadores atualizados no envio: +1 não lida para os demais; quem envia leu a conversa até aqui.
+# No PostgreSQL dois envios simultâneos podem comitar fora de ordem: last_message_id nunca
+# volta para trás (o long-poll e a caixa de entrada dependem dele), e o remetente só zera as
+# não lidas se a sua mensagem for a mais nova da conversa.
+UPDATE_PARTICIPANTS = register('messages_update_participants', f'''
+    UPDATE conversation_participants
+    SET unread_count = CASE WHEN user_id <> %s THEN unread_count + 1
+                            WHEN %s >= last_message_id THEN 0
+                            ELSE unread_count END,
+        last_read_message_id = CASE WHEN user_id = %s THEN {_GREATEST}(last_read_message_id, %s)
+                                    ELSE last_read_message_id END,
+        last_message_id = {_GREATEST}(last_message_id, %s)
+    WHERE conversation_id = %s
+    RETURNING user_id
+''', prepare=True)
+
+# A prévia só é trocada por uma mensagem mais nova que a atual
+UPDATE_CONVERSATION = register('messages_update_conversation', '''
+    UPDATE conversations SET last_message_id = %s, last_message_at = %s, last_message_preview = %s
+    WHERE id = %s AND last_message_id < %s
+''', prepare=True)
+
+INSERT_CONVERSATION = register('conversations_insert', '''
+    INSERT INTO conversations (subject, created_by) VALUES (%s, %s) RETURNING id
+''')
+
+IS_PARTICIPANT = register('conversations_is_participant', '''
+    SELECT 1 AS found FROM conversation_participants WHERE conversation_id = %s AND user_id = %s
+''', prepare=True)
+
+MARK_READ = register('conversations_mark_read', '''
+    UPDATE conversation_participants SET unread_count = 0, last_read_message_id = last_message_id
+    WHERE conversation_id = %s AND user_id = %s
+    RETURNING last_read_message_id
+''', prepare=True)
+
+UNREAD_COUNTS = register('conversations_unread', '''
+    SELECT conversation_id, unread_count FROM conversation_participants
+    WHERE user_id = %s AND unread_count > 0
+''', prepare=True)
+
+LATEST_MESSAGE_ID = register('messages_latest_for_user', '''
+    SELECT COALESCE(MAX(last_message_id), 0) AS last_id FROM conversation_participants WHERE user_id = %s
+''', prepare=True)
+
+# Mensagens de todas as conversas do usuário após um id; last_message_id descarta
+# pelo índice as conversas sem nada novo antes de tocar em messages
+NEW_MESSAGES = register('messages_new_for_user', '''
+    SELECT m.id, m.conversation_id, m.sender_id, m.body, m.created_at
+    FROM conversation_participants p
+    JOIN messages m ON m.conversation_id = p.conversation_id AND m.id > %s
+    WHERE p.user_id = %s AND p.last_message_id > %s
+    ORDER BY m.id LIMIT %s
+''', prepare=True)
+
+SQLITE_NEW_RECIPIENTS = '''
+    SELECT m.id, p.user_id FROM messages m
+    JOIN conversation_participants p ON p.conversation_id = m.conversation_id
+    WHERE m.id > %s ORDER BY m.id
+'''
+
+
+def _inbox_sql(active):
+    conditions = ['p.user_id = %s']
+    if 'cursor' in active:
+        conditions.append(keyset_sql(INBOX_SORT_KEY))
+    return f'''
+        SELECT p.conversation_id, p.last_message_id, p.last_read_message_id, p.unread_count,
+               c.subject, c.last_message_at, c.last_message_preview
+        FROM conversation_participants p
+        JOIN conversations c ON c.id = p.conversation_id
+        WHERE {' AND '.join(conditions)}
+        {keyset_order_by(INBOX_SORT_KEY)} LIMIT %s
+    '''
+
+
+def _history_sql(active):
+    # A junção com participants é a checagem de acesso, na mesma query
+    conditions = ['p.conversation_id = %s', 'p.user_id = %s']
+    if 'cursor' in active:
+        conditions.append(keyset_sql(HISTORY_SORT_KEY))
+    return f'''
+        SELECT m.id, m.sender_id, m.body, m.created_at
+        FROM conversation_participants p
+        JOIN messages m ON m.conversation_id = p.conversation_id
+        WHERE {' AND '.join(conditions)}
+        {keyset_order_by(HISTORY_SORT_KEY)} LIMIT %s
+    '''
+
+
+INBOX = register_variants('conversations_inbox', ('cursor',), _inbox_sql, prepare=True)
+HISTORY = register_variants('messages_history', ('cursor',), _history_sql, prepare=True)
+
+
+def _in_list(ids):
+    return ', '.join(['%s'] * len(ids))
+
+
+def _clean_body(body):
+    body = (body or '').strip() if isinstance(body, str) else ''
+    if not body:
+        raise MessagingError('A mensagem não pode ser vazia')
+    if len(body) > MESSAGE_MAX_LENGTH:
+        raise MessagingError(f'A mensagem deve ter no máximo {MESSAGE_MAX_LENGTH} caracteres')
+    return body
+
+
+# ----------------------------------------------------------------
+# Escrita
+# ----------------------------------------------------------------
+
+def _send(conversation_id, sender_id, body):
+    """
+    Grava a mensagem e atualiza os contadores (deve rodar dentro de transaction()).
+
+    :return: (mensagem, ids dos participantes) ou (None, []) se o remetente não participa da conversa.
+    """
+    rows = execute_sql(INSERT_MESSAGE, (conversation_id, sender_id, body, conversation_id, sender_id),
+                       fetch=True, commit=True)
+    if not rows:
+        return None, []
+    message = rows[0]
+    message_id = message['id']
+    participants = execute_sql(UPDATE_PARTICIPANTS, (sender_id, message_id, sender_id, message_id, message_id,
+                                                     conversation_id), fetch=True, commit=True)
+    execute_sql(UPDATE_CONVERSATION, (message_id, message['created_at'], body[:PREVIEW_LENGTH],
+                                      conversation_id, message_id), commit=True)
+    return message, [row['user_id'] for row in participants]
+
+
+def send_message(conversation_id, sender_id, body):
+    """
+    Envia uma mensagem em uma conversa e acorda os long-polls dos participantes.
+
+    :return: A mensagem gravada, ou None se o remetente não participa da conversa.
+    """
+    body = _clean_body(body)
+    with transaction():
+        message, participants = _send(conversation_id, sender_id, body)
+    # Depois do commit: quem acordar já encontra a mensagem
+    message_waiters.notify(participants)
+    return message
+
+
+def create_conversation(user_id, participant_ids, subject=None, body=None):
+    """
+    Cria uma conversa entre o usuário e os participantes informados, opcionalmente com a primeira mensagem.
+
+    :return: {'conversation_id', 'message'} (message é None sem texto inicial).
+    """
+    try:
+        others = [int(participant_id) for participant_id in participant_ids]
+    except (TypeError, ValueError):
+        raise MessagingError('participant_ids deve ser uma lista de ids de usuários')
+    members = list(dict.fromkeys([user_id] + others))
+    if len(members) < 2:
+        raise MessagingError('Informe ao menos um participante além de você')
+    if len(members) > MAX_CONVERSATION_PARTICIPANTS:
+        raise MessagingError(f'Máximo de {MAX_CONVERSATION_PARTICIPANTS} participantes por conversa')
+    subject = (subject or '').strip()[:255] or None
+    if body is not None:
+        body = _clean_body(body)
+
+    message, participants = None, []
+    with transaction():
+        conversation_id = execute_sql(INSERT_CONVERSATION, (subject, user_id), fetch=True, commit=True)[0]['id']
+        added = execute_sql(register_lazy(f'conversations_add_participants_{len(members)}', lambda: f'''
+            INSERT INTO conversation_participants (conversation_id, user_id)
+            SELECT CAST(%s AS INTEGER), id FROM users WHERE id IN ({_in_list(members)}) AND is_active = TRUE
+            RETURNING user_id
+        '''), [conversation_id] + members, fetch=True, commit=True)
+        if len(added) != len(members):
+            # Desfaz a conversa inteira
+            raise MessagingError('Participante não encontrado')
+        if body is not None:
+            message, participants = _send(conversation_id, user_id, body)
+    message_waiters.notify(participants)
+    return {'conversation_id': conversation_id, 'message': message}
+
+
+def mark_read(conversation_id, user_id):
+    """
+    Zera as não lidas do usuário na conversa. :return: Último id lido, ou None se não participa.
+    """
+    rows = execute_sql(MARK_READ, (conversation_id, user_id), fetch=True, commit=True)
+    return rows[0]['last_read_message_id'] if rows else None
+
+
+# ----------------------------------------------------------------
+# Leitura
+# ----------------------------------------------------------------
+
+def inbox(user_id, limit, cursor=None):
+    """
+    Conversas do usuário, da mais recente para a mais antiga, com os demais participantes.
+
+    :param cursor: Valores de INBOX_SORT_KEY da última conversa da página anterior.
+    :return: Até limit + 1 conversas (a extra indica que há próxima página).
+    """
+    params = [user_id] + list(cursor or []) + [limit + 1]
+    conversations = execute_sql(INBOX[frozenset({'cursor'}) if cursor else frozenset()], params, fetch=True)
+    if conversations:
+        ids = [row['conversation_id'] for row in conversations]
+        people = {}
+        for row in execute_sql(f'''
+            SELECT p.conversation_id, u.id, u.name FROM conversation_participants p
+            JOIN users u ON u.id = p.user_id
+            WHERE p.conversation_id IN ({_in_list(ids)}) AND p.user_id <> %s
+        ''', ids + [user_id], fetch=True):
+            people.setdefault(row['conversation_id'], []).append({'id': row['id'], 'name': row['name']})
+        for row in conversations:
+            row['participants'] = people.get(row['conversation_id'], [])
+    return conversations
+
+
+def history(conversation_id, user_id, limit, cursor=None):
+    """
+    Mensagens da conversa, da mais nova para a mais antiga (keyset em id).
+
+    :param cursor: Valores de HISTORY_SORT_KEY da última mensagem da página anterior.
+    :return: Até limit + 1 mensagens, ou None se o usuário não participa da conversa.
+    """
+    params = [conversation_id, user_id] + list(cursor or []) + [limit + 1]
+    rows = execute_sql(HISTORY[frozenset({'cursor'}) if cursor else frozenset()], params, fetch=True)
+    if not rows and not execute_sql(IS_PARTICIPANT, (conversation_id, user_id), fetch=True):
+        return None
+    return rows
+
+
+def unread_counts(user_id):
+    """
+    :return: {'total', 'conversations': {id da conversa: não lidas}}, lido dos contadores.
+    """
+    rows = execute_sql(UNREAD_COUNTS, (user_id,), fetch=True)
+    return {'total': sum(row['unread_count'] for row in rows),
+            'conversations': {row['conversation_id']: row['unread_count'] for row in rows}}
+
+
+def latest_message_id(user_id):
+    return execute_sql(LATEST_MESSAGE_ID, (user_id,), fetch=True)[0]['last_id']
+
+
+def _new_messages(user_id, after, limit):
+    # Lê do primário: a réplica pode ainda não ter a mensagem que acordou a espera
+    with transaction():
+        return execute_sql(NEW_MESSAGES, (after, user_id, after, limit), fetch=True)
+
+
+def wait_for_messages(user_id, after, timeout, limit):
+    """
+    Long-poll: devolve as mensagens após `after` assim que houver alguma, ou [] depois de `timeout` s.
+
+    Durante a espera a requisição não segura conexão do banco; cada despertar custa uma query.
+    """
+    if not math.isfinite(timeout):
+        raise ValueError('timeout deve ser um número finito')
+    deadline = time.monotonic() + min(max(timeout, 0.0), MESSAGES_POLL_TIMEOUT)
+    with message_waiters.waiting(user_id) as wakeup:
+        while True:
+            # Limpa o sinal antes de consultar: uma mensagem gravada depois da consulta volta a acordá-lo
+            wakeup.clear()
+            rows = _new_messages(user_id, after, limit)
+            remaining = deadline - time.monotonic()
+            if rows or remaining <= 0:
+                return rows
+            if has_app_context():
+                release_request_connection()
+            wakeup.wait(remaining)
+
+
+# ----------------------------------------------------------------
+# Long-polls em espera (um ouvinte do banco por processo)
+# ----------------------------------------------------------------
+
+class MessageWaiters:
+    """
+    Sinais dos long-polls em espera, por usuário.
+
+    Mensagens enviadas neste processo acordam os participantes na hora; as dos
+    outros processos chegam pelo ouvinte do processo (LISTEN no PostgreSQL, ou
+    a leitura periódica das mensagens novas no SQLite), iniciado na primeira espera.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._waiters = {}
+        self._count = 0
+        self._listener = None
+        self._pid = os.getpid()
+
+    @contextmanager
+    def waiting(self, user_id):
+        """
+        Registra uma espera do usuário e entrega o threading.Event que a acorda.
+        """
+        wakeup = threading.Event()
+        with self._lock:
+            if self._pid != os.getpid():
+                # Após um fork, o ouvinte (thread) e as esperas do pai não existem aqui
+                self._waiters, self._count, self._listener, self._pid = {}, 0, None, os.getpid()
+            if self._count >= MESSAGES_MAX_WAITERS:
+                raise TooManyWaiters(f'Limite de {MESSAGES_MAX_WAITERS} esperas por mensagens atingido')
+            self._waiters.setdefault(user_id, set()).add(wakeup)
+            self._count += 1
+            if self._listener is None:
+                target = self._listen_postgres if DATABASE_URL else self._poll_sqlite
+                self._listener = threading.Thread(target=target, name='messages-listener', daemon=True)
+                self._listener.start()
+        MESSAGE_WAITERS.inc()
+        try:
+            yield wakeup
+        finally:
+            with self._lock:
+                events = self._waiters.get(user_id)
+                events.discard(wakeup)
+                if not events:
+                    del self._waiters[user_id]
+                self._count -= 1
+            MESSAGE_WAITERS.dec()
+
+    def notify(self, user_ids):
+        with self._lock:
+            events = [event for user_id in set(user_ids) for event in self._waiters.get(user_id, ())]
+        for event in events:
+            event.set()
+
+    def stats(self):
+        with self._lock:
+            return {'waiters': self._count, 'users': len(self._waiters), 'listening': self._listener is not None}
+
+    def _listen_postgres(self):
+        listen(MESSAGES_CHANNEL, lambda payload: self.notify(payload.get('users') or []))
+
+    def _poll_sqlite(self):
+        last_id = None
+        while True:
+            try:
+                if last_id is None:
+                    last_id = execute_sql('SELECT COALESCE(MAX(id), 0) AS id FROM messages', fetch=True)[0]['id']
+                rows = execute_sql(SQLITE_NEW_RECIPIENTS, (last_id,), fetch=True)
+                if rows:
+                    last_id = rows[-1]['id']
+                    self.notify(row['user_id'] for row in rows)
+            except Exception as e:
+                print(f"Erro ao ler mensagens novas: {e}")
+            time.sleep(MESSAGES_POLL_INTERVAL)
+
+
+message_waiters = MessageWaiters()
@@ -0,0 +1,82 @@
+# backend/app/services/metric_rollups.py
+import time
+
+from app.services.database import DATABASE_URL, execute_sql, transaction
+
+# ----------------------------------------------------------------
+# Consolidação das Métricas do Painel (deltas -> rollups)
+# ----------------------------------------------------------------
+
+# Os triggers (migração 0012) só acrescentam linhas em metrics_deltas. Este job soma os
+# deltas em metrics_totals/metrics_daily e os apaga; o painel soma os que ainda estão
+# pendentes, então a frequência do cron só limita o tamanho de metrics_deltas.
+
+_FOLD_TOTALS = '''
+    INSERT INTO metrics_totals (metric, dimension, total)
+    SELECT metric, dimension, SUM(total_delta) FROM {source} WHERE TRUE GROUP BY metric, dimension
+    ON CONFLICT (metric, dimension) DO UPDATE SET total = metrics_totals.total + excluded.total
+'''
+_FOLD_DAILY = '''
+    INSERT INTO metrics_daily (day, metric, dimension, total)
+    SELECT day, metric, dimension, SUM(daily_delta) FROM {source} WHERE TRUE GROUP BY day, metric, dimension
+    ON CONFLICT (day, metric, dimension) DO UPDATE SET total = metrics_daily.total + excluded.total
+'''
+
+# PostgreSQL: um único comando. O DELETE ... RETURNING trava as linhas consolidadas, então
+# duas execuções simultâneas não somam o mesmo delta duas vezes.
+POSTGRES_FOLD = f'''
+    WITH moved AS (DELETE FROM metrics_deltas RETURNING day, metric, dimension, total_delta, daily_delta),
+    totals AS ({_FOLD_TOTALS.format(source='moved')})
+    {_FOLD_DAILY.format(source='moved')}
+'''
+
+# Totais atuais e séries diárias: rollups mais os deltas ainda não consolidados
+TOTALS_SQL = '''
+    SELECT metric, dimension, SUM(total) AS total FROM (
+        SELECT metric, dimension, total FROM metrics_totals
+        UNION ALL
+        SELECT metric, dimension, total_delta FROM metrics_deltas
+    ) combined GROUP BY metric, dimension HAVING SUM(total) <> 0
+'''
+DAILY_SQL = '''
+    SELECT day, metric, SUM(total) AS total FROM (
+        SELECT day, metric, total FROM metrics_daily WHERE day >= %s AND day <= %s
+        UNION ALL
+        SELECT day, metric, daily_delta FROM metrics_deltas WHERE day >= %s AND day <= %s
+    ) combined GROUP BY day, metric
+'''
+
+
+def fold():
+    """
+    Soma os deltas pendentes nas tabelas de rollup e os remove, em uma transação.
+
+    :return: Número de deltas pendentes no início (0 quando não havia nada a consolidar).
+    """
+    pending = execute_sql('SELECT COUNT(*) AS total FROM metrics_deltas', fetch=True)[0]['total']
+    if not pending:
+        return 0
+    if DATABASE_URL:
+        execute_sql(POSTGRES_FOLD, commit=True)
+        return pending
+    # SQLite: o primeiro INSERT reserva o lock de escrita (BEGIN IMMEDIATE); nenhum delta
+    # novo entra entre as somas e o DELETE
+    with transaction():
+        execute_sql(_FOLD_TOTALS.format(source='metrics_deltas'), commit=True)
+        execute_sql(_FOLD_DAILY.format(source='metrics_deltas'), commit=True)
+        execute_sql('DELETE FROM metrics_deltas', commit=True)
+    return pending
+
+
+def main():
+    """
+    Uso (a partir de backend/, por exemplo em um cron job):
+        python3 -m app.services.metric_rollups
+    """
+    started = time.perf_counter()
+    folded = fold()
+    print(f'Métricas consolidadas em {time.perf_counter() - started:.2f}s: {folded} deltas')
+
+
+if __name__ == '__main__':
+    main()
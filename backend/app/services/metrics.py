@@ -0,0 +1,170 @@
+# backend/app/services/metrics.py
+import hmac
+import os
+import re
+import time
+
+from flask import Response, jsonify, request
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client import multiprocess
+
+# ----------------------------------------------------------------
+# Métricas Prometheus (latência por rota e por query, pool de conexões)
+# ----------------------------------------------------------------
+
+# Com vários workers do gunicorn, cada processo grava seus valores em arquivos
+# mmap neste diretório e o /metrics soma todos eles (ver gunicorn.conf.py).
+# A variável precisa estar definida antes da importação do prometheus_client.
+PROMETHEUS_MULTIPROC_DIR = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+
+# Se definido, o /metrics exige "Authorization: Bearer <METRICS_TOKEN>"
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
+# Intervalo mínimo (s) entre duas leituras do pool para os gauges db_pool_*
+METRICS_POOL_INTERVAL = float(os.environ.get('METRICS_POOL_INTERVAL', 5))
+
+# Buckets (s): requisições vão de arquivos em cache (<5 ms) a relatórios lentos;
+# queries começam em 0,5 ms (lookups por índice)
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+REQUEST_LATENCY = Histogram('http_request_duration_seconds', 'Latência das requisições por endpoint Flask',
+                            ['endpoint', 'method'], buckets=REQUEST_BUCKETS)
+REQUEST_COUNT = Counter('http_requests', 'Requisições por endpoint Flask e status HTTP',
+                        ['endpoint', 'method', 'status'])
+QUERY_LATENCY = Histogram('db_query_duration_seconds', 'Tempo de execução de execute_sql() por statement',
+                          ['statement'], buckets=QUERY_BUCKETS)
+QUERY_ERRORS = Counter('db_query_errors', 'Erros em execute_sql() por statement', ['statement'])
+
+# Estatística de ConnectionPool.stats() -> gauge (somado entre os workers vivos)
+POOL_GAUGES = {
+    key: Gauge(f'db_pool_{key}', description, multiprocess_mode='livesum')
+    for key, description in (
+        ('max', 'Tamanho máximo do pool'),
+        ('in_use', 'Conexões emprestadas'),
+        ('idle', 'Conexões ociosas'),
+        ('waiting', 'Threads aguardando uma conexão'),
+        ('checkouts', 'Empréstimos desde o início do processo'),
+        ('timeouts', 'Esperas que estouraram DB_POOL_TIMEOUT'),
+        ('discarded', 'Conexões descartadas no health check'),
+    )
+}
+
+# Conexões abertas no stream SSE de vagas (app.services.job_stream), somadas entre os workers vivos
+SSE_SUBSCRIBERS = Gauge('sse_subscribers', 'Conexões abertas no stream de vagas', multiprocess_mode='livesum')
+
+# Long-polls de mensagens em espera (app.services.messaging), somados entre os workers vivos
+MESSAGE_WAITERS = Gauge('message_waiters', 'Long-polls de mensagens aguardando', multiprocess_mode='livesum')
+
+_METHODS = frozenset(('GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'))
+
+# Rótulo de SQL em texto (sem Statement registrado): verbo + primeira tabela, ex.: 'select_jobs'
+_VERB_RE = re.compile(r'\b(SELECT|INSERT|UPDATE|DELETE|CREATE|ALTER|DROP)\b', re.IGNORECASE)
+_FIRST_TABLE_RE = re.compile(r'\b(?:FROM|INTO|UPDATE|TABLE|EXISTS)\s+([A-Za-z_][A-Za-z0-9_]*)', re.IGNORECASE)
+_SQL_LABEL_LIMIT = 2048
+_sql_labels = {}
+
+# Filhos (séries com rótulos) já resolvidos: evita o lock de .labels() a cada observação
+_children = {}
+_pool_state = {'checked_at': 0.0}
+
+
+def _child(metric, *labels):
+    key = (metric, labels)
+    child = _children.get(key)
+    if child is None:
+        child = _children.setdefault(key, metric.labels(*labels))
+    return child
+
+
+def sql_label(sql):
+    """
+    Rótulo estável para um comando em texto: verbo e primeira tabela ('select_jobs').
+    """
+    label = _sql_labels.get(sql)
+    if label is None:
+        verb = _VERB_RE.search(sql)
+        table = _FIRST_TABLE_RE.search(sql)
+        label = '_'.join(match.group(1).lower() for match in (verb, table) if match) or 'other'
+        if len(_sql_labels) < _SQL_LABEL_LIMIT:
+            _sql_labels[sql] = label
+    return label
+
+
+def observe_query(label, seconds, failed=False):
+    """
+    Registra a duração de um execute_sql() (chamado pelo app.services.database).
+    """
+    _child(QUERY_LATENCY, label).observe(seconds)
+    if failed:
+        _child(QUERY_ERRORS, label).inc()
+
+
+def update_pool_gauges(force=False):
+    """
+    Copia ConnectionPool.stats() deste processo para os gauges, no máximo a cada METRICS_POOL_INTERVAL.
+    """
+    now = time.monotonic()
+    if not force and now - _pool_state['checked_at'] < METRICS_POOL_INTERVAL:
+        return
+    _pool_state['checked_at'] = now
+    # Importação tardia: o módulo de banco registra as queries aqui
+    from app.services.database import get_pool_stats
+    stats = get_pool_stats()
+    if stats is None:
+        return
+    for key, gauge in POOL_GAUGES.items():
+        gauge.set(stats[key])
+
+
+# O início fica no environ do WSGI: cada acesso aos proxies do Flask (g, request) custa ~1 µs
+REQUEST_STARTED_KEY = 'claunnetworking.metrics_started'
+
+
+def _start_timer():
+    request.environ[REQUEST_STARTED_KEY] = time.perf_counter()
+
+
+def _record_request(response):
+    current = request._get_current_object()
+    started = current.environ.get(REQUEST_STARTED_KEY)
+    if started is None:
+        return response
+    elapsed = time.perf_counter() - started
+    # Rotas inexistentes (404 sem endpoint) ficam em um único rótulo
+    endpoint = current.endpoint or 'not_found'
+    method = current.method if current.method in _METHODS else 'OTHER'
+    _child(REQUEST_LATENCY, endpoint, method).observe(elapsed)
+    _child(REQUEST_COUNT, endpoint, method, str(response.status_code)).inc()
+    update_pool_gauges()
+    return response
+
+
+def render():
+    """
+    Texto no formato de exposição do Prometheus (somando todos os workers no modo multiprocesso).
+    """
+    update_pool_gauges(force=True)
+    if PROMETHEUS_MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry)
+
+
+def metrics_view():
+    if METRICS_TOKEN:
+        supplied = request.headers.get('Authorization', '').removeprefix('Bearer ').strip()
+        if not hmac.compare_digest(supplied.encode(), METRICS_TOKEN.encode()):
+            return jsonify({'error': 'Não autorizado'}), 401
+    return Response(render(), content_type=CONTENT_TYPE_LATEST)
+
+
+def init_app(app):
+    """
+    Mede todas as requisições do app e expõe GET /metrics.
+    """
+    app.before_request(_start_timer)
+    app.after_request(_record_request)
+    app.add_url_rule('/metrics', 'metrics', metrics_view, methods=['GET'])
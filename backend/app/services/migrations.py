@@ -0,0 +1,1145 @@
+# backend/app/services/migrations.py
+import hashlib
+
+from app.services.database import (
+    DATABASE_URL, SEARCH_COLUMNS, get_db_connection, put_db_connection, query_cache
+)
+
+# ----------------------------------------------------------------
+# Migrações Versionadas do Esquema
+# ----------------------------------------------------------------
+
+# Chave do advisory lock do PostgreSQL: impede que dois deploys migrem ao mesmo tempo
+MIGRATION_LOCK_ID = 7_210_431
+
+SCHEMA_MIGRATIONS_TABLE = '''
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version INTEGER PRIMARY KEY,
+        name VARCHAR(255) NOT NULL,
+        checksum VARCHAR(64) NOT NULL,
+        applied_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+    )
+'''
+
+
+class MigrationError(Exception):
+    """Migração já aplicada cujo conteúdo foi alterado depois da aplicação."""
+
+
+class Migration:
+    """
+    Conjunto de comandos aplicados uma única vez, em uma transação, com o texto de cada dialeto.
+    """
+
+    def __init__(self, version, name, postgres, sqlite):
+        self.version = version
+        self.name = name
+        self._commands = {'postgres': postgres, 'sqlite': sqlite}
+
+    def commands(self, dialect):
+        return self._commands[dialect]
+
+    def checksum(self, dialect):
+        # Espaços são normalizados para que reindentar o SQL não invalide a migração
+        normalized = '\n'.join(' '.join(sql.split()) for sql in self.commands(dialect))
+        return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+# ----------------------------------------------------------------
+# 0001: Esquema inicial
+# ----------------------------------------------------------------
+
+# Nota: os comandos usam SERIAL PRIMARY KEY e TIMESTAMP WITH TIME ZONE (PostgreSQL).
+# No SQLite, SERIAL não é alias do rowid e o id ficaria NULL; por isso é convertido.
+INITIAL_SCHEMA = [
+    # Tabela de usuários
+    '''
+    CREATE TABLE IF NOT EXISTS users (
+        id SERIAL PRIMARY KEY,
+        email VARCHAR(255) UNIQUE NOT NULL,
+        password_hash VARCHAR(255) NOT NULL,
+        user_type VARCHAR(50) NOT NULL,
+        name VARCHAR(255) NOT NULL,
+        phone VARCHAR(50),
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+        is_active BOOLEAN DEFAULT TRUE,
+        is_verified BOOLEAN DEFAULT FALSE,
+        profile_public BOOLEAN DEFAULT TRUE
+    )
+    ''',
+    
+    # Tabela de perfis de candidatos
+    '''
+    CREATE TABLE IF NOT EXISTS candidate_profiles (
+        id SERIAL PRIMARY KEY,
+        user_id INTEGER NOT NULL REFERENCES users (id),
+        birth_date DATE,
+        marital_status VARCHAR(50),
+        nationality VARCHAR(100),
+        linkedin_url VARCHAR(255),
+        address_cep VARCHAR(20),
+        address_street VARCHAR(255),
+        address_number VARCHAR(10),
+        address_complement VARCHAR(255),
+        address_neighborhood VARCHAR(100),
+        address_city VARCHAR(100),
+        address_state VARCHAR(50),
+        professional_title VARCHAR(255),
+        experience_years INTEGER,
+        sector VARCHAR(100),
+        level VARCHAR(50),
+        work_modality VARCHAR(50),
+        salary_expectation DECIMAL(10,2),
+        summary TEXT,
+        skills TEXT,
+        languages TEXT,
+        education_level VARCHAR(100),
+        course VARCHAR(255),
+        institution VARCHAR(255),
+        graduation_year INTEGER,
+        availability_status VARCHAR(50),
+        start_availability DATE
+    )
+    ''',
+    
+    # Tabela de perfis de empresas
+    '''
+    CREATE TABLE IF NOT EXISTS company_profiles (
+        id SERIAL PRIMARY KEY,
+        user_id INTEGER NOT NULL REFERENCES users (id),
+        cnpj VARCHAR(50),
+        company_type VARCHAR(100),
+        founded_year INTEGER,
+        sector VARCHAR(100),
+        employees_count VARCHAR(50),
+        tagline VARCHAR(255),
+        description TEXT,
+        address_cep VARCHAR(20),
+        address_street VARCHAR(255),
+        address_number VARCHAR(10),
+        address_complement VARCHAR(255),
+        address_neighborhood VARCHAR(100),
+        address_city VARCHAR(100),
+        address_state VARCHAR(50),
+        work_modality VARCHAR(50),
+        company_culture TEXT,
+        benefits TEXT,
+        areas_of_operation TEXT,
+        website VARCHAR(255),
+        linkedin_url VARCHAR(255),
+        responsible_name VARCHAR(255),
+        responsible_email VARCHAR(255),
+        responsible_phone VARCHAR(50)
+    )
+    ''',
+    
+    # Tabela de perfis de instituições
+    '''
+    CREATE TABLE IF NOT EXISTS institution_profiles (
+        id SERIAL PRIMARY KEY,
+        user_id INTEGER NOT NULL REFERENCES users (id),
+        cnpj VARCHAR(50),
+        institution_type VARCHAR(100),
+        founded_year INTEGER,
+        students_count INTEGER,
+        mec_code VARCHAR(50),
+        description TEXT,
+        address_cep VARCHAR(20),
+        address_street VARCHAR(255),
+        address_number VARCHAR(10),
+        address_complement VARCHAR(255),
+        address_neighborhood VARCHAR(100),
+        address_city VARCHAR(100),
+        address_state VARCHAR(50),
+        courses_offered TEXT,
+        education_levels TEXT,
+        modalities TEXT,
+        specialization_areas TEXT,
+        special_programs TEXT,
+        website VARCHAR(255),
+        linkedin_url VARCHAR(255),
+        responsible_name VARCHAR(255),
+        responsible_email VARCHAR(255),
+        responsible_phone VARCHAR(50)
+    )
+    ''',
+    
+    # Tabela de vagas
+    '''
+    CREATE TABLE IF NOT EXISTS jobs (
+        id SERIAL PRIMARY KEY,
+        company_id INTEGER NOT NULL REFERENCES users (id),
+        title VARCHAR(255) NOT NULL,
+        description TEXT,
+        requirements TEXT,
+        benefits TEXT,
+        salary_range VARCHAR(100),
+        location VARCHAR(255),
+        work_modality VARCHAR(50),
+        job_type VARCHAR(50),
+        area VARCHAR(100),
+        level VARCHAR(50),
+        is_active BOOLEAN DEFAULT TRUE,
+        is_featured BOOLEAN DEFAULT FALSE,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+        expires_at DATE
+    )
+    ''',
+    
+    # Tabela de candidaturas
+    '''
+    CREATE TABLE IF NOT EXISTS applications (
+        id SERIAL PRIMARY KEY,
+        job_id INTEGER NOT NULL REFERENCES jobs (id),
+        candidate_id INTEGER NOT NULL REFERENCES users (id),
+        status VARCHAR(50) DEFAULT 'pending',
+        applied_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+        message TEXT
+    )
+    ''',
+    
+    # Tabela de cursos
+    '''
+    CREATE TABLE IF NOT EXISTS courses (
+        id SERIAL PRIMARY KEY,
+        institution_id INTEGER NOT NULL REFERENCES users (id),
+        title VARCHAR(255) NOT NULL,
+        description TEXT,
+        category VARCHAR(100),
+        level VARCHAR(50),
+        modality VARCHAR(50),
+        duration VARCHAR(50),
+        price DECIMAL(10,2) DEFAULT 0,
+        is_free BOOLEAN DEFAULT TRUE,
+        is_featured BOOLEAN DEFAULT FALSE,
+        is_active BOOLEAN DEFAULT TRUE,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+    )
+    ''',
+    
+    # Tabela de planos
+    '''
+    CREATE TABLE IF NOT EXISTS plans (
+        id SERIAL PRIMARY KEY,
+        name VARCHAR(255) NOT NULL,
+        description TEXT,
+        price DECIMAL(10,2) NOT NULL,
+        features TEXT,
+        plan_type VARCHAR(50) NOT NULL,
+        is_active BOOLEAN DEFAULT TRUE
+    )
+    ''',
+    
+    # Tabela de assinaturas
+    '''
+    CREATE TABLE IF NOT EXISTS subscriptions (
+        id SERIAL PRIMARY KEY,
+        user_id INTEGER NOT NULL REFERENCES users (id),
+        plan_id INTEGER NOT NULL REFERENCES plans (id),
+        status VARCHAR(50) DEFAULT 'active',
+        started_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+        expires_at DATE
+    )
+    '''
+]
+
+def _sqlite_schema(commands):
+    return [sql.replace('SERIAL PRIMARY KEY', 'INTEGER PRIMARY KEY AUTOINCREMENT') for sql in commands]
+
+# ----------------------------------------------------------------
+# 0002: Índices de busca textual (vagas e cursos)
+# ----------------------------------------------------------------
+
+def _postgres_search_commands(table, columns):
+    """
+    Coluna tsvector gerada (configuração 'portuguese') com índice GIN.
+    Por ser GENERATED ... STORED, o PostgreSQL a recalcula em cada INSERT/UPDATE.
+    """
+    vector = ' || '.join(
+        f"setweight(to_tsvector('portuguese', coalesce({column}, '')), '{weight}')"
+        for column, weight in zip(columns, 'ABC')
+    )
+    return [
+        f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ({vector}) STORED",
+        f"CREATE INDEX IF NOT EXISTS idx_{table}_search ON {table} USING GIN (search_vector)",
+    ]
+
+def _sqlite_search_commands(table, columns):
+    """
+    Tabela FTS5 de conteúdo externo sincronizada por triggers com a tabela de origem.
+    """
+    column_list = ', '.join(columns)
+    new_values = ', '.join(f'new.{column}' for column in columns)
+    old_values = ', '.join(f'old.{column}' for column in columns)
+    return [
+        f'''
+        CREATE VIRTUAL TABLE IF NOT EXISTS {table}_fts USING fts5(
+            {column_list}, content='{table}', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+        ''',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS {table}_fts_ai AFTER INSERT ON {table} BEGIN
+            INSERT INTO {table}_fts (rowid, {column_list}) VALUES (new.id, {new_values});
+        END
+        ''',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS {table}_fts_ad AFTER DELETE ON {table} BEGIN
+            INSERT INTO {table}_fts ({table}_fts, rowid, {column_list}) VALUES ('delete', old.id, {old_values});
+        END
+        ''',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS {table}_fts_au AFTER UPDATE ON {table} BEGIN
+            INSERT INTO {table}_fts ({table}_fts, rowid, {column_list}) VALUES ('delete', old.id, {old_values});
+            INSERT INTO {table}_fts (rowid, {column_list}) VALUES (new.id, {new_values});
+        END
+        ''',
+    ]
+
+def _search_indexes(dialect):
+    commands = []
+    for table, columns in SEARCH_COLUMNS.items():
+        if dialect == 'postgres':
+            commands += _postgres_search_commands(table, columns)
+        else:
+            commands += _sqlite_search_commands(table, columns)
+            # Indexa as linhas que já existiam antes da criação do índice
+            commands.append(f"INSERT INTO {table}_fts ({table}_fts) VALUES ('rebuild')")
+    return commands
+
+# ----------------------------------------------------------------
+# 0003: Índices das consultas mais frequentes
+# ----------------------------------------------------------------
+
+# Índices de chaves estrangeiras usadas em JOINs e buscas por usuário
+FOREIGN_KEY_INDEXES = [
+    'CREATE INDEX IF NOT EXISTS idx_jobs_company_id ON jobs (company_id)',
+    'CREATE INDEX IF NOT EXISTS idx_applications_job_candidate ON applications (job_id, candidate_id)',
+    'CREATE INDEX IF NOT EXISTS idx_applications_candidate_id ON applications (candidate_id)',
+    'CREATE INDEX IF NOT EXISTS idx_courses_institution_id ON courses (institution_id)',
+    'CREATE INDEX IF NOT EXISTS idx_candidate_profiles_user_id ON candidate_profiles (user_id)',
+    'CREATE INDEX IF NOT EXISTS idx_company_profiles_user_id ON company_profiles (user_id)',
+    'CREATE INDEX IF NOT EXISTS idx_institution_profiles_user_id ON institution_profiles (user_id)',
+    'CREATE INDEX IF NOT EXISTS idx_subscriptions_user_id ON subscriptions (user_id)',
+]
+
+# PostgreSQL: índices parciais cobrindo apenas as linhas ativas, na ordem da listagem
+POSTGRES_LISTING_INDEXES = [
+    'CREATE INDEX IF NOT EXISTS idx_jobs_active_listing ON jobs (is_featured DESC, created_at DESC, id DESC) WHERE is_active',
+    'CREATE INDEX IF NOT EXISTS idx_courses_active_listing ON courses (is_featured DESC, created_at DESC, id DESC) WHERE is_active',
+    'CREATE INDEX IF NOT EXISTS idx_courses_active_filters ON courses (category, level) WHERE is_active',
+]
+
+# SQLite: is_active como primeira coluna do índice composto
+SQLITE_LISTING_INDEXES = [
+    'CREATE INDEX IF NOT EXISTS idx_jobs_active_listing ON jobs (is_active, is_featured DESC, created_at DESC, id DESC)',
+    'CREATE INDEX IF NOT EXISTS idx_courses_active_listing ON courses (is_active, is_featured DESC, created_at DESC, id DESC)',
+    'CREATE INDEX IF NOT EXISTS idx_courses_active_filters ON courses (is_active, category, level)',
+]
+
+# ----------------------------------------------------------------
+# 0004: Candidaturas únicas e Idempotency-Key
+# ----------------------------------------------------------------
+
+# O índice único substitui o índice simples (job_id, candidate_id) da 0003.
+# Duplicatas antigas são removidas antes, mantendo a candidatura mais antiga.
+APPLICATION_CONSTRAINTS = [
+    '''
+    DELETE FROM applications
+    WHERE id NOT IN (SELECT MIN(id) FROM applications GROUP BY job_id, candidate_id)
+    ''',
+    'DROP INDEX IF EXISTS idx_applications_job_candidate',
+    'CREATE UNIQUE INDEX IF NOT EXISTS uq_applications_job_candidate ON applications (job_id, candidate_id)',
+    'ALTER TABLE applications ADD COLUMN idempotency_key VARCHAR(255)',
+    # NULLs não conflitam entre si: só candidaturas enviadas com a chave são restringidas
+    'CREATE UNIQUE INDEX IF NOT EXISTS uq_applications_idempotency_key ON applications (candidate_id, idempotency_key)',
+]
+
+# ----------------------------------------------------------------
+# 0005: Índice invertido de competências e idiomas dos candidatos
+# ----------------------------------------------------------------
+
+# Colunas de texto livre indexadas como tags, separadas por ',', ';' ou quebra de linha
+CANDIDATE_TAG_COLUMNS = {'skill': 'skills', 'language': 'languages'}
+
+CANDIDATE_TAGS_TABLE = '''
+    CREATE TABLE IF NOT EXISTS candidate_tags (
+        kind VARCHAR(20) NOT NULL,
+        tag VARCHAR(100) NOT NULL,
+        user_id INTEGER NOT NULL REFERENCES users (id),
+        PRIMARY KEY (kind, tag, user_id)
+    )
+'''
+
+# Filtros mais usados na busca de candidatos
+CANDIDATE_FILTER_INDEXES = [
+    'CREATE INDEX IF NOT EXISTS idx_candidate_tags_user_id ON candidate_tags (user_id)',
+    'CREATE INDEX IF NOT EXISTS idx_candidate_profiles_filters ON candidate_profiles (sector, level, work_modality)',
+    'CREATE INDEX IF NOT EXISTS idx_candidate_profiles_location ON candidate_profiles (address_state, address_city)',
+]
+
+def _postgres_candidate_tags():
+    """
+    Tabela candidate_tags mantida por trigger a cada INSERT/UPDATE/DELETE de candidate_profiles.
+    As tags são normalizadas com trim + lower, assim como os termos da busca.
+    """
+    def tags_of(row):
+        parts = ' UNION ALL '.join(
+            f"SELECT '{kind}' AS kind, regexp_split_to_table(coalesce({row}.{column}, ''), '[,;\\n]') AS tag"
+            for kind, column in CANDIDATE_TAG_COLUMNS.items()
+        )
+        return f'''
+            SELECT DISTINCT parts.kind, left(lower(trim(parts.tag)), 100), {row}.user_id
+            FROM {'candidate_profiles p, LATERAL ' if row == 'p' else ''}({parts}) parts
+            WHERE trim(parts.tag) <> ''
+        '''
+    return [
+        CANDIDATE_TAGS_TABLE,
+        f'''
+        CREATE OR REPLACE FUNCTION candidate_tags_sync() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP <> 'INSERT' THEN
+                DELETE FROM candidate_tags WHERE user_id = OLD.user_id;
+            END IF;
+            IF TG_OP <> 'DELETE' THEN
+                INSERT INTO candidate_tags (kind, tag, user_id)
+                {tags_of('NEW')}
+                ON CONFLICT DO NOTHING;
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+        ''',
+        '''
+        CREATE TRIGGER candidate_tags_sync
+        AFTER INSERT OR DELETE OR UPDATE OF skills, languages, user_id ON candidate_profiles
+        FOR EACH ROW EXECUTE FUNCTION candidate_tags_sync()
+        ''',
+        # Indexa os perfis que já existiam
+        f'INSERT INTO candidate_tags (kind, tag, user_id) {tags_of("p")} ON CONFLICT DO NOTHING',
+    ] + CANDIDATE_FILTER_INDEXES
+
+def _sqlite_split(value):
+    """
+    Converte o texto livre em um array JSON para json_each(): triggers do SQLite
+    não aceitam WITH RECURSIVE, então a separação é feita com replace().
+    """
+    escaped = f"""replace(replace(coalesce({value}, ''), '\\', '\\\\'), '"', '\\"')"""
+    for separator in ('char(13)', 'char(9)'):
+        escaped = f"replace({escaped}, {separator}, ' ')"
+    for separator in ('char(10)', "';'"):
+        escaped = f"replace({escaped}, {separator}, ',')"
+    array = f"""'["' || replace({escaped}, ',', '","') || '"]'"""
+    return f"CASE WHEN json_valid({array}) THEN {array} ELSE '[]' END"
+
+def _sqlite_candidate_tags():
+    """
+    Mesma tabela no SQLite (WITHOUT ROWID: o índice é a própria tabela), com triggers por operação.
+    """
+    def tags_of(row):
+        return ' UNION '.join(
+            f'''
+            SELECT '{kind}', substr(lower(trim(parts.value)), 1, 100), {row}.user_id
+            FROM {'candidate_profiles p, ' if row == 'p' else ''}json_each({_sqlite_split(f'{row}.{column}')}) AS parts
+            WHERE trim(parts.value) <> ''
+            '''
+            for kind, column in CANDIDATE_TAG_COLUMNS.items()
+        )
+    insert_new = f'INSERT OR IGNORE INTO candidate_tags (kind, tag, user_id) {tags_of("new")};'
+    delete_old = 'DELETE FROM candidate_tags WHERE user_id = old.user_id;'
+    return [
+        CANDIDATE_TAGS_TABLE.rstrip() + ' WITHOUT ROWID',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS candidate_tags_ai AFTER INSERT ON candidate_profiles BEGIN
+            {insert_new}
+        END
+        ''',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS candidate_tags_ad AFTER DELETE ON candidate_profiles BEGIN
+            {delete_old}
+        END
+        ''',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS candidate_tags_au
+        AFTER UPDATE OF skills, languages, user_id ON candidate_profiles BEGIN
+            {delete_old}
+            {insert_new}
+        END
+        ''',
+        # Indexa os perfis que já existiam
+        f'INSERT OR IGNORE INTO candidate_tags (kind, tag, user_id) {tags_of("p")}',
+    ] + CANDIDATE_FILTER_INDEXES
+
+# ----------------------------------------------------------------
+# 0006: Listas de recomendações e fila de recálculo
+# ----------------------------------------------------------------
+
+RECOMMENDATION_TABLES = [
+    '''
+    CREATE TABLE IF NOT EXISTS job_matches (
+        job_id INTEGER NOT NULL,
+        candidate_id INTEGER NOT NULL,
+        score REAL NOT NULL,
+        PRIMARY KEY (job_id, candidate_id)
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS candidate_recommendations (
+        candidate_id INTEGER NOT NULL,
+        job_id INTEGER NOT NULL,
+        score REAL NOT NULL,
+        PRIMARY KEY (candidate_id, job_id)
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS recommendation_queue (
+        kind VARCHAR(20) NOT NULL,
+        entity_id INTEGER NOT NULL,
+        PRIMARY KEY (kind, entity_id)
+    )
+    ''',
+]
+
+# Usados por refresh() para achar as listas que contêm um item alterado
+RECOMMENDATION_INDEXES = [
+    'CREATE INDEX IF NOT EXISTS idx_job_matches_candidate_id ON job_matches (candidate_id)',
+    'CREATE INDEX IF NOT EXISTS idx_candidate_recommendations_job_id ON candidate_recommendations (job_id)',
+]
+
+# Tabela -> (tipo na fila, coluna do id, colunas que alteram a recomendação, condição)
+RECOMMENDATION_TRIGGERS = {
+    'jobs': ('job', 'id', ('title', 'requirements', 'area', 'level', 'work_modality', 'location',
+                           'salary_range', 'is_active'), None),
+    'candidate_profiles': ('candidate', 'user_id', ('professional_title', 'skills', 'sector', 'level', 'work_modality',
+                                                    'address_city', 'address_state', 'salary_expectation'), None),
+    'users': ('candidate', 'id', ('is_active', 'profile_public'), "user_type = 'candidate'"),
+}
+
+# Na primeira execução do refresh() todas as entidades estão na fila (recálculo completo)
+RECOMMENDATION_BACKFILL = [
+    "INSERT INTO recommendation_queue (kind, entity_id) SELECT 'job', id FROM jobs",
+    "INSERT INTO recommendation_queue (kind, entity_id) SELECT DISTINCT 'candidate', user_id FROM candidate_profiles",
+]
+
+def _postgres_recommendation_commands():
+    commands = RECOMMENDATION_TABLES + RECOMMENDATION_INDEXES + [
+        '''
+        CREATE OR REPLACE FUNCTION recommendation_enqueue() RETURNS trigger AS $$
+        DECLARE
+            row_data jsonb;
+        BEGIN
+            row_data := CASE WHEN TG_OP = 'DELETE' THEN to_jsonb(OLD) ELSE to_jsonb(NEW) END;
+            INSERT INTO recommendation_queue (kind, entity_id)
+            VALUES (TG_ARGV[0], (row_data ->> TG_ARGV[1])::integer)
+            ON CONFLICT DO NOTHING;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+        ''',
+    ]
+    for table, (kind, id_column, columns, condition) in RECOMMENDATION_TRIGGERS.items():
+        events = f"UPDATE OF {', '.join(columns)}" if condition else f"INSERT OR DELETE OR UPDATE OF {', '.join(columns)}"
+        when = f'WHEN (OLD.{condition})' if condition else ''
+        commands.append(f'''
+        CREATE TRIGGER {table}_recommendation_enqueue AFTER {events} ON {table}
+        FOR EACH ROW {when} EXECUTE FUNCTION recommendation_enqueue('{kind}', '{id_column}')
+        ''')
+    return commands + RECOMMENDATION_BACKFILL
+
+def _sqlite_recommendation_commands():
+    commands = [sql.rstrip() + ' WITHOUT ROWID' for sql in RECOMMENDATION_TABLES] + RECOMMENDATION_INDEXES
+    for table, (kind, id_column, columns, condition) in RECOMMENDATION_TRIGGERS.items():
+        events = [('au', f"UPDATE OF {', '.join(columns)}", 'new')]
+        if not condition:
+            events += [('ai', 'INSERT', 'new'), ('ad', 'DELETE', 'old')]
+        for suffix, event, row in events:
+            when = f'WHEN old.{condition}' if condition else ''
+            commands.append(f'''
+            CREATE TRIGGER IF NOT EXISTS {table}_recommendation_{suffix} AFTER {event} ON {table} {when} BEGIN
+                INSERT OR IGNORE INTO recommendation_queue (kind, entity_id) VALUES ('{kind}', {row}.{id_column});
+            END
+            ''')
+    return commands + RECOMMENDATION_BACKFILL
+
+# ----------------------------------------------------------------
+# 0007: Contadores das facetas de vagas e cursos
+# ----------------------------------------------------------------
+
+# Catálogo -> (tabela de contadores, colunas das facetas, coluna de expiração).
+# Uma linha por combinação de valores com o total de itens ativos: as facetas
+# são somas sobre esta tabela, que não cresce com o número de vagas/cursos.
+FACET_COUNTERS = {
+    'jobs': ('job_facet_counts', ('area', 'location', 'work_modality'), 'expires_at'),
+    'courses': ('course_facet_counts', ('category', 'level', 'modality', 'is_free'), None),
+}
+
+# NULL não pode fazer parte da chave primária: é gravado como estes valores
+FACET_COUNTER_DEFAULTS = {'is_free': 'FALSE', 'expires_at': "'9999-12-31'"}
+FACET_COUNTER_TYPES = {'is_free': 'BOOLEAN', 'expires_at': 'DATE'}
+
+def _facet_counter_sql(table, sqlite):
+    """
+    :return: (CREATE TABLE, comando que soma 1 à combinação de NEW, comando que subtrai 1 da de OLD, backfill).
+    """
+    counts_table, columns, expires = FACET_COUNTERS[table]
+    keys = columns + ((expires,) if expires else ())
+    key_list = ', '.join(keys)
+    defaults = {column: FACET_COUNTER_DEFAULTS.get(column, "''") for column in keys}
+
+    def values(row):
+        prefix = f'{row}.' if row else ''
+        return [f'COALESCE({prefix}{column}, {defaults[column]})' for column in keys]
+
+    definitions = ''.join(f'{column} {FACET_COUNTER_TYPES.get(column, "TEXT")} NOT NULL, ' for column in keys)
+    create = f'''
+    CREATE TABLE IF NOT EXISTS {counts_table} (
+        {definitions}total INTEGER NOT NULL, PRIMARY KEY ({key_list})
+    ){' WITHOUT ROWID' if sqlite else ''}
+    '''
+    # No SQLite o INSERT ... SELECT ... WHERE evita a ambiguidade do ON CONFLICT após o SELECT
+    increment = f'''
+        INSERT INTO {counts_table} ({key_list}, total)
+        SELECT {', '.join(values('new' if sqlite else 'NEW'))}, 1 {'WHERE new.is_active' if sqlite else ''}
+        ON CONFLICT ({key_list}) DO UPDATE SET total = {counts_table}.total + 1;
+    '''
+    old_match = ' AND '.join(f'{column} = {value}' for column, value in zip(keys, values('old' if sqlite else 'OLD')))
+    decrement = f'''
+        UPDATE {counts_table} SET total = total - 1
+        WHERE {'old.is_active AND ' if sqlite else ''}{old_match};
+    '''
+    backfill = f'''
+        INSERT INTO {counts_table} ({key_list}, total)
+        SELECT {', '.join(values(None))}, COUNT(*) FROM {table} WHERE is_active = TRUE
+        GROUP BY {', '.join(values(None))}
+    '''
+    return create, increment, decrement, backfill
+
+def _postgres_facet_counters():
+    commands = []
+    for table, (counts_table, columns, expires) in FACET_COUNTERS.items():
+        create, increment, decrement, backfill = _facet_counter_sql(table, sqlite=False)
+        watched = ', '.join(('is_active',) + columns + ((expires,) if expires else ()))
+        commands += [
+            create,
+            f'''
+            CREATE OR REPLACE FUNCTION {counts_table}_sync() RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP <> 'INSERT' AND OLD.is_active THEN
+                    {decrement}
+                END IF;
+                IF TG_OP <> 'DELETE' AND NEW.is_active THEN
+                    {increment}
+                END IF;
+                RETURN NULL;
+            END
+            $$ LANGUAGE plpgsql
+            ''',
+            f'''
+            CREATE TRIGGER {counts_table}_sync
+            AFTER INSERT OR DELETE OR UPDATE OF {watched} ON {table}
+            FOR EACH ROW EXECUTE FUNCTION {counts_table}_sync()
+            ''',
+            backfill,
+        ]
+    return commands
+
+def _sqlite_facet_counters():
+    commands = []
+    for table, (counts_table, columns, expires) in FACET_COUNTERS.items():
+        create, increment, decrement, backfill = _facet_counter_sql(table, sqlite=True)
+        watched = ', '.join(('is_active',) + columns + ((expires,) if expires else ()))
+        commands += [
+            create,
+            f'CREATE TRIGGER IF NOT EXISTS {counts_table}_ai AFTER INSERT ON {table} BEGIN {increment} END',
+            f'CREATE TRIGGER IF NOT EXISTS {counts_table}_ad AFTER DELETE ON {table} BEGIN {decrement} END',
+            f'''
+            CREATE TRIGGER IF NOT EXISTS {counts_table}_au AFTER UPDATE OF {watched} ON {table} BEGIN
+                {decrement}
+                {increment}
+            END
+            ''',
+            backfill,
+        ]
+    return commands
+
+# ----------------------------------------------------------------
+# 0008: Métricas do painel administrativo (totais e buckets diários)
+# ----------------------------------------------------------------
+
+# Métrica (tabela de origem) -> (coluna da dimensão, coluna da data, (coluna, valor) exigidos no total).
+# metrics_totals guarda quantas linhas atendem à condição agora, por dimensão;
+# metrics_daily guarda quantas linhas foram criadas em cada dia, por dimensão.
+METRIC_ROLLUPS = {
+    'users': ('user_type', 'created_at', None),
+    'jobs': (None, 'created_at', ('is_active', 'TRUE')),
+    'applications': (None, 'applied_at', None),
+    'courses': (None, 'created_at', ('is_active', 'TRUE')),
+    'subscriptions': ('plan_id', 'started_at', ('status', "'active'")),
+}
+
+METRIC_TABLES = [
+    '''
+    CREATE TABLE IF NOT EXISTS metrics_totals (
+        metric VARCHAR(50) NOT NULL,
+        dimension VARCHAR(100) NOT NULL,
+        total INTEGER NOT NULL,
+        PRIMARY KEY (metric, dimension)
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS metrics_daily (
+        day DATE NOT NULL,
+        metric VARCHAR(50) NOT NULL,
+        dimension VARCHAR(100) NOT NULL,
+        total INTEGER NOT NULL,
+        PRIMARY KEY (day, metric, dimension)
+    )
+    ''',
+]
+
+def _metric_rollup_sql(metric, sqlite):
+    """
+    :return: (colunas observadas, comandos que somam NEW, comandos que subtraem OLD, backfill).
+    """
+    dimension, day_column, condition = METRIC_ROLLUPS[metric]
+
+    def dimension_of(row):
+        return f"COALESCE(CAST({row}.{dimension} AS VARCHAR(100)), '')" if dimension else "''"
+
+    def day_of(row):
+        day = f'date({row}.{day_column})' if sqlite else f'CAST({row}.{day_column} AS DATE)'
+        return f'COALESCE({day}, CURRENT_DATE)'
+
+    def condition_of(row):
+        return f'{row}.{condition[0]} = {condition[1]}' if condition else 'TRUE'
+
+    def add(row):
+        return f'''
+            INSERT INTO metrics_totals (metric, dimension, total)
+            SELECT '{metric}', {dimension_of(row)}, 1 WHERE {condition_of(row)}
+            ON CONFLICT (metric, dimension) DO UPDATE SET total = metrics_totals.total + 1;
+            INSERT INTO metrics_daily (day, metric, dimension, total)
+            SELECT {day_of(row)}, '{metric}', {dimension_of(row)}, 1 WHERE TRUE
+            ON CONFLICT (day, metric, dimension) DO UPDATE SET total = metrics_daily.total + 1;
+        '''
+
+    def subtract(row):
+        return f'''
+            UPDATE metrics_totals SET total = total - 1
+            WHERE metric = '{metric}' AND dimension = {dimension_of(row)} AND {condition_of(row)};
+            UPDATE metrics_daily SET total = total - 1
+            WHERE day = {day_of(row)} AND metric = '{metric}' AND dimension = {dimension_of(row)};
+        '''
+
+    backfill = [
+        f'''
+        INSERT INTO metrics_totals (metric, dimension, total)
+        SELECT '{metric}', {dimension_of('r')}, COUNT(*) FROM {metric} r
+        WHERE {condition_of('r')} GROUP BY {dimension_of('r')}
+        ''',
+        f'''
+        INSERT INTO metrics_daily (day, metric, dimension, total)
+        SELECT {day_of('r')}, '{metric}', {dimension_of('r')}, COUNT(*) FROM {metric} r
+        GROUP BY {day_of('r')}, {dimension_of('r')}
+        ''',
+    ]
+    watched = [column for column in (dimension, day_column, condition and condition[0]) if column]
+    return ', '.join(watched), add, subtract, backfill
+
+def _postgres_metric_rollups():
+    commands = list(METRIC_TABLES)
+    for metric in METRIC_ROLLUPS:
+        watched, add, subtract, backfill = _metric_rollup_sql(metric, sqlite=False)
+        commands += [
+            f'''
+            CREATE OR REPLACE FUNCTION metrics_{metric}_sync() RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP <> 'INSERT' THEN
+                    {subtract('OLD')}
+                END IF;
+                IF TG_OP <> 'DELETE' THEN
+                    {add('NEW')}
+                END IF;
+                RETURN NULL;
+            END
+            $$ LANGUAGE plpgsql
+            ''',
+            f'''
+            CREATE TRIGGER metrics_{metric}_sync
+            AFTER INSERT OR DELETE OR UPDATE OF {watched} ON {metric}
+            FOR EACH ROW EXECUTE FUNCTION metrics_{metric}_sync()
+            ''',
+        ] + backfill
+    return commands
+
+def _sqlite_metric_rollups():
+    commands = list(METRIC_TABLES)
+    for metric in METRIC_ROLLUPS:
+        watched, add, subtract, backfill = _metric_rollup_sql(metric, sqlite=True)
+        commands += [
+            f"CREATE TRIGGER IF NOT EXISTS metrics_{metric}_ai AFTER INSERT ON {metric} BEGIN {add('new')} END",
+            f"CREATE TRIGGER IF NOT EXISTS metrics_{metric}_ad AFTER DELETE ON {metric} BEGIN {subtract('old')} END",
+            f'''
+            CREATE TRIGGER IF NOT EXISTS metrics_{metric}_au AFTER UPDATE OF {watched} ON {metric} BEGIN
+                {subtract('old')}
+                {add('new')}
+            END
+            ''',
+        ] + backfill
+    return commands
+
+# ----------------------------------------------------------------
+# 0009: Outbox transacional (notificações entregues pelo worker)
+# ----------------------------------------------------------------
+
+# Gravada na mesma transação da linha de negócio e drenada por app.services.outbox.
+# available_at (epoch, em segundos) guarda o próximo retry e o prazo do lote reservado por um worker.
+OUTBOX_SCHEMA = [
+    '''
+    CREATE TABLE IF NOT EXISTS outbox (
+        id SERIAL PRIMARY KEY,
+        event_type VARCHAR(50) NOT NULL,
+        payload TEXT NOT NULL,
+        status VARCHAR(20) NOT NULL DEFAULT 'pending',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        available_at DOUBLE PRECISION NOT NULL DEFAULT 0,
+        pending_sinks TEXT,
+        last_error TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        processed_at TIMESTAMP
+    )
+    ''',
+    # Só os eventos pendentes: o índice não cresce com o histórico entregue
+    "CREATE INDEX IF NOT EXISTS idx_outbox_pending ON outbox (id) WHERE status = 'pending'",
+]
+
+# ----------------------------------------------------------------
+# 0010: Eventos de vagas novas/destacadas para o stream SSE (app.services.job_stream)
+# ----------------------------------------------------------------
+
+# Vaga ativa criada ou que passou a ser destacada
+JOB_EVENT_CONDITIONS = {
+    'created': 'NEW.is_active',
+    'featured': 'NEW.is_featured AND NOT OLD.is_featured AND NEW.is_active',
+}
+
+def _postgres_job_events():
+    """
+    NOTIFY no canal 'job_events' (entregue no commit) com os campos usados nos filtros do stream.
+    """
+    return [
+        '''
+        CREATE OR REPLACE FUNCTION job_events_notify() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('job_events', json_build_object(
+                'event', TG_ARGV[0], 'id', NEW.id, 'title', NEW.title, 'area', NEW.area,
+                'work_modality', NEW.work_modality, 'location', NEW.location, 'level', NEW.level,
+                'is_featured', NEW.is_featured,
+                'company_name', (SELECT name FROM users WHERE id = NEW.company_id)
+            )::text);
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+        ''',
+        f'''
+        CREATE TRIGGER jobs_events_created AFTER INSERT ON jobs
+        FOR EACH ROW WHEN ({JOB_EVENT_CONDITIONS['created']}) EXECUTE FUNCTION job_events_notify('created')
+        ''',
+        f'''
+        CREATE TRIGGER jobs_events_featured AFTER UPDATE OF is_featured ON jobs
+        FOR EACH ROW WHEN ({JOB_EVENT_CONDITIONS['featured']}) EXECUTE FUNCTION job_events_notify('featured')
+        ''',
+    ]
+
+def _sqlite_job_events():
+    """
+    Sem LISTEN/NOTIFY: os triggers gravam em job_events, lida periodicamente por um
+    único leitor em cada processo (e podada por ele).
+    """
+    return [
+        '''
+        CREATE TABLE IF NOT EXISTS job_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            event VARCHAR(20) NOT NULL,
+            job_id INTEGER NOT NULL,
+            created_at REAL NOT NULL DEFAULT (strftime('%s', 'now'))
+        )
+        ''',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS jobs_events_created AFTER INSERT ON jobs
+        WHEN {JOB_EVENT_CONDITIONS['created'].replace('NEW', 'new')} BEGIN
+            INSERT INTO job_events (event, job_id) VALUES ('created', new.id);
+        END
+        ''',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS jobs_events_featured AFTER UPDATE OF is_featured ON jobs
+        WHEN {JOB_EVENT_CONDITIONS['featured'].replace('NEW', 'new').replace('OLD', 'old')} BEGIN
+            INSERT INTO job_events (event, job_id) VALUES ('featured', new.id);
+        END
+        ''',
+    ]
+
+# ----------------------------------------------------------------
+# 0011: Mensagens (conversas, participantes e mensagens)
+# ----------------------------------------------------------------
+
+# conversation_participants guarda, por usuário, a última mensagem da conversa e o
+# total de não lidas: os dois são atualizados no envio (app.services.messaging),
+# de modo que a caixa de entrada e os contadores não precisam ler messages.
+MESSAGING_SCHEMA = [
+    '''
+    CREATE TABLE IF NOT EXISTS conversations (
+        id SERIAL PRIMARY KEY,
+        subject VARCHAR(255),
+        created_by INTEGER NOT NULL REFERENCES users (id),
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+        last_message_id INTEGER NOT NULL DEFAULT 0,
+        last_message_at TIMESTAMP WITH TIME ZONE,
+        last_message_preview VARCHAR(255)
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS conversation_participants (
+        conversation_id INTEGER NOT NULL REFERENCES conversations (id),
+        user_id INTEGER NOT NULL REFERENCES users (id),
+        last_message_id INTEGER NOT NULL DEFAULT 0,
+        last_read_message_id INTEGER NOT NULL DEFAULT 0,
+        unread_count INTEGER NOT NULL DEFAULT 0,
+        joined_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (conversation_id, user_id)
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS messages (
+        id SERIAL PRIMARY KEY,
+        conversation_id INTEGER NOT NULL REFERENCES conversations (id),
+        sender_id INTEGER NOT NULL REFERENCES users (id),
+        body TEXT NOT NULL,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+    )
+    ''',
+    # Histórico de uma conversa por keyset em id (e novas mensagens após um id)
+    'CREATE INDEX IF NOT EXISTS idx_messages_conversation ON messages (conversation_id, id)',
+    # Caixa de entrada do usuário, da conversa mais recente para a mais antiga
+    'CREATE INDEX IF NOT EXISTS idx_participants_inbox ON conversation_participants (user_id, last_message_id, conversation_id)',
+    # Só as conversas com não lidas: o total do usuário soma poucas linhas
+    'CREATE INDEX IF NOT EXISTS idx_participants_unread ON conversation_participants (user_id) WHERE unread_count > 0',
+]
+
+def _postgres_messaging():
+    """
+    NOTIFY no canal 'messages' (entregue no commit) com os participantes a acordar no long-poll.
+    """
+    return MESSAGING_SCHEMA + [
+        '''
+        CREATE OR REPLACE FUNCTION messages_notify() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('messages', json_build_object(
+                'id', NEW.id, 'conversation_id', NEW.conversation_id,
+                'users', (SELECT json_agg(user_id) FROM conversation_participants
+                          WHERE conversation_id = NEW.conversation_id)
+            )::text);
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+        ''',
+        '''
+        CREATE TRIGGER messages_notify AFTER INSERT ON messages
+        FOR EACH ROW EXECUTE FUNCTION messages_notify()
+        ''',
+    ]
+
+# ----------------------------------------------------------------
+# 0012: Métricas por deltas (sem disputa pela mesma linha de metrics_totals)
+# ----------------------------------------------------------------
+
+# Os triggers da 0008 atualizavam a mesma linha de metrics_totals/metrics_daily em cada
+# cadastro, vaga ou candidatura, e o lock dessa linha ficava com o escritor até o commit.
+# Agora cada alteração só acrescenta uma linha em metrics_deltas; app.services.metric_rollups
+# (cron) soma os deltas nas tabelas de rollup e os apaga. O painel lê rollups + deltas pendentes.
+METRIC_DELTAS_TABLE = '''
+    CREATE TABLE IF NOT EXISTS metrics_deltas (
+        id SERIAL PRIMARY KEY,
+        day DATE NOT NULL,
+        metric VARCHAR(50) NOT NULL,
+        dimension VARCHAR(100) NOT NULL,
+        total_delta INTEGER NOT NULL,
+        daily_delta INTEGER NOT NULL
+    )
+'''
+
+def _metric_delta_sql(metric, sqlite):
+    """
+    :return: (colunas observadas, comando que registra +1 para NEW / -1 para OLD).
+    """
+    dimension, day_column, condition = METRIC_ROLLUPS[metric]
+
+    def delta(row, sign):
+        dimension_sql = f"COALESCE(CAST({row}.{dimension} AS VARCHAR(100)), '')" if dimension else "''"
+        day = f'date({row}.{day_column})' if sqlite else f'CAST({row}.{day_column} AS DATE)'
+        counted = f'{row}.{condition[0]} = {condition[1]}' if condition else 'TRUE'
+        return f'''
+            INSERT INTO metrics_deltas (day, metric, dimension, total_delta, daily_delta)
+            VALUES (COALESCE({day}, CURRENT_DATE), '{metric}', {dimension_sql},
+                    CASE WHEN {counted} THEN {sign}1 ELSE 0 END, {sign}1);
+        '''
+
+    watched = [column for column in (dimension, day_column, condition and condition[0]) if column]
+    return ', '.join(watched), delta
+
+def _postgres_metric_deltas():
+    commands = [METRIC_DELTAS_TABLE]
+    for metric in METRIC_ROLLUPS:
+        _, delta = _metric_delta_sql(metric, sqlite=False)
+        # O trigger da 0008 continua o mesmo; só a função passa a gravar deltas
+        commands.append(f'''
+            CREATE OR REPLACE FUNCTION metrics_{metric}_sync() RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP <> 'INSERT' THEN
+                    {delta('OLD', '-')}
+                END IF;
+                IF TG_OP <> 'DELETE' THEN
+                    {delta('NEW', '+')}
+                END IF;
+                RETURN NULL;
+            END
+            $$ LANGUAGE plpgsql
+        ''')
+    return commands
+
+def _sqlite_metric_deltas():
+    commands = _sqlite_schema([METRIC_DELTAS_TABLE])
+    for metric in METRIC_ROLLUPS:
+        watched, delta = _metric_delta_sql(metric, sqlite=True)
+        commands += [f'DROP TRIGGER IF EXISTS metrics_{metric}_{suffix}' for suffix in ('ai', 'ad', 'au')]
+        commands += [
+            f"CREATE TRIGGER metrics_{metric}_ai AFTER INSERT ON {metric} BEGIN {delta('new', '+')} END",
+            f"CREATE TRIGGER metrics_{metric}_ad AFTER DELETE ON {metric} BEGIN {delta('old', '-')} END",
+            f'''
+            CREATE TRIGGER metrics_{metric}_au AFTER UPDATE OF {watched} ON {metric} BEGIN
+                {delta('old', '-')}
+                {delta('new', '+')}
+            END
+            ''',
+        ]
+    return commands
+
+# ----------------------------------------------------------------
+# Lista de migrações (apenas acrescente; nunca altere uma migração já aplicada)
+# ----------------------------------------------------------------
+
+MIGRATIONS = [
+    Migration(1, 'initial_schema', INITIAL_SCHEMA, _sqlite_schema(INITIAL_SCHEMA)),
+    Migration(2, 'search_indexes', _search_indexes('postgres'), _search_indexes('sqlite')),
+    Migration(3, 'hot_path_indexes',
+              POSTGRES_LISTING_INDEXES + FOREIGN_KEY_INDEXES,
+              SQLITE_LISTING_INDEXES + FOREIGN_KEY_INDEXES),
+    Migration(4, 'unique_applications', APPLICATION_CONSTRAINTS, APPLICATION_CONSTRAINTS),
+    Migration(5, 'candidate_tags', _postgres_candidate_tags(), _sqlite_candidate_tags()),
+    Migration(6, 'recommendations', _postgres_recommendation_commands(), _sqlite_recommendation_commands()),
+    Migration(7, 'facet_counters', _postgres_facet_counters(), _sqlite_facet_counters()),
+    Migration(8, 'metric_rollups', _postgres_metric_rollups(), _sqlite_metric_rollups()),
+    Migration(9, 'outbox', OUTBOX_SCHEMA, _sqlite_schema(OUTBOX_SCHEMA)),
+    Migration(10, 'job_events', _postgres_job_events(), _sqlite_job_events()),
+    # No SQLite, o próprio messages (lido por id) faz o papel do NOTIFY
+    Migration(11, 'messaging', _postgres_messaging(), _sqlite_schema(MESSAGING_SCHEMA)),
+    Migration(12, 'metric_deltas', _postgres_metric_deltas(), _sqlite_metric_deltas()),
+]
+
+# ----------------------------------------------------------------
+# Execução
+# ----------------------------------------------------------------
+
+def run_migrations(migrations=MIGRATIONS):
+    """
+    Aplica as migrações pendentes, cada uma em sua transação, usando uma única conexão.
+
+    :return: Número de migrações aplicadas (0 quando o esquema já está atualizado).
+    """
+    postgres = bool(DATABASE_URL)
+    dialect = 'postgres' if postgres else 'sqlite'
+    placeholder = '%s' if postgres else '?'
+
+    conn = get_db_connection()
+    isolation_level = None if postgres else conn.isolation_level
+    try:
+        cursor = conn.cursor()
+        if postgres:
+            cursor.execute('SELECT pg_advisory_lock(%s)', (MIGRATION_LOCK_ID,))
+        else:
+            # BEGIN/COMMIT explícitos: o módulo sqlite3 não abre transação para DDL.
+            # A conexão da thread é reaproveitada: linhas como tuplas, qualquer que seja o row_factory
+            conn.isolation_level = None
+            cursor.row_factory = None
+
+        cursor.execute(SCHEMA_MIGRATIONS_TABLE)
+        if postgres:
+            conn.commit()
+        cursor.execute('SELECT version, checksum FROM schema_migrations')
+        applied = dict(cursor.fetchall())
+
+        pending = []
+        for migration in sorted(migrations, key=lambda m: m.version):
+            checksum = migration.checksum(dialect)
+            if migration.version in applied:
+                if applied[migration.version] != checksum:
+                    raise MigrationError(
+                        f"Migração {migration.version:04d}_{migration.name} foi alterada após ser aplicada"
+                    )
+                continue
+            pending.append((migration, checksum))
+
+        if not pending:
+            print("Esquema do banco de dados já está atualizado.")
+            return 0
+
+        applied_now = 0
+        for migration, checksum in pending:
+            if not postgres:
+                # IMMEDIATE: reserva a escrita já no início (outros workers esperam pelo busy_timeout).
+                # Como o advisory lock do PostgreSQL, mas por migração: relê schema_migrations com
+                # o lock em mãos e pula a versão que outro worker aplicou depois da leitura acima
+                cursor.execute('BEGIN IMMEDIATE')
+                cursor.execute('SELECT 1 FROM schema_migrations WHERE version = ?', (migration.version,))
+                if cursor.fetchone():
+                    cursor.execute('COMMIT')
+                    continue
+            print(f"Aplicando migração {migration.version:04d}_{migration.name}...")
+            try:
+                for sql in migration.commands(dialect):
+                    cursor.execute(sql)
+                cursor.execute(
+                    f'INSERT INTO schema_migrations (version, name, checksum) '
+                    f'VALUES ({placeholder}, {placeholder}, {placeholder})',
+                    (migration.version, migration.name, checksum)
+                )
+                if postgres:
+                    conn.commit()
+                else:
+                    cursor.execute('COMMIT')
+            except Exception:
+                if postgres:
+                    conn.rollback()
+                else:
+                    cursor.execute('ROLLBACK')
+                raise
+            applied_now += 1
+
+        if not applied_now:
+            print("Esquema do banco de dados já está atualizado.")
+            return 0
+        # O esquema mudou: resultados em cache podem não refletir as novas colunas
+        query_cache.clear()
+        print(f"{applied_now} migração(ões) aplicada(s).")
+        return applied_now
+    finally:
+        if postgres:
+            try:
+                conn.rollback()
+                conn.cursor().execute('SELECT pg_advisory_unlock(%s)', (MIGRATION_LOCK_ID,))
+                conn.commit()
+            except Exception as e:
+                print(f"Erro ao liberar o lock de migração: {e}")
+        else:
+            conn.isolation_level = isolation_level
+        put_db_connection(conn)
@@ -0,0 +1,279 @@
+# backend/app/services/notifications.py
+import importlib
+import json
+import os
+import smtplib
+from email.message import EmailMessage
+
+from app.services.database import execute_sql
+from app.services.recommendations import JOB_FEATURES_SQL, load_candidates, matches_for_job, score_job
+
+# ----------------------------------------------------------------
+# Notificações dos Eventos da Outbox e Destinos de Entrega (sinks)
+# ----------------------------------------------------------------
+
+# Destinos usados pelo worker, separados por vírgula: nomes de SINKS ou 'modulo:Classe'
+OUTBOX_SINKS = os.environ.get('OUTBOX_SINKS', 'file')
+
+# Arquivo do FileSink (JSON por linha): destino local para desenvolvimento e testes
+OUTBOX_FILE_PATH = os.environ.get('OUTBOX_FILE_PATH', os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', '..', 'instance', 'notifications.jsonl'))
+
+# Candidatos compatíveis avisados de cada vaga nova (0 desativa os alertas)
+NOTIFY_JOB_MATCHES = int(os.environ.get('NOTIFY_JOB_MATCHES', 20))
+
+# Servidor SMTP do SmtpSink (ex.: um servidor de testes local em localhost:1025)
+SMTP_HOST = os.environ.get('SMTP_HOST', 'localhost')
+SMTP_PORT = int(os.environ.get('SMTP_PORT', 25))
+SMTP_USER = os.environ.get('SMTP_USER')
+SMTP_PASSWORD = os.environ.get('SMTP_PASSWORD')
+SMTP_STARTTLS = os.environ.get('SMTP_STARTTLS', '0') == '1'
+SMTP_SENDER = os.environ.get('SMTP_SENDER', 'ClaunNetworking <nao-responda@claunnetworking.com>')
+SMTP_TIMEOUT = float(os.environ.get('SMTP_TIMEOUT', 10))
+
+
+def _in_list(ids):
+    return ', '.join(['%s'] * len(ids))
+
+
+def _lookup(events):
+    """
+    Carrega, em poucas queries para o lote inteiro, as vagas e os usuários citados nos eventos.
+    """
+    job_ids, user_ids = set(), set()
+    for event in events:
+        payload = event['payload']
+        if event['event_type'] == 'application.created':
+            user_ids.add(payload['candidate_id'])
+            job_ids.update(item['job_id'] for item in payload['applications'])
+        elif event['event_type'] == 'job.created':
+            job_ids.add(payload['job_id'])
+        elif event['event_type'] == 'jobs.imported':
+            job_ids.update(payload['job_ids'])
+
+    jobs = {}
+    if job_ids:
+        jobs = {row['id']: row for row in execute_sql(f'''
+            SELECT j.id, j.title, j.company_id, u.email AS company_email, u.name AS company_name
+            FROM jobs j JOIN users u ON u.id = j.company_id WHERE j.id IN ({_in_list(job_ids)})
+        ''', list(job_ids), fetch=True)}
+    users = {}
+    if user_ids:
+        users = {row['id']: row for row in execute_sql(
+            f'SELECT id, email, name FROM users WHERE id IN ({_in_list(user_ids)})', list(user_ids), fetch=True)}
+    return jobs, users
+
+
+def _job_alerts(job_id, candidate_matrix):
+    """
+    Candidatos mais compatíveis com uma vaga nova: a lista de recomendações ou, se o cron
+    ainda não a calculou, a pontuação contra candidate_matrix() (montada uma vez por lote).
+    """
+    if NOTIFY_JOB_MATCHES <= 0:
+        return []
+    rows = execute_sql(f'{JOB_FEATURES_SQL} AND id = %s', (job_id,), fetch=True)
+    if not rows:
+        return []
+    matches = matches_for_job(rows[0], NOTIFY_JOB_MATCHES)
+    if not matches:
+        matches = score_job(rows[0], candidate_matrix(), NOTIFY_JOB_MATCHES)
+    if not matches:
+        return []
+    ids = [match['item_id'] for match in matches]
+    return execute_sql(f'''
+        SELECT id, email, name FROM users WHERE id IN ({_in_list(ids)}) AND is_active = TRUE
+    ''', ids, fetch=True)
+
+
+def _alert_messages(job, candidate_matrix):
+    """
+    Alertas de vaga nova para os candidatos de _job_alerts().
+    """
+    return [{
+        'to': candidate['email'],
+        'subject': f"Nova vaga compatível com seu perfil: {job['title']}",
+        'body': f"{job['company_name']} publicou a vaga {job['title']}.",
+    } for candidate in _job_alerts(job['id'], candidate_matrix)]
+
+
+def build(events):
+    """
+    Monta as mensagens de cada evento do lote.
+
+    :param events: Eventos com 'id', 'event_type' e 'payload' (já decodificado).
+    :return: Dicionário id do evento -> lista de {'to', 'subject', 'body'}.
+    """
+    jobs, users = _lookup(events)
+    messages = {}
+    loaded = []
+
+    def candidate_matrix():
+        if not loaded:
+            loaded.append(load_candidates())
+        return loaded[0]
+
+    for event in events:
+        payload = event['payload']
+        items = messages[event['id']] = []
+        if event['event_type'] == 'application.created':
+            candidate = users.get(payload['candidate_id'])
+            if candidate is None:
+                continue
+            for application in payload['applications']:
+                job = jobs.get(application['job_id'])
+                if job is None:
+                    continue
+                items.append({
+                    'to': job['company_email'],
+                    'subject': f"Nova candidatura para {job['title']}",
+                    'body': f"{candidate['name']} se candidatou à vaga {job['title']}.",
+                })
+                items.append({
+                    'to': candidate['email'],
+                    'subject': f"Candidatura enviada: {job['title']}",
+                    'body': f"Sua candidatura para {job['title']} ({job['company_name']}) foi recebida.",
+                })
+        elif event['event_type'] == 'job.created':
+            job = jobs.get(payload['job_id'])
+            if job is None:
+                continue
+            items.append({
+                'to': job['company_email'],
+                'subject': f"Vaga publicada: {job['title']}",
+                'body': f"A vaga {job['title']} já está disponível para candidaturas.",
+            })
+            items.extend(_alert_messages(job, candidate_matrix))
+        elif event['event_type'] == 'jobs.imported':
+            # Um lote da importação: um resumo para a empresa e os alertas de cada vaga
+            imported = [jobs[job_id] for job_id in payload['job_ids'] if job_id in jobs]
+            if not imported:
+                continue
+            items.append({
+                'to': imported[0]['company_email'],
+                'subject': f'{len(imported)} vagas importadas',
+                'body': 'Vagas publicadas: ' + ', '.join(job['title'] for job in imported) + '.',
+            })
+            for job in imported:
+                items.extend(_alert_messages(job, candidate_matrix))
+    return messages
+
+# ----------------------------------------------------------------
+# Destinos (sinks)
+# ----------------------------------------------------------------
+
+class Sink:
+    """
+    Destino de entrega. deliver() é chamado uma vez por evento e deve lançar
+    uma exceção em caso de falha (o evento volta para a fila com backoff);
+    flush() é chamado ao fim de cada lote.
+
+    A entrega é "pelo menos uma vez": após uma falha parcial o evento é
+    reenviado, por isso cada mensagem carrega um identificador estável.
+    """
+
+    name = None
+
+    def deliver(self, event, messages):
+        raise NotImplementedError
+
+    def flush(self):
+        pass
+
+
+class FileSink(Sink):
+    """
+    Grava cada evento e suas mensagens como uma linha JSON (stub local para testes).
+    """
+
+    name = 'file'
+
+    def __init__(self, path=None):
+        self.path = path or OUTBOX_FILE_PATH
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._file = None
+
+    def deliver(self, event, messages):
+        if self._file is None:
+            self._file = open(self.path, 'a', encoding='utf-8')
+        self._file.write(json.dumps({'event_id': event['id'], 'event_type': event['event_type'],
+                                     'payload': event['payload'], 'messages': messages}, ensure_ascii=False) + '\n')
+
+    def flush(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class SmtpSink(Sink):
+    """
+    Envia as mensagens por SMTP, com uma conexão aberta por lote.
+    """
+
+    name = 'smtp'
+
+    def __init__(self):
+        self._client = None
+
+    def _connect(self):
+        client = smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=SMTP_TIMEOUT)
+        if SMTP_STARTTLS:
+            client.starttls()
+        if SMTP_USER:
+            client.login(SMTP_USER, SMTP_PASSWORD or '')
+        return client
+
+    def deliver(self, event, messages):
+        try:
+            if self._client is None and messages:
+                self._client = self._connect()
+            for index, item in enumerate(messages):
+                message = EmailMessage()
+                message['From'] = SMTP_SENDER
+                message['To'] = item['to']
+                message['Subject'] = item['subject']
+                # Permite ao destino descartar reenvios do mesmo evento
+                message['Message-ID'] = f"<outbox-{event['id']}-{index}@claunnetworking>"
+                message.set_content(item['body'])
+                self._client.send_message(message)
+        except (smtplib.SMTPException, OSError):
+            self._close()
+            raise
+
+    def _close(self):
+        client, self._client = self._client, None
+        if client is not None:
+            try:
+                client.quit()
+            except (smtplib.SMTPException, OSError):
+                client.close()
+
+    def flush(self):
+        self._close()
+
+
+SINKS = {sink.name: sink for sink in (FileSink, SmtpSink)}
+
+
+def load_sinks(spec=None):
+    """
+    Instancia os destinos de OUTBOX_SINKS (ex.: 'file,smtp' ou 'meu_pacote.webhooks:WebhookSink').
+    """
+    sinks = []
+    for name in (spec or OUTBOX_SINKS).split(','):
+        name = name.strip()
+        if not name:
+            continue
+        if ':' in name:
+            module, attribute = name.split(':', 1)
+            factory = getattr(importlib.import_module(module), attribute)
+        elif name in SINKS:
+            factory = SINKS[name]
+        else:
+            raise ValueError(f'Destino de notificações desconhecido: {name}')
+        sink = factory()
+        # O nome identifica o destino nos retries (pending_sinks) e nas estatísticas
+        sink.name = sink.name or name
+        sinks.append(sink)
+    if not sinks:
+        raise ValueError('Nenhum destino de notificações configurado (OUTBOX_SINKS)')
+    return sinks
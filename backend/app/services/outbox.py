@@ -0,0 +1,237 @@
+# backend/app/services/outbox.py
+import argparse
+import json
+import logging
+import os
+import random
+import signal
+import time
+
+from app.services.database import DATABASE_URL, execute_sql, transaction
+from app.services.notifications import build, load_sinks
+from app.services.statements import register
+
+# ----------------------------------------------------------------
+# Outbox Transacional e Worker de Entrega
+# ----------------------------------------------------------------
+
+# Eventos reservados por lote e espera entre consultas quando a fila está vazia (s)
+OUTBOX_BATCH_SIZE = int(os.environ.get('OUTBOX_BATCH_SIZE', 100))
+OUTBOX_POLL_INTERVAL = float(os.environ.get('OUTBOX_POLL_INTERVAL', 2))
+
+# Retries com backoff exponencial (base * 2^(tentativas-1), até o máximo, com jitter de ±20%).
+# Depois de OUTBOX_MAX_ATTEMPTS falhas o evento fica com status 'dead'.
+OUTBOX_MAX_ATTEMPTS = int(os.environ.get('OUTBOX_MAX_ATTEMPTS', 8))
+OUTBOX_BACKOFF_BASE = float(os.environ.get('OUTBOX_BACKOFF_BASE', 5))
+OUTBOX_BACKOFF_MAX = float(os.environ.get('OUTBOX_BACKOFF_MAX', 3600))
+
+# Um lote reservado fica invisível para outros workers por este tempo (s); se o worker
+# morrer no meio da entrega, os eventos voltam para a fila quando o prazo vencer
+OUTBOX_LEASE_SECONDS = float(os.environ.get('OUTBOX_LEASE_SECONDS', 300))
+
+logger = logging.getLogger('claunnetworking.outbox')
+
+ENQUEUE = register('outbox_enqueue', 'INSERT INTO outbox (event_type, payload) VALUES (%s, %s)', prepare=True)
+
+# Reserva o próximo lote empurrando available_at para o fim do prazo. No PostgreSQL,
+# SKIP LOCKED deixa workers simultâneos pegarem lotes diferentes sem esperar uns pelos outros.
+CLAIM = register('outbox_claim', f'''
+    UPDATE outbox SET available_at = %s
+    WHERE id IN (
+        SELECT id FROM outbox WHERE status = 'pending' AND available_at <= %s
+        ORDER BY id LIMIT %s{' FOR UPDATE SKIP LOCKED' if DATABASE_URL else ''}
+    )
+    RETURNING id, event_type, payload, attempts, pending_sinks
+''')
+
+RETRY = register('outbox_retry', '''
+    UPDATE outbox SET status = %s, attempts = %s, available_at = %s, pending_sinks = %s, last_error = %s
+    WHERE id = %s
+''')
+
+
+def enqueue(event_type, payload):
+    """
+    Grava um evento na outbox. Deve ser chamado dentro de transaction(), junto
+    com a linha de negócio: o evento só existe se a transação for comitada.
+
+    :param event_type: Tipo do evento (ex.: 'application.created').
+    :param payload: Dados do evento (serializáveis em JSON; ids, não textos prontos).
+    """
+    execute_sql(ENQUEUE, (event_type, json.dumps(payload, ensure_ascii=False)), commit=True)
+
+
+def backoff(attempts):
+    """
+    Espera (s) antes da próxima tentativa após `attempts` falhas.
+    """
+    delay = min(OUTBOX_BACKOFF_MAX, OUTBOX_BACKOFF_BASE * 2 ** (attempts - 1))
+    return delay * random.uniform(0.8, 1.2)
+
+
+class SinkStats:
+    """
+    Totais de um destino no worker: eventos entregues, falhas e tempo gasto nele.
+    """
+
+    def __init__(self):
+        self.delivered = 0
+        self.failed = 0
+        self.seconds = 0.0
+
+    def as_dict(self):
+        return {
+            'delivered': self.delivered,
+            'failed': self.failed,
+            'events_per_second': round(self.delivered / self.seconds, 1) if self.seconds else None,
+        }
+
+
+class OutboxWorker:
+    """
+    Drena a outbox em lotes: reserva eventos, monta as mensagens, entrega em
+    cada destino e grava o resultado (entregue, retry com backoff ou 'dead').
+
+    Um evento só é marcado como entregue quando todos os destinos aceitaram;
+    nos retries, apenas os destinos que falharam recebem o evento de novo.
+    """
+
+    def __init__(self, sinks, batch_size=OUTBOX_BATCH_SIZE):
+        self.sinks = sinks
+        self.batch_size = batch_size
+        self.stats = {sink.name: SinkStats() for sink in sinks}
+        self.events = 0
+        self.started = time.monotonic()
+        self._stopping = False
+
+    def claim(self):
+        now = time.time()
+        events = execute_sql(CLAIM, (now + OUTBOX_LEASE_SECONDS, now, self.batch_size), fetch=True, commit=True)
+        events.sort(key=lambda event: event['id'])
+        for event in events:
+            event['payload'] = json.loads(event['payload'])
+        return events
+
+    def _targets(self, event):
+        # Primeira tentativa: todos os destinos; retries: só os que falharam
+        pending = event['pending_sinks']
+        if not pending:
+            return self.sinks
+        names = pending.split(',')
+        return [sink for sink in self.sinks if sink.name in names]
+
+    def _deliver(self, events, messages):
+        """
+        Entrega o lote em cada destino. :return: id do evento -> {destino: erro}.
+        """
+        errors = {event['id']: {} for event in events}
+        for sink in self.sinks:
+            stats = self.stats[sink.name]
+            started = time.perf_counter()
+            delivered = []
+            for event in events:
+                if sink not in self._targets(event):
+                    continue
+                try:
+                    sink.deliver(event, messages.get(event['id'], []))
+                    delivered.append(event['id'])
+                except Exception as e:
+                    errors[event['id']][sink.name] = e
+            try:
+                sink.flush()
+            except Exception as e:
+                # O que estava em buffer no destino se perdeu: o lote inteiro falhou nele
+                for event_id in delivered:
+                    errors[event_id][sink.name] = e
+                delivered = []
+            stats.seconds += time.perf_counter() - started
+            stats.delivered += len(delivered)
+            stats.failed += sum(1 for event_errors in errors.values() if sink.name in event_errors)
+        return errors
+
+    def _save(self, events, errors):
+        done = [event['id'] for event in events if not errors[event['id']]]
+        with transaction():
+            if done:
+                execute_sql(f'''
+                    UPDATE outbox SET status = 'delivered', processed_at = CURRENT_TIMESTAMP,
+                                      pending_sinks = NULL, last_error = NULL
+                    WHERE id IN ({', '.join(['%s'] * len(done))})
+                ''', done, commit=True)
+            for event in events:
+                failures = errors[event['id']]
+                if not failures:
+                    continue
+                attempts = event['attempts'] + 1
+                status = 'dead' if attempts >= OUTBOX_MAX_ATTEMPTS else 'pending'
+                last_error = '; '.join(f'{name}: {error}' for name, error in failures.items())[:1000]
+                execute_sql(RETRY, (status, attempts, time.time() + backoff(attempts), ','.join(failures),
+                                    last_error, event['id']), commit=True)
+                if status == 'dead':
+                    logger.error(json.dumps({'event': 'outbox_dead', 'id': event['id'],
+                                             'event_type': event['event_type'], 'error': last_error},
+                                            ensure_ascii=False))
+
+    def run_once(self):
+        """
+        Processa um lote. :return: Número de eventos reservados (0 com a fila vazia).
+        """
+        events = self.claim()
+        if not events:
+            return 0
+        try:
+            messages = build(events)
+        except Exception as e:
+            # Sem as mensagens nenhum destino pode ser chamado: todos os eventos voltam com backoff
+            errors = {event['id']: {sink.name: e for sink in self._targets(event)} for event in events}
+        else:
+            errors = self._deliver(events, messages)
+        self._save(events, errors)
+        self.events += len(events)
+        logger.info(json.dumps({
+            'event': 'outbox_batch',
+            'events': len(events),
+            'failed': sum(1 for event_errors in errors.values() if event_errors),
+            'events_per_second': round(self.events / (time.monotonic() - self.started), 1),
+            'sinks': {name: stats.as_dict() for name, stats in self.stats.items()},
+        }, ensure_ascii=False))
+        return len(events)
+
+    def stop(self, *args):
+        self._stopping = True
+
+    def run(self, interval=OUTBOX_POLL_INTERVAL, drain=False):
+        """
+        Laço do worker. Com drain=True termina quando a fila fica vazia.
+        """
+        while not self._stopping:
+            claimed = self.run_once()
+            if claimed < self.batch_size:
+                if drain:
+                    return
+                time.sleep(interval)
+
+
+def main():
+    """
+    Uso (a partir de backend/, como processo separado do servidor web):
+        python3 -m app.services.outbox                    # worker contínuo
+        python3 -m app.services.outbox --once --sinks file  # drena a fila e termina
+    """
+    parser = argparse.ArgumentParser(description='Worker da outbox: entrega as notificações pendentes.')
+    parser.add_argument('--once', action='store_true', help='drena a fila e termina')
+    parser.add_argument('--batch-size', type=int, default=OUTBOX_BATCH_SIZE)
+    parser.add_argument('--interval', type=float, default=OUTBOX_POLL_INTERVAL)
+    parser.add_argument('--sinks', help='destinos (sobrepõe OUTBOX_SINKS), ex.: file,smtp')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    worker = OutboxWorker(load_sinks(args.sinks), args.batch_size)
+    # SIGTERM (deploy/restart) termina o lote atual antes de sair
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    worker.run(args.interval, drain=args.once)
+
+
+if __name__ == '__main__':
+    main()
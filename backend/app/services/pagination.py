@@ -0,0 +1,104 @@
+# backend/app/services/pagination.py
+import base64
+import json
+import math
+
+# ----------------------------------------------------------------
+# Paginação por cursor (keyset)
+# ----------------------------------------------------------------
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+class PaginationError(ValueError):
+    """Cursor ou limite de paginação malformado enviado pelo cliente."""
+
+
+def encode_cursor(values):
+    """
+    Serializa a chave de ordenação da última linha em um token opaco.
+
+    :param values: Lista com os valores da chave (ex.: is_featured, created_at, id).
+    :return: Token base64 seguro para URL.
+    """
+    raw = json.dumps(list(values), separators=(',', ':'), default=str)
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token, size):
+    """
+    Decodifica um token gerado por encode_cursor().
+
+    :param token: Token recebido no parâmetro 'cursor'.
+    :param size: Quantidade de valores esperada na chave.
+    :return: Lista com os valores da chave de ordenação.
+    """
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, TypeError):
+        raise PaginationError('Cursor inválido')
+    if not isinstance(values, list) or len(values) != size:
+        raise PaginationError('Cursor inválido')
+    # Os valores viram parâmetros da query: listas/objetos de um cursor forjado
+    # (ex.: [[1],"x",3]) falhariam no driver com erro 500
+    for value in values:
+        if value is not None and not isinstance(value, (str, int, float, bool)):
+            raise PaginationError('Cursor inválido')
+        if isinstance(value, float) and not math.isfinite(value):
+            raise PaginationError('Cursor inválido')
+    return values
+
+
+def parse_limit(raw, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    """
+    Valida o parâmetro 'limit', limitando-o ao tamanho máximo de página.
+    """
+    if raw is None or raw == '':
+        return default
+    try:
+        limit = int(raw)
+    except ValueError:
+        raise PaginationError('Parâmetro limit inválido')
+    if limit < 1:
+        raise PaginationError('Parâmetro limit inválido')
+    return min(limit, maximum)
+
+
+def keyset_condition(sort_key, token):
+    """
+    Condição WHERE que continua a listagem após o cursor recebido.
+    Todas as colunas de sort_key são ordenadas de forma decrescente.
+
+    :param sort_key: Colunas da chave de ordenação, terminando em uma coluna única (id).
+    :param token: Cursor recebido no parâmetro 'cursor'.
+    :return: (sql, params) no formato de placeholders de execute_sql().
+    """
+    return keyset_sql(sort_key), decode_cursor(token, len(sort_key))
+
+
+def keyset_sql(sort_key):
+    """
+    Texto da condição keyset (sem os valores), para statements declarados previamente.
+    """
+    placeholders = ', '.join(['%s'] * len(sort_key))
+    return f"({', '.join(sort_key)}) < ({placeholders})"
+
+
+def keyset_order_by(sort_key):
+    return 'ORDER BY ' + ', '.join(f'{column} DESC' for column in sort_key)
+
+
+def paginate(rows, sort_key, limit):
+    """
+    Recebe as linhas buscadas com LIMIT limit + 1, descarta a linha extra
+    e gera o next_cursor a partir da última linha da página.
+
+    :return: (linhas da página, next_cursor ou None se for a última página).
+    """
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor([last[column.split('.')[-1]] for column in sort_key])
@@ -0,0 +1,189 @@
+# backend/app/services/passwords.py
+import argparse
+import hashlib
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+# ----------------------------------------------------------------
+# Hashing de Senhas fora do Worker Web
+# ----------------------------------------------------------------
+
+PASSWORD_HASH_ALGORITHM = 'pbkdf2:sha256'
+
+# Piso de segurança (recomendação OWASP para PBKDF2-HMAC-SHA256): nenhum valor configurado
+# reduz o custo abaixo deste.
+MIN_PBKDF2_ITERATIONS = 600_000
+
+# Custo dos novos hashes. É um valor fixo de configuração, o mesmo em todos os workers e
+# deploys: medido por processo, cada worker chegava a um número diferente e um login em
+# outro worker regravava o hash. Para escolher o valor desta máquina:
+#     python3 -m app.services.passwords --calibrate [--target-ms 250]
+PASSWORD_HASH_ITERATIONS = max(MIN_PBKDF2_ITERATIONS,
+                               int(os.environ.get('PASSWORD_HASH_ITERATIONS', MIN_PBKDF2_ITERATIONS)))
+PASSWORD_HASH_TARGET_MS = float(os.environ.get('PASSWORD_HASH_TARGET_MS', 250))
+
+# Processos dedicados ao hashing (0 = executa na própria thread, útil em desenvolvimento),
+# limite de operações em andamento e tempo máximo de espera por resultado
+HASH_WORKERS = int(os.environ.get('HASH_WORKERS', min(2, os.cpu_count() or 1)))
+HASH_QUEUE_LIMIT = int(os.environ.get('HASH_QUEUE_LIMIT', max(1, HASH_WORKERS) * 4))
+HASH_TIMEOUT = float(os.environ.get('HASH_TIMEOUT', 5))
+
+
+class HashingBusy(Exception):
+    """Fila de hashing cheia: a requisição deve ser recusada com 503."""
+
+
+def calibrate_iterations(target_ms, sample=100_000):
+    """
+    Mede o PBKDF2 nesta máquina e retorna o número de iterações que leva ~target_ms.
+    Usado só pela linha de comando, para escolher PASSWORD_HASH_ITERATIONS.
+    """
+    started = time.perf_counter()
+    hashlib.pbkdf2_hmac('sha256', b'calibration', b'calibration-salt', sample)
+    elapsed = time.perf_counter() - started
+    iterations = int(sample * (target_ms / 1000.0) / elapsed)
+    return max(MIN_PBKDF2_ITERATIONS, iterations // 10_000 * 10_000)
+
+
+def current_method():
+    """
+    Método do werkzeug usado em novos hashes (ex.: 'pbkdf2:sha256:600000').
+    """
+    return f'{PASSWORD_HASH_ALGORITHM}:{PASSWORD_HASH_ITERATIONS}'
+
+
+def needs_rehash(password_hash):
+    """
+    True se o hash usa outro algoritmo ou menos iterações que o custo atual.
+    Hashes mais fortes que o atual são mantidos.
+    """
+    method = password_hash.split('$', 1)[0]
+    algorithm, _, iterations = method.rpartition(':')
+    if algorithm != PASSWORD_HASH_ALGORITHM or not iterations.isdigit():
+        return True
+    return int(iterations) < PASSWORD_HASH_ITERATIONS
+
+
+class PasswordHasher:
+    """
+    Executa hash/verificação de senhas em um pool de processos limitado.
+
+    Quando já existem queue_limit operações em andamento, novas chamadas
+    falham imediatamente com HashingBusy em vez de enfileirar sem limite.
+    """
+
+    def __init__(self, workers, queue_limit, timeout):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(queue_limit)
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+        self._samples = deque(maxlen=2048)  # (terminou_em, duração em segundos)
+        self.completed = 0
+        self.rejected = 0
+
+    def _get_executor(self):
+        with self._lock:
+            # O pool de processos não sobrevive a um fork: recria no processo atual
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                self._pid = os.getpid()
+            return self._executor
+
+    def _reset_executor(self):
+        with self._lock:
+            self._executor = None
+
+    def _run(self, func, *args):
+        if not self._slots.acquire(blocking=False):
+            self.rejected += 1
+            raise HashingBusy('Fila de hashing de senhas cheia')
+        started = time.perf_counter()
+        try:
+            if self.workers <= 0:
+                try:
+                    return func(*args)
+                finally:
+                    self._slots.release()
+            try:
+                future = self._get_executor().submit(func, *args)
+            except Exception as e:
+                self._slots.release()
+                if isinstance(e, BrokenProcessPool):
+                    self._reset_executor()
+                raise
+            # A vaga só é liberada quando o processo termina, mesmo após um timeout
+            future.add_done_callback(lambda _: self._slots.release())
+            try:
+                return future.result(timeout=self.timeout)
+            except BrokenProcessPool:
+                self._reset_executor()
+                raise
+        finally:
+            finished = time.perf_counter()
+            self._samples.append((finished, finished - started))
+            self.completed += 1
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, current_method())
+
+    def verify(self, password_hash, password):
+        return self._run(check_password_hash, password_hash, password)
+
+    def stats(self):
+        """
+        Latência (incluindo espera na fila) e vazão das operações de hashing deste processo.
+        """
+        samples = list(self._samples)
+        durations = sorted(duration for _, duration in samples)
+        now = time.perf_counter()
+
+        def percentile(p):
+            if not durations:
+                return 0.0
+            return durations[min(len(durations) - 1, int(len(durations) * p))] * 1000
+
+        return {
+            'method': current_method(),
+            'workers': self.workers,
+            'queue_limit': self.queue_limit,
+            'completed': self.completed,
+            'rejected': self.rejected,
+            'p50_ms': percentile(0.50),
+            'p95_ms': percentile(0.95),
+            'p99_ms': percentile(0.99),
+            'per_second': sum(1 for finished, _ in samples if now - finished < 60) / 60.0,
+        }
+
+
+hasher = PasswordHasher(HASH_WORKERS, HASH_QUEUE_LIMIT, HASH_TIMEOUT)
+
+
+def main():
+    """
+    Uso (a partir de backend/):
+        python3 -m app.services.passwords --calibrate [--target-ms 250]
+    """
+    parser = argparse.ArgumentParser(description='Custo do hashing de senhas (PBKDF2).')
+    parser.add_argument('--calibrate', action='store_true', help='mede esta máquina e sugere PASSWORD_HASH_ITERATIONS')
+    parser.add_argument('--target-ms', type=float, default=PASSWORD_HASH_TARGET_MS)
+    args = parser.parse_args()
+
+    if args.calibrate:
+        # Mediana de algumas medições: uma só varia demais entre execuções
+        samples = sorted(calibrate_iterations(args.target_ms) for _ in range(5))
+        print(f'PASSWORD_HASH_ITERATIONS={samples[len(samples) // 2]}')
+    else:
+        print(f'Método atual: {current_method()}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,281 @@
+# backend/app/services/pool.py
+import os
+import re
+import threading
+import time
+from collections import deque
+
+import psycopg2
+from psycopg2 import extensions
+
+# ----------------------------------------------------------------
+# Pool de Conexões PostgreSQL (thread-safe, com health check)
+# ----------------------------------------------------------------
+
+
+class PoolTimeout(Exception):
+    """Nenhuma conexão ficou disponível dentro do tempo de espera."""
+
+
+class PooledConnection(extensions.connection):
+    """
+    Conexão psycopg2 que registra os statements já preparados (PREPARE) nesta sessão.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared_statements = set()
+
+
+def _gunicorn_threads():
+    """
+    Número de threads por worker do gunicorn (GUNICORN_THREADS ou --threads em GUNICORN_CMD_ARGS).
+    """
+    if os.environ.get('GUNICORN_THREADS'):
+        return int(os.environ['GUNICORN_THREADS'])
+    match = re.search(r'--threads[= ](\d+)', os.environ.get('GUNICORN_CMD_ARGS', ''))
+    return int(match.group(1)) if match else 1
+
+
+def gevent_active():
+    """
+    Indica se o processo roda com o monkey patch do gevent (workers gevent do gunicorn).
+    Nesse modo threading.local e os locks valem por greenlet, não por thread do sistema.
+    """
+    try:
+        from gevent import monkey
+    except ImportError:
+        return False
+    return monkey.is_module_patched('threading')
+
+
+def _gunicorn_concurrency():
+    """
+    Requisições simultâneas por worker: GUNICORN_WORKER_CONNECTIONS nos workers gevent
+    (exportado por gunicorn.conf.py), senão o número de threads.
+    """
+    if gevent_active():
+        return int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 1000))
+    return _gunicorn_threads()
+
+
+def default_pool_size():
+    """
+    Calcula (mínimo, máximo) de conexões por processo.
+
+    Cada thread (ou greenlet, nos workers gevent) precisa de no máximo uma conexão
+    por vez, mais uma de folga para tarefas em segundo plano. Se DB_MAX_CONNECTIONS
+    for definido, o limite do servidor é dividido entre os workers (WEB_CONCURRENCY);
+    com gevent ele é o que de fato limita o pool, já que worker_connections passa
+    do max_connections do PostgreSQL. DB_POOL_MAX tem a palavra final.
+    """
+    maxconn = _gunicorn_concurrency() + 1
+    budget = int(os.environ.get('DB_MAX_CONNECTIONS', 0))
+    if budget:
+        workers = int(os.environ.get('WEB_CONCURRENCY', 1))
+        maxconn = min(maxconn, max(1, budget // workers))
+    maxconn = int(os.environ.get('DB_POOL_MAX', maxconn))
+    minconn = min(int(os.environ.get('DB_POOL_MIN', 1)), maxconn)
+    return minconn, maxconn
+
+
+class ConnectionPool:
+    """
+    Pool de conexões psycopg2 seguro para uso entre threads.
+
+    - getconn() bloqueia até `timeout` segundos quando o pool está esgotado.
+    - Conexões ociosas há mais de `validate_after` segundos são testadas com
+      SELECT 1 antes de serem entregues; conexões mais velhas que `max_lifetime`
+      ou ociosas há mais de `max_idle` são recicladas.
+    - Após um fork (gunicorn --preload), o processo filho descarta as conexões
+      herdadas e recomeça com um pool vazio.
+    """
+
+    def __init__(self, dsn, minconn, maxconn, timeout=5.0, validate_after=30.0,
+                 max_idle=300.0, max_lifetime=1800.0):
+        self.dsn = dsn
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.validate_after = validate_after
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self._cond = threading.Condition()
+        self._init_state()
+        # Conexões herdadas do processo pai: mantidas vivas (sem close()) para que
+        # o coletor de lixo do filho não encerre as sessões que o pai ainda usa.
+        self._inherited = []
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._after_fork)
+        with self._cond:
+            for _ in range(minconn):
+                self._idle.append(self._new_connection())
+
+    def _init_state(self):
+        self._pid = os.getpid()
+        self._idle = deque()          # (conexão, criada_em, devolvida_em)
+        self._in_use = {}             # id(conexão) -> criada_em
+        self._opening = 0             # vagas reservadas por getconn() em andamento
+        self._waiting = 0
+        self.checkouts = 0
+        self.timeouts = 0
+        self.discarded = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+        self._rate = deque(maxlen=60)  # [segundo, checkouts] dos últimos 60 s
+
+    def _connect(self):
+        return psycopg2.connect(self.dsn, connection_factory=PooledConnection)
+
+    def _new_connection(self):
+        return (self._connect(), time.monotonic(), time.monotonic())
+
+    def _check_fork(self):
+        # Chamado com o lock adquirido; salvaguarda para forks sem register_at_fork
+        if self._pid != os.getpid():
+            self._inherited.extend(conn for conn, _, _ in self._idle)
+            self._init_state()
+
+    def _after_fork(self):
+        # O lock pode ter sido copiado adquirido por outra thread do pai: recria-o
+        self._cond = threading.Condition()
+        self._check_fork()
+
+    def _is_usable(self, conn, created_at, returned_at, now):
+        if conn.closed:
+            return False
+        if now - created_at > self.max_lifetime or now - returned_at > self.max_idle:
+            return False
+        if now - returned_at > self.validate_after:
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute('SELECT 1')
+                conn.rollback()
+            except psycopg2.Error:
+                return False
+        return True
+
+    def _discard(self, conn):
+        self.discarded += 1  # contador aproximado: pode ser chamado fora do lock
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+
+    def getconn(self, timeout=None):
+        timeout = self.timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+        while True:
+            with self._cond:
+                self._check_fork()
+                candidate = self._reserve(deadline, timeout)
+
+            # Validação e abertura de conexões acontecem fora do lock, para que um
+            # servidor lento não bloqueie as demais threads.
+            try:
+                if candidate is None:
+                    conn, created_at, _ = self._new_connection()
+                else:
+                    conn, created_at, returned_at = candidate
+                    if not self._is_usable(conn, created_at, returned_at, time.monotonic()):
+                        self._discard(conn)
+                        conn = None
+            except Exception:
+                with self._cond:
+                    self._opening -= 1
+                    self._cond.notify()
+                raise
+
+            with self._cond:
+                self._opening -= 1
+                if conn is not None:
+                    return self._checkout(conn, created_at, started)
+                self._cond.notify()
+
+    def _reserve(self, deadline, timeout):
+        """
+        Reserva uma vaga no pool: devolve uma conexão ociosa ou None (abrir uma nova).
+        Chamado com o lock adquirido.
+        """
+        while True:
+            if self._idle:
+                self._opening += 1
+                return self._idle.pop()
+            if len(self._in_use) + self._opening < self.maxconn:
+                self._opening += 1
+                return None
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self.timeouts += 1
+                raise PoolTimeout(f'Pool esgotado: {self.maxconn} conexões em uso há {timeout:.1f}s')
+            self._waiting += 1
+            try:
+                self._cond.wait(remaining)
+            finally:
+                self._waiting -= 1
+
+    def _checkout(self, conn, created_at, started):
+        # Chamado com o lock adquirido
+        self._in_use[id(conn)] = created_at
+        waited = time.monotonic() - started
+        self.checkouts += 1
+        self.wait_time_total += waited
+        self.wait_time_max = max(self.wait_time_max, waited)
+        second = int(time.time())
+        if self._rate and self._rate[-1][0] == second:
+            self._rate[-1][1] += 1
+        else:
+            self._rate.append([second, 1])
+        return conn
+
+    def putconn(self, conn, close=False):
+        if self._pid != os.getpid():
+            # Conexão obtida antes do fork: não pertence a este processo
+            return
+        if not close and not conn.closed:
+            # Desfaz transações pendentes antes de devolver a conexão (fora do lock)
+            status = conn.info.transaction_status
+            if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+                close = True
+            elif status != extensions.TRANSACTION_STATUS_IDLE:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    close = True
+        with self._cond:
+            created_at = self._in_use.pop(id(conn), None)
+            self._cond.notify()
+            if created_at is None:
+                return
+            if close or conn.closed:
+                self._discard(conn)
+                return
+            self._idle.append((conn, created_at, time.monotonic()))
+
+    def closeall(self):
+        with self._cond:
+            while self._idle:
+                self._discard(self._idle.pop()[0])
+
+    def stats(self):
+        """
+        Estatísticas instantâneas do pool deste processo.
+        """
+        with self._cond:
+            now = int(time.time())
+            recent = sum(count for second, count in self._rate if now - second < 10)
+            in_use = len(self._in_use)
+            return {
+                'pid': self._pid,
+                'max': self.maxconn,
+                'in_use': in_use,
+                'idle': len(self._idle),
+                'waiting': self._waiting,
+                'checkouts': self.checkouts,
+                'checkouts_per_second': recent / 10.0,
+                'timeouts': self.timeouts,
+                'discarded': self.discarded,
+                'wait_time_avg': self.wait_time_total / self.checkouts if self.checkouts else 0.0,
+                'wait_time_max': self.wait_time_max,
+            }
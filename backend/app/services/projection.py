@@ -0,0 +1,83 @@
+# backend/app/services/projection.py
+
+# ----------------------------------------------------------------
+# Projeção de Campos e Formato Compacto das Listagens
+# ----------------------------------------------------------------
+
+FORMAT_OBJECTS = 'objects'
+FORMAT_COMPACT = 'compact'
+
+
+class ProjectionError(ValueError):
+    """Parâmetro fields= ou format= inválido (a rota responde 400)."""
+
+
+class Projection:
+    """
+    Campos que uma listagem pode devolver e a expressão SQL de cada um.
+
+    O parâmetro fields= reduz o próprio SELECT, não apenas o JSON: textos longos
+    (descrição, requisitos...) não são lidos do banco quando não foram pedidos.
+    Os campos em `always` (chave de ordenação do cursor) são sempre lidos, mas
+    só aparecem na resposta se forem pedidos.
+    """
+
+    def __init__(self, columns, always=()):
+        self.columns = dict(columns)   # campo -> expressão SQL
+        self.names = tuple(self.columns)
+        self.always = tuple(always)
+        self._bits = {name: 1 << index for index, name in enumerate(self.names)}
+
+    def parse(self, raw):
+        """
+        Converte 'id,title,...' na tupla de campos pedidos, na ordem canônica.
+        Sem o parâmetro, retorna todos os campos.
+        """
+        if not raw:
+            return self.names
+        requested = {name.strip() for name in raw.split(',') if name.strip()}
+        unknown = requested - self._bits.keys()
+        if unknown:
+            raise ProjectionError(f"Campos inválidos: {', '.join(sorted(unknown))}")
+        if not requested:
+            return self.names
+        return tuple(name for name in self.names if name in requested)
+
+    def select_sql(self, fields):
+        """
+        Lista do SELECT com os campos pedidos mais os obrigatórios, cada um com alias.
+        """
+        selected = fields + tuple(name for name in self.always if name not in fields)
+        return ', '.join(f'{self.columns[name]} AS {name}' for name in selected)
+
+    def mask(self, fields):
+        """
+        Identificador curto da combinação de campos, usado no nome do statement.
+        """
+        return format(sum(self._bits[name] for name in fields), 'x')
+
+
+def parse_format(raw):
+    """
+    Valida o parâmetro format=: 'objects' (padrão) ou 'compact'.
+    """
+    value = (raw or FORMAT_OBJECTS).strip().lower()
+    if value not in (FORMAT_OBJECTS, FORMAT_COMPACT):
+        raise ProjectionError(f'Formato inválido: {raw}')
+    return value
+
+
+def serialize(key, rows, fields, output_format, **extra):
+    """
+    Monta o corpo da resposta da listagem.
+
+    - objects: {key: [{campo: valor, ...}, ...]}
+    - compact: {'columns': [campos], key: [[valor, ...], ...]}, com os nomes
+      dos campos enviados uma única vez.
+    """
+    if output_format == FORMAT_COMPACT:
+        body = {'columns': list(fields), key: [[row[name] for name in fields] for row in rows]}
+    else:
+        body = {key: [{name: row[name] for name in fields} for row in rows]}
+    body.update(extra)
+    return body
@@ -0,0 +1,153 @@
+# backend/app/services/query_log.py
+import functools
+import json
+import logging
+import os
+import re
+import time
+
+from flask import current_app, g, has_app_context, has_request_context, request
+
+from app.services.metrics import REQUEST_STARTED_KEY
+
+# ----------------------------------------------------------------
+# Contabilidade de Queries por Requisição e Log de Queries Lentas
+# ----------------------------------------------------------------
+
+# Queries acima deste tempo (ms) vão para o log estruturado 'claunnetworking.slow_query'
+SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', 200))
+
+# Anexa o plano (EXPLAIN / EXPLAIN QUERY PLAN) das leituras lentas ao log
+SLOW_QUERY_EXPLAIN = os.environ.get('SLOW_QUERY_EXPLAIN', '0') == '1'
+
+# Estouro de @query_budget: exceção em modo de teste (app.testing) ou com QUERY_BUDGET_STRICT=1;
+# nos demais casos apenas um aviso no log
+QUERY_BUDGET_STRICT = os.environ.get('QUERY_BUDGET_STRICT', '0') == '1'
+
+# Parâmetros listados individualmente em bind_shape (o restante é resumido)
+_BIND_SHAPE_LIMIT = 12
+
+slow_query_logger = logging.getLogger('claunnetworking.slow_query')
+budget_logger = logging.getLogger('claunnetworking.query_budget')
+
+_WHITESPACE_RE = re.compile(r'\s+')
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'(?<![\w$])-?\d+(?:\.\d+)?\b')
+_PLACEHOLDER_LIST_RE = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_READ_RE = re.compile(r'^\s*(?:SELECT|WITH)\b', re.IGNORECASE)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A requisição executou mais queries do que o declarado em @query_budget."""
+
+
+def normalize_sql(sql):
+    """
+    Forma canônica do comando para agrupar ocorrências: literais e placeholders
+    viram '?', listas IN (?, ?, ...) viram (...) e os espaços são compactados.
+    """
+    sql = _STRING_RE.sub('?', sql.replace('%s', '?'))
+    sql = _NUMBER_RE.sub('?', sql)
+    sql = _PLACEHOLDER_LIST_RE.sub('(...)', sql)
+    return _WHITESPACE_RE.sub(' ', sql).strip().rstrip(';')
+
+
+def bind_shape(params):
+    """
+    Tipos dos parâmetros, sem os valores (ex.: ['int', 'str', 'NoneType']).
+    """
+    params = list(params or ())
+    shape = [type(value).__name__ for value in params[:_BIND_SHAPE_LIMIT]]
+    if len(params) > _BIND_SHAPE_LIMIT:
+        shape.append(f'... +{len(params) - _BIND_SHAPE_LIMIT}')
+    return shape
+
+
+def _explain(conn, sql, params, postgres):
+    """
+    Plano de uma leitura na mesma conexão. No PostgreSQL roda dentro de um
+    SAVEPOINT, para que uma falha do EXPLAIN não aborte a transação em andamento.
+    """
+    if not _READ_RE.match(sql):
+        return None
+    try:
+        cursor = conn.cursor()
+        if postgres:
+            cursor.execute('SAVEPOINT slow_query_explain')
+            try:
+                cursor.execute(f'EXPLAIN {sql}', params)
+                plan = [row[0] for row in cursor.fetchall()]
+            finally:
+                cursor.execute('ROLLBACK TO SAVEPOINT slow_query_explain')
+            return plan
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql.replace('%s', '?')}", params)
+        return [row[-1] for row in cursor.fetchall()]
+    except Exception as e:
+        return [f'EXPLAIN falhou: {e}']
+
+
+def record(label, sql, params, seconds, conn=None, postgres=False):
+    """
+    Soma a query aos totais da requisição e, se passar de SLOW_QUERY_MS, grava no log lento.
+    Chamado por execute_sql() após cada ida ao banco.
+    """
+    if has_app_context():
+        g.query_count = g.get('query_count', 0) + 1
+        g.query_seconds = g.get('query_seconds', 0.0) + seconds
+
+    if seconds * 1000 < SLOW_QUERY_MS:
+        return
+    entry = {
+        'event': 'slow_query',
+        'statement': label,
+        'duration_ms': round(seconds * 1000, 3),
+        'sql': normalize_sql(sql),
+        'bind_shape': bind_shape(params),
+    }
+    if has_request_context():
+        entry['endpoint'] = request.endpoint
+    if SLOW_QUERY_EXPLAIN and conn is not None:
+        entry['plan'] = _explain(conn, sql, params, postgres)
+    slow_query_logger.warning(json.dumps(entry, ensure_ascii=False, default=str))
+
+
+def query_budget(limit):
+    """
+    Declara o número máximo de queries da rota. Um N+1 que estoure o limite
+    falha nos testes (QueryBudgetExceeded) e gera um aviso em produção.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            g.query_budget = limit
+            return view(*args, **kwargs)
+        # Exposto para os testes conferirem que toda rota com orçamento é exercitada
+        wrapper.query_budget = limit
+        return wrapper
+    return decorator
+
+
+def _check_request(response):
+    count = g.get('query_count', 0)
+    seconds = g.get('query_seconds', 0.0)
+    timings = [f'db;dur={seconds * 1000:.2f};desc="{count} queries"']
+    started = request.environ.get(REQUEST_STARTED_KEY)
+    if started is not None:
+        timings.append(f'app;dur={(time.perf_counter() - started) * 1000:.2f}')
+    response.headers['Server-Timing'] = ', '.join(timings)
+
+    budget = g.get('query_budget')
+    if budget is not None and count > budget:
+        message = f'{request.endpoint} executou {count} queries (orçamento: {budget})'
+        if current_app.testing or QUERY_BUDGET_STRICT:
+            raise QueryBudgetExceeded(message)
+        budget_logger.warning(json.dumps({'event': 'query_budget_exceeded', 'endpoint': request.endpoint,
+                                          'queries': count, 'budget': budget}, ensure_ascii=False))
+    return response
+
+
+def init_app(app):
+    """
+    Adiciona o cabeçalho Server-Timing (queries e tempo de banco) e verifica os orçamentos de @query_budget.
+    """
+    app.after_request(_check_request)
@@ -0,0 +1,430 @@
+# backend/app/services/recommendations.py
+import argparse
+import os
+import re
+import time
+import unicodedata
+import zlib
+
+import numpy as np
+
+from app.services.database import execute_sql, insert_many, transaction
+
+# ----------------------------------------------------------------
+# Recomendações Vaga x Candidato (vetores de atributos + NumPy)
+# ----------------------------------------------------------------
+
+# Tamanho das listas pré-calculadas e linhas por bloco de multiplicação de matrizes.
+# Cada bloco ocupa RECOMMENDATION_BATCH_SIZE x (nº de itens) floats de 4 bytes.
+RECOMMENDATION_TOP_K = int(os.environ.get('RECOMMENDATION_TOP_K', 50))
+RECOMMENDATION_BATCH_SIZE = int(os.environ.get('RECOMMENDATION_BATCH_SIZE', 128))
+
+# Acima desta fração de entidades alteradas, refresh() recalcula tudo de uma vez
+RECOMMENDATION_REBUILD_RATIO = float(os.environ.get('RECOMMENDATION_REBUILD_RATIO', 0.2))
+
+# Dimensões dos blocos com hashing de termos (competências, setor/área, localização)
+SKILL_DIMS = int(os.environ.get('RECOMMENDATION_SKILL_DIMS', 256))
+SECTOR_DIMS = 16
+LOCATION_DIMS = 32
+
+# Escalas ordinais: valores vizinhos também pontuam (núcleo [0.5, 1, 0.5])
+LEVELS = ('estagiario', 'trainee', 'junior', 'pleno', 'senior', 'especialista', 'coordenador', 'gerente', 'diretor')
+MODALITIES = ('presencial', 'hibrido', 'remoto')
+
+# Peso de cada bloco na pontuação final (somam 1 com o peso do salário)
+FEATURE_WEIGHTS = {
+    'skills': 0.40,
+    'sector': 0.15,
+    'level': 0.15,
+    'modality': 0.10,
+    'location': 0.10,
+}
+SALARY_WEIGHT = 0.10
+
+_STOPWORDS = {
+    'a', 'o', 'as', 'os', 'e', 'ou', 'de', 'da', 'do', 'das', 'dos', 'em', 'na', 'no', 'com', 'para',
+    'por', 'um', 'uma', 'experiencia', 'conhecimento', 'conhecimentos', 'desejavel', 'vaga',
+}
+_TAG_SPLIT_RE = re.compile(r'[,;\n/|]+')
+_WORD_RE = re.compile(r'[a-z0-9+#.]{2,}')
+_NUMBER_RE = re.compile(r'\d+(?:[.,]\d{3})*(?:,\d+)?')
+
+_BLOCKS = (
+    ('skills', SKILL_DIMS),
+    ('sector', SECTOR_DIMS),
+    ('level', len(LEVELS)),
+    ('modality', len(MODALITIES)),
+    ('location', LOCATION_DIMS),
+)
+_OFFSETS = {}
+_offset = 0
+for _name, _dims in _BLOCKS:
+    _OFFSETS[_name] = (_offset, _offset + _dims)
+    _offset += _dims
+FEATURE_DIMS = _offset
+
+JOB_FEATURES_SQL = '''
+    SELECT id, title, requirements, area, level, work_modality, location, salary_range
+    FROM jobs WHERE is_active = TRUE
+'''
+CANDIDATE_FEATURES_SQL = '''
+    SELECT p.user_id AS id, p.professional_title, p.skills, p.sector, p.level, p.work_modality,
+           p.address_city, p.address_state, p.salary_expectation, u.profile_public
+    FROM candidate_profiles p JOIN users u ON u.id = p.user_id
+    WHERE u.user_type = 'candidate' AND u.is_active = TRUE
+'''
+
+# Tabelas de listas: (tabela, coluna do dono da lista, coluna do item recomendado)
+JOB_MATCHES = ('job_matches', 'job_id', 'candidate_id')
+CANDIDATE_RECOMMENDATIONS = ('candidate_recommendations', 'candidate_id', 'job_id')
+
+# ----------------------------------------------------------------
+# Codificação em vetores
+# ----------------------------------------------------------------
+
+def normalize_text(value):
+    """
+    Minúsculas e sem acentos ('Gestão' -> 'gestao'), para que o hashing seja estável.
+    """
+    if not value:
+        return ''
+    decomposed = unicodedata.normalize('NFKD', str(value))
+    return ''.join(char for char in decomposed if not unicodedata.combining(char)).lower().strip()
+
+def _bucket(token, dims):
+    # crc32 e não hash(): o hash de str muda a cada processo
+    return zlib.crc32(token.encode('utf-8')) % dims
+
+def _add_terms(vector, block, terms):
+    start, end = _OFFSETS[block]
+    for term, weight in terms:
+        vector[start + _bucket(term, end - start)] += weight
+
+def _skill_terms(*texts, weight=1.0):
+    """
+    Cada tag inteira (separada por vírgula, ';'...) e cada palavra relevante dela.
+    """
+    terms = []
+    for text in texts:
+        for tag in _TAG_SPLIT_RE.split(normalize_text(text)):
+            tag = tag.strip()
+            if not tag:
+                continue
+            terms.append((tag, weight))
+            terms += [(word, weight * 0.5) for word in _WORD_RE.findall(tag) if word not in _STOPWORDS and word != tag]
+    return terms
+
+def _set_ordinal(vector, block, scale, value):
+    value = normalize_text(value)
+    if value not in scale:
+        return
+    start, _ = _OFFSETS[block]
+    index = scale.index(value)
+    for neighbor, weight in ((index - 1, 0.5), (index, 1.0), (index + 1, 0.5)):
+        if 0 <= neighbor < len(scale):
+            vector[start + neighbor] = weight
+
+def _finish(vector):
+    """
+    Normaliza cada bloco (norma 1) e aplica a raiz do peso: o produto escalar de dois
+    vetores é então a soma ponderada das similaridades de cosseno de cada bloco.
+    """
+    for name, (start, end) in _OFFSETS.items():
+        block = vector[start:end]
+        norm = np.linalg.norm(block)
+        if norm > 0:
+            vector[start:end] = block / norm * np.sqrt(FEATURE_WEIGHTS[name])
+    return vector
+
+def parse_salary(text):
+    """
+    Maior valor numérico de uma faixa salarial em texto ('R$ 4.000 - 6.500' -> 6500.0).
+    """
+    values = []
+    for number in _NUMBER_RE.findall(text or ''):
+        try:
+            values.append(float(number.replace('.', '').replace(',', '.')))
+        except ValueError:
+            continue
+    return max(values) if values else np.nan
+
+def encode_job(job):
+    vector = np.zeros(FEATURE_DIMS, dtype=np.float32)
+    _add_terms(vector, 'skills', _skill_terms(job['requirements']) + _skill_terms(job['title'], weight=0.5))
+    if job['area']:
+        _add_terms(vector, 'sector', [(normalize_text(job['area']), 1.0)])
+    _set_ordinal(vector, 'level', LEVELS, job['level'])
+    _set_ordinal(vector, 'modality', MODALITIES, job['work_modality'])
+    # Vagas remotas não dependem da localização do candidato
+    if normalize_text(job['work_modality']) != 'remoto':
+        parts = re.split(r'[,\-/]', normalize_text(job['location']))
+        _add_terms(vector, 'location', [(part.strip(), 1.0) for part in parts if part.strip()])
+    return _finish(vector)
+
+def encode_candidate(candidate):
+    vector = np.zeros(FEATURE_DIMS, dtype=np.float32)
+    _add_terms(vector, 'skills',
+               _skill_terms(candidate['skills']) + _skill_terms(candidate['professional_title'], weight=0.5))
+    if candidate['sector']:
+        _add_terms(vector, 'sector', [(normalize_text(candidate['sector']), 1.0)])
+    _set_ordinal(vector, 'level', LEVELS, candidate['level'])
+    _set_ordinal(vector, 'modality', MODALITIES, candidate['work_modality'])
+    places = (candidate['address_city'], candidate['address_state'])
+    _add_terms(vector, 'location', [(normalize_text(value), 1.0) for value in places if value])
+    return _finish(vector)
+
+
+class FeatureMatrix:
+    """
+    Ids, vetores (uma linha por entidade) e salário de um lado da recomendação.
+    """
+
+    def __init__(self, ids, vectors, salaries, visible=None):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.vectors = vectors
+        self.salaries = np.asarray(salaries, dtype=np.float32)
+        # Candidatos com perfil privado não aparecem nas listas das empresas
+        self.visible = np.ones(len(self.ids), dtype=bool) if visible is None else np.asarray(visible, dtype=bool)
+        self.positions = {int(entity_id): index for index, entity_id in enumerate(self.ids)}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def take(self, positions):
+        positions = np.asarray(positions, dtype=np.int64)
+        return FeatureMatrix(self.ids[positions], self.vectors[positions], self.salaries[positions], self.visible[positions])
+
+    @classmethod
+    def build(cls, rows, encode, salary, visible=None):
+        vectors = np.zeros((len(rows), FEATURE_DIMS), dtype=np.float32)
+        for index, row in enumerate(rows):
+            vectors[index] = encode(row)
+        return cls([row['id'] for row in rows], vectors, [salary(row) for row in rows],
+                   [visible(row) for row in rows] if visible else None)
+
+
+def load_jobs():
+    rows = execute_sql(JOB_FEATURES_SQL, fetch=True) or []
+    return FeatureMatrix.build(rows, encode_job, lambda row: parse_salary(row['salary_range']))
+
+def load_candidates():
+    rows = execute_sql(CANDIDATE_FEATURES_SQL, fetch=True) or []
+    return FeatureMatrix.build(
+        rows, encode_candidate,
+        lambda row: float(row['salary_expectation']) if row['salary_expectation'] else np.nan,
+        visible=lambda row: bool(row['profile_public']),
+    )
+
+# ----------------------------------------------------------------
+# Pontuação em lote
+# ----------------------------------------------------------------
+
+def pair_scores(jobs, candidates):
+    """
+    Matriz (vagas x candidatos) de pontuações entre 0 e 1.
+
+    Produto de matrizes dos vetores mais o encaixe salarial: 1 quando a pretensão
+    cabe no teto da vaga, proporcional quando passa, 0.5 quando falta um dos valores.
+    """
+    scores = jobs.vectors @ candidates.vectors.T
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fit = np.minimum(1.0, jobs.salaries[:, None] / candidates.salaries[None, :])
+    fit = np.where(np.isnan(fit), 0.5, fit)
+    scores += SALARY_WEIGHT * fit.astype(np.float32)
+    return scores
+
+def top_k(owners, items, k, owner_is_job, batch_size=None):
+    """
+    Para cada linha de `owners`, os k itens de maior pontuação, em blocos de linhas.
+
+    :return: (posições em items [n, k'], pontuações [n, k']), ordenadas da maior para a menor.
+    """
+    batch_size = batch_size or RECOMMENDATION_BATCH_SIZE
+    k = min(k, len(items))
+    positions = np.zeros((len(owners), k), dtype=np.int64)
+    values = np.zeros((len(owners), k), dtype=np.float32)
+    if k == 0:
+        return positions, values
+    hidden = ~items.visible
+    for start in range(0, len(owners), batch_size):
+        block = owners.take(np.arange(start, min(start + batch_size, len(owners))))
+        scores = pair_scores(block, items) if owner_is_job else pair_scores(items, block).T
+        if hidden.any():
+            scores[:, hidden] = -np.inf
+        # argpartition é O(n) por linha; só os k escolhidos são ordenados
+        best = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        best_scores = np.take_along_axis(scores, best, axis=1)
+        order = np.argsort(-best_scores, axis=1)
+        positions[start:start + len(block)] = np.take_along_axis(best, order, axis=1)
+        values[start:start + len(block)] = np.take_along_axis(best_scores, order, axis=1)
+    return positions, values
+
+def _list_rows(owners, items, positions, values):
+    rows = []
+    for owner_index, owner_id in enumerate(owners.ids):
+        for position, score in zip(positions[owner_index], values[owner_index]):
+            if np.isfinite(score):
+                rows.append((int(owner_id), int(items.ids[position]), round(float(score), 6)))
+    return rows
+
+# ----------------------------------------------------------------
+# Listas pré-calculadas
+# ----------------------------------------------------------------
+
+def _replace_lists(target, owners, items, owner_is_job, owner_ids=None):
+    """
+    Recalcula as listas dos donos informados (todos, se owner_ids for None) e as grava.
+    Donos que não existem mais em `owners` têm a lista apagada.
+    """
+    table, owner_column, item_column = target
+    if owner_ids is None:
+        selected = owners
+        execute_sql(f'DELETE FROM {table}', commit=True)
+    else:
+        owner_ids = sorted(set(owner_ids))
+        selected = owners.take([owners.positions[owner_id] for owner_id in owner_ids if owner_id in owners.positions])
+        for start in range(0, len(owner_ids), 500):
+            chunk = owner_ids[start:start + 500]
+            placeholders = ', '.join(['%s'] * len(chunk))
+            execute_sql(f'DELETE FROM {table} WHERE {owner_column} IN ({placeholders})', chunk, commit=True)
+    positions, values = top_k(selected, items, RECOMMENDATION_TOP_K, owner_is_job)
+    return insert_many(table, (owner_column, item_column, 'score'), _list_rows(selected, items, positions, values))
+
+def _affected_owners(target, owners, items, changed_items, owner_is_job):
+    """
+    Donos cuja lista pode mudar porque os itens informados mudaram ou foram removidos:
+    os que já listavam algum deles e os em que um item alterado supera a menor pontuação da lista.
+    """
+    table, owner_column, item_column = target
+    changed_items = sorted(changed_items)
+    affected = set()
+    for start in range(0, len(changed_items), 500):
+        chunk = changed_items[start:start + 500]
+        placeholders = ', '.join(['%s'] * len(chunk))
+        rows = execute_sql(f'SELECT DISTINCT {owner_column} AS owner_id FROM {table} WHERE {item_column} IN ({placeholders})',
+                           chunk, fetch=True) or []
+        affected.update(row['owner_id'] for row in rows)
+
+    present = [items.positions[item_id] for item_id in changed_items if item_id in items.positions]
+    if present and len(owners):
+        changed = items.take(present)
+        floors = {row['owner_id']: (row['floor'], row['total']) for row in execute_sql(
+            f'SELECT {owner_column} AS owner_id, MIN(score) AS floor, COUNT(*) AS total FROM {table} GROUP BY {owner_column}',
+            fetch=True) or []}
+        floor = np.array([
+            floors[owner_id][0] if owner_id in floors and floors[owner_id][1] >= RECOMMENDATION_TOP_K else -np.inf
+            for owner_id in owners.ids.tolist()
+        ], dtype=np.float32)
+        for start in range(0, len(owners), RECOMMENDATION_BATCH_SIZE):
+            block = owners.take(np.arange(start, min(start + RECOMMENDATION_BATCH_SIZE, len(owners))))
+            scores = pair_scores(block, changed) if owner_is_job else pair_scores(changed, block).T
+            if not changed.visible.all():
+                scores[:, ~changed.visible] = -np.inf
+            better = scores.max(axis=1) > floor[start:start + len(block)]
+            affected.update(block.ids[better].tolist())
+    return affected
+
+def rebuild(jobs=None, candidates=None):
+    """
+    Recalcula todas as listas (vagas -> candidatos e candidatos -> vagas).
+    """
+    jobs = jobs if jobs is not None else load_jobs()
+    candidates = candidates if candidates is not None else load_candidates()
+    with transaction():
+        execute_sql('DELETE FROM recommendation_queue', commit=True)
+        matches = _replace_lists(JOB_MATCHES, jobs, candidates, owner_is_job=True)
+        recommendations = _replace_lists(CANDIDATE_RECOMMENDATIONS, candidates, jobs, owner_is_job=False)
+    return {'jobs': len(jobs), 'candidates': len(candidates), 'job_matches': matches,
+            'candidate_recommendations': recommendations}
+
+def refresh():
+    """
+    Processa a fila recommendation_queue (preenchida por triggers em jobs, candidate_profiles
+    e users) e recalcula apenas as listas que podem ter mudado.
+    """
+    claimed = execute_sql('DELETE FROM recommendation_queue RETURNING kind, entity_id', fetch=True, commit=True) or []
+    if not claimed:
+        return {'jobs': 0, 'candidates': 0}
+    changed_jobs = {row['entity_id'] for row in claimed if row['kind'] == 'job'}
+    changed_candidates = {row['entity_id'] for row in claimed if row['kind'] == 'candidate'}
+    try:
+        jobs, candidates = load_jobs(), load_candidates()
+        total = max(1, len(jobs) + len(candidates))
+        if (len(changed_jobs) + len(changed_candidates)) / total > RECOMMENDATION_REBUILD_RATIO:
+            rebuild(jobs, candidates)
+            return {'jobs': len(changed_jobs), 'candidates': len(changed_candidates), 'rebuilt': True}
+
+        with transaction():
+            job_owners = changed_jobs | _affected_owners(JOB_MATCHES, jobs, candidates, changed_candidates, owner_is_job=True)
+            candidate_owners = changed_candidates | _affected_owners(
+                CANDIDATE_RECOMMENDATIONS, candidates, jobs, changed_jobs, owner_is_job=False)
+            _replace_lists(JOB_MATCHES, jobs, candidates, True, job_owners)
+            _replace_lists(CANDIDATE_RECOMMENDATIONS, candidates, jobs, False, candidate_owners)
+    except Exception:
+        # Devolve os itens à fila para a próxima execução
+        insert_queue = 'INSERT INTO recommendation_queue (kind, entity_id) VALUES (%s, %s) ON CONFLICT DO NOTHING'
+        for row in claimed:
+            execute_sql(insert_queue, (row['kind'], row['entity_id']), commit=True)
+        raise
+    return {'jobs': len(changed_jobs), 'candidates': len(changed_candidates),
+            'job_lists': len(job_owners), 'candidate_lists': len(candidate_owners)}
+
+# ----------------------------------------------------------------
+# Consulta (listas pré-calculadas)
+# ----------------------------------------------------------------
+
+# As matrizes só são montadas pelo cron (refresh/rebuild): nos workers web, em especial
+# os gevent, codificar a tabela inteira pararia todas as conexões do worker. Uma vaga ou
+# perfil alterado continua com a lista anterior (ou nenhuma, se novo) até o próximo refresh().
+
+def _stored(target, owner_id, limit):
+    table, owner_column, item_column = target
+    return execute_sql(f'SELECT {item_column} AS item_id, score FROM {table} WHERE {owner_column} = %s '
+                       f'ORDER BY score DESC LIMIT %s', (owner_id, limit), fetch=True) or []
+
+def matches_for_job(job, limit):
+    """
+    Melhores candidatos para a vaga, da lista pré-calculada pelo cron.
+
+    :param job: Linha da vaga com as colunas de JOB_FEATURES_SQL.
+    :return: Lista de {'item_id', 'score'} (item = candidato).
+    """
+    return _stored(JOB_MATCHES, job['id'], limit)
+
+def recommendations_for_candidate(candidate, limit):
+    """
+    Vagas recomendadas para o candidato, da lista pré-calculada pelo cron.
+
+    :param candidate: Linha do perfil com as colunas de CANDIDATE_FEATURES_SQL.
+    :return: Lista de {'item_id', 'score'} (item = vaga).
+    """
+    return _stored(CANDIDATE_RECOMMENDATIONS, candidate['id'], limit)
+
+def score_job(job, candidates, limit):
+    """
+    Candidatos para uma vaga ainda sem lista, contra a matriz de load_candidates().
+    Para processos em segundo plano (worker da outbox), não para requisições web.
+
+    :return: Lista de {'item_id', 'score'} (item = candidato).
+    """
+    owner = FeatureMatrix([job['id']], encode_job(job)[None, :], [parse_salary(job['salary_range'])])
+    positions, values = top_k(owner, candidates, limit, owner_is_job=True)
+    return [{'item_id': int(candidates.ids[position]), 'score': round(float(score), 6)}
+            for position, score in zip(positions[0], values[0]) if np.isfinite(score)]
+
+def main():
+    """
+    Uso (a partir de backend/, por exemplo em um cron job):
+        python3 -m app.services.recommendations           # processa a fila
+        python3 -m app.services.recommendations --rebuild # recalcula tudo
+    """
+    parser = argparse.ArgumentParser(description='Atualiza as listas de recomendações.')
+    parser.add_argument('--rebuild', action='store_true', help='recalcula todas as listas')
+    args = parser.parse_args()
+    started = time.perf_counter()
+    result = rebuild() if args.rebuild else refresh()
+    print(f'Recomendações atualizadas em {time.perf_counter() - started:.2f}s: {result}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+# backend/app/services/replicas.py
+import itertools
+import os
+import threading
+import time
+
+from flask import g, has_request_context, request
+
+# ----------------------------------------------------------------
+# Réplicas de Leitura e Read-Your-Writes
+# ----------------------------------------------------------------
+
+# Réplicas do PostgreSQL (DSNs separados por vírgula); sem elas, tudo vai para DATABASE_URL
+DATABASE_REPLICA_URLS = [url.strip() for url in os.environ.get('DATABASE_REPLICA_URLS', '').split(',') if url.strip()]
+
+# Sem DATABASE_URL: arquivos SQLite que fazem o papel de réplica (testes locais)
+DATABASE_REPLICA_PATHS = [path.strip() for path in os.environ.get('DATABASE_REPLICA_PATHS', '').split(',')
+                          if path.strip()]
+
+# Depois de escrever, o cliente lê do primário por este tempo (s), cobrindo o atraso da replicação
+READ_YOUR_WRITES_SECONDS = float(os.environ.get('READ_YOUR_WRITES_SECONDS', 5))
+
+# Réplica que falhou ao entregar conexão fica fora do rodízio por este tempo (s)
+REPLICA_RETRY_AFTER = float(os.environ.get('REPLICA_RETRY_AFTER', 30))
+
+# Cookie de sessão (sem expiração no navegador) com o instante até o qual as leituras vão ao primário
+WATERMARK_COOKIE = 'db_primary_until'
+
+
+class ReplicaSet:
+    """
+    Rodízio (round-robin) entre as réplicas de leitura, pulando as que falharam recentemente.
+
+    `connect(target)` cria a fonte de conexões de uma réplica (um pool, no
+    PostgreSQL), chamada na primeira vez que ela é usada; `getconn(source)` e
+    `putconn(source, conn)` emprestam e devolvem conexões dessa fonte.
+    """
+
+    def __init__(self, targets, connect, getconn, putconn, retry_after=REPLICA_RETRY_AFTER):
+        self.targets = list(targets)
+        self._connect = connect
+        self._getconn = getconn
+        self._putconn = putconn
+        self.retry_after = retry_after
+        self._lock = threading.Lock()
+        self._sources = [None] * len(self.targets)
+        self._down_until = [0.0] * len(self.targets)
+        self._next = itertools.count()
+        self.reads = [0] * len(self.targets)
+        self.failures = [0] * len(self.targets)
+
+    def __bool__(self):
+        return bool(self.targets)
+
+    def _source(self, index):
+        with self._lock:
+            source = self._sources[index]
+            if source is None:
+                source = self._sources[index] = self._connect(self.targets[index])
+            return source
+
+    def acquire(self):
+        """
+        Conexão da próxima réplica disponível: (índice, conexão), ou (None, None)
+        se todas estiverem fora do ar (a leitura então vai para o primário).
+        """
+        start = next(self._next)
+        now = time.monotonic()
+        for offset in range(len(self.targets)):
+            index = (start + offset) % len(self.targets)
+            if self._down_until[index] > now:
+                continue
+            try:
+                conn = self._getconn(self._source(index))
+            except Exception as e:
+                print(f"Réplica {index} indisponível, lendo do primário: {e}")
+                self.failures[index] += 1
+                self._down_until[index] = now + self.retry_after
+                continue
+            self.reads[index] += 1
+            return index, conn
+        return None, None
+
+    def release(self, index, conn):
+        self._putconn(self._sources[index], conn)
+
+    def stats(self):
+        now = time.monotonic()
+        return [{'replica': index, 'reads': self.reads[index], 'failures': self.failures[index],
+                 'available': self._down_until[index] <= now} for index in range(len(self.targets))]
+
+
+# ----------------------------------------------------------------
+# Read-your-writes
+# ----------------------------------------------------------------
+
+def note_write():
+    """
+    Registra uma escrita da requisição atual: as próximas leituras dela e do
+    mesmo cliente (pelo cookie de watermark) vão para o primário.
+    """
+    if has_request_context():
+        g.db_wrote = True
+
+
+def pinned_to_primary():
+    """
+    True se a requisição deve ler do primário: já escreveu algo ou o cliente
+    escreveu há menos de READ_YOUR_WRITES_SECONDS.
+    """
+    if g.get('db_wrote'):
+        return True
+    try:
+        return float(request.cookies.get(WATERMARK_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def _set_watermark(response):
+    if g.get('db_wrote'):
+        until = time.time() + READ_YOUR_WRITES_SECONDS
+        response.set_cookie(WATERMARK_COOKIE, f'{until:.3f}', max_age=int(READ_YOUR_WRITES_SECONDS) + 1,
+                            secure=request.is_secure, httponly=True, samesite='Lax')
+    return response
+
+
+def init_app(app):
+    """
+    Envia o cookie de watermark nas respostas de requisições que escreveram no banco.
+    """
+    app.after_request(_set_watermark)
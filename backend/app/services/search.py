@@ -0,0 +1,65 @@
+# backend/app/services/search.py
+import re
+
+from app.services.database import DATABASE_URL, SEARCH_COLUMNS
+
+# ----------------------------------------------------------------
+# Busca Textual com Ranqueamento (vagas e cursos)
+# ----------------------------------------------------------------
+
+# Multiplicador de relevância aplicado a vagas/cursos em destaque
+FEATURED_BOOST = 1.5
+
+# Pesos do bm25() do FTS5, na mesma ordem das colunas em SEARCH_COLUMNS
+SQLITE_COLUMN_WEIGHTS = (10.0, 4.0, 1.0)
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+class SearchError(ValueError):
+    """Termo de busca vazio ou sem palavras pesquisáveis."""
+
+
+def build_fts5_query(q):
+    """
+    Converte o texto livre do usuário em uma consulta FTS5 segura.
+
+    Cada palavra vira um termo entre aspas (evitando a sintaxe de operadores do FTS5)
+    e a última recebe busca por prefixo, para que "desenvolv" encontre "desenvolvedor".
+    """
+    terms = _TOKEN_RE.findall(q.lower())
+    if not terms:
+        raise SearchError('Termo de busca inválido')
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += '*'
+    return ' '.join(quoted)
+
+
+def search_source(table, alias, q):
+    """
+    Monta os fragmentos SQL da busca textual sobre 'table'.
+
+    :param table: Tabela pesquisada ('jobs' ou 'courses').
+    :param alias: Alias da tabela usado no restante da consulta.
+    :param q: Texto digitado pelo usuário.
+    :return: (from_sql, relevance_sql, where_sql, params). Os parâmetros devem
+             vir antes de quaisquer outros filtros da consulta.
+    """
+    if table not in SEARCH_COLUMNS:
+        raise ValueError(f'Tabela sem índice de busca: {table}')
+
+    boost = f'(CASE WHEN {alias}.is_featured THEN {FEATURED_BOOST} ELSE 1.0 END)'
+
+    if DATABASE_URL:
+        # PostgreSQL: coluna tsvector gerada + índice GIN (ver init_search_indexes)
+        from_sql = f"{table} {alias} CROSS JOIN websearch_to_tsquery('portuguese', %s) AS search_query"
+        relevance_sql = f'ts_rank_cd({alias}.search_vector, search_query) * {boost}'
+        where_sql = f'{alias}.search_vector @@ search_query'
+        return from_sql, relevance_sql, where_sql, [q]
+
+    # SQLite: tabela FTS5 de conteúdo externo; bm25() é negativo (menor = melhor)
+    weights = ', '.join(str(weight) for weight in SQLITE_COLUMN_WEIGHTS)
+    from_sql = f'{table}_fts JOIN {table} {alias} ON {alias}.id = {table}_fts.rowid'
+    relevance_sql = f'-bm25({table}_fts, {weights}) * {boost}'
+    where_sql = f'{table}_fts MATCH %s'
+    return from_sql, relevance_sql, where_sql, [build_fts5_query(q)]
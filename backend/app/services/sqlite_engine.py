@@ -0,0 +1,256 @@
+# backend/app/services/sqlite_engine.py
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+
+from app.services.pool import gevent_active
+
+# ----------------------------------------------------------------
+# Motor SQLite (sem DATABASE_URL): conexão persistente por thread, WAL e fila de escrita
+# ----------------------------------------------------------------
+
+# Desative (0) para voltar a abrir e fechar uma conexão a cada uso
+SQLITE_ENGINE = os.environ.get('SQLITE_ENGINE', '1') != '0'
+
+# WAL: leitores não bloqueiam o escritor (e vice-versa); NORMAL só sincroniza nos checkpoints
+SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')
+SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+
+# Páginas mapeadas em memória (bytes) e cache de páginas por conexão (KiB)
+SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+SQLITE_CACHE_SIZE_KB = int(os.environ.get('SQLITE_CACHE_SIZE_KB', 16 * 1024))
+
+# Espera máxima (ms) pelo lock de escrita, na fila deste processo e no arquivo (outros workers)
+SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+
+# Workers gevent: conexões ociosas mantidas por arquivo entre as requisições (greenlets)
+SQLITE_POOL_IDLE = int(os.environ.get('SQLITE_POOL_IDLE', 32))
+
+
+class WriterQueue:
+    """
+    Fila FIFO de escritores de um banco, dentro do processo.
+
+    O SQLite aceita um único escritor por vez. Em vez de várias threads
+    disputarem o lock do arquivo (com esperas crescentes e 'database is
+    locked' no fim), cada conexão entra na fila antes da primeira escrita e
+    sai no commit/rollback. Entre processos, o BEGIN IMMEDIATE e o
+    busy_timeout fazem o mesmo papel.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._owner = None
+        self._waiting = deque()
+        self.acquired = 0
+        self.waits = 0
+        self.wait_time_max = 0.0
+
+    def acquire(self, owner, timeout):
+        with self._cond:
+            if self._owner is owner:
+                return
+            started = time.monotonic()
+            deadline = started + timeout
+            ticket = object()
+            self._waiting.append(ticket)
+            try:
+                while self._owner is not None or self._waiting[0] is not ticket:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise sqlite3.OperationalError('database is locked (fila de escrita cheia)')
+                    self._cond.wait(remaining)
+            except BaseException:
+                self._waiting.remove(ticket)
+                self._cond.notify_all()
+                raise
+            self._waiting.popleft()
+            self._owner = owner
+            waited = time.monotonic() - started
+            self.acquired += 1
+            if waited > 0.001:
+                self.waits += 1
+                self.wait_time_max = max(self.wait_time_max, waited)
+
+    def release(self, owner):
+        with self._cond:
+            if self._owner is owner:
+                self._owner = None
+                self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            return {'acquired': self.acquired, 'waiting': len(self._waiting), 'waits': self.waits,
+                    'wait_time_max': self.wait_time_max}
+
+
+class EngineConnection(sqlite3.Connection):
+    """
+    Conexão do motor: entra na fila de escrita antes da primeira escrita da
+    transação (begin_write) e sai dela no commit ou rollback.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.writer_queue = None
+        self.holds_writer = False
+        self.path = None
+
+    def begin_write(self):
+        if not self.holds_writer:
+            self.writer_queue.acquire(self, SQLITE_BUSY_TIMEOUT_MS / 1000.0)
+            self.holds_writer = True
+
+    def _release_writer(self):
+        if self.holds_writer:
+            self.holds_writer = False
+            self.writer_queue.release(self)
+
+    def commit(self):
+        super().commit()
+        self._release_writer()
+
+    def rollback(self):
+        try:
+            super().rollback()
+        finally:
+            self._release_writer()
+
+
+class SQLiteEngine:
+    """
+    Uma conexão persistente por thread e por arquivo, configurada uma única vez.
+
+    Substitui o connect()/close() a cada execute_sql(): a conexão (com o
+    esquema já carregado e o cache de páginas quente) é reaproveitada pela
+    thread nas requisições seguintes. Depois de um fork, o processo filho
+    abre conexões próprias.
+
+    Nos workers gevent o threading.local vale por greenlet, e cada requisição
+    abriria (e descartaria) a sua conexão. Nesse modo a greenlet retira uma
+    conexão ociosa do arquivo e a devolve quando a última chamada aninhada a
+    libera; as greenlets que rodam ao mesmo tempo usam conexões distintas.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._idle = {}
+        self._idle_pid = os.getpid()
+        self._queues = {}
+        self._created_dirs = set()
+        self.connections_opened = 0
+
+    def _queue(self, path):
+        with self._lock:
+            queue = self._queues.get(path)
+            if queue is None:
+                queue = self._queues[path] = WriterQueue()
+            return queue
+
+    def _connect(self, path):
+        if path not in self._created_dirs:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._created_dirs.add(path)
+        # isolation_level IMMEDIATE: o BEGIN implícito antes de INSERT/UPDATE/DELETE já reserva
+        # o lock de escrita, evitando o deadlock de duas leituras que tentam virar escrita
+        conn = sqlite3.connect(path, timeout=SQLITE_BUSY_TIMEOUT_MS / 1000.0, isolation_level='IMMEDIATE',
+                               factory=EngineConnection)
+        conn.execute(f'PRAGMA journal_mode = {SQLITE_JOURNAL_MODE}')
+        conn.execute(f'PRAGMA synchronous = {SQLITE_SYNCHRONOUS}')
+        conn.execute(f'PRAGMA mmap_size = {SQLITE_MMAP_SIZE}')
+        conn.execute(f'PRAGMA cache_size = -{SQLITE_CACHE_SIZE_KB}')
+        conn.execute(f'PRAGMA busy_timeout = {SQLITE_BUSY_TIMEOUT_MS}')
+        conn.execute('PRAGMA temp_store = MEMORY')
+        conn.writer_queue = self._queue(path)
+        conn.path = path
+        with self._lock:
+            self.connections_opened += 1
+        return conn
+
+    def connection(self, path):
+        """
+        Conexão desta thread para o arquivo, aberta na primeira chamada.
+        """
+        path = os.path.abspath(path)
+        if gevent_active():
+            return self._checkout(path)
+        connections = getattr(self._local, 'connections', None)
+        if connections is None or self._local.pid != os.getpid():
+            # Conexões herdadas de um fork não podem ser usadas (nem fechadas) no filho
+            connections = self._local.connections = {}
+            self._local.pid = os.getpid()
+        conn = connections.get(path)
+        if conn is None:
+            conn = connections[path] = self._connect(path)
+        return conn
+
+    def _checkouts(self):
+        checkouts = getattr(self._local, 'checkouts', None)
+        if checkouts is None or self._local.pid != os.getpid():
+            checkouts = self._local.checkouts = {}
+            self._local.pid = os.getpid()
+        return checkouts
+
+    def _checkout(self, path):
+        """
+        Conexão da greenlet para o arquivo (workers gevent): a mesma nas chamadas
+        aninhadas, retirada das ociosas na primeira delas.
+        """
+        checkouts = self._checkouts()
+        entry = checkouts.get(path)
+        if entry is None:
+            with self._lock:
+                if self._idle_pid != os.getpid():
+                    self._idle = {}
+                    self._idle_pid = os.getpid()
+                idle = self._idle.get(path)
+                conn = idle.pop() if idle else None
+            if conn is None:
+                conn = self._connect(path)
+            entry = checkouts[path] = [conn, 0]
+        entry[1] += 1
+        return entry[0]
+
+    def release(self, conn):
+        """
+        Devolve a conexão à thread: desfaz o que não foi comitado e sai da fila de escrita.
+        Nos workers gevent, a última liberação da greenlet a devolve às ociosas do arquivo.
+        """
+        if conn.in_transaction or conn.holds_writer:
+            conn.rollback()
+        checkouts = getattr(self._local, 'checkouts', None)
+        entry = checkouts.get(conn.path) if checkouts else None
+        if entry is None or entry[0] is not conn:
+            return
+        entry[1] -= 1
+        if entry[1] > 0:
+            return
+        del checkouts[conn.path]
+        with self._lock:
+            idle = self._idle.setdefault(conn.path, [])
+            if self._idle_pid == os.getpid() and len(idle) < SQLITE_POOL_IDLE:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def stats(self):
+        with self._lock:
+            queues = {path: queue.stats() for path, queue in self._queues.items()}
+            idle = {path: len(conns) for path, conns in self._idle.items()}
+        return {'connections_opened': self.connections_opened, 'idle': idle, 'writer_queues': queues}
+
+
+sqlite_engine = SQLiteEngine()
+
+
+def begin_write(conn):
+    """
+    Entra na fila de escrita antes da primeira escrita da transação (INSERT/UPDATE/DELETE/DDL).
+    Sem efeito em conexões comuns (SQLITE_ENGINE=0).
+    """
+    method = getattr(conn, 'begin_write', None)
+    if method is not None:
+        method()
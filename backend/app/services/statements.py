@@ -0,0 +1,93 @@
+# backend/app/services/statements.py
+import itertools
+import re
+
+from app.services.cache import tables_in, written_tables
+
+# ----------------------------------------------------------------
+# Registro de Statements Compilados
+# ----------------------------------------------------------------
+
+_NAME_RE = re.compile(r'^[a-z][a-z0-9_]*$')
+_PLACEHOLDER_RE = re.compile(r'%s')
+
+# Nome -> Statement, preenchido na importação dos módulos de rotas
+STATEMENTS = {}
+
+
+class Statement:
+    """
+    Comando SQL declarado uma única vez, com o texto de cada dialeto já pronto.
+
+    O SQL é escrito com placeholders '%s' (formato do psycopg2), como em execute_sql().
+    Na criação são gerados o texto para SQLite ('?'), os comandos PREPARE/EXECUTE
+    do PostgreSQL, as tabelas citadas (tags do cache de resultados) e as
+    tabelas escritas (invalidadas no commit).
+    """
+
+    __slots__ = ('name', 'sql', 'sqlite_sql', 'prepare', 'prepare_sql', 'execute_sql', 'tables', 'written')
+
+    def __init__(self, name, sql, prepare=False):
+        if not _NAME_RE.match(name):
+            raise ValueError(f'Nome de statement inválido: {name}')
+        self.name = name
+        self.sql = sql
+        self.sqlite_sql = sql.replace('%s', '?')
+        self.prepare = prepare
+        self.tables = frozenset(tables_in(sql))
+        self.written = frozenset(written_tables(sql))
+
+        # PostgreSQL: PREPARE usa parâmetros posicionais ($1, $2...) e o EXECUTE
+        # recebe os valores pelos placeholders normais do psycopg2.
+        count = itertools.count(1)
+        body = _PLACEHOLDER_RE.sub(lambda match: f'${next(count)}', sql).strip().rstrip(';')
+        total = sql.count('%s')
+        self.prepare_sql = f'PREPARE {name} AS {body}'
+        self.execute_sql = f'EXECUTE {name}' + (f" ({', '.join(['%s'] * total)})" if total else '')
+
+    def __repr__(self):
+        return f'<Statement {self.name}>'
+
+
+def register(name, sql, prepare=False):
+    """
+    Declara um statement pelo nome. Com prepare=True ele é preparado (PREPARE)
+    uma vez por conexão no PostgreSQL e executado via EXECUTE nas chamadas seguintes.
+    """
+    existing = STATEMENTS.get(name)
+    if existing is not None:
+        if existing.sql != sql:
+            raise ValueError(f'Statement já registrado com outro SQL: {name}')
+        return existing
+    statement = Statement(name, sql, prepare)
+    STATEMENTS[name] = statement
+    return statement
+
+
+def register_variants(prefix, flags, build, prepare=False):
+    """
+    Registra uma variante do statement para cada combinação de filtros opcionais.
+
+    :param prefix: Prefixo dos nomes (o sufixo é a máscara de filtros, ex.: 'jobs_list_0101').
+    :param flags: Nomes dos filtros opcionais, em ordem fixa.
+    :param build: Função que recebe o frozenset de filtros ativos e retorna o SQL.
+    :return: Dicionário frozenset(filtros ativos) -> Statement.
+    """
+    variants = {}
+    for mask in itertools.product((False, True), repeat=len(flags)):
+        active = frozenset(flag for flag, enabled in zip(flags, mask) if enabled)
+        suffix = ''.join('1' if enabled else '0' for enabled in mask)
+        variants[active] = register(f'{prefix}_{suffix}', build(active), prepare)
+    return variants
+
+
+def register_lazy(name, build, prepare=False):
+    """
+    Retorna o statement já registrado com esse nome ou o registra com o SQL de build().
+    Usado em variantes criadas sob demanda (ex.: projeções de campos), em que o SQL
+    só é montado na primeira requisição que usa a combinação.
+    """
+    statement = STATEMENTS.get(name)
+    if statement is None:
+        statement = register(name, build(), prepare)
+    return statement
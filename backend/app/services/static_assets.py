@@ -0,0 +1,403 @@
+# backend/app/services/static_assets.py
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+import posixpath
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from flask import Response, request
+
+from app.services.images import SOURCE_IMAGE_TYPES, build_variants, choose_variant, parse_width_hint
+
+try:
+    import brotli
+except ImportError:  # brotli é opcional: sem ele só a variante gzip é gerada
+    brotli = None
+
+# ----------------------------------------------------------------
+# Arquivos Estáticos (pré-compressão, fingerprint, ETag e cache em memória)
+# ----------------------------------------------------------------
+
+_BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+FRONTEND_DIR = os.environ.get('FRONTEND_DIR', os.path.join(os.path.dirname(_BACKEND_DIR), 'frontend'))
+
+# Variantes .gz/.br, HTML reescrito e manifest.json (gerados no build: python3 -m app.services.static_assets)
+STATIC_BUILD_DIR = os.environ.get('STATIC_BUILD_DIR', os.path.join(_BACKEND_DIR, 'instance', 'static'))
+
+# Memória máxima dos corpos em cache; arquivos maiores que 1/8 do limite são lidos do disco
+STATIC_CACHE_MAX_BYTES = int(os.environ.get('STATIC_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+
+# Abaixo deste tamanho a compressão não compensa o cabeçalho extra
+STATIC_MIN_COMPRESS_SIZE = 1024
+
+# URLs com hash do conteúdo nunca mudam: o navegador pode guardá-las por um ano
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE_CONTROL = 'no-cache'
+
+COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json', 'application/xml',
+                      'image/svg+xml', 'image/x-icon', 'image/vnd.microsoft.icon')
+
+# Client Hints pedidas nas páginas HTML para escolher a largura das imagens
+IMAGE_CLIENT_HINTS = 'Sec-CH-Width, Sec-CH-Viewport-Width, Sec-CH-DPR'
+IMAGE_VARY = 'Accept, Width, ' + IMAGE_CLIENT_HINTS
+
+# Preferência do servidor quando o cliente aceita mais de uma codificação
+ENCODINGS = ('br', 'gzip') if brotli else ('gzip',)
+_SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+logger = logging.getLogger('claunnetworking.static_assets')
+
+_HASH_LENGTH = 10
+_FINGERPRINT_RE = re.compile(r'^(?P<base>.+)\.(?P<hash>[0-9a-f]{%d})(?P<ext>\.[^./]+)$' % _HASH_LENGTH)
+# Referências locais em src/href dos HTML (sem esquema, âncora ou query)
+_REFERENCE_RE = re.compile(r'''(?P<attr>\b(?:src|href)=)(?P<quote>["'])(?P<url>[^"'#?:]+)(?P=quote)''')
+
+
+def fingerprinted(path, digest):
+    """
+    'js/admin-bundle.min.js' -> 'js/admin-bundle.min.<hash>.js'
+    """
+    base, ext = os.path.splitext(path)
+    return f'{base}.{digest}{ext}'
+
+
+def _content_type(path):
+    content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    if content_type.startswith('text/') or content_type in ('application/javascript', 'application/json'):
+        content_type += '; charset=utf-8'
+    return content_type
+
+
+def _compress(encoding, data):
+    if encoding == 'br':
+        return brotli.compress(data, quality=11)
+    # mtime=0: a mesma entrada gera sempre os mesmos bytes
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def _write(path, data):
+    # Escrita atômica: vários workers podem gerar o build ao mesmo tempo
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = f'{path}.{os.getpid()}.tmp'
+    with open(temporary, 'wb') as handle:
+        handle.write(data)
+    os.replace(temporary, path)
+
+
+def _source_files(root):
+    for directory, subdirectories, files in os.walk(root):
+        subdirectories[:] = sorted(name for name in subdirectories if not name.startswith('.'))
+        for name in sorted(files):
+            if not name.startswith('.'):
+                full = os.path.join(directory, name)
+                yield os.path.relpath(full, root).replace(os.sep, '/'), full
+
+
+def _rewrite_html(path, html, manifest):
+    """
+    Troca as referências a arquivos do frontend pelas URLs com fingerprint.
+    Links entre páginas HTML continuam iguais (são URLs de navegação).
+    """
+    directory = os.path.dirname(path)
+
+    def replace(match):
+        url = match.group('url')
+        target = posixpath.normpath(url.lstrip('/') if url.startswith('/') else posixpath.join(directory, url))
+        entry = manifest.get(target)
+        if entry is None or target.endswith('.html'):
+            return match.group(0)
+        new_url = fingerprinted(url, entry['hash'])
+        return f"{match.group('attr')}{match.group('quote')}{new_url}{match.group('quote')}"
+
+    return _REFERENCE_RE.sub(replace, html)
+
+
+def build(root=None, build_dir=None, images=True):
+    """
+    Gera o manifest (hash, tipo e variantes de cada arquivo), o HTML reescrito,
+    as variantes gzip/brotli dos arquivos compressíveis e, com images=True,
+    as variantes AVIF/WebP das imagens (app/services/images.py).
+
+    :return: Manifest {caminho: {'hash', 'type', 'size', 'rewritten', 'encodings', 'variants'}}.
+    """
+    root = root or FRONTEND_DIR
+    build_dir = build_dir or STATIC_BUILD_DIR
+    files = list(_source_files(root))
+    manifest = {}
+    # Primeiro os arquivos referenciados, depois o HTML que aponta para eles
+    for path, full in sorted(files, key=lambda item: item[0].endswith('.html')):
+        with open(full, 'rb') as handle:
+            data = handle.read()
+        rewritten = False
+        if path.endswith('.html'):
+            html = _rewrite_html(path, data.decode('utf-8', errors='surrogateescape'), manifest)
+            new_data = html.encode('utf-8', errors='surrogateescape')
+            if new_data != data:
+                data, rewritten = new_data, True
+                _write(os.path.join(build_dir, path), data)
+        content_type = _content_type(path)
+        entry = {
+            'hash': hashlib.sha256(data).hexdigest()[:_HASH_LENGTH],
+            'type': content_type,
+            'size': len(data),
+            'rewritten': rewritten,
+            'encodings': [],
+            'variants': [],
+        }
+        if images and content_type in SOURCE_IMAGE_TYPES:
+            entry['variants'] = build_variants(path, full, content_type,
+                                               lambda file, data: _write(os.path.join(build_dir, file), data))
+        if len(data) >= STATIC_MIN_COMPRESS_SIZE and content_type.startswith(COMPRESSIBLE_TYPES):
+            for encoding in ENCODINGS:
+                compressed = _compress(encoding, data)
+                # Só guarda a variante se ela economizar ao menos 10%
+                if len(compressed) < len(data) * 0.9:
+                    _write(os.path.join(build_dir, path + _SUFFIXES[encoding]), compressed)
+                    entry['encodings'].append(encoding)
+        manifest[path] = entry
+    _write(os.path.join(build_dir, 'manifest.json'),
+           json.dumps({'root': os.path.abspath(root), 'files': manifest}, indent=1).encode('utf-8'))
+    return manifest
+
+
+def _manifest_is_current(root, build_dir):
+    """
+    O manifest vale se foi gerado para esta pasta e nenhum arquivo mudou depois dele
+    (verificado uma vez, na inicialização).
+    """
+    path = os.path.join(build_dir, 'manifest.json')
+    try:
+        with open(path, encoding='utf-8') as handle:
+            saved = json.load(handle)
+        built_at = os.path.getmtime(path)
+    except (OSError, ValueError):
+        return None
+    if saved.get('root') != os.path.abspath(root):
+        return None
+    files = dict(_source_files(root))
+    if set(files) != set(saved['files']):
+        return None
+    if any(os.path.getmtime(full) > built_at for full in files.values()):
+        return None
+    return saved['files']
+
+
+def _source_manifest(root):
+    """
+    Manifest dos originais, sem variantes nem HTML reescrito, para quando não há build.
+    O hash vem do tamanho e do mtime: nenhum arquivo é lido ou comprimido na requisição.
+    """
+    manifest = {}
+    for path, full in _source_files(root):
+        stat = os.stat(full)
+        manifest[path] = {
+            'hash': hashlib.sha256(f'{stat.st_size}:{stat.st_mtime_ns}'.encode()).hexdigest()[:_HASH_LENGTH],
+            'type': _content_type(path),
+            'size': stat.st_size,
+            'rewritten': False,
+            'encodings': [],
+            'variants': [],
+        }
+    return manifest
+
+
+def _parse_accept_encoding(header):
+    """
+    Codificações aceitas com q > 0 ('gzip;q=0' recusa o gzip).
+    """
+    accepted = {}
+    for part in (header or '').split(','):
+        name, _, params = part.strip().partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name] = quality
+    # '*' vale para as codificações não citadas explicitamente
+    if accepted.get('*', 0) > 0:
+        for name in ENCODINGS:
+            accepted.setdefault(name, accepted['*'])
+    return {name for name, quality in accepted.items() if quality > 0}
+
+
+class StaticAssets:
+    """
+    Serve o frontend a partir do manifest em memória: cada acesso resolve o
+    caminho, negocia a codificação e responde 304 ao If-None-Match, sem stat()
+    nem open() no disco para os arquivos que já estão no cache.
+    """
+
+    def __init__(self, root=None, build_dir=None, max_bytes=None):
+        self.root = root or FRONTEND_DIR
+        self.build_dir = build_dir or STATIC_BUILD_DIR
+        self.max_bytes = max_bytes or STATIC_CACHE_MAX_BYTES
+        self._manifest = None
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()
+        self._cache_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def manifest(self):
+        if self._manifest is None:
+            with self._lock:
+                if self._manifest is None:
+                    manifest = _manifest_is_current(self.root, self.build_dir)
+                    if manifest is None:
+                        # O build (compressão e imagens) é do deploy, nunca de uma requisição
+                        logger.warning('Manifest de %s ausente ou desatualizado: servindo os originais sem '
+                                       'compressão (rode python3 -m app.services.static_assets)', self.build_dir)
+                        manifest = _source_manifest(self.root)
+                    self._manifest = manifest
+        return self._manifest
+
+    def url_for(self, path):
+        """
+        URL com fingerprint de um arquivo do frontend (para uso em templates e respostas da API).
+        """
+        entry = self.manifest.get(path.lstrip('/'))
+        return '/' + fingerprinted(path.lstrip('/'), entry['hash']) if entry else '/' + path.lstrip('/')
+
+    def resolve(self, path):
+        """
+        :return: (caminho original, entrada do manifest, imutável?) ou None.
+        """
+        entry = self.manifest.get(path)
+        if entry is not None:
+            return path, entry, False
+        match = _FINGERPRINT_RE.match(path)
+        if match:
+            original = match.group('base') + match.group('ext')
+            entry = self.manifest.get(original)
+            if entry is not None and entry['hash'] == match.group('hash'):
+                return original, entry, True
+        return None
+
+    def _read(self, key, full):
+        with self._lock:
+            body = self._cache.get(key)
+            if body is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return body
+            self.misses += 1
+        with open(full, 'rb') as handle:
+            body = handle.read()
+        if len(body) <= self.max_bytes // 8:
+            with self._lock:
+                if key not in self._cache:
+                    self._cache[key] = body
+                    self._cache_bytes += len(body)
+                    while self._cache_bytes > self.max_bytes:
+                        _, evicted = self._cache.popitem(last=False)
+                        self._cache_bytes -= len(evicted)
+        return body
+
+    def _image_response(self, path, entry, variant, cache_control):
+        kind = variant['type'].split('/')[1]
+        etag = f"{entry['hash']}-{variant['width']}w-{kind}"
+        headers = {'ETag': f'"{etag}"', 'Cache-Control': cache_control, 'Vary': IMAGE_VARY}
+        # Larguras e formatos diferentes são representações diferentes: só a mesma variante gera 304
+        tags = {tag.strip().removeprefix('W/').strip('"') for tag in request.headers.get('If-None-Match', '').split(',')}
+        if '*' in tags or etag in tags:
+            return Response(status=304, headers=headers)
+        body = self._read((path, variant['file']), os.path.join(self.build_dir, variant['file']))
+        return Response(body, status=200, headers=headers, content_type=variant['type'])
+
+    def response(self, path):
+        """
+        Resposta para o caminho pedido, ou None se ele não existir no frontend.
+        """
+        resolved = self.resolve(path)
+        if resolved is None:
+            return None
+        path, entry, immutable = resolved
+        cache_control = IMMUTABLE_CACHE_CONTROL if immutable else REVALIDATE_CACHE_CONTROL
+
+        # Imagens: melhor formato aceito (Accept) na largura pedida (?w= ou Client Hints)
+        if entry.get('variants'):
+            width = parse_width_hint(request.args.get('w'), request.headers)
+            variant = choose_variant(entry['variants'], request.headers.get('Accept'), width)
+            if variant is not None:
+                return self._image_response(path, entry, variant, cache_control)
+
+        accepted = _parse_accept_encoding(request.headers.get('Accept-Encoding'))
+        encoding = next((name for name in ENCODINGS if name in entry['encodings'] and name in accepted), None)
+        etag = f"{entry['hash']}-{encoding}" if encoding else entry['hash']
+
+        headers = {'ETag': f'"{etag}"', 'Cache-Control': cache_control}
+        if entry['encodings']:
+            headers['Vary'] = 'Accept-Encoding'
+        if entry['type'].startswith('text/html'):
+            headers['Accept-CH'] = IMAGE_CLIENT_HINTS
+
+        # Qualquer variante com o mesmo hash representa o mesmo conteúdo
+        if_none_match = request.headers.get('If-None-Match', '')
+        if if_none_match:
+            tags = {tag.strip().removeprefix('W/').strip('"').split('-')[0] for tag in if_none_match.split(',')}
+            if '*' in tags or entry['hash'] in tags:
+                return Response(status=304, headers=headers)
+
+        if encoding:
+            full = os.path.join(self.build_dir, path + _SUFFIXES[encoding])
+        elif entry['rewritten']:
+            full = os.path.join(self.build_dir, path)
+        else:
+            full = os.path.join(self.root, path)
+        body = self._read((path, encoding), full)
+        if encoding:
+            headers['Content-Encoding'] = encoding
+        return Response(body, status=200, headers=headers, content_type=entry['type'])
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._cache), 'bytes': self._cache_bytes, 'hits': self.hits, 'misses': self.misses}
+
+
+# Instância compartilhada pelas rotas
+static_assets = StaticAssets()
+
+
+def main():
+    """
+    Uso (a partir de backend/, no buildCommand do deploy):
+        python3 -m app.services.static_assets
+    """
+    parser = argparse.ArgumentParser(description='Gera as variantes comprimidas e o manifest do frontend.')
+    parser.add_argument('--root', default=FRONTEND_DIR)
+    parser.add_argument('--build-dir', default=STATIC_BUILD_DIR)
+    parser.add_argument('--no-images', action='store_true', help='não gera as variantes AVIF/WebP')
+    args = parser.parse_args()
+    started = time.perf_counter()
+    manifest = build(args.root, args.build_dir, images=not args.no_images)
+    original = sum(entry['size'] for entry in manifest.values())
+    # Menor representação de cada arquivo (variante comprimida ou imagem na largura padrão)
+    compressed = 0
+    for path, entry in manifest.items():
+        variant = choose_variant(entry['variants'], 'image/avif,image/webp', None)
+        if variant is not None:
+            compressed += variant['size']
+        elif entry['encodings']:
+            compressed += os.path.getsize(os.path.join(args.build_dir, path + _SUFFIXES[entry['encodings'][0]]))
+        else:
+            compressed += entry['size']
+    print(f'{len(manifest)} arquivos em {time.perf_counter() - started:.2f}s: '
+          f'{original / 1024:.0f} KB -> {compressed / 1024:.0f} KB ({", ".join(ENCODINGS)})')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark de candidaturas concorrentes (POST /api/jobs/apply).
+
+Compara o fluxo antigo (SELECT de verificação + INSERT, dois round trips)
+com o INSERT ... ON CONFLICT DO NOTHING atual. Cada candidatura é enviada
+--clicks vezes em paralelo, simulando cliques repetidos no botão.
+
+No fluxo antigo, "corridas" são as vezes em que duas threads passaram pela
+verificação ao mesmo tempo: sem o índice único elas gerariam candidaturas
+duplicadas (aqui o índice as recusa com IntegrityError).
+
+Uso (a partir de backend/):
+    python3 -m benchmarks.bench_apply [--threads 8] [--candidates 50] [--jobs 20] [--clicks 2]
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import Flask
+
+from app.services import database
+from app.routes.jobs import APPLY_TO_JOB
+
+LEGACY_FIND = "SELECT id FROM applications WHERE job_id = %s AND candidate_id = %s"
+LEGACY_INSERT = "INSERT INTO applications (job_id, candidate_id, message) VALUES (%s, %s, %s)"
+
+
+def _seed(candidates, jobs):
+    database.execute_sql(
+        "INSERT INTO users (email, password_hash, user_type, name) VALUES (%s, %s, %s, %s)",
+        ('bench-company@example.com', 'x', 'company', 'Bench'), commit=True
+    )
+    company_id = database.execute_sql("SELECT id FROM users WHERE email = %s",
+                                      ('bench-company@example.com',), fetch=True)[0]['id']
+    candidate_ids = []
+    for index in range(candidates):
+        result = database.execute_sql(
+            "INSERT INTO users (email, password_hash, user_type, name) VALUES (%s, %s, %s, %s) RETURNING id",
+            (f'bench-candidate-{index}@example.com', 'x', 'candidate', f'Candidato {index}'),
+            fetch=True, commit=True
+        )
+        candidate_ids.append(result[0]['id'])
+    job_ids = []
+    for index in range(jobs):
+        result = database.execute_sql(
+            "INSERT INTO jobs (company_id, title) VALUES (%s, %s) RETURNING id",
+            (company_id, f'Vaga {index}'), fetch=True, commit=True
+        )
+        job_ids.append(result[0]['id'])
+    return candidate_ids, job_ids
+
+
+def _legacy_apply(job_id, candidate_id, counters):
+    if database.execute_sql(LEGACY_FIND, (job_id, candidate_id), fetch=True):
+        counters['duplicates'] += 1
+        return
+    try:
+        database.execute_sql(LEGACY_INSERT, (job_id, candidate_id, ''), commit=True)
+        counters['created'] += 1
+    except Exception:
+        counters['races'] += 1
+
+
+def _current_apply(job_id, candidate_id, counters):
+    if database.execute_sql(APPLY_TO_JOB, (candidate_id, '', None, job_id), fetch=True, commit=True):
+        counters['created'] += 1
+    else:
+        counters['duplicates'] += 1
+
+
+def _run(label, apply, attempts, threads):
+    database.execute_sql("DELETE FROM applications", commit=True)
+    counters = {'created': 0, 'duplicates': 0, 'races': 0}
+    lock = threading.Lock()
+    app = Flask(__name__)
+    app.teardown_appcontext(database.release_request_connection)
+
+    def worker(attempt):
+        # Um app context por tentativa, como uma requisição
+        local = {'created': 0, 'duplicates': 0, 'races': 0}
+        with app.app_context():
+            apply(*attempt, local)
+        with lock:
+            for key, value in local.items():
+                counters[key] += value
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(worker, attempts))
+    elapsed = time.perf_counter() - started
+
+    stored = database.execute_sql("SELECT COUNT(*) AS total FROM applications", fetch=True)[0]['total']
+    print(f"{label:<28} {len(attempts) / elapsed:9.1f} req/s  criadas={counters['created']:<5} "
+          f"duplicadas={counters['duplicates']:<5} corridas={counters['races']:<4} gravadas={stored}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--candidates', type=int, default=50)
+    parser.add_argument('--jobs', type=int, default=20)
+    parser.add_argument('--clicks', type=int, default=2, help='envios simultâneos de cada candidatura')
+    args = parser.parse_args()
+
+    if not database.DATABASE_URL:
+        database.DATABASE_PATH = os.path.join(tempfile.mkdtemp(), 'bench_apply.db')
+    database.init_database()
+    candidate_ids, job_ids = _seed(args.candidates, args.jobs)
+
+    # Cliques repetidos ficam lado a lado para disputarem a mesma candidatura
+    attempts = [(job_id, candidate_id)
+                for candidate_id in candidate_ids
+                for job_id in job_ids
+                for _ in range(args.clicks)]
+
+    print(f"Dialeto: {'PostgreSQL' if database.DATABASE_URL else 'SQLite'} — "
+          f"{len(attempts)} envios, {args.threads} threads\n")
+    _run('SELECT + INSERT (antes)', _legacy_apply, attempts, args.threads)
+    _run('INSERT ... ON CONFLICT', _current_apply, attempts, args.threads)
+
+
+if __name__ == '__main__':
+    main()
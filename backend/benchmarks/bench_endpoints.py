@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark dos endpoints principais com massa de dados sintética e baseline.
+
+Carrega a massa de benchmarks/seed.py (--users, de 10k a 1M) e mede
+/api/jobs/, /api/courses/, /api/jobs/apply (app de create_app()) e
+/api/login, /api/profile (app.py) de duas formas:
+
+  client  Flask test client no próprio processo (sem rede: custo do app e do banco)
+  http    servidores werkzeug em processos próprios e --processes clientes HTTP
+          em paralelo (inclui sockets, threads e disputa pelo banco)
+
+Para cada cenário são reportados p50/p95/p99 (ms) e vazão (req/s). Com
+--baseline, os números são comparados ao baseline salvo: o p95 não pode
+subir mais que --max-latency-regression e a vazão não pode cair mais que
+--max-throughput-regression (saída 1 em caso de regressão).
+
+Uso (a partir de backend/):
+    python3 -m benchmarks.bench_endpoints [--users 10000] [--mode client|http|both]
+        [--requests 300] [--processes 4] [--scenarios jobs_list,login]
+        [--baseline benchmarks/baseline.json] [--save-baseline]
+
+Sem DATABASE_URL a massa vai para um SQLite temporário; com DATABASE_URL,
+para o PostgreSQL informado (use um banco local descartável).
+"""
+
+import argparse
+import http.client
+import importlib.util
+import json
+import multiprocessing
+import os
+import platform
+import random
+import secrets
+import signal
+import socket
+import sys
+import tempfile
+import time
+
+# app.py exige uma SECRET_KEY forte; o benchmark usa uma aleatória
+os.environ.setdefault('SECRET_KEY', secrets.token_hex(32))
+
+from app import create_app  # noqa: E402
+from app.services import database  # noqa: E402
+from benchmarks.seed import seed  # noqa: E402
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE = os.path.join(BACKEND_DIR, 'benchmarks', 'baseline.json')
+
+# Cenário -> (app, método, requer sessão de candidato, fração de --requests).
+# O login roda o PBKDF2 completo (~250 ms), por isso recebe menos requisições.
+SCENARIOS = {
+    'jobs_list': ('factory', 'GET', False, 1.0),
+    'courses_list': ('factory', 'GET', False, 1.0),
+    'login': ('monolith', 'POST', False, 0.1),
+    'profile': ('monolith', 'GET', True, 1.0),
+    'apply': ('factory', 'POST', True, 1.0),
+}
+
+# A listagem varia filtros e páginas para não medir só o cache de resultados
+_JOB_FILTERS = ('', '&area=tecnologia', '&modality=remoto', '&area=saude&modality=hibrido', '&q=analista')
+_COURSE_FILTERS = ('', '&category=tecnologia', '&is_free=true', '&q=gerente')
+
+# O app.py também usa o Talisman: sem HTTPS real, o cabeçalho evita o redirect 302
+_MONOLITH_HEADERS = {'X-Forwarded-Proto': 'https'}
+
+
+def _request_for(name, data, rng):
+    """
+    (caminho, corpo JSON) da próxima requisição do cenário.
+    """
+    if name == 'jobs_list':
+        return f'/api/jobs/?limit=20{rng.choice(_JOB_FILTERS)}', None
+    if name == 'courses_list':
+        return f'/api/courses/?limit=20{rng.choice(_COURSE_FILTERS)}', None
+    if name == 'login':
+        index = rng.randrange(len(data['candidates']))
+        return '/api/login', {'email': f"{data['prefix']}-candidate-{index}@example.com",
+                              'password': data['password']}
+    if name == 'profile':
+        return '/api/profile', None
+    if name == 'apply':
+        return '/api/jobs/apply', {'job_id': rng.choice(data['jobs']), 'message': 'benchmark'}
+    raise ValueError(f'Cenário desconhecido: {name}')
+
+
+def load_monolith():
+    """
+    Importa backend/app.py (o nome 'app' é do pacote app/, por isso a carga pelo caminho).
+    """
+    spec = importlib.util.spec_from_file_location('claunnetworking_monolith', os.path.join(BACKEND_DIR, 'app.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.app
+
+
+def _percentile(ordered, p):
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, int(round(p / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def _summary(latencies, elapsed, errors):
+    ordered = sorted(latencies)
+    return {
+        'requests': len(ordered),
+        'errors': errors,
+        'p50_ms': round(_percentile(ordered, 50) * 1000, 3),
+        'p95_ms': round(_percentile(ordered, 95) * 1000, 3),
+        'p99_ms': round(_percentile(ordered, 99) * 1000, 3),
+        'throughput': round(len(ordered) / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+# ----------------------------------------------------------------
+# Modo client: Flask test client
+# ----------------------------------------------------------------
+
+def run_client(names, data, requests, warmup, rng):
+    apps = {'factory': create_app(), 'monolith': load_monolith()}
+    candidate = rng.choice(data['candidates'])
+    results = {}
+    for name in names:
+        app_name, method, needs_session, share = SCENARIOS[name]
+        client = apps[app_name].test_client()
+        base_url = 'https://localhost' if app_name == 'monolith' else 'http://localhost'
+        if needs_session:
+            with client.session_transaction(base_url=base_url) as session:
+                session.update(user_id=candidate, user_type='candidate', name='Benchmark')
+
+        count = max(1, int(requests * share))
+        latencies, errors = [], 0
+        started = None
+        for index in range(warmup + count):
+            if index == warmup:
+                started = time.perf_counter()
+            path, body = _request_for(name, data, rng)
+            before = time.perf_counter()
+            response = client.open(path, method=method, json=body, base_url=base_url)
+            elapsed = time.perf_counter() - before
+            if index >= warmup:
+                latencies.append(elapsed)
+                errors += response.status_code >= 500
+        results[name] = _summary(latencies, time.perf_counter() - started, errors)
+    return results
+
+
+# ----------------------------------------------------------------
+# Modo http: servidores e clientes em processos separados
+# ----------------------------------------------------------------
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _serve(app_name, port, database_path):
+    import logging
+    from werkzeug.serving import make_server
+    # Grupo próprio: o encerramento alcança também os processos de hashing de senhas
+    os.setpgrp()
+    # Sem o log de acesso do werkzeug (uma linha por requisição no stderr)
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    database.DATABASE_PATH = database_path
+    app = create_app() if app_name == 'factory' else load_monolith()
+    make_server('127.0.0.1', port, app, threaded=True).serve_forever()
+
+
+def _wait_for(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f'Servidor na porta {port} não respondeu em {timeout}s')
+
+
+def _http(port, method, path, body=None, headers=None):
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    try:
+        payload = json.dumps(body) if body is not None else None
+        request_headers = dict(headers or {})
+        if payload is not None:
+            request_headers['Content-Type'] = 'application/json'
+        connection.request(method, path, body=payload, headers=request_headers)
+        response = connection.getresponse()
+        response.read()
+        return response.status, response.getheader('Set-Cookie')
+    finally:
+        connection.close()
+
+
+def _login_cookie(port, path, email, password, headers):
+    status, cookie = _http(port, 'POST', path, {'email': email, 'password': password}, headers)
+    if status != 200 or not cookie:
+        raise RuntimeError(f'Login do benchmark falhou em {path} ({status})')
+    return cookie.split(';', 1)[0]
+
+
+def _http_worker(job):
+    name, ports, data, count, warmup, worker_seed = job
+    app_name, method, needs_session, _ = SCENARIOS[name]
+    rng = random.Random(worker_seed)
+    port = ports[app_name]
+    headers = dict(_MONOLITH_HEADERS) if app_name == 'monolith' else {}
+    if needs_session:
+        index = rng.randrange(len(data['candidates']))
+        email = f"{data['prefix']}-candidate-{index}@example.com"
+        login_path = '/api/login' if app_name == 'monolith' else '/api/auth/login'
+        headers['Cookie'] = _login_cookie(port, login_path, email, data['password'], headers)
+
+    latencies, errors = [], 0
+    for index in range(warmup + count):
+        path, body = _request_for(name, data, rng)
+        before = time.perf_counter()
+        status, _ = _http(port, method, path, body, headers)
+        elapsed = time.perf_counter() - before
+        if index >= warmup:
+            latencies.append(elapsed)
+            errors += status >= 500
+    return latencies, errors
+
+
+def run_http(names, data, requests, warmup, processes, rng):
+    context = multiprocessing.get_context('fork')
+    ports = {'factory': _free_port(), 'monolith': _free_port()}
+    # Não daemônicos: o hashing de senhas do login cria seu próprio pool de processos
+    servers = [context.Process(target=_serve, args=(app_name, port, database.DATABASE_PATH))
+               for app_name, port in ports.items()]
+    for server in servers:
+        server.start()
+    results = {}
+    try:
+        for port in ports.values():
+            _wait_for(port)
+        # Os clientes recebem só o necessário para montar as requisições
+        shared = {'prefix': data['prefix'], 'password': data['password'],
+                  'candidates': data['candidates'], 'jobs': data['jobs']}
+        with context.Pool(processes) as pool:
+            for name in names:
+                count = max(1, int(requests * SCENARIOS[name][3]) // processes)
+                jobs = [(name, ports, shared, count, warmup, rng.random()) for _ in range(processes)]
+                started = time.perf_counter()
+                outcomes = pool.map(_http_worker, jobs)
+                elapsed = time.perf_counter() - started
+                latencies = [latency for worker_latencies, _ in outcomes for latency in worker_latencies]
+                # A vazão inclui o aquecimento de cada cliente no tempo total; descontamos
+                # proporcionalmente para manter a comparação com o modo client
+                measured = elapsed * count / (count + warmup)
+                results[name] = _summary(latencies, measured, sum(errors for _, errors in outcomes))
+    finally:
+        for server in servers:
+            try:
+                os.killpg(server.pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+            server.join()
+    return results
+
+
+# ----------------------------------------------------------------
+# Relatório e baseline
+# ----------------------------------------------------------------
+
+def _environment(args):
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'database': 'postgresql' if database.DATABASE_URL else 'sqlite',
+        'users': args.users,
+        'requests': args.requests,
+        'processes': args.processes,
+    }
+
+
+def _print_results(mode, results):
+    print(f'\n[{mode}]')
+    print(f"{'cenário':<14} {'req':>6} {'erros':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>9}")
+    for name, row in results.items():
+        print(f"{name:<14} {row['requests']:>6} {row['errors']:>6} {row['p50_ms']:>9.2f} "
+              f"{row['p95_ms']:>9.2f} {row['p99_ms']:>9.2f} {row['throughput']:>9.1f}")
+
+
+def compare(results, baseline, max_latency, max_throughput):
+    """
+    Compara os resultados com o baseline salvo.
+
+    :return: Lista de mensagens de regressão (vazia se tudo estiver dentro dos limites).
+    """
+    failures = []
+    for mode, scenarios in results.items():
+        for name, row in scenarios.items():
+            reference = baseline.get('results', {}).get(mode, {}).get(name)
+            if reference is None:
+                continue
+            if row['errors']:
+                failures.append(f'{mode}/{name}: {row["errors"]} respostas 5xx')
+            if row['p95_ms'] > reference['p95_ms'] * (1 + max_latency):
+                failures.append(f"{mode}/{name}: p95 {row['p95_ms']:.2f} ms > "
+                                f"{reference['p95_ms']:.2f} ms + {max_latency:.0%}")
+            if row['throughput'] < reference['throughput'] * (1 - max_throughput):
+                failures.append(f"{mode}/{name}: vazão {row['throughput']:.1f} req/s < "
+                                f"{reference['throughput']:.1f} req/s - {max_throughput:.0%}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=10_000)
+    parser.add_argument('--mode', choices=('client', 'http', 'both'), default='client')
+    parser.add_argument('--requests', type=int, default=300, help='requisições por cenário')
+    parser.add_argument('--warmup', type=int, default=20, help='requisições descartadas por cenário/cliente')
+    parser.add_argument('--processes', type=int, default=4, help='clientes HTTP em paralelo')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS))
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true', help='grava os resultados como novo baseline')
+    parser.add_argument('--max-latency-regression', type=float, default=0.25)
+    parser.add_argument('--max-throughput-regression', type=float, default=0.20)
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"cenários desconhecidos: {', '.join(unknown)}")
+
+    if not database.DATABASE_URL:
+        database.DATABASE_PATH = os.path.join(tempfile.mkdtemp(), 'bench_endpoints.db')
+    database.init_database()
+    started = time.perf_counter()
+    data = seed(args.users, args.seed)
+    print(f"Massa: {data['rows']} linhas em {time.perf_counter() - started:.1f}s "
+          f"({'PostgreSQL' if database.DATABASE_URL else 'SQLite'})")
+
+    rng = random.Random(args.seed)
+    results = {}
+    if args.mode in ('client', 'both'):
+        results['client'] = run_client(names, data, args.requests, args.warmup, rng)
+        _print_results('client', results['client'])
+    if args.mode in ('http', 'both'):
+        results['http'] = run_http(names, data, args.requests, args.warmup, args.processes, rng)
+        _print_results('http', results['http'])
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as handle:
+            json.dump({'environment': _environment(args), 'results': results}, handle, indent=2, sort_keys=True)
+            handle.write('\n')
+        print(f'\nBaseline salvo em {args.baseline}')
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print('\nSem baseline para comparar (use --save-baseline).')
+        return 0
+    with open(args.baseline, encoding='utf-8') as handle:
+        baseline = json.load(handle)
+    # Números de outra máquina, banco ou escala não são comparáveis: apenas avisa
+    current = _environment(args)
+    for key in ('cpus', 'database', 'users'):
+        if baseline.get('environment', {}).get(key) != current[key]:
+            print(f"\nAviso: baseline gerado com {key}={baseline.get('environment', {}).get(key)} "
+                  f"(atual: {current[key]}).")
+    failures = compare(results, baseline, args.max_latency_regression, args.max_throughput_regression)
+    if failures:
+        print('\nRegressões em relação ao baseline:')
+        for failure in failures:
+            print(f'  - {failure}')
+        return 1
+    print('\nDentro dos limites do baseline.')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark das mensagens (app.services.messaging) com um histórico grande.
+
+Grava --messages mensagens (padrão: 10M) distribuídas em --conversations
+conversas de dois participantes entre os usuários de benchmarks.seed, com
+os contadores (última mensagem e não lidas) já calculados. Uma fração
+(--hot-share) vai para uma única conversa longa, onde é medida a paginação
+profunda. São reportados p50/p95/p99:
+
+  envio            send_message(): INSERT + contadores em uma transação
+  histórico        primeira página de uma conversa comum e uma página no meio da
+                   conversa longa (keyset em (conversation_id, id)), contra o
+                   mesmo trecho com OFFSET
+  caixa de entrada primeira página das conversas do usuário
+  não lidas        contadores de conversation_participants, contra o COUNT(*)
+                   em messages que eles substituem
+  long-poll        a query executada a cada despertar (mensagens após um id)
+
+Uso (a partir de backend/):
+    python3 -m benchmarks.bench_messages [--messages 10000000] [--conversations 50000]
+        [--users 10000] [--hot-share 0.1] [--samples 300]
+
+Sem DATABASE_URL os dados vão para um SQLite temporário; com DATABASE_URL,
+para o PostgreSQL informado (use um banco local descartável).
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from flask import Flask
+
+from app.services import database, messaging
+from benchmarks.seed import BATCH_SIZE, WORDS, seed
+
+PAGE_SIZE = 20
+
+LEGACY_HISTORY_SQL = '''
+    SELECT m.id, m.sender_id, m.body, m.created_at FROM messages m
+    WHERE m.conversation_id = %s ORDER BY m.id DESC LIMIT %s OFFSET %s
+'''
+LEGACY_UNREAD_SQL = '''
+    SELECT p.conversation_id, COUNT(*) AS unread_count
+    FROM conversation_participants p
+    JOIN messages m ON m.conversation_id = p.conversation_id AND m.id > p.last_read_message_id
+    WHERE p.user_id = %s AND m.sender_id <> %s
+    GROUP BY p.conversation_id
+'''
+
+
+def _percentile(ordered, p):
+    index = min(len(ordered) - 1, max(0, int(round(p / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def _measure(label, samples, work):
+    """
+    Executa work(índice) `samples` vezes, cada uma em um app context (como uma requisição).
+    """
+    app = Flask(__name__)
+    app.teardown_appcontext(database.release_request_connection)
+    latencies = []
+    for index in range(samples):
+        with app.app_context():
+            started = time.perf_counter()
+            work(index)
+            latencies.append(time.perf_counter() - started)
+    ordered = sorted(latencies)
+    print(f'{label:<34} p50={_percentile(ordered, 50) * 1000:8.3f} ms  p95={_percentile(ordered, 95) * 1000:8.3f} ms  '
+          f'p99={_percentile(ordered, 99) * 1000:8.3f} ms  {samples / sum(latencies):9.1f} op/s')
+
+
+def seed_messages(users, messages, conversations, hot_share, rng):
+    """
+    Grava as conversas, os participantes e as mensagens com ids explícitos e os contadores calculados.
+
+    :return: ({conversa: (participante, participante)}, id da conversa longa, ids das mensagens dela).
+    """
+    start_conversation = database.execute_sql('SELECT COALESCE(MAX(id), 0) AS id FROM conversations',
+                                              fetch=True)[0]['id'] + 1
+    start_message = database.execute_sql('SELECT COALESCE(MAX(id), 0) AS id FROM messages',
+                                         fetch=True)[0]['id'] + 1
+    pairs = {start_conversation + index: tuple(rng.sample(users, 2)) for index in range(conversations)}
+    conversation_ids = list(pairs)
+    hot = conversation_ids[0]
+    hot_ids = []
+    last = {}
+    unread = {}
+
+    with database.transaction():
+        if database.DATABASE_URL:
+            # Sem NOTIFY por linha durante a carga (ninguém está esperando)
+            database.execute_sql('ALTER TABLE messages DISABLE TRIGGER messages_notify', commit=True)
+        database.insert_many('conversations', ('id', 'subject', 'created_by'),
+                             [(conversation_id, 'Benchmark', pair[0]) for conversation_id, pair in pairs.items()])
+
+        started = time.perf_counter()
+        message_id = start_message
+        remaining = messages
+        while remaining:
+            batch = []
+            for _ in range(min(BATCH_SIZE, remaining)):
+                conversation_id = hot if rng.random() < hot_share else rng.choice(conversation_ids)
+                sender = pairs[conversation_id][rng.random() < 0.5]
+                body = ' '.join(rng.choice(WORDS) for _ in range(6))
+                batch.append((message_id, conversation_id, sender, body))
+                last[conversation_id] = (message_id, body)
+                receiver = (conversation_id, pairs[conversation_id][pairs[conversation_id][0] == sender])
+                unread[receiver] = unread.get(receiver, 0) + 1
+                if conversation_id == hot:
+                    hot_ids.append(message_id)
+                message_id += 1
+            database.insert_many('messages', ('id', 'conversation_id', 'sender_id', 'body'), batch)
+            remaining -= len(batch)
+            done = messages - remaining
+            if done % (BATCH_SIZE * 50) == 0 or not remaining:
+                rate = done / (time.perf_counter() - started)
+                print(f'  {done:>11,} mensagens ({rate:,.0f}/s)')
+
+        participants = []
+        for conversation_id, pair in pairs.items():
+            last_id = last.get(conversation_id, (0, None))[0]
+            for user_id in pair:
+                participants.append((conversation_id, user_id, last_id, unread.get((conversation_id, user_id), 0)))
+        for start in range(0, len(participants), BATCH_SIZE):
+            database.insert_many('conversation_participants',
+                                 ('conversation_id', 'user_id', 'last_message_id', 'unread_count'),
+                                 participants[start:start + BATCH_SIZE])
+        for conversation_id, (last_id, body) in last.items():
+            database.execute_sql('UPDATE conversations SET last_message_id = %s, last_message_preview = %s, '
+                                 'last_message_at = CURRENT_TIMESTAMP WHERE id = %s',
+                                 (last_id, body, conversation_id), commit=True)
+        if database.DATABASE_URL:
+            database.execute_sql('ALTER TABLE messages ENABLE TRIGGER messages_notify', commit=True)
+            # ids explícitos: os SERIAL continuam depois do maior id gravado
+            for table in ('conversations', 'messages'):
+                database.execute_sql(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), MAX(id)) FROM {table}",
+                                     fetch=True, commit=True)
+    # Estatísticas atualizadas para o planner (índices de messages e participants)
+    database.execute_sql('ANALYZE', commit=True)
+    return pairs, hot, hot_ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--messages', type=int, default=10_000_000)
+    parser.add_argument('--conversations', type=int, default=50_000)
+    parser.add_argument('--users', type=int, default=10_000)
+    parser.add_argument('--hot-share', type=float, default=0.1, help='fração das mensagens na conversa longa')
+    parser.add_argument('--samples', type=int, default=300)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    if not database.DATABASE_URL:
+        database.DATABASE_PATH = os.path.join(tempfile.mkdtemp(), 'bench_messages.db')
+    database.init_database()
+    data = seed(args.users, args.seed)
+    users = data['candidates'] + data['companies']
+
+    print(f"Dialeto: {'PostgreSQL' if database.DATABASE_URL else 'SQLite'} — {args.messages:,} mensagens em "
+          f"{args.conversations:,} conversas, {args.samples} amostras por medição")
+    started = time.perf_counter()
+    pairs, hot, hot_ids = seed_messages(users, args.messages, args.conversations, args.hot_share, rng)
+    print(f'Carga: {time.perf_counter() - started:.1f} s\n')
+
+    conversations = list(pairs)
+    members = [pairs[rng.choice(conversations)][0] for _ in range(args.samples)]
+    picks = [rng.choice(conversations) for _ in range(args.samples)]
+    middles = []
+    for _ in range(args.samples):
+        position = rng.randrange(PAGE_SIZE, len(hot_ids) - PAGE_SIZE)
+        # Cursor = id da última mensagem da página anterior; OFFSET = mensagens mais novas que ele
+        middles.append((hot_ids[position], len(hot_ids) - position))
+    latest = database.execute_sql('SELECT MAX(id) AS id FROM messages', fetch=True)[0]['id']
+
+    _measure('envio', args.samples, lambda i: messaging.send_message(
+        picks[i], pairs[picks[i]][i % 2], f'Mensagem de benchmark {i}'))
+    _measure('histórico: primeira página', args.samples, lambda i: messaging.history(
+        picks[i], pairs[picks[i]][0], PAGE_SIZE))
+    print(f'(conversa longa: {len(hot_ids):,} mensagens)')
+    _measure('histórico: meio (keyset)', args.samples, lambda i: messaging.history(
+        hot, pairs[hot][0], PAGE_SIZE, [middles[i][0]]))
+    _measure('histórico: meio (OFFSET, antes)', args.samples, lambda i: database.execute_sql(
+        LEGACY_HISTORY_SQL, (hot, PAGE_SIZE, middles[i][1]), fetch=True))
+    _measure('caixa de entrada', args.samples, lambda i: messaging.inbox(members[i], PAGE_SIZE))
+    _measure('não lidas (contadores)', args.samples, lambda i: messaging.unread_counts(members[i]))
+    _measure('não lidas (COUNT, antes)', args.samples, lambda i: database.execute_sql(
+        LEGACY_UNREAD_SQL, (members[i], members[i]), fetch=True))
+    _measure('long-poll: mensagens após um id', args.samples, lambda i: messaging._new_messages(
+        members[i], latest - 1000, PAGE_SIZE))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Micro-benchmark do custo das métricas Prometheus (app/services/metrics.py).
+
+Mede, por chamada, os hooks executados em toda requisição (before_request +
+after_request: histograma de latência, contador de status e verificação do
+intervalo dos gauges do pool) e o registro de uma query em execute_sql().
+Por fim compara requisições completas (test client) com e sem os hooks.
+
+Uso (a partir de backend/):
+    python3 -m benchmarks.bench_metrics [--calls 50000]
+
+Para medir o modo multiprocesso do gunicorn (valores em arquivos mmap):
+    PROMETHEUS_MULTIPROC_DIR=$(mktemp -d) python3 -m benchmarks.bench_metrics
+"""
+
+import argparse
+import timeit
+
+from flask import Flask, Response
+
+from app.services import metrics
+
+
+def _report(label, seconds, calls):
+    print(f'{label:<46} {seconds / calls * 1e6:8.2f} µs/chamada')
+
+
+def _app(instrumented):
+    app = Flask(__name__)
+    if instrumented:
+        metrics.init_app(app)
+
+    @app.route('/ping')
+    def ping():
+        return Response('ok')
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=50000)
+    args = parser.parse_args()
+
+    mode = 'multiprocesso (mmap)' if metrics.PROMETHEUS_MULTIPROC_DIR else 'processo único'
+    print(f'Modo: {mode} — {args.calls} chamadas\n')
+
+    app = _app(instrumented=True)
+    response = Response('ok')
+
+    def hooks_once():
+        metrics._start_timer()
+        metrics._record_request(response)
+
+    with app.test_request_context('/ping'):
+        hooks = timeit.timeit(hooks_once, number=args.calls)
+    query = timeit.timeit(lambda: metrics.observe_query('users_login_lookup', 0.0012), number=args.calls)
+    label = timeit.timeit(lambda: metrics.sql_label('SELECT id FROM jobs WHERE id = %s'), number=args.calls)
+    _report('Hooks da requisição (before + after)', hooks, args.calls)
+    _report('observe_query()', query, args.calls)
+    _report('sql_label() (SQL em texto, memoizado)', label, args.calls)
+
+    calls = max(1, args.calls // 10)
+    timings = {}
+    for instrumented in (False, True):
+        client = _app(instrumented).test_client()
+        client.get('/ping')
+        timings[instrumented] = timeit.timeit(lambda: client.get('/ping'), number=calls)
+    print()
+    _report('Requisição completa sem métricas', timings[False], calls)
+    _report('Requisição completa com métricas', timings[True], calls)
+    print(f'\nCusto por requisição: {(timings[True] - timings[False]) / calls * 1e6:.2f} µs')
+
+
+if __name__ == '__main__':
+    main()
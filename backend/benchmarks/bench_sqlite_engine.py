@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark do caminho SQLite (sem DATABASE_URL): motor com conexão persistente
+por thread, WAL e fila de escrita (SQLITE_ENGINE=1) contra o modo antigo, que
+abre e fecha uma conexão a cada execute_sql() (SQLITE_ENGINE=0).
+
+Para cada modo, em um banco temporário com a massa de benchmarks.seed:
+  - leituras: a listagem de vagas em 1, 2, 4 e 8 threads (consultas/s);
+  - escritas: threads gravando usuários ao mesmo tempo que outras leem,
+    contando os erros 'database is locked'.
+
+Uso (a partir de backend/):
+    python3 -m benchmarks.bench_sqlite_engine [--users 10000] [--seconds 3] [--threads 1,2,4,8]
+"""
+
+import argparse
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from app.services import database
+from app.services.sqlite_engine import sqlite_engine
+from benchmarks.seed import seed
+
+READ_SQL = ('SELECT id, title, location, work_modality, level FROM jobs '
+            'WHERE is_active = 1 AND area = %s ORDER BY created_at DESC, id DESC LIMIT 20')
+WRITE_SQL = 'INSERT INTO users (email, password_hash, user_type, name) VALUES (%s, %s, %s, %s)'
+AREAS = ('tecnologia', 'saude', 'educacao', 'financas')
+
+
+def _run_threads(threads, seconds, work):
+    """
+    Executa work(thread_index, deadline) em várias threads e soma as contagens (ok, erros).
+    """
+    results = [None] * threads
+    deadline = time.perf_counter() + seconds
+
+    def target(index):
+        results[index] = work(index, deadline)
+
+    workers = [threading.Thread(target=target, args=(index,)) for index in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return sum(r[0] for r in results), sum(r[1] for r in results)
+
+
+def _reader(index, deadline):
+    count = errors = 0
+    while time.perf_counter() < deadline:
+        try:
+            database.execute_sql(READ_SQL, (AREAS[count % len(AREAS)],), fetch=True)
+            count += 1
+        except sqlite3.OperationalError:
+            errors += 1
+    return count, errors
+
+
+def _writer(index, deadline):
+    count = errors = 0
+    while time.perf_counter() < deadline:
+        try:
+            database.execute_sql(WRITE_SQL, (f'w{index}-{count}-{errors}-{time.perf_counter_ns()}@example.com',
+                                             'x', 'candidate', 'Writer'), commit=True)
+            count += 1
+        except sqlite3.OperationalError:
+            errors += 1
+    return count, errors
+
+
+def bench_mode(engine, args):
+    database.SQLITE_ENGINE = engine
+    database.DATABASE_PATH = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    database.init_database()
+    seed(args.users)
+    journal = database.execute_sql('PRAGMA journal_mode', fetch=True)[0]['journal_mode']
+    label = 'motor (conexão por thread)' if engine else 'conexão por chamada'
+    print(f'\n== {label} — journal_mode={journal}')
+
+    for threads in args.threads:
+        reads, errors = _run_threads(threads, args.seconds, _reader)
+        print(f'leituras  {threads} thread(s): {reads / args.seconds:9.0f} consultas/s  erros={errors}')
+
+    # Escritores nas primeiras threads, leitores nas demais
+    writers = max(1, args.writers)
+    totals = {'escritas': [0, 0], 'leituras': [0, 0]}
+
+    def mixed(index, deadline):
+        kind, work = ('escritas', _writer) if index < writers else ('leituras', _reader)
+        ok, failed = work(index, deadline)
+        totals[kind][0] += ok
+        totals[kind][1] += failed
+        return ok, failed
+
+    _run_threads(writers + args.mixed_readers, args.seconds, mixed)
+    print(f'misto {writers} escritor(es) + {args.mixed_readers} leitor(es): ' + ', '.join(
+        f'{ok / args.seconds:7.0f} {kind}/s (locked={failed})' for kind, (ok, failed) in totals.items()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=10_000)
+    parser.add_argument('--seconds', type=float, default=3)
+    parser.add_argument('--threads', type=lambda value: [int(n) for n in value.split(',')], default=[1, 2, 4, 8])
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--mixed-readers', type=int, default=4)
+    args = parser.parse_args()
+
+    if database.DATABASE_URL:
+        parser.error('benchmark do SQLite: execute sem DATABASE_URL')
+    print(f'CPUs: {os.cpu_count()} — {args.users} usuários, {args.seconds:g}s por medição')
+    for engine in (False, True):
+        bench_mode(engine, args)
+    print(f'\nFila de escrita: {sqlite_engine.stats()["writer_queues"]}')
+
+
+if __name__ == '__main__':
+    main()
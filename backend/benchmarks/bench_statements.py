@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Micro-benchmark do registro de statements (app/services/statements.py).
+
+Compara o custo por chamada de execute_sql() com SQL em texto (tradução de
+placeholders e extração de tabelas a cada chamada) contra um Statement
+registrado (texto do dialeto pronto na importação e, no PostgreSQL, PREPARE
+uma vez por conexão).
+
+Uso (a partir de backend/):
+    python3 -m benchmarks.bench_statements [--calls 20000]
+
+Sem DATABASE_URL o teste roda em um SQLite temporário; com DATABASE_URL
+definida, mede o caminho PostgreSQL (SQL simples x PREPARE/EXECUTE).
+"""
+
+import argparse
+import os
+import tempfile
+import timeit
+
+from flask import Flask
+
+from app.services import database
+from app.services.cache import tables_in
+from app.services.statements import Statement
+
+LOOKUP_SQL = "SELECT id, password_hash, user_type, name FROM users WHERE email = %s;"
+
+
+def _legacy_overhead(sql):
+    # Trabalho que o execute_sql() antigo refazia em toda chamada
+    from psycopg2.extras import RealDictCursor  # noqa: F401
+    if not database.DATABASE_URL:
+        sql = sql.replace('%s', '?')
+    return sql, tables_in(sql)
+
+
+def _report(label, seconds, calls):
+    print(f'{label:<42} {seconds / calls * 1e6:8.2f} µs/chamada')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=20000)
+    args = parser.parse_args()
+
+    if not database.DATABASE_URL:
+        database.DATABASE_PATH = os.path.join(tempfile.mkdtemp(), 'bench_statements.db')
+    database.init_database()
+    database.execute_sql(
+        "INSERT INTO users (email, password_hash, user_type, name) VALUES (%s, %s, %s, %s)",
+        ('bench@example.com', 'x', 'candidate', 'Bench'), commit=True
+    )
+    statement = Statement('bench_users_login_lookup', LOOKUP_SQL, prepare=True)
+    params = ('bench@example.com',)
+
+    print(f"Dialeto: {'PostgreSQL' if database.DATABASE_URL else 'SQLite'} — {args.calls} chamadas\n")
+
+    legacy = timeit.timeit(lambda: _legacy_overhead(LOOKUP_SQL), number=args.calls)
+    compiled = timeit.timeit(lambda: (statement.sqlite_sql, statement.tables), number=args.calls)
+    _report('Preparação do SQL (antes)', legacy, args.calls)
+    _report('Preparação do SQL (Statement)', compiled, args.calls)
+
+    # Chamadas completas reutilizando a conexão da requisição, como nas rotas
+    app = Flask(__name__)
+    app.teardown_appcontext(database.release_request_connection)
+    with app.app_context():
+        database.execute_sql(statement, params, fetch=True)  # aquece o PREPARE
+        raw = timeit.timeit(lambda: database.execute_sql(LOOKUP_SQL, params, fetch=True), number=args.calls)
+        prepared = timeit.timeit(lambda: database.execute_sql(statement, params, fetch=True), number=args.calls)
+    print()
+    _report('execute_sql() com SQL em texto', raw, args.calls)
+    _report('execute_sql() com Statement', prepared, args.calls)
+    print(f'\nGanho por chamada: {(raw - prepared) / args.calls * 1e6:.2f} µs ({(1 - prepared / raw) * 100:.1f}%)')
+
+
+if __name__ == '__main__':
+    main()
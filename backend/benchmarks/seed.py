@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Massa de dados sintética para os benchmarks (usuários, perfis, vagas, cursos e candidaturas).
+
+As linhas são geradas de forma determinística (--seed) e gravadas com
+insert_many() (executemany no SQLite, COPY no PostgreSQL) em uma única
+transação. Todos os usuários compartilham a mesma senha, com um único hash
+calculado no início (o PBKDF2 de cada login continua sendo medido).
+
+Uso (a partir de backend/):
+    python3 -m benchmarks.seed --users 100000
+
+Sem DATABASE_URL os dados vão para o SQLite de DATABASE_PATH; com
+DATABASE_URL, para o PostgreSQL informado (use um banco local descartável).
+"""
+
+import argparse
+import random
+import time
+import uuid
+
+from app.services import database
+from app.services.passwords import hasher
+
+BENCH_PASSWORD = 'bench-password'
+
+# Proporções em relação ao número de usuários (10k usuários -> 2,5k vagas, 500 cursos, 17k candidaturas)
+USER_TYPES = (('candidate', 0.85), ('company', 0.10), ('institution', 0.05))
+JOBS_PER_USER = 0.25
+COURSES_PER_USER = 0.05
+APPLICATIONS_PER_CANDIDATE = 2
+
+AREAS = ('tecnologia', 'saude', 'educacao', 'financas', 'marketing', 'vendas', 'engenharia', 'juridico')
+LEVELS = ('estagio', 'junior', 'pleno', 'senior', 'especialista')
+MODALITIES = ('presencial', 'remoto', 'hibrido')
+JOB_TYPES = ('clt', 'pj', 'estagio', 'temporario')
+CITIES = (('São Paulo', 'SP'), ('Rio de Janeiro', 'RJ'), ('Belo Horizonte', 'MG'), ('Curitiba', 'PR'),
+          ('Porto Alegre', 'RS'), ('Recife', 'PE'), ('Salvador', 'BA'), ('Fortaleza', 'CE'))
+SKILLS = ('python', 'sql', 'excel', 'java', 'react', 'vendas', 'atendimento', 'gestao', 'ingles', 'contabilidade',
+          'marketing digital', 'figma', 'docker', 'enfermagem', 'logistica', 'libras')
+WORDS = ('analista', 'desenvolvedor', 'assistente', 'coordenador', 'gerente', 'técnico', 'consultor', 'especialista',
+         'dados', 'sistemas', 'comercial', 'financeiro', 'pessoas', 'projetos', 'clientes', 'operações')
+COURSE_CATEGORIES = ('tecnologia', 'gestao', 'idiomas', 'saude', 'design', 'financas')
+
+# Linhas por chamada de insert_many() (limita a memória em escalas de 1M)
+BATCH_SIZE = 20_000
+
+
+def _title(rng, words=3):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def _batches(rows):
+    for start in range(0, len(rows), BATCH_SIZE):
+        yield rows[start:start + BATCH_SIZE]
+
+
+def _insert(table, columns, rows):
+    for batch in _batches(rows):
+        database.insert_many(table, columns, batch)
+
+
+def seed(users=10_000, seed_value=42, prefix=None):
+    """
+    Gera e grava a massa de dados.
+
+    :param users: Número de usuários (as demais tabelas são proporcionais).
+    :param prefix: Prefixo dos e-mails (padrão: aleatório, permite várias cargas no mesmo banco).
+    :return: {'prefix', 'password', 'candidates', 'companies', 'institutions', 'jobs', 'courses', 'rows'}
+             com os ids de cada grupo.
+    """
+    rng = random.Random(seed_value)
+    prefix = prefix or f'bench-{uuid.uuid4().hex[:8]}'
+    password_hash = hasher.hash(BENCH_PASSWORD)
+
+    counts = {user_type: int(users * share) for user_type, share in USER_TYPES}
+    counts['candidate'] += users - sum(counts.values())
+
+    with database.transaction():
+        user_rows = []
+        for user_type, count in counts.items():
+            for index in range(count):
+                user_rows.append((f'{prefix}-{user_type}-{index}@example.com', password_hash, user_type,
+                                  f'{user_type.capitalize()} {index}', None))
+        _insert('users', ('email', 'password_hash', 'user_type', 'name', 'phone'), user_rows)
+
+        ids = {user_type: [] for user_type in counts}
+        for row in database.execute_sql('SELECT id, user_type FROM users WHERE email LIKE %s ORDER BY id',
+                                        (f'{prefix}-%',), fetch=True):
+            ids[row['user_type']].append(row['id'])
+
+        profiles = []
+        for user_id in ids['candidate']:
+            city, state = rng.choice(CITIES)
+            profiles.append((user_id, _title(rng, 2), rng.choice(AREAS), rng.choice(LEVELS), rng.choice(MODALITIES),
+                             city, state, ', '.join(rng.sample(SKILLS, rng.randint(2, 6))),
+                             rng.randint(0, 25), rng.randint(15, 200) * 100))
+        _insert('candidate_profiles', ('user_id', 'professional_title', 'sector', 'level', 'work_modality',
+                                       'address_city', 'address_state', 'skills', 'experience_years',
+                                       'salary_expectation'), profiles)
+        _insert('company_profiles', ('user_id', 'sector'),
+                [(user_id, rng.choice(AREAS)) for user_id in ids['company']])
+        _insert('institution_profiles', ('user_id', 'institution_type'),
+                [(user_id, 'universidade') for user_id in ids['institution']])
+
+        job_rows = []
+        for _ in range(int(users * JOBS_PER_USER)):
+            city, state = rng.choice(CITIES)
+            job_rows.append((rng.choice(ids['company']), _title(rng), _title(rng, 12),
+                             ', '.join(rng.sample(SKILLS, 3)), f'{city} - {state}', rng.choice(MODALITIES),
+                             rng.choice(JOB_TYPES), rng.choice(AREAS), rng.choice(LEVELS), rng.random() < 0.05))
+        _insert('jobs', ('company_id', 'title', 'description', 'requirements', 'location', 'work_modality',
+                         'job_type', 'area', 'level', 'is_featured'), job_rows)
+
+        course_rows = [
+            (rng.choice(ids['institution']), _title(rng), _title(rng, 10), rng.choice(COURSE_CATEGORIES),
+             rng.choice(LEVELS), rng.choice(MODALITIES), f'{rng.randint(4, 400)}h', rng.random() < 0.4)
+            for _ in range(int(users * COURSES_PER_USER))
+        ]
+        _insert('courses', ('institution_id', 'title', 'description', 'category', 'level', 'modality',
+                            'duration', 'is_free'), course_rows)
+
+        job_ids = [row['id'] for row in database.execute_sql(
+            'SELECT id FROM jobs WHERE company_id IN (SELECT id FROM users WHERE email LIKE %s) ORDER BY id',
+            (f'{prefix}-%',), fetch=True)]
+        course_ids = [row['id'] for row in database.execute_sql(
+            'SELECT id FROM courses WHERE institution_id IN (SELECT id FROM users WHERE email LIKE %s) ORDER BY id',
+            (f'{prefix}-%',), fetch=True)]
+
+        applications = set()
+        for candidate_id in ids['candidate']:
+            for job_id in rng.sample(job_ids, min(APPLICATIONS_PER_CANDIDATE, len(job_ids))):
+                applications.add((job_id, candidate_id))
+        _insert('applications', ('job_id', 'candidate_id'), sorted(applications))
+
+    return {
+        'prefix': prefix,
+        'password': BENCH_PASSWORD,
+        'candidates': ids['candidate'],
+        'companies': ids['company'],
+        'institutions': ids['institution'],
+        'jobs': job_ids,
+        'courses': course_ids,
+        'rows': (len(user_rows) + len(profiles) + len(ids['company']) + len(ids['institution'])
+                 + len(job_rows) + len(course_rows) + len(applications)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=10_000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    database.init_database()
+    started = time.perf_counter()
+    result = seed(args.users, args.seed)
+    elapsed = time.perf_counter() - started
+    print(f"{result['rows']} linhas ({result['prefix']}) em {elapsed:.1f}s "
+          f"— {len(result['jobs'])} vagas, {len(result['courses'])} cursos")
+
+
+if __name__ == '__main__':
+    main()
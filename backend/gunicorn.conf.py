@@ -0,0 +1,54 @@
+# backend/gunicorn.conf.py
+# Carregado automaticamente pelo gunicorn (startCommand executado em backend/)
+import os
+import shutil
+
+# ----------------------------------------------------------------
+# Métricas Prometheus em modo multiprocesso (app/services/metrics.py)
+# ----------------------------------------------------------------
+
+# Definido antes do fork: os workers herdam a variável e gravam seus valores neste diretório
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/claunnetworking-metrics')
+
+
+def on_starting(server):
+    # Arquivos de uma execução anterior somariam valores antigos aos contadores
+    directory = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory, exist_ok=True)
+
+
+def child_exit(server, worker):
+    # Remove os gauges "livesum" do worker encerrado (contadores e histogramas são mantidos)
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
+
+# ----------------------------------------------------------------
+# Workers gevent: conexões ociosas do stream SSE (/api/jobs/stream) não ocupam um worker
+# ----------------------------------------------------------------
+
+# 'sync' ou 'gthread' voltam ao modelo de uma requisição por worker/thread
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gevent')
+
+# Conexões simultâneas por worker gevent (inclui os assinantes do stream)
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 2000))
+
+# Os workers herdam o valor: com gevent, pool.default_pool_size() dimensiona o pool do
+# PostgreSQL por greenlet, limitado por DB_MAX_CONNECTIONS / WEB_CONCURRENCY (ou DB_POOL_MAX)
+os.environ.setdefault('GUNICORN_WORKER_CONNECTIONS', str(worker_connections))
+
+
+def when_ready(server):
+    # Sem limite explícito, cada worker abriria até worker_connections conexões no PostgreSQL
+    if (worker_class == 'gevent' and os.environ.get('DATABASE_URL')
+            and not (os.environ.get('DB_MAX_CONNECTIONS') or os.environ.get('DB_POOL_MAX'))):
+        server.log.warning('Workers gevent sem DB_MAX_CONNECTIONS nem DB_POOL_MAX: o pool do PostgreSQL '
+                           'cresce até %s conexões por worker', worker_connections + 1)
+
+
+def post_fork(server, worker):
+    # O gunicorn já aplicou o monkey patch do gevent; o psycopg2 (extensão C) precisa
+    # do callback de espera para ceder a vez às outras greenlets durante as queries
+    if worker_class == 'gevent':
+        from psycogreen.gevent import patch_psycopg
+        patch_psycopg()
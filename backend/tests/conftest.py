@@ -0,0 +1,51 @@
+# backend/tests/conftest.py
+import os
+import sys
+import tempfile
+import uuid
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services import database  # noqa: E402
+
+# Banco SQLite descartável, definido antes de create_app() aplicar as migrações
+database.DATABASE_PATH = os.path.join(tempfile.mkdtemp(), 'test.db')
+
+from app import create_app  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def app():
+    app = create_app()
+    # Em modo de teste, estourar um @query_budget levanta QueryBudgetExceeded
+    app.testing = True
+    return app
+
+
+@pytest.fixture
+def make_user(app):
+    """
+    Cria um usuário direto no banco (sem o hashing do cadastro) e retorna o id.
+    """
+    def make(user_type='candidate', name=None):
+        return database.execute_sql(
+            'INSERT INTO users (email, password_hash, user_type, name) VALUES (%s, %s, %s, %s) RETURNING id',
+            (f'{uuid.uuid4().hex}@example.com', 'x', user_type, name or user_type.capitalize()),
+            fetch=True, commit=True)[0]['id']
+    return make
+
+
+@pytest.fixture
+def login(app):
+    """
+    Test client com a sessão de um usuário já autenticado.
+    """
+    def client_for(user_id, user_type='candidate'):
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session['user_id'] = user_id
+            session['user_type'] = user_type
+        return client
+    return client_for
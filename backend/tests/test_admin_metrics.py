@@ -0,0 +1,43 @@
+# backend/tests/test_admin_metrics.py
+from app.services import metric_rollups
+from app.services.database import execute_sql
+
+
+def _metrics(login, admin_id):
+    response = login(admin_id, 'admin').get('/api/admin/metrics?days=7')
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
+
+
+def test_writes_only_append_deltas(make_user):
+    before = execute_sql('SELECT COUNT(*) AS total FROM metrics_totals', fetch=True)[0]['total']
+    make_user('candidate')
+    assert execute_sql("SELECT COUNT(*) AS total FROM metrics_deltas WHERE metric = 'users'",
+                       fetch=True)[0]['total'] >= 1
+    # Nenhuma linha de rollup é tocada pelo escritor (apenas pelo fold)
+    assert execute_sql('SELECT COUNT(*) AS total FROM metrics_totals', fetch=True)[0]['total'] == before
+
+
+def test_metrics_are_the_same_before_and_after_fold(login, make_user):
+    admin_id = make_user('admin')
+    metric_rollups.fold()
+    start = _metrics(login, admin_id)
+
+    company_id = make_user('company')
+    candidate_id = make_user('candidate')
+    job_ids = [execute_sql('INSERT INTO jobs (company_id, title) VALUES (%s, %s) RETURNING id',
+                           (company_id, f'Vaga {index}'), fetch=True, commit=True)[0]['id'] for index in range(2)]
+    execute_sql('INSERT INTO applications (job_id, candidate_id) VALUES (%s, %s)', (job_ids[0], candidate_id),
+                commit=True)
+    execute_sql('UPDATE jobs SET is_active = FALSE WHERE id = %s', (job_ids[1],), commit=True)
+
+    pending = _metrics(login, admin_id)
+    assert pending['totals']['users']['total'] == start['totals']['users']['total'] + 2
+    assert pending['totals']['jobs']['active'] == start['totals']['jobs']['active'] + 1
+    assert pending['totals']['applications']['total'] == start['totals']['applications']['total'] + 1
+    assert pending['period_totals']['jobs'] == start['period_totals']['jobs'] + 2
+
+    assert metric_rollups.fold() > 0
+    assert execute_sql('SELECT COUNT(*) AS total FROM metrics_deltas', fetch=True)[0]['total'] == 0
+    assert _metrics(login, admin_id) == pending
+    assert metric_rollups.fold() == 0
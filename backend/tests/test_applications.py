@@ -0,0 +1,66 @@
+# backend/tests/test_applications.py
+import pytest
+
+from app.services.database import execute_sql
+
+
+@pytest.fixture
+def jobs(make_user):
+    company_id = make_user('company')
+    return [execute_sql('INSERT INTO jobs (company_id, title) VALUES (%s, %s) RETURNING id',
+                        (company_id, f'Vaga {index}'), fetch=True, commit=True)[0]['id'] for index in range(2)]
+
+
+def _applications(candidate_id):
+    return execute_sql('SELECT id, job_id FROM applications WHERE candidate_id = %s', (candidate_id,), fetch=True)
+
+
+@pytest.mark.parametrize('kwargs', [
+    {},
+    {'data': 'job_id=1', 'content_type': 'application/x-www-form-urlencoded'},
+    {'json': {}},
+    {'json': {'job_id': 'abc'}},
+    {'json': {'job_id': None}},
+    {'json': [1]},
+])
+def test_invalid_body_is_rejected(login, make_user, kwargs):
+    response = login(make_user()).post('/api/jobs/apply', **kwargs)
+    assert response.status_code == 400, response.get_json()
+    assert 'job_id' in response.get_json()['error']
+
+
+def test_same_key_replays_the_original_application(login, make_user, jobs):
+    candidate_id = make_user()
+    client = login(candidate_id)
+    headers = {'Idempotency-Key': 'retry-1'}
+    first = client.post('/api/jobs/apply', json={'job_id': jobs[0]}, headers=headers)
+    assert first.status_code == 201 and 'Idempotent-Replayed' not in first.headers
+
+    replay = client.post('/api/jobs/apply', json={'job_id': jobs[0]}, headers=headers)
+    assert replay.status_code == 201
+    assert replay.headers['Idempotent-Replayed'] == 'true'
+    assert replay.get_json()['application_id'] == first.get_json()['application_id']
+    assert len(_applications(candidate_id)) == 1
+
+
+def test_same_key_for_another_job_is_rejected(login, make_user, jobs):
+    candidate_id = make_user()
+    client = login(candidate_id)
+    headers = {'Idempotency-Key': 'retry-2'}
+    assert client.post('/api/jobs/apply', json={'job_id': jobs[0]}, headers=headers).status_code == 201
+    response = client.post('/api/jobs/apply', json={'job_id': jobs[1]}, headers=headers)
+    assert response.status_code == 422, response.get_json()
+    assert [row['job_id'] for row in _applications(candidate_id)] == [jobs[0]]
+
+
+def test_duplicate_without_key_and_unknown_job(login, make_user, jobs):
+    candidate_id = make_user()
+    client = login(candidate_id)
+    assert client.post('/api/jobs/apply', json={'job_id': jobs[0]}).status_code == 201
+    response = client.post('/api/jobs/apply', json={'job_id': jobs[0]})
+    assert response.status_code == 400 and 'já se candidatou' in response.get_json()['error']
+    # Outra chave para uma vaga já candidatada também é duplicata, não um replay
+    assert client.post('/api/jobs/apply', json={'job_id': jobs[0]},
+                       headers={'Idempotency-Key': 'nova'}).status_code == 400
+    assert client.post('/api/jobs/apply', json={'job_id': 999999}).status_code == 404
+    assert len(_applications(candidate_id)) == 1
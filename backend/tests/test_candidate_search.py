@@ -0,0 +1,31 @@
+# backend/tests/test_candidate_search.py
+import uuid
+
+from app.services.database import execute_sql
+
+
+def test_first_page_carries_exact_facets(login, make_user):
+    sector = f'Setor {uuid.uuid4().hex[:8]}'
+    candidate_ids = []
+    for index in range(5):
+        candidate_id = make_user('candidate')
+        execute_sql('INSERT INTO candidate_profiles (user_id, skills, sector, level, work_modality, address_state) '
+                    'VALUES (%s, %s, %s, %s, %s, %s)',
+                    (candidate_id, 'python, sql' if index % 2 else 'python', sector,
+                     'pleno' if index < 3 else 'senior', 'remoto', 'SP'), commit=True)
+        execute_sql('UPDATE users SET profile_public = TRUE WHERE id = %s', (candidate_id,), commit=True)
+        candidate_ids.append(candidate_id)
+    client = login(make_user('company'), 'company')
+
+    body = client.get(f'/api/candidates/search?sector={sector}&limit=2').get_json()
+    # Contagens sobre todos os candidatos filtrados, não só sobre a página
+    assert body['total'] == 5
+    assert body['facets']['sector'] == [{'value': sector, 'count': 5}]
+    assert body['facets']['level'] == [{'value': 'pleno', 'count': 3}, {'value': 'senior', 'count': 2}]
+    assert {'value': 'sql', 'count': 2} in body['facets']['skills']
+    assert [row['user_id'] for row in body['candidates']] == candidate_ids[::-1][:2]
+    assert set(body['candidates'][0]) >= {'user_id', 'name', 'sector'} and 'facet' not in body['candidates'][0]
+
+    rest = client.get(f"/api/candidates/search?sector={sector}&limit=10&cursor={body['next_cursor']}").get_json()
+    assert [row['user_id'] for row in rest['candidates']] == candidate_ids[::-1][2:]
+    assert 'facets' not in rest and rest['next_cursor'] is None
@@ -0,0 +1,75 @@
+# backend/tests/test_facets.py
+import uuid
+
+from app.services.database import execute_sql
+
+
+def _facets(app, **args):
+    response = app.test_client().get('/api/jobs/facets', query_string=args)
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
+
+
+def _counts(result, facet):
+    return {item['value']: item['count'] for item in result['facets'][facet]}
+
+
+def test_job_counters_follow_inserts_updates_and_deletes(app, make_user):
+    company_id = make_user('company')
+    # Localização e título únicos isolam as vagas deste teste das demais no banco
+    token = uuid.uuid4().hex[:12]
+    location = f'Cidade {token}'
+
+    def insert(area, modality, expires_at=None):
+        return execute_sql('INSERT INTO jobs (company_id, title, area, work_modality, location, expires_at) '
+                           'VALUES (%s, %s, %s, %s, %s, %s) RETURNING id',
+                           (company_id, f'Vaga {token}', area, modality, location, expires_at),
+                           fetch=True, commit=True)[0]['id']
+
+    ids = [insert('Tecnologia', 'remoto'), insert('Tecnologia', 'presencial'), insert('Dados', 'remoto'),
+           insert('Dados', 'hibrido'), insert('Vendas', 'remoto')]
+    insert('Tecnologia', 'remoto', expires_at='2000-01-01')
+    execute_sql("UPDATE jobs SET area = 'Tecnologia' WHERE id = %s", (ids[2],), commit=True)
+    execute_sql('UPDATE jobs SET is_active = FALSE WHERE id = %s', (ids[3],), commit=True)
+    execute_sql('DELETE FROM jobs WHERE id = %s', (ids[4],), commit=True)
+
+    counters = _facets(app, location=token)
+    assert _counts(counters, 'area') == {'Tecnologia': 3}
+    assert _counts(counters, 'modality') == {'remoto': 2, 'presencial': 1}
+    assert _counts(counters, 'location') == {location: 3}
+    assert counters['total'] == 3
+
+    # A busca textual conta sobre as próprias vagas: os contadores precisam bater com ela
+    searched = _facets(app, location=token, q=token)
+    assert searched['facets'] == counters['facets'] and searched['total'] == counters['total']
+
+    # Filtro de uma faceta não restringe a contagem dela mesma
+    filtered = _facets(app, location=token, modality='presencial')
+    assert _counts(filtered, 'modality') == {'remoto': 2, 'presencial': 1}
+    assert _counts(filtered, 'area') == {'Tecnologia': 1}
+
+
+def test_course_counters_match_the_catalog(app, make_user):
+    institution_id = make_user('institution')
+    for category, is_free in (('Tecnologia', True), ('Tecnologia', False), (None, None)):
+        execute_sql('INSERT INTO courses (institution_id, title, category, level, modality, is_free) '
+                    'VALUES (%s, %s, %s, %s, %s, %s)',
+                    (institution_id, 'Curso', category, 'basico', 'online', is_free), commit=True)
+    execute_sql('UPDATE courses SET is_active = FALSE WHERE institution_id = %s AND is_free = FALSE',
+                (institution_id,), commit=True)
+
+    counters = execute_sql('''
+        SELECT category, level, modality, is_free, SUM(total) AS total FROM course_facet_counts
+        GROUP BY category, level, modality, is_free HAVING SUM(total) > 0
+    ''', fetch=True)
+    catalog = execute_sql('''
+        SELECT COALESCE(category, '') AS category, COALESCE(level, '') AS level,
+               COALESCE(modality, '') AS modality, COALESCE(is_free, FALSE) AS is_free, COUNT(*) AS total
+        FROM courses WHERE is_active = TRUE GROUP BY 1, 2, 3, 4
+    ''', fetch=True)
+
+    def normalized(rows):
+        return sorted((row['category'], row['level'], row['modality'], bool(row['is_free']), int(row['total']))
+                      for row in rows)
+
+    assert normalized(counters) == normalized(catalog)
@@ -0,0 +1,108 @@
+# backend/tests/test_gevent.py
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+pytest.importorskip('gevent')
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_patched(script, *args, **env):
+    """
+    Executa o script em um processo com o monkey patch do gevent aplicado antes de qualquer
+    import, como nos workers gevent do gunicorn (o patch não pode ser desfeito neste processo).
+    """
+    source = 'from gevent import monkey\nmonkey.patch_all()\n' + textwrap.dedent(script)
+    # None remove a variável do ambiente herdado
+    env = {key: value for key, value in {**os.environ, **env}.items() if value is not None}
+    result = subprocess.run([sys.executable, '-c', source, *args], cwd=BACKEND_DIR, capture_output=True,
+                            text=True, timeout=120, env=env)
+    assert result.returncode == 0, result.stderr
+    return result.stdout
+
+
+def test_sqlite_engine_reuses_connections_across_greenlets(tmp_path):
+    run_patched('''
+        import sys
+        import gevent
+        from gevent.pool import Pool
+        from flask import Flask
+        from app.services import database
+        from app.services.sqlite_engine import sqlite_engine
+
+        database.DATABASE_PATH = sys.argv[1]
+        database.init_database()
+        app = Flask(__name__)
+        app.teardown_appcontext(database.release_request_connection)
+
+        def request(index):
+            # Uma "requisição": escreve em transação e lê, cedendo a vez no meio
+            with app.app_context():
+                with database.transaction():
+                    database.execute_sql('INSERT INTO users (email, password_hash, user_type, name) '
+                                         'VALUES (%s, %s, %s, %s)',
+                                         (f'g{index}@example.com', 'x', 'candidate', 'G'), commit=True)
+                    gevent.sleep(0)
+                rows = database.execute_sql('SELECT COUNT(*) AS n FROM users WHERE email LIKE %s',
+                                            ('g%@example.com',), fetch=True)
+                assert rows[0]['n'] >= 1
+
+        Pool(20).map(request, range(500))
+        count = database.execute_sql('SELECT COUNT(*) AS n FROM users', fetch=True)[0]['n']
+        assert count == 500, count
+        opened = sqlite_engine.stats()['connections_opened']
+        # Uma conexão por greenlet simultânea (mais a das migrações), não uma por requisição
+        assert opened <= 22, opened
+    ''', str(tmp_path / 'gevent.db'), DATABASE_URL=None)
+
+
+def test_hasher_does_not_block_other_greenlets():
+    run_patched('''
+        import time
+        import gevent
+        from app.services.passwords import PasswordHasher, needs_rehash
+
+        hasher = PasswordHasher(workers=2, queue_limit=8, timeout=60)
+        gaps = []
+
+        def heartbeat():
+            last = time.perf_counter()
+            while True:
+                gevent.sleep(0.01)
+                now = time.perf_counter()
+                gaps.append(now - last)
+                last = now
+
+        def login(index):
+            password_hash = hasher.hash(f'senha-{index}')
+            assert not needs_rehash(password_hash)
+            assert hasher.verify(password_hash, f'senha-{index}')
+            assert not hasher.verify(password_hash, 'outra')
+
+        beat = gevent.spawn(heartbeat)
+        gevent.joinall([gevent.spawn(login, index) for index in range(4)], raise_error=True)
+        beat.kill()
+        assert hasher.completed == 12, hasher.completed
+        # Cada hash leva centenas de ms: executado no processo, pararia o loop do gevent
+        assert gaps and max(gaps) < 0.2, max(gaps)
+    ''')
+
+
+def test_pool_size_follows_worker_connections():
+    output = run_patched('''
+        from app.services.pool import default_pool_size, gevent_active
+        assert gevent_active()
+        print(default_pool_size())
+    ''', GUNICORN_WORKER_CONNECTIONS='200', DB_MAX_CONNECTIONS='90', WEB_CONCURRENCY='2',
+        DB_POOL_MAX=None, DB_POOL_MIN=None)
+    assert output.strip() == '(1, 45)'
+
+    output = run_patched('''
+        from app.services.pool import default_pool_size
+        print(default_pool_size())
+    ''', GUNICORN_WORKER_CONNECTIONS='30', DB_MAX_CONNECTIONS=None, DB_POOL_MAX=None, DB_POOL_MIN=None)
+    assert output.strip() == '(1, 31)'
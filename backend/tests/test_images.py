@@ -0,0 +1,88 @@
+# backend/tests/test_images.py
+import io
+import os
+import random
+
+import pytest
+from PIL import Image
+
+from app.services import images
+from app.services.images import build_variants, choose_variant, parse_width_hint
+from app.services.static_assets import IMAGE_VARY, StaticAssets, build
+
+VARIANTS = [{'width': width, 'type': mime, 'file': f'logo.png.{width}w.{mime}', 'size': width}
+            for width in (160, 320, 640) for mime in ('image/avif', 'image/webp', 'image/png')]
+
+
+def _noise(path, width, height):
+    # Ruído não comprime bem: as variantes menores ficam abaixo do tamanho do original
+    generator = random.Random(width)
+    image = Image.new('RGB', (width, height))
+    image.putdata([tuple(generator.randrange(256) for _ in range(3)) for _ in range(width * height)])
+    image.save(path, format='PNG')
+
+
+def _open(data):
+    return Image.open(io.BytesIO(data))
+
+
+def test_best_accepted_format_at_the_next_width(monkeypatch):
+    monkeypatch.setattr(images, 'IMAGE_FORMATS', {'avif': ('image/avif', {}), 'webp': ('image/webp', {})})
+    assert choose_variant(VARIANTS, 'image/avif,image/webp,*/*', 300) == VARIANTS[3]
+    assert choose_variant(VARIANTS, 'image/webp,*/*;q=0.8', 160)['type'] == 'image/webp'
+    assert choose_variant(VARIANTS, 'image/avif;q=0,image/webp', 161) == VARIANTS[4]
+    # Sem AVIF/WebP no Accept: o formato original redimensionado
+    assert choose_variant(VARIANTS, 'image/png,image/*;q=0.8', 640) == VARIANTS[8]
+    # Maior que todas as larguras: a maior disponível; sem dica: IMAGE_DEFAULT_WIDTH
+    assert choose_variant(VARIANTS, 'image/webp', 4000)['width'] == 640
+    assert choose_variant(VARIANTS, 'image/webp', None)['width'] == 640
+    assert choose_variant([], 'image/webp', 100) is None
+
+
+def test_width_hints():
+    assert parse_width_hint('300', {}) == 300
+    assert parse_width_hint(None, {'Sec-CH-Width': '412'}) == 412
+    assert parse_width_hint('abc', {'Width': '200'}) == 200
+    assert parse_width_hint(None, {'Sec-CH-Viewport-Width': '400', 'Sec-CH-DPR': '2.5'}) == 1000
+    assert parse_width_hint('100000', {}) == images.IMAGE_MAX_HINT
+    assert parse_width_hint(None, {'Sec-CH-Viewport-Width': 'x'}) is None
+    assert parse_width_hint(None, {}) is None
+
+
+def test_build_variants_never_exceed_the_original(tmp_path, monkeypatch):
+    monkeypatch.setattr(images, 'IMAGE_WIDTHS', (32, 64, 1024))
+    source = tmp_path / 'foto.png'
+    _noise(source, 96, 48)
+    written = {}
+    variants = build_variants('img/foto.png', str(source), 'image/png', written.__setitem__)
+    assert variants and set(written) == {variant['file'] for variant in variants}
+    # Larguras acima da original viram a própria largura da imagem
+    assert {variant['width'] for variant in variants} <= {32, 64, 96}
+    assert all(variant['size'] < os.path.getsize(source) for variant in variants)
+    for variant in variants:
+        with _open(written[variant['file']]) as image:
+            assert image.size[0] == variant['width']
+
+
+@pytest.mark.skipif(not images.IMAGE_FORMATS.get('webp'), reason='Pillow sem WebP')
+def test_static_response_negotiates_variant_and_etag(app, tmp_path, monkeypatch):
+    monkeypatch.setattr(images, 'IMAGE_WIDTHS', (32, 64))
+    root = tmp_path / 'frontend'
+    root.mkdir()
+    _noise(root / 'foto.png', 64, 32)
+    build(str(root), str(tmp_path / 'build'))
+    assets = StaticAssets(str(root), str(tmp_path / 'build'))
+
+    def get(**headers):
+        with app.test_request_context('/foto.png?w=30', headers=headers):
+            return assets.response('foto.png')
+
+    webp = get(Accept='image/webp')
+    assert webp.status_code == 200 and webp.content_type == 'image/webp'
+    assert webp.headers['Vary'] == IMAGE_VARY and webp.headers['ETag'].endswith('-32w-webp"')
+    assert _open(webp.get_data()).size == (32, 16)
+    original = get(Accept='image/png')
+    assert original.content_type == 'image/png' and original.headers['ETag'] != webp.headers['ETag']
+    # Só a mesma variante revalida com 304
+    assert get(Accept='image/webp', **{'If-None-Match': webp.headers['ETag']}).status_code == 304
+    assert get(Accept='image/png', **{'If-None-Match': webp.headers['ETag']}).status_code == 200
@@ -0,0 +1,108 @@
+# backend/tests/test_job_import.py
+import json
+
+import pytest
+
+from app.services import job_import
+from app.services.database import DATABASE_URL, execute_sql
+
+
+def _import(client, body, content_type):
+    return client.post('/api/jobs/import', data=body.encode('utf-8'), content_type=content_type)
+
+
+def _jobs(company_id):
+    return execute_sql('SELECT id, title, expires_at FROM jobs WHERE company_id = %s ORDER BY id',
+                       (company_id,), fetch=True)
+
+
+def _imported_events(company_id):
+    events = execute_sql("SELECT payload FROM outbox WHERE event_type = 'jobs.imported' ORDER BY id", fetch=True)
+    payloads = [json.loads(event['payload']) for event in events]
+    return [payload['job_ids'] for payload in payloads if payload['company_id'] == company_id]
+
+
+def test_csv_import_reports_row_errors(login, make_user):
+    company_id = make_user('company')
+    body = ('title;area;expires_at\n'
+            'Dev Python;Tecnologia;2030-01-31\n'
+            ';Tecnologia;\n'
+            'Dev Flask;Tecnologia;31/01/2030\n'
+            'Analista;Dados;\n')
+    response = _import(login(company_id, 'company'), body, 'text/csv; charset=utf-8')
+    assert response.status_code == 201, response.get_json()
+    result = response.get_json()
+    assert (result['imported'], result['failed']) == (2, 2)
+    assert [error['line'] for error in result['errors']] == [3, 4]
+    jobs = _jobs(company_id)
+    assert [job['title'] for job in jobs] == ['Dev Python', 'Analista']
+    assert str(jobs[0]['expires_at']).startswith('2030-01-31')
+
+
+def test_ndjson_import_and_unknown_header(login, make_user):
+    company_id = make_user('company')
+    client = login(company_id, 'company')
+    body = '\n'.join([json.dumps({'title': 'Dev Go', 'level': 'senior'}), '{quebrado', '[1, 2]',
+                      json.dumps({'title': 'Dev Rust', 'salario': '10k'}), ''])
+    result = _import(client, body, 'application/x-ndjson').get_json()
+    assert (result['imported'], result['failed']) == (1, 3)
+    assert [error['line'] for error in result['errors']] == [2, 3, 4]
+
+    response = _import(client, 'titulo,area\nDev,TI\n', 'text/csv')
+    assert response.status_code == 400 and 'titulo' in response.get_json()['error']
+    assert _import(client, '{}', 'application/json').status_code == 400
+    assert [job['title'] for job in _jobs(company_id)] == ['Dev Go']
+
+
+def test_row_limit_rolls_back_the_import(login, make_user, monkeypatch):
+    company_id = make_user('company')
+    monkeypatch.setattr(job_import, 'JOB_IMPORT_MAX_ROWS', 3)
+    monkeypatch.setattr(job_import, 'JOB_IMPORT_BATCH_SIZE', 2)
+    body = 'title\n' + ''.join(f'Vaga {index}\n' for index in range(4))
+    response = _import(login(company_id, 'company'), body, 'text/csv')
+    assert response.status_code == 400 and '3 linhas' in response.get_json()['error']
+    # O lote já gravado e o seu evento são desfeitos junto com a importação
+    assert _jobs(company_id) == [] and _imported_events(company_id) == []
+
+
+def test_only_companies_can_import(app, login, make_user):
+    body = 'title\nDev\n'
+    assert _import(app.test_client(), body, 'text/csv').status_code == 401
+    for user_type in ('candidate', 'institution'):
+        user_id = make_user(user_type)
+        response = _import(login(user_id, user_type), body, 'text/csv')
+        assert response.status_code == 403, response.get_json()
+        assert _jobs(user_id) == []
+
+
+def test_each_batch_enqueues_its_job_ids(login, make_user, monkeypatch):
+    company_id = make_user('company')
+    monkeypatch.setattr(job_import, 'JOB_IMPORT_BATCH_SIZE', 2)
+    body = 'title\n' + ''.join(f'Vaga {index}\n' for index in range(5))
+    assert _import(login(company_id, 'company'), body, 'text/csv').get_json()['imported'] == 5
+    batches = _imported_events(company_id)
+    assert [len(job_ids) for job_ids in batches] == [2, 2, 1]
+    assert [job_id for job_ids in batches for job_id in job_ids] == [job['id'] for job in _jobs(company_id)]
+
+
+def test_imported_jobs_notify_company_once_per_batch(make_user):
+    from app.services import notifications
+    company_id = make_user('company')
+    records = iter([(2, {'title': 'Dev Python'}), (3, {'title': 'Dev Go'})])
+    assert job_import.import_jobs(company_id, records)['imported'] == 2
+    payload = {'company_id': company_id, 'job_ids': _imported_events(company_id)[0]}
+    messages = notifications.build([{'id': 1, 'event_type': 'jobs.imported', 'payload': payload}])[1]
+    summaries = [message for message in messages if message['subject'] == '2 vagas importadas']
+    assert len(summaries) == 1 and 'Dev Python, Dev Go' in summaries[0]['body']
+
+
+@pytest.mark.skipif(not DATABASE_URL, reason='COPY só existe no PostgreSQL')
+def test_copy_import_keeps_reserved_ids(make_user):
+    company_id = make_user('company')
+    records = iter([(line, {'title': f'Vaga {line}', 'description': ''}) for line in range(2, 7)])
+    assert job_import.import_jobs(company_id, records, batch_size=2)['imported'] == 5
+    jobs = _jobs(company_id)
+    assert [job_id for job_ids in _imported_events(company_id) for job_id in job_ids] == [job['id'] for job in jobs]
+    # Campo vazio vira NULL no COPY
+    assert execute_sql('SELECT COUNT(*) AS total FROM jobs WHERE company_id = %s AND description IS NULL',
+                       (company_id,), fetch=True)[0]['total'] == 5
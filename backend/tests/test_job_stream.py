@@ -0,0 +1,54 @@
+# backend/tests/test_job_stream.py
+import json
+import time
+import uuid
+
+from app.services import job_stream
+from app.services.database import execute_sql
+from app.services.job_stream import JobStreamBroker, Subscriber
+
+JOB = {'event': 'created', 'id': 1, 'title': 'Dev', 'area': 'Tecnologia', 'work_modality': 'Remoto',
+       'location': 'São Paulo - SP'}
+
+
+def test_filters_match_like_the_listing():
+    assert Subscriber({}).matches(JOB)
+    assert Subscriber({'area': ' tecnologia ', 'modality': 'REMOTO'}).matches(JOB)
+    # Localização: trecho, sem diferenciar maiúsculas
+    assert Subscriber({'location': 'paulo'}).matches(JOB)
+    assert not Subscriber({'area': 'Tecno'}).matches(JOB)
+    assert not Subscriber({'area': 'Tecnologia', 'modality': 'presencial'}).matches(JOB)
+    assert not Subscriber({'location': 'Rio'}).matches({**JOB, 'location': None})
+    # Parâmetros desconhecidos ou vazios não filtram
+    assert Subscriber({'area': '', 'title': 'Outro'}).matches(JOB)
+
+
+def test_new_jobs_reach_only_matching_streams(app, make_user, monkeypatch):
+    monkeypatch.setattr(job_stream, 'JOB_EVENTS_POLL_INTERVAL', 0.02)
+    monkeypatch.setattr(job_stream, 'SSE_HEARTBEAT_SECONDS', 2)
+    broker = JobStreamBroker()
+    area = f'Area {uuid.uuid4().hex[:8]}'
+    matching, other = broker.subscribe({'area': area}), broker.subscribe({'area': 'Outra'})
+    body = broker.stream(matching)
+    assert next(body).startswith('retry: ')
+    # O ouvinte começa no evento mais recente: as vagas devem ser criadas depois da primeira leitura
+    time.sleep(0.2)
+
+    company_id = make_user('company')
+    for title, job_area in (('Fora do filtro', 'Vendas'), ('Dentro do filtro', area)):
+        execute_sql('INSERT INTO jobs (company_id, title, area) VALUES (%s, %s, %s)',
+                    (company_id, title, job_area), commit=True)
+
+    event = next(body)
+    assert event.startswith('event: job.created\n')
+    data = json.loads(event.split('data: ', 1)[1])
+    assert (data['title'], data['area']) == ('Dentro do filtro', area)
+    assert not other.queue
+    body.close()
+    assert broker.stats()['subscribers'] == 1
+
+
+def test_stream_refuses_connections_over_the_limit(app, monkeypatch):
+    monkeypatch.setattr(job_stream, 'SSE_MAX_SUBSCRIBERS', 0)
+    response = app.test_client().get('/api/jobs/stream')
+    assert response.status_code == 503 and response.headers['Retry-After'] == '30'
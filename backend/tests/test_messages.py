@@ -0,0 +1,63 @@
+# backend/tests/test_messages.py
+import time
+
+import pytest
+
+
+@pytest.fixture
+def conversation(make_user, login):
+    alice, bob = make_user(), make_user('company')
+    client = login(alice)
+    response = client.post('/api/messages/conversations', json={'participant_ids': [bob], 'message': 'Olá'})
+    assert response.status_code == 201
+    return client, login(bob, 'company'), response.get_json()['conversation_id']
+
+
+@pytest.mark.parametrize('timeout', ['nan', 'inf', '-inf', 'abc'])
+def test_poll_rejects_non_finite_timeout(conversation, timeout):
+    client, _, _ = conversation
+    started = time.monotonic()
+    response = client.get(f'/api/messages/poll?after=1&timeout={timeout}')
+    assert response.status_code == 400
+    assert time.monotonic() - started < 1
+
+
+def test_poll_clamps_negative_timeout(conversation):
+    client, _, _ = conversation
+    last_id = client.get('/api/messages/poll').get_json()['last_id']
+    started = time.monotonic()
+    response = client.get(f'/api/messages/poll?after={last_id}&timeout=-5')
+    assert response.status_code == 200
+    assert response.get_json()['messages'] == []
+    assert time.monotonic() - started < 1
+
+
+def test_poll_returns_new_messages(conversation):
+    alice, bob, conversation_id = conversation
+    last_id = alice.get('/api/messages/poll').get_json()['last_id']
+    assert bob.post(f'/api/messages/conversations/{conversation_id}/messages', json={'body': 'Oi'}).status_code == 201
+    body = alice.get(f'/api/messages/poll?after={last_id}&timeout=1').get_json()
+    assert [message['body'] for message in body['messages']] == ['Oi']
+    assert alice.get('/api/messages/unread').get_json()['total'] == 1
+
+
+def test_late_commit_does_not_move_counters_back(app, conversation):
+    from app.services import database, messaging
+    alice, bob, conversation_id = conversation
+    older = bob.post(f'/api/messages/conversations/{conversation_id}/messages', json={'body': 'antiga'}).get_json()
+    newer = bob.post(f'/api/messages/conversations/{conversation_id}/messages', json={'body': 'nova'}).get_json()
+    older_id, newer_id = older['message']['id'], newer['message']['id']
+    sender = older['message']['sender_id']
+
+    # Contadores da mensagem mais antiga aplicados depois (commit fora de ordem no PostgreSQL)
+    with app.app_context(), database.transaction():
+        database.execute_sql(messaging.UPDATE_PARTICIPANTS, (sender, older_id, sender, older_id, older_id,
+                                                             conversation_id), fetch=True, commit=True)
+        database.execute_sql(messaging.UPDATE_CONVERSATION, (older_id, older['message']['created_at'], 'antiga',
+                                                             conversation_id, older_id), commit=True)
+
+    inbox = alice.get('/api/messages/conversations').get_json()['conversations'][0]
+    assert inbox['last_message_id'] == newer_id
+    assert inbox['last_message_preview'] == 'nova'
+    body = alice.get(f'/api/messages/poll?after={older_id}&timeout=0').get_json()
+    assert [message['id'] for message in body['messages']] == [newer_id]
@@ -0,0 +1,41 @@
+# backend/tests/test_migrations.py
+import threading
+
+from app.services.database import execute_sql
+from app.services.migrations import Migration, run_migrations
+
+
+class RacingMigration(Migration):
+    """
+    Simula outro worker: logo depois de run_migrations() ler schema_migrations (no cálculo
+    do checksum), aplica a mesma migração em outra thread, com outra conexão.
+    """
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.raced = False
+
+    def checksum(self, dialect):
+        if not self.raced:
+            self.raced = True
+            worker = threading.Thread(target=run_migrations, args=([self],))
+            worker.start()
+            worker.join()
+        return super().checksum(dialect)
+
+
+def test_second_run_is_a_noop(app):
+    migration = Migration(9001, 'test_noop', ['CREATE TABLE test_noop (id INTEGER)'],
+                          ['CREATE TABLE test_noop (id INTEGER)'])
+    assert run_migrations([migration]) == 1
+    assert run_migrations([migration]) == 0
+
+
+def test_concurrent_run_skips_version_applied_after_the_read(app):
+    # Sem IF NOT EXISTS: aplicar duas vezes falharia com "table already exists"
+    migration = RacingMigration(9002, 'test_race', ['CREATE TABLE test_race (id INTEGER)'],
+                                ['CREATE TABLE test_race (id INTEGER)'])
+    assert run_migrations([migration]) == 0
+    assert migration.raced
+    assert execute_sql('SELECT COUNT(*) AS total FROM schema_migrations WHERE version = 9002',
+                       fetch=True)[0]['total'] == 1
@@ -0,0 +1,120 @@
+# backend/tests/test_outbox.py
+import json
+import logging
+import time
+
+import pytest
+
+from app.services import outbox
+from app.services.database import execute_sql, transaction
+from app.services.notifications import Sink
+from app.services.outbox import OutboxWorker
+
+
+class RecordingSink(Sink):
+    """
+    Destino de teste: guarda os ids entregues e falha enquanto `failing` for True.
+    """
+
+    def __init__(self, name, failing=False):
+        self.name = name
+        self.failing = failing
+        self.delivered = []
+
+    def deliver(self, event, messages):
+        if self.failing:
+            raise ConnectionError(f'{self.name} fora do ar')
+        self.delivered.append(event['id'])
+
+
+@pytest.fixture
+def event_id(app):
+    # Fila só com o evento do teste (outros testes deixam eventos pendentes no banco)
+    execute_sql('DELETE FROM outbox', commit=True)
+    with transaction():
+        outbox.enqueue('job.created', {'job_id': 999999, 'company_id': 1})
+    return execute_sql('SELECT id FROM outbox', fetch=True)[0]['id']
+
+
+def _event(event_id):
+    return execute_sql('SELECT status, attempts, available_at, pending_sinks, last_error FROM outbox WHERE id = %s',
+                       (event_id,), fetch=True)[0]
+
+
+def _make_available(event_id):
+    execute_sql('UPDATE outbox SET available_at = %s WHERE id = %s', (time.time(), event_id), commit=True)
+
+
+def test_enqueue_is_rolled_back_with_the_transaction(app):
+    execute_sql('DELETE FROM outbox', commit=True)
+    with pytest.raises(RuntimeError):
+        with transaction():
+            outbox.enqueue('job.created', {'job_id': 1, 'company_id': 1})
+            raise RuntimeError('falha depois do INSERT')
+    assert execute_sql('SELECT COUNT(*) AS total FROM outbox', fetch=True)[0]['total'] == 0
+
+
+def test_delivered_to_every_sink(event_id):
+    sinks = [RecordingSink('a'), RecordingSink('b')]
+    assert OutboxWorker(sinks).run_once() == 1
+    assert [sink.delivered for sink in sinks] == [[event_id], [event_id]]
+    assert _event(event_id)['status'] == 'delivered'
+    assert OutboxWorker(sinks).run_once() == 0
+
+
+def test_retry_goes_only_to_failed_sink_after_backoff(event_id, monkeypatch):
+    monkeypatch.setattr(outbox, 'OUTBOX_BACKOFF_BASE', 60)
+    healthy, flaky = RecordingSink('healthy'), RecordingSink('flaky', failing=True)
+    worker = OutboxWorker([healthy, flaky])
+    started = time.time()
+    worker.run_once()
+    event = _event(event_id)
+    assert (event['status'], event['attempts'], event['pending_sinks']) == ('pending', 1, 'flaky')
+    assert 'flaky fora do ar' in event['last_error']
+    assert started + 60 * 0.8 <= event['available_at'] <= time.time() + 60 * 1.2
+    # Antes do prazo o evento não é reservado de novo
+    assert worker.run_once() == 0
+
+    _make_available(event_id)
+    flaky.failing = False
+    assert worker.run_once() == 1
+    assert healthy.delivered == [event_id] and flaky.delivered == [event_id]
+    assert worker.stats['flaky'].as_dict()['failed'] == 1
+    assert _event(event_id)['status'] == 'delivered'
+
+
+def test_dead_letter_after_max_attempts(event_id, monkeypatch, caplog):
+    monkeypatch.setattr(outbox, 'OUTBOX_MAX_ATTEMPTS', 2)
+    worker = OutboxWorker([RecordingSink('down', failing=True)])
+    worker.run_once()
+    assert _event(event_id)['status'] == 'pending'
+    _make_available(event_id)
+    with caplog.at_level(logging.ERROR, logger='claunnetworking.outbox'):
+        worker.run_once()
+    event = _event(event_id)
+    assert (event['status'], event['attempts']) == ('dead', 2)
+    logged = json.loads(caplog.records[-1].getMessage())
+    assert logged['event'] == 'outbox_dead' and logged['id'] == event_id
+    # Um evento 'dead' não volta para a fila
+    _make_available(event_id)
+    assert worker.run_once() == 0
+
+
+def test_flush_failure_fails_the_whole_batch(event_id):
+    class BufferedSink(RecordingSink):
+        def flush(self):
+            raise ConnectionError('buffer perdido')
+
+    worker = OutboxWorker([BufferedSink('buffered')])
+    worker.run_once()
+    event = _event(event_id)
+    assert (event['status'], event['pending_sinks']) == ('pending', 'buffered')
+    assert 'buffer perdido' in event['last_error']
+
+
+def test_backoff_grows_exponentially_up_to_the_maximum(monkeypatch):
+    monkeypatch.setattr(outbox, 'OUTBOX_BACKOFF_BASE', 5)
+    monkeypatch.setattr(outbox, 'OUTBOX_BACKOFF_MAX', 3600)
+    assert 4 <= outbox.backoff(1) <= 6
+    assert 32 <= outbox.backoff(4) <= 48
+    assert 3600 * 0.8 <= outbox.backoff(30) <= 3600 * 1.2
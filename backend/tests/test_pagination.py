@@ -0,0 +1,29 @@
+# backend/tests/test_pagination.py
+import base64
+import json
+
+import pytest
+
+from app.services.pagination import PaginationError, decode_cursor, encode_cursor
+
+
+def _token(raw):
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def test_round_trip():
+    values = [True, '2026-10-18 10:00:00', 42, 1.5, None]
+    assert decode_cursor(encode_cursor(values), len(values)) == values
+
+
+@pytest.mark.parametrize('raw', ['[[1],"x",3]', '[{"a":1},"x",3]', '[1,"x",NaN]', '[1,"x",Infinity]',
+                                 '{"a":1}', '[1,2]', 'nada'])
+def test_rejects_malformed_values(raw):
+    with pytest.raises(PaginationError):
+        decode_cursor(_token(raw), 3)
+
+
+def test_crafted_cursor_is_a_client_error(app):
+    token = _token(json.dumps([[1], 'x', 3]))
+    response = app.test_client().get(f'/api/jobs/?cursor={token}')
+    assert response.status_code == 400
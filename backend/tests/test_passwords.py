@@ -0,0 +1,43 @@
+# backend/tests/test_passwords.py
+import uuid
+from concurrent.futures import TimeoutError as HashTimeout
+
+import pytest
+from werkzeug.security import generate_password_hash
+
+from app.services import passwords
+from app.services.database import execute_sql
+
+
+def test_current_method_is_fixed_across_calls():
+    assert passwords.current_method() == f'pbkdf2:sha256:{passwords.PASSWORD_HASH_ITERATIONS}'
+    assert passwords.current_method() == passwords.current_method()
+
+
+def test_needs_rehash_only_for_weaker_or_other_algorithms():
+    current = passwords.PASSWORD_HASH_ITERATIONS
+    assert not passwords.needs_rehash(f'pbkdf2:sha256:{current}$salt$hash')
+    # Um hash mais forte (ex.: de um worker ou deploy com custo maior) não é rebaixado
+    assert not passwords.needs_rehash(f'pbkdf2:sha256:{current + 200_000}$salt$hash')
+    assert passwords.needs_rehash(f'pbkdf2:sha256:{current - 1}$salt$hash')
+    assert passwords.needs_rehash('pbkdf2:sha256$salt$hash')
+    assert passwords.needs_rehash(generate_password_hash('senha', 'scrypt'))
+
+
+@pytest.mark.parametrize('error', [passwords.HashingBusy('Fila de hashing de senhas cheia'), HashTimeout()])
+def test_login_continues_when_rehash_is_busy(app, monkeypatch, error):
+    from app.routes import auth
+    email = f'{uuid.uuid4().hex}@example.com'
+    old_hash = generate_password_hash('senha', 'pbkdf2:sha256:1000')
+    execute_sql('INSERT INTO users (email, password_hash, user_type, name) VALUES (%s, %s, %s, %s)',
+                (email, old_hash, 'candidate', 'Antigo'), commit=True)
+
+    def busy(password):
+        raise error
+
+    monkeypatch.setattr(auth.hasher, 'hash', busy)
+    response = app.test_client().post('/api/auth/login', json={'email': email, 'password': 'senha'})
+    assert response.status_code == 200, response.get_json()
+    # O hash antigo continua válido e será atualizado em um próximo login
+    assert execute_sql('SELECT password_hash FROM users WHERE email = %s', (email,),
+                       fetch=True)[0]['password_hash'] == old_hash
@@ -0,0 +1,111 @@
+# backend/tests/test_pool.py
+import threading
+import time
+
+import psycopg2
+import pytest
+from psycopg2 import extensions
+
+from app.services.pool import ConnectionPool, PoolTimeout
+
+
+class FakeConnection:
+    """
+    Conexão sem servidor: só o que o pool usa (closed, cursor, rollback, close, info).
+    """
+
+    def __init__(self):
+        self.closed = 0
+        self.healthy = True
+        self.rollbacks = 0
+        self.info = type('Info', (), {'transaction_status': extensions.TRANSACTION_STATUS_IDLE})()
+
+    def cursor(self):
+        connection = self
+
+        class Cursor:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+            def execute(self, sql):
+                if not connection.healthy:
+                    raise psycopg2.OperationalError('server closed the connection unexpectedly')
+
+        return Cursor()
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.info.transaction_status = extensions.TRANSACTION_STATUS_IDLE
+
+    def close(self):
+        self.closed = 1
+
+
+class FakePool(ConnectionPool):
+    def _connect(self):
+        conn = FakeConnection()
+        self.opened.append(conn)
+        return conn
+
+
+def make_pool(maxconn=2, **kwargs):
+    # minconn=0: nenhuma conexão é aberta no construtor
+    pool = FakePool('postgresql://teste', 0, maxconn, **kwargs)
+    pool.opened = []
+    return pool
+
+
+def test_exhausted_pool_times_out():
+    pool = make_pool(maxconn=1)
+    pool.getconn()
+    started = time.monotonic()
+    with pytest.raises(PoolTimeout):
+        pool.getconn(timeout=0.05)
+    assert time.monotonic() - started >= 0.05
+    assert pool.stats()['timeouts'] == 1
+
+
+def test_waiter_gets_the_returned_connection():
+    pool = make_pool(maxconn=1)
+    conn = pool.getconn()
+    threading.Timer(0.05, pool.putconn, args=(conn,)).start()
+    assert pool.getconn(timeout=2) is conn
+    stats = pool.stats()
+    assert stats['wait_time_max'] >= 0.04 and len(pool.opened) == 1
+
+
+def test_broken_and_expired_connections_are_discarded(monkeypatch):
+    pool = make_pool(validate_after=0, max_lifetime=60)
+    conn = pool.getconn()
+    pool.putconn(conn)
+    # Falha no SELECT 1 da validação: descartada e trocada por uma nova
+    conn.healthy = False
+    replacement = pool.getconn()
+    assert replacement is not conn and conn.closed
+
+    pool.putconn(replacement)
+    real_monotonic = time.monotonic
+    monkeypatch.setattr('app.services.pool.time.monotonic', lambda: real_monotonic() + 120)
+    assert pool.getconn() is not replacement and replacement.closed
+    assert pool.stats()['discarded'] == 2
+
+
+def test_putconn_rolls_back_or_closes():
+    pool = make_pool()
+    conn = pool.getconn()
+    conn.info.transaction_status = extensions.TRANSACTION_STATUS_INTRANS
+    pool.putconn(conn)
+    assert conn.rollbacks == 1 and pool.stats()['idle'] == 1
+
+    conn = pool.getconn()
+    conn.info.transaction_status = extensions.TRANSACTION_STATUS_UNKNOWN
+    pool.putconn(conn)
+    assert conn.closed and pool.stats()['idle'] == 0
+
+    conn = pool.getconn()
+    pool.putconn(conn, close=True)
+    stats = pool.stats()
+    assert conn.closed and (stats['in_use'], stats['discarded']) == (0, 2)
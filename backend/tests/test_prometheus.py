@@ -0,0 +1,31 @@
+# backend/tests/test_prometheus.py
+from app.services import metrics
+from app.services.database import execute_sql
+
+
+def test_metrics_requires_token_when_configured(app, monkeypatch):
+    monkeypatch.setattr(metrics, 'METRICS_TOKEN', 'segredo')
+    client = app.test_client()
+    assert client.get('/metrics').status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer outro'}).status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Basic segredo'}).status_code == 401
+    response = client.get('/metrics', headers={'Authorization': 'Bearer segredo'})
+    assert response.status_code == 200
+    assert response.content_type.startswith('text/plain')
+
+
+def test_metrics_expose_route_and_query_latency(app, monkeypatch):
+    monkeypatch.setattr(metrics, 'METRICS_TOKEN', None)
+    client = app.test_client()
+    client.get('/api/jobs/?limit=1')
+    execute_sql('SELECT COUNT(*) AS total FROM courses', fetch=True)
+    body = client.get('/metrics').get_data(as_text=True)
+    assert 'http_request_duration_seconds_bucket{' in body
+    assert 'http_requests_total{endpoint="jobs.get_jobs",method="GET",status="200"}' in body
+    assert 'db_query_duration_seconds_count{statement="select_courses"}' in body
+
+
+def test_sql_label_uses_verb_and_first_table():
+    assert metrics.sql_label('SELECT id FROM jobs WHERE id = %s') == 'select_jobs'
+    assert metrics.sql_label('INSERT INTO outbox (event_type) VALUES (%s)') == 'insert_outbox'
+    assert metrics.sql_label('PRAGMA optimize') == 'other'
@@ -0,0 +1,131 @@
+# backend/tests/test_query_budgets.py
+"""
+Exercita cada rota com @query_budget com app.testing ligado: acima do orçamento o
+after_request levanta QueryBudgetExceeded e o teste falha. Cada requisição usa o
+caminho mais caro da rota (filtros, busca textual, cursor, facetas).
+"""
+import pytest
+
+from app.services.database import execute_sql
+
+# Rotas exercitadas neste módulo (endpoint do Flask)
+EXERCISED = set()
+
+
+@pytest.fixture
+def get(app):
+    """
+    Faz a requisição com o client informado e registra o endpoint exercitado.
+    """
+    def request(client, method, url, expected, **kwargs):
+        response = client.open(url, method=method, **kwargs)
+        assert response.status_code == expected, response.get_data(as_text=True)
+        EXERCISED.add(app.url_map.bind('localhost').match(url.split('?')[0], method=method)[0])
+        return response
+    return request
+
+
+@pytest.fixture
+def catalog(make_user):
+    """
+    Empresa com vagas, instituição com cursos e candidatos com perfil público e competências.
+    """
+    company_id = make_user('company', 'Empresa Orçamento')
+    institution_id = make_user('institution', 'Instituição Orçamento')
+    job_ids = [execute_sql(
+        'INSERT INTO jobs (company_id, title, description, requirements, area, level, work_modality, location, '
+        'salary_range) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s) RETURNING id',
+        (company_id, f'Desenvolvedor Python {index}', 'Vaga de orçamento', 'python, flask', 'Tecnologia', 'pleno',
+         'remoto', 'São Paulo - SP', 'R$ 8.000'), fetch=True, commit=True)[0]['id'] for index in range(3)]
+    for index in range(3):
+        execute_sql('INSERT INTO courses (institution_id, title, description, category, level, modality) '
+                    'VALUES (%s, %s, %s, %s, %s, %s)',
+                    (institution_id, f'Curso de Python {index}', 'Curso de orçamento', 'Tecnologia', 'basico',
+                     'online'), commit=True)
+    candidate_ids = []
+    for index in range(3):
+        candidate_id = make_user('candidate', f'Candidato {index}')
+        execute_sql('INSERT INTO candidate_profiles (user_id, professional_title, skills, languages, sector, level, '
+                    'work_modality, address_state, salary_expectation) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)',
+                    (candidate_id, 'Desenvolvedor', 'python, flask', 'ingles', 'Tecnologia', 'pleno', 'remoto',
+                     'SP', 7000), commit=True)
+        execute_sql('UPDATE users SET profile_public = TRUE WHERE id = %s', (candidate_id,), commit=True)
+        candidate_ids.append(candidate_id)
+    return {'company': company_id, 'jobs': job_ids, 'candidates': candidate_ids}
+
+
+def _next_page(get, client, url):
+    first = get(client, 'GET', url, 200).get_json()
+    assert first['next_cursor'], first
+    separator = '&' if '?' in url else '?'
+    get(client, 'GET', f"{url}{separator}cursor={first['next_cursor']}", 200)
+
+
+def test_job_listing(app, get, catalog):
+    client = app.test_client()
+    _next_page(get, client, '/api/jobs/?limit=1&area=Tecnologia&modality=remoto&location=Paulo')
+    _next_page(get, client, '/api/jobs/?limit=1&q=python')
+    get(client, 'GET', '/api/jobs/facets?area=Tecnologia&q=python', 200)
+
+
+def test_job_stream(app, get):
+    response = get(app.test_client(), 'GET', '/api/jobs/stream?area=Tecnologia', 200)
+    response.close()
+
+
+def test_job_writes(get, login, catalog, make_user):
+    company = login(catalog['company'], 'company')
+    get(company, 'POST', '/api/jobs/', 201, json={
+        'title': 'Analista de Dados', 'description': 'Vaga', 'requirements': 'sql', 'benefits': 'VR',
+        'salary_range': 'R$ 6.000', 'location': 'Remoto', 'work_modality': 'remoto', 'job_type': 'clt',
+        'area': 'Dados', 'level': 'junior'})
+
+    candidate = login(make_user('candidate'))
+    job_ids = catalog['jobs']
+    get(candidate, 'POST', '/api/jobs/apply', 201, json={'job_id': job_ids[0]})
+    # Repetida: o INSERT não grava e a rota consulta o conflito
+    get(candidate, 'POST', '/api/jobs/apply', 400, json={'job_id': job_ids[0]})
+    get(candidate, 'POST', '/api/jobs/apply/batch', 201, json={'job_ids': job_ids + [999999]})
+
+
+def test_recommendation_routes(get, login, catalog):
+    get(login(catalog['company'], 'company'), 'GET', f"/api/jobs/{catalog['jobs'][0]}/matches", 200)
+    get(login(catalog['candidates'][0]), 'GET', '/api/candidates/me/recommendations', 200)
+
+
+def test_course_listing(app, get, catalog):
+    client = app.test_client()
+    _next_page(get, client, '/api/courses/?limit=1&category=Tecnologia&modality=online')
+    _next_page(get, client, '/api/courses/?limit=1&q=python')
+    get(client, 'GET', '/api/courses/facets?category=Tecnologia&q=python', 200)
+
+
+def test_candidate_search(get, login, catalog):
+    company = login(catalog['company'], 'company')
+    _next_page(get, company, '/api/candidates/search?limit=1&skills=python,flask&languages=ingles&sector=Tecnologia')
+    _next_page(get, company, '/api/candidates/search?limit=1&state=SP&salary_max=9000')
+
+
+def test_admin_metrics(get, login, make_user):
+    get(login(make_user('admin'), 'admin'), 'GET', '/api/admin/metrics?days=90', 200)
+
+
+def test_messaging(get, login, make_user):
+    sender_id, receiver_id = make_user(), make_user('company')
+    sender, receiver = login(sender_id), login(receiver_id, 'company')
+    conversation_id = get(sender, 'POST', '/api/messages/conversations', 201, json={
+        'participant_ids': [receiver_id], 'subject': 'Vaga', 'message': 'Olá'}).get_json()['conversation_id']
+    for index in range(3):
+        get(receiver, 'POST', f'/api/messages/conversations/{conversation_id}/messages', 201,
+            json={'body': f'Resposta {index}'})
+    _next_page(get, sender, f'/api/messages/conversations/{conversation_id}/messages?limit=1')
+    get(sender, 'GET', '/api/messages/unread', 200)
+    get(sender, 'POST', f'/api/messages/conversations/{conversation_id}/read', 200)
+    get(receiver, 'POST', '/api/messages/conversations', 201, json={'participant_ids': [sender_id]})
+    _next_page(get, sender, '/api/messages/conversations?limit=1')
+
+
+def test_every_budgeted_route_is_exercised(app):
+    # Executado por último (ordem do arquivo): uma rota nova com @query_budget precisa de um teste aqui
+    budgeted = {endpoint for endpoint, view in app.view_functions.items() if hasattr(view, 'query_budget')}
+    assert budgeted - EXERCISED == set()
@@ -0,0 +1,71 @@
+# backend/tests/test_query_cache.py
+import pytest
+
+from app.services import cache
+from app.services.cache import QueryCache, tables_in, written_tables
+from app.services.database import execute_sql, query_cache, transaction
+
+
+def test_tables_read_and_written():
+    assert tables_in('SELECT * FROM jobs j JOIN users u ON u.id = j.company_id') == {'jobs', 'users'}
+    assert written_tables('INSERT INTO applications (job_id) SELECT id FROM jobs') == {'applications'}
+    assert written_tables('DELETE FROM courses WHERE id = %s') == {'courses', 'course_facet_counts'}
+    assert written_tables('CREATE TABLE IF NOT EXISTS outbox (id INTEGER)') == {'outbox'}
+    assert written_tables('SELECT 1') == set()
+
+
+def test_invalidation_by_tag_ttl_and_memory_limit(monkeypatch):
+    query_cache = QueryCache(max_bytes=10_000, ttl=30)
+    query_cache.set(('jobs', ()), [{'id': 1}], {'jobs'})
+    query_cache.set(('courses', ()), [{'id': 2}], {'courses'})
+    query_cache.invalidate({'jobs'})
+    assert query_cache.get(('jobs', ())) is None
+    assert query_cache.get(('courses', ())) == [{'id': 2}]
+
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, 'monotonic', lambda: now[0])
+    query_cache.set(('ttl', ()), [{'id': 3}], {'jobs'})
+    now[0] += 31
+    assert query_cache.get(('ttl', ())) is None
+
+    # LRU: o acesso recente mantém a entrada; a mais antiga sai ao passar do limite
+    small = QueryCache(max_bytes=cache._estimate_size([{'id': 'x' * 100}]) * 2 + 1, ttl=30)
+    small.set('a', [{'id': 'a' * 100}], set())
+    small.set('b', [{'id': 'b' * 100}], set())
+    small.get('a')
+    small.set('c', [{'id': 'c' * 100}], set())
+    assert small.get('b') is None and small.get('a') is not None
+    assert small.stats()['evictions'] == 1
+
+
+def _cached_titles(company_id):
+    rows = execute_sql('SELECT title FROM jobs WHERE company_id = %s ORDER BY id', (company_id,),
+                       fetch=True, cache=True)
+    return [row['title'] for row in rows]
+
+
+def test_execute_sql_invalidates_written_tables(make_user):
+    company_id = make_user('company')
+    assert _cached_titles(company_id) == []
+    hits = query_cache.stats()['hits']
+    assert _cached_titles(company_id) == []
+    assert query_cache.stats()['hits'] == hits + 1
+
+    execute_sql('INSERT INTO jobs (company_id, title) VALUES (%s, %s)', (company_id, 'Vaga'), commit=True)
+    assert _cached_titles(company_id) == ['Vaga']
+
+
+def test_transaction_invalidates_on_commit_only(make_user):
+    company_id = make_user('company')
+    assert _cached_titles(company_id) == []
+    with pytest.raises(RuntimeError):
+        with transaction():
+            execute_sql('INSERT INTO jobs (company_id, title) VALUES (%s, %s)', (company_id, 'Desfeita'), commit=True)
+            # Dentro da transação a leitura ignora o cache e vê a própria escrita
+            assert _cached_titles(company_id) == ['Desfeita']
+            raise RuntimeError('rollback')
+    assert _cached_titles(company_id) == []
+
+    with transaction():
+        execute_sql('INSERT INTO jobs (company_id, title) VALUES (%s, %s)', (company_id, 'Comitada'), commit=True)
+    assert _cached_titles(company_id) == ['Comitada']
@@ -0,0 +1,95 @@
+# backend/tests/test_recommendations.py
+import pytest
+
+from app.services import recommendations
+from app.services.database import execute_sql
+
+
+@pytest.fixture
+def job_and_candidate(make_user):
+    """
+    Vaga de uma empresa e candidato com perfil público, já com as listas calculadas (fila vazia).
+    """
+    company_id = make_user('company')
+    candidate_id = make_user('candidate')
+    job_id = execute_sql('INSERT INTO jobs (company_id, title, requirements, area, level, work_modality, location) '
+                         'VALUES (%s, %s, %s, %s, %s, %s, %s) RETURNING id',
+                         (company_id, 'Dev Python', 'python, flask', 'Tecnologia', 'pleno', 'remoto', 'São Paulo'),
+                         fetch=True, commit=True)[0]['id']
+    execute_sql('INSERT INTO candidate_profiles (user_id, professional_title, skills, sector, level, work_modality) '
+                'VALUES (%s, %s, %s, %s, %s, %s)',
+                (candidate_id, 'Desenvolvedor', 'python, flask', 'Tecnologia', 'pleno', 'remoto'), commit=True)
+    execute_sql('UPDATE users SET profile_public = TRUE WHERE id = %s', (candidate_id,), commit=True)
+    execute_sql('INSERT INTO job_matches (job_id, candidate_id, score) VALUES (%s, %s, %s)',
+                (job_id, candidate_id, 0.9), commit=True)
+    execute_sql('INSERT INTO candidate_recommendations (candidate_id, job_id, score) VALUES (%s, %s, %s)',
+                (candidate_id, job_id, 0.9), commit=True)
+    execute_sql('DELETE FROM recommendation_queue', commit=True)
+    return company_id, candidate_id, job_id
+
+
+def test_job_matches_from_stored_list(login, job_and_candidate):
+    company_id, candidate_id, job_id = job_and_candidate
+    # app.testing: acima do @query_budget a requisição falharia com QueryBudgetExceeded
+    response = login(company_id, 'company').get(f'/api/jobs/{job_id}/matches')
+    assert response.status_code == 200, response.get_json()
+    assert [match['user_id'] for match in response.get_json()['matches']] == [candidate_id]
+
+
+def test_candidate_recommendations_from_stored_list(login, job_and_candidate):
+    company_id, candidate_id, job_id = job_and_candidate
+    response = login(candidate_id).get('/api/candidates/me/recommendations')
+    assert response.status_code == 200, response.get_json()
+    assert [job['id'] for job in response.get_json()['jobs']] == [job_id]
+
+
+def test_requests_never_encode_matrices(login, job_and_candidate, monkeypatch):
+    company_id, candidate_id, job_id = job_and_candidate
+
+    def forbidden():
+        raise AssertionError('matriz montada durante a requisição')
+
+    monkeypatch.setattr(recommendations, 'load_candidates', forbidden)
+    monkeypatch.setattr(recommendations, 'load_jobs', forbidden)
+    # Vaga alterada: a lista anterior continua valendo até o próximo refresh() do cron
+    execute_sql("INSERT INTO recommendation_queue (kind, entity_id) VALUES ('job', %s)", (job_id,), commit=True)
+
+    response = login(company_id, 'company').get(f'/api/jobs/{job_id}/matches')
+    assert response.status_code == 200, response.get_json()
+    assert [match['user_id'] for match in response.get_json()['matches']] == [candidate_id]
+    response = login(candidate_id).get('/api/candidates/me/recommendations')
+    assert response.status_code == 200, response.get_json()
+
+
+def test_refresh_builds_list_for_new_job(login, job_and_candidate):
+    company_id, candidate_id, job_id = job_and_candidate
+    new_job_id = execute_sql('INSERT INTO jobs (company_id, title, requirements, area, level, work_modality) '
+                             'VALUES (%s, %s, %s, %s, %s, %s) RETURNING id',
+                             (company_id, 'Dev Flask', 'python, flask', 'Tecnologia', 'pleno', 'remoto'),
+                             fetch=True, commit=True)[0]['id']
+    client = login(company_id, 'company')
+    assert client.get(f'/api/jobs/{new_job_id}/matches').get_json()['matches'] == []
+
+    recommendations.refresh()
+    matches = client.get(f'/api/jobs/{new_job_id}/matches').get_json()['matches']
+    assert candidate_id in [match['user_id'] for match in matches]
+
+
+def test_job_alerts_score_new_job_outside_requests(job_and_candidate):
+    company_id, candidate_id, job_id = job_and_candidate
+    from app.services import notifications
+    new_job_id = execute_sql('INSERT INTO jobs (company_id, title, requirements, area, level, work_modality) '
+                             'VALUES (%s, %s, %s, %s, %s, %s) RETURNING id',
+                             (company_id, 'Dev Flask', 'python, flask', 'Tecnologia', 'pleno', 'remoto'),
+                             fetch=True, commit=True)[0]['id']
+    loads = []
+
+    def candidate_matrix():
+        loads.append(1)
+        return recommendations.load_candidates()
+
+    # Sem lista do cron: o worker da outbox pontua a vaga contra a matriz do lote
+    alerts = notifications._job_alerts(new_job_id, candidate_matrix)
+    assert candidate_id in [row['id'] for row in alerts] and loads == [1]
+    # Com lista gravada, a matriz não é montada
+    assert notifications._job_alerts(job_id, candidate_matrix) and loads == [1]
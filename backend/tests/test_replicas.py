@@ -0,0 +1,81 @@
+# backend/tests/test_replicas.py
+import sqlite3
+import time
+
+import pytest
+
+from app.services import database, replicas
+from app.services.database import execute_sql
+from app.services.replicas import WATERMARK_COOKIE, ReplicaSet
+from app.services.sqlite_engine import sqlite_engine
+
+
+@pytest.fixture
+def replica(app, tmp_path, monkeypatch, make_user):
+    """
+    Cópia do banco de teste no papel de réplica. Escritas posteriores só chegam ao primário,
+    como em uma réplica atrasada; o usuário marcador diz de onde veio cada leitura.
+    """
+    marker_id = make_user(name='primario')
+    path = str(tmp_path / 'replica.db')
+    source, target = sqlite3.connect(database.DATABASE_PATH), sqlite3.connect(path)
+    source.backup(target)
+    source.close()
+    target.execute("UPDATE users SET name = 'replica' WHERE id = ?", (marker_id,))
+    target.commit()
+    target.close()
+    replica_set = ReplicaSet([path], database._sqlite_replica, sqlite_engine.connection,
+                             lambda path, conn: sqlite_engine.release(conn))
+    monkeypatch.setattr(database, 'replica_set', replica_set)
+    return marker_id
+
+
+def _source(marker_id):
+    return execute_sql('SELECT name FROM users WHERE id = %s', (marker_id,), fetch=True)[0]['name']
+
+
+def test_reads_go_to_replica_until_the_request_writes(app, replica):
+    with app.test_request_context('/'):
+        assert _source(replica) == 'replica'
+        execute_sql('UPDATE users SET is_active = TRUE WHERE id = %s', (replica,), commit=True)
+        # A requisição que escreveu lê do primário
+        assert _source(replica) == 'primario'
+    assert database.replica_set.reads == [1]
+
+
+def test_watermark_cookie_pins_client_to_primary(app, replica):
+    with app.test_request_context('/', headers={'Cookie': f'{WATERMARK_COOKIE}={time.time() + 60:.3f}'}):
+        assert _source(replica) == 'primario'
+    with app.test_request_context('/', headers={'Cookie': f'{WATERMARK_COOKIE}={time.time() - 1:.3f}'}):
+        assert _source(replica) == 'replica'
+    with app.test_request_context('/', headers={'Cookie': f'{WATERMARK_COOKIE}=invalido'}):
+        assert _source(replica) == 'replica'
+
+
+def test_write_response_sets_watermark(app, replica, login, make_user, monkeypatch):
+    monkeypatch.setattr(replicas, 'READ_YOUR_WRITES_SECONDS', 30)
+    company = login(make_user('company'), 'company')
+    response = company.post('/api/jobs/', json={
+        'title': 'Vaga', 'description': '', 'requirements': '', 'benefits': '', 'salary_range': '',
+        'location': '', 'work_modality': 'remoto', 'job_type': 'clt', 'area': 'TI', 'level': 'junior'})
+    assert response.status_code == 201, response.get_json()
+    cookie = next(header for header in response.headers.getlist('Set-Cookie') if header.startswith(WATERMARK_COOKIE))
+    until = float(cookie.split(';')[0].split('=')[1])
+    # O cookie guarda o instante com 3 casas decimais (arredondado)
+    assert time.time() + 25 < until <= time.time() + 30.001
+    assert 'HttpOnly' in cookie
+    # Uma leitura sem escrita não renova o cookie
+    response = company.get('/api/jobs/?limit=1')
+    assert not any(header.startswith(WATERMARK_COOKIE) for header in response.headers.getlist('Set-Cookie'))
+
+
+def test_unavailable_replica_falls_back_to_primary(app, tmp_path, monkeypatch):
+    replica_set = ReplicaSet([str(tmp_path / 'ausente.db')], database._sqlite_replica, sqlite_engine.connection,
+                             lambda path, conn: sqlite_engine.release(conn))
+    monkeypatch.setattr(database, 'replica_set', replica_set)
+    with app.test_request_context('/'):
+        assert execute_sql('SELECT 1 AS ok', fetch=True)[0]['ok'] == 1
+    with app.test_request_context('/'):
+        execute_sql('SELECT 1 AS ok', fetch=True)
+    # Fora do rodízio por REPLICA_RETRY_AFTER: a segunda requisição nem tenta a réplica
+    assert replica_set.failures == [1] and replica_set.stats()[0]['available'] is False
@@ -0,0 +1,73 @@
+# backend/tests/test_static_assets.py
+import logging
+
+import pytest
+
+from app.services import static_assets
+from app.services.static_assets import StaticAssets, build
+
+SCRIPT = 'function saudacao() { return "Olá"; }\n' * 200
+
+
+@pytest.fixture
+def frontend(tmp_path):
+    root = tmp_path / 'frontend'
+    (root / 'js').mkdir(parents=True)
+    (root / 'js' / 'app.js').write_text(SCRIPT)
+    (root / 'index.html').write_text('<html><script src="js/app.js"></script></html>')
+    return str(root), str(tmp_path / 'build')
+
+
+def _get(app, assets, path, **headers):
+    with app.test_request_context('/' + path, headers=headers):
+        return assets.response(path)
+
+
+def test_without_manifest_serves_originals_without_building(app, frontend, caplog, monkeypatch):
+    root, build_dir = frontend
+
+    def forbidden(*args, **kwargs):
+        raise AssertionError('build() chamado durante a requisição')
+
+    monkeypatch.setattr(static_assets, 'build', forbidden)
+    assets = StaticAssets(root, build_dir)
+    with caplog.at_level(logging.WARNING, logger='claunnetworking.static_assets'):
+        response = _get(app, assets, 'js/app.js', **{'Accept-Encoding': 'gzip, br'})
+    assert 'Manifest' in caplog.text
+    assert response.status_code == 200 and 'Content-Encoding' not in response.headers
+    assert response.get_data(as_text=True) == SCRIPT
+
+    # A URL com fingerprint e o 304 continuam funcionando sem o build
+    url = assets.url_for('js/app.js')
+    assert _get(app, assets, url.lstrip('/')).headers['Cache-Control'] == static_assets.IMMUTABLE_CACHE_CONTROL
+    assert _get(app, assets, 'js/app.js', **{'If-None-Match': response.headers['ETag']}).status_code == 304
+
+
+def test_encoding_negotiation_and_etags(app, frontend):
+    root, build_dir = frontend
+    build(root, build_dir, images=False)
+    assets = StaticAssets(root, build_dir)
+
+    gzipped = _get(app, assets, 'js/app.js', **{'Accept-Encoding': 'gzip'})
+    assert gzipped.headers['Content-Encoding'] == 'gzip'
+    assert gzipped.headers['Vary'] == 'Accept-Encoding'
+    plain = _get(app, assets, 'js/app.js', **{'Accept-Encoding': 'gzip;q=0'})
+    assert 'Content-Encoding' not in plain.headers and plain.get_data(as_text=True) == SCRIPT
+    assert plain.headers['ETag'] != gzipped.headers['ETag']
+
+    # Qualquer variante com o mesmo hash revalida; outro conteúdo não
+    revalidated = _get(app, assets, 'js/app.js', **{'If-None-Match': f"W/{gzipped.headers['ETag']}"})
+    assert revalidated.status_code == 304 and revalidated.headers['Cache-Control'] == 'no-cache'
+    assert _get(app, assets, 'js/app.js', **{'If-None-Match': '"0123456789"'}).status_code == 200
+
+
+def test_fingerprinted_urls(app, frontend):
+    root, build_dir = frontend
+    build(root, build_dir, images=False)
+    assets = StaticAssets(root, build_dir)
+    url = assets.url_for('js/app.js')
+    assert url != '/js/app.js'
+    html = _get(app, assets, 'index.html').get_data(as_text=True)
+    assert f'src="{url.lstrip("/")}"' in html
+    assert _get(app, assets, url.lstrip('/')).headers['Cache-Control'] == static_assets.IMMUTABLE_CACHE_CONTROL
+    assert _get(app, assets, 'js/app.0123456789.js') is None
@@ -0,0 +1,65 @@
+# backend/tests/test_transactions.py
+import pytest
+from flask import g
+
+from app.services.database import execute_sql, get_request_connection, transaction
+
+
+def _count(company_id):
+    return execute_sql('SELECT COUNT(*) AS total FROM jobs WHERE company_id = %s', (company_id,),
+                       fetch=True)[0]['total']
+
+
+def _insert(company_id, title):
+    execute_sql('INSERT INTO jobs (company_id, title) VALUES (%s, %s)', (company_id, title), commit=True)
+
+
+def test_exception_rolls_back_every_statement(make_user):
+    company_id = make_user('company')
+    with pytest.raises(ValueError):
+        with transaction():
+            _insert(company_id, 'Primeira')
+            _insert(company_id, 'Segunda')
+            assert _count(company_id) == 2
+            raise ValueError('falha no meio do bloco')
+    assert _count(company_id) == 0
+
+
+def test_nested_blocks_join_the_outer_transaction(make_user):
+    company_id = make_user('company')
+    with pytest.raises(ValueError):
+        with transaction():
+            _insert(company_id, 'Externa')
+            with transaction():
+                _insert(company_id, 'Interna')
+            # O bloco interno não comitou: a falha aqui desfaz os dois INSERTs
+            raise ValueError('falha depois do bloco interno')
+    assert _count(company_id) == 0
+
+    with transaction():
+        _insert(company_id, 'Externa')
+        with transaction():
+            _insert(company_id, 'Interna')
+    assert _count(company_id) == 2
+
+
+def test_failed_statement_rolls_back_the_transaction(make_user):
+    company_id = make_user('company')
+    with pytest.raises(Exception):
+        with transaction():
+            _insert(company_id, 'Antes do erro')
+            execute_sql('INSERT INTO jobs (company_id) VALUES (%s)', (company_id,), commit=True)
+    assert _count(company_id) == 0
+
+
+def test_request_connection_is_reused_and_released(app, make_user):
+    company_id = make_user('company')
+    with app.app_context():
+        conn = get_request_connection()
+        assert get_request_connection() is conn
+        with transaction():
+            _insert(company_id, 'Comitada')
+        assert g.db_conn is conn
+        # Escrita sem commit: descartada pelo teardown do app context
+        execute_sql('INSERT INTO jobs (company_id, title) VALUES (%s, %s)', (company_id, 'Sem commit'))
+    assert _count(company_id) == 1